@@ -0,0 +1,246 @@
+"""
+Scaling benchmarks for wall and slab generation.
+
+Builds synthetic inventories of 1k, 10k and 100k elements and records, per stage, the wall
+time, peak memory, entity count and output file size. Results are written as JSON so runs
+of different commits can be compared:
+
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 --output before.json
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ifcopenshell
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.elements.ifc_slab import IFCSlab
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.ifc_manager import IFCManager
+
+KINDS = ("walls", "solid_slabs", "hollow_core_slabs")
+PATHS = ("api", "bulk")
+SIZES = (1000, 10000, 100000)
+
+
+class StageTimer:
+    """
+    Records wall time, peak memory and entity count of consecutive benchmark stages.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.stages = []
+
+    def run(self, name, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        self.stages.append({
+            "stage": name,
+            "seconds": elapsed,
+            # ru_maxrss is in kilobytes on Linux; the peak includes ifcopenshell's C++ allocations
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "entities": sum(1 for _ in self.model)
+        })
+        return result
+
+
+def generate_records(kind, size, seed):
+    if kind == "walls":
+        return generate_walls(size, seed)
+    return generate_slabs(size, seed, hollow_core=kind == "hollow_core_slabs")
+
+
+def run_api_benchmark(ifc_manager, kind, records, timer):
+    # One stage per step of the per-element path, each over the whole inventory
+    def create_elements():
+        elements = []
+        for record in records:
+            if kind == "walls":
+                element = IFCWall(ifc_manager, name=record["element_data"]["Wall_ID"])
+            else:
+                element = IFCSlab(ifc_manager, name=record["element_data"]["Product ID"])
+            element.set_placement()
+            elements.append(element)
+        return elements
+
+    elements = timer.run("create", create_elements)
+
+    def add_representations():
+        for element, record in zip(elements, records):
+            if kind == "walls":
+                geometry_data = record["geometry_data"]
+                element.add_wall_representation(geometry_data["Length"], geometry_data["Height"],
+                                                geometry_data["Thickness"], voids=geometry_data["Voids"])
+            else:
+                element_data = record["element_data"]
+                element.add_slab_representation(element_data["Length"], element_data["Width"], element_data["Height"],
+                                                element_data["Void Count"], element_data["Void Diameter"])
+
+    def add_psets():
+        for element, record in zip(elements, records):
+            element.add_element_data(record["element_data"])
+            if kind == "walls":
+                element.add_geometry_data(record["geometry_data"])
+
+    timer.run("representation", add_representations)
+    timer.run("psets", add_psets)
+    def contain():
+        for element in elements:
+            element.assign_to_container(ifc_manager.storey)
+        ifc_manager.flush_containment()
+
+    timer.run("containment", contain)
+
+
+def run_bulk_benchmark(ifc_manager, kind, records, timer):
+    # The bulk builder interleaves the stages per batch, so it is measured as one stage
+    if kind == "walls":
+        timer.run("build", ifc_manager.add_walls_bulk, records)
+    else:
+        timer.run("build", ifc_manager.add_slabs_bulk, records)
+
+
+def run_case(case):
+    """
+    Runs one benchmark case. Called in a fresh process per case, so peak memory is per case.
+
+    Args:
+        case (tuple): Element kind, size, path, seed and output directory.
+
+    Returns:
+        dict: The case parameters, its stages and the output file size.
+    """
+    kind, size, path, seed, output_dir = case
+    records = generate_records(kind, size, seed)
+    file_path = os.path.join(output_dir, f"{kind}_{size}_{path}.ifc")
+
+    ifc_manager = IFCManager(file_path)
+    timer = StageTimer(ifc_manager.model)
+    if path == "api":
+        run_api_benchmark(ifc_manager, kind, records, timer)
+    else:
+        run_bulk_benchmark(ifc_manager, kind, records, timer)
+    timer.run("save", ifc_manager.save)
+    # Sum of the stages, leaving out the entity counts taken between them
+    total = sum(stage["seconds"] for stage in timer.stages)
+
+    file_size = os.path.getsize(file_path)
+    os.remove(file_path)
+    return {
+        "kind": kind,
+        "size": size,
+        "path": path,
+        "seconds": total,
+        "elements_per_second": size / total,
+        "file_size_mb": file_size / 1e6,
+        "stages": timer.stages
+    }
+
+
+def run_benchmarks(sizes=SIZES, kinds=KINDS, paths=PATHS, seed=0, output_dir=None):
+    """
+    Runs every combination of size, element kind and build path, each in its own process.
+
+    Args:
+        sizes (iterable of int): Inventory sizes.
+        kinds (iterable of str): Element kinds, see KINDS.
+        paths (iterable of str): "api" for the per-element IFCWall / IFCSlab path, "bulk" for the bulk builder.
+        seed (int): Seed of the synthetic inventories.
+        output_dir (str): Directory for the temporary IFC files, defaults to a temporary directory.
+
+    Returns:
+        dict: Environment information and the results of every case.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases = [(kind, size, path, seed, output_dir or temp_dir) for size in sizes for kind in kinds for path in paths]
+        results = []
+        for case in cases:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_case, case).result()
+            print_result(result)
+            results.append(result)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "ifcopenshell": ifcopenshell.version,
+        "seed": seed,
+        "results": results
+    }
+
+
+def print_result(result):
+    stages = ", ".join(f"{stage['stage']} {stage['seconds']:.2f}s" for stage in result["stages"])
+    peak = max(stage["peak_rss_mb"] for stage in result["stages"])
+    print(f"{result['kind']:>17} {result['size']:>7} {result['path']:>4}: {result['seconds']:8.2f}s "
+          f"({result['elements_per_second']:.0f} elements/s, {peak:.0f} MB peak, "
+          f"{result['file_size_mb']:.1f} MB file) [{stages}]")
+
+
+def compare_results(baseline, current):
+    """
+    Prints the change in total time, peak memory and file size of every case present in both runs.
+
+    Args:
+        baseline (dict): Earlier results, as returned by run_benchmarks.
+        current (dict): Current results.
+    """
+    def key(result):
+        return result["kind"], result["size"], result["path"]
+
+    def peak(result):
+        return max(stage["peak_rss_mb"] for stage in result["stages"])
+
+    earlier = {key(result): result for result in baseline["results"]}
+    print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+    for result in current["results"]:
+        before = earlier.get(key(result))
+        if before is None:
+            continue
+        print(f"{result['kind']:>17} {result['size']:>7} {result['path']:>4}: "
+              f"time x{result['seconds'] / before['seconds']:.2f}, "
+              f"peak memory x{peak(result) / peak(before):.2f}, "
+              f"file size x{result['file_size_mb'] / before['file_size_mb']:.2f}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark wall and slab generation at increasing inventory sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON results file, defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="Earlier JSON results file to compare with")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.kinds, args.paths, args.seed)
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results",
+                                         f"{results['commit'] or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_results(json.load(f), results)
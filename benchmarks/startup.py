@@ -0,0 +1,89 @@
+"""
+Startup benchmarks: time from process start to the first wall, and IFCManager construction cost.
+
+    python -m benchmarks.startup --runs 10 --managers 200
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_ELEMENT_SCRIPT = """
+import time
+start = time.perf_counter()
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.elements.ifc_wall import IFCWall
+imported = time.perf_counter()
+wall = IFCWall(IFCManager(None), name="Wall")
+wall.set_placement()
+wall.add_wall_representation(3200.0, 2600.0, 200.0)
+print(imported - start, time.perf_counter() - start)
+"""
+
+
+def time_first_element(runs):
+    """
+    Starts a fresh interpreter per run and times it until its first wall has a representation.
+
+    Args:
+        runs (int): Number of processes started.
+
+    Returns:
+        dict: Median process, import and import-to-first-wall times in seconds.
+    """
+    totals, imports, first_walls = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", FIRST_ELEMENT_SCRIPT], capture_output=True, text=True, check=True)
+        totals.append(time.perf_counter() - start)
+        imported, first_wall = (float(value) for value in output.stdout.split()[-2:])
+        imports.append(imported)
+        first_walls.append(first_wall)
+    return {
+        "process_to_first_wall": statistics.median(totals),
+        "import": statistics.median(imports),
+        "import_to_first_wall": statistics.median(first_walls)
+    }
+
+
+def time_managers(count):
+    """
+    Times IFCManager construction from the cached skeleton and with the setup API calls re-run.
+
+    Args:
+        count (int): Number of managers constructed per variant.
+
+    Returns:
+        dict: Mean construction time in milliseconds of both variants.
+    """
+    from ifc_library.ifc_manager import IFCManager
+
+    IFCManager(None)
+    start = time.perf_counter()
+    for _ in range(count):
+        IFCManager(None)
+    cached = (time.perf_counter() - start) / count
+
+    start = time.perf_counter()
+    for _ in range(count):
+        IFCManager.skeleton = None
+        IFCManager(None)
+    uncached = (time.perf_counter() - start) / count
+
+    return {"cached_ms": cached * 1000, "uncached_ms": uncached * 1000}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark process startup and IFCManager construction.")
+    parser.add_argument("--runs", type=int, default=10, help="Processes started to time the first wall")
+    parser.add_argument("--managers", type=int, default=200, help="Managers constructed per variant")
+    args = parser.parse_args()
+
+    first = time_first_element(args.runs)
+    print(f"Process start to first wall: {first['process_to_first_wall'] * 1000:.0f}ms "
+          f"(imports {first['import'] * 1000:.0f}ms, then {first['import_to_first_wall'] * 1000:.0f}ms to the first wall)")
+    managers = time_managers(args.managers)
+    print(f"IFCManager construction: {managers['cached_ms']:.2f}ms from the skeleton cache, "
+          f"{managers['uncached_ms']:.2f}ms running the setup")
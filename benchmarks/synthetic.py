@@ -0,0 +1,135 @@
+import random
+
+STATUSES = ["Available", "Reserved", "Stored", "Reused", "Damaged"]
+ORIENTATIONS = ["North", "East", "South", "West"]
+STRENGTH_CLASSES = ["C25/30", "C30/37", "C35/45", "C40/50"]
+WALL_TYPES = ["Precast Concrete", "Sandwich Panel", "Shear Wall"]
+WINGS = ["Wing_A", "Wing_B", "Wing_C"]
+
+# Standard hollow-core cross-sections: width, height, void count, void diameter (mm)
+HOLLOW_CORE_SECTIONS = [(1200, 200, 6, 150), (1200, 265, 5, 185), (1200, 320, 5, 230), (1200, 400, 4, 280)]
+
+
+def generate_walls(count, seed=0, max_voids=10):
+    """
+    Generates a synthetic wall inventory in the record format of `IFCManager.add_walls_bulk`.
+
+    Dimensions come from a small catalogue of panel sizes, as in a real inventory where the
+    same panels repeat, and each wall gets 0 to `max_voids` doors and windows laid out along
+    its length without overlapping.
+
+    Args:
+        count (int): Number of walls.
+        seed (int): Seed of the random generator, so runs are comparable between commits.
+        max_voids (int): Maximum number of voids per wall.
+
+    Returns:
+        list: Wall records holding `element_data` and `geometry_data`.
+    """
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        length = rng.choice([2400.0, 3200.0, 4800.0, 6000.0, 7200.0])
+        height = rng.choice([2600.0, 2800.0, 3000.0])
+        thickness = rng.choice([150.0, 200.0, 250.0])
+        voids = generate_voids(rng, length, height, rng.randint(0, max_voids))
+        floor = i // 500
+        records.append({
+            "element_data": {
+                "Element_ID": i,
+                "Wall_ID": f"W-{i:06d}",
+                "Local_ID": f"L-{i % 1000:03d}",
+                "Building_ID": f"B-{floor // 10:02d}",
+                "Product_ID": f"P-{rng.randint(0, 199):03d}",
+                "Reinf_ID": f"R-{rng.randint(0, 49):02d}",
+                "Wall_Type": rng.choice(WALL_TYPES),
+                "Wing": rng.choice(WINGS),
+                "Floor_Num": floor % 10,
+                "Orientation": rng.choice(ORIENTATIONS),
+                "Grid_Pos": f"{chr(65 + rng.randint(0, 25))}{rng.randint(1, 40)}",
+                "Status": rng.choice(STATUSES),
+                "Storage_Loc": f"Yard_{rng.randint(1, 12)}",
+                "Links": f"https://example.com/walls/{i}",
+                "Notes": "Salvaged from donor building, visual inspection passed."
+            },
+            "geometry_data": {
+                "Product_ID": f"P-{rng.randint(0, 199):03d}",
+                "Reinf_Type": rng.choice(["Type_A", "Type_B", "Type_C"]),
+                "Mirrored": rng.random() < 0.2,
+                "Count": 1,
+                "Height": height,
+                "Length": length,
+                "Thickness": thickness,
+                "Strength_Class": rng.choice(STRENGTH_CLASSES),
+                "Agg_Size": rng.choice([16, 20, 32]),
+                "Drawing": f"DWG-{i:06d}.pdf",
+                "Geometry_Notes": "Edges chipped at lifting points.",
+                "Has_Void": bool(voids),
+                "Voids": voids,
+                "Has_ExtPanels": rng.random() < 0.1,
+                "Has_Connections": rng.random() < 0.7,
+                "Has_Corbel": rng.random() < 0.05
+            }
+        })
+    return records
+
+
+def generate_voids(rng, length, height, count):
+    # Equal bays along the wall, one opening per bay, so openings never overlap
+    if count == 0:
+        return []
+    bay = length / count
+    voids = []
+    for i in range(count):
+        width = min(rng.choice([300.0, 600.0, 900.0, 1200.0]), bay - 100.0)
+        if width <= 0:
+            break
+        is_door = rng.random() < 0.2
+        void_height = 2100.0 if is_door else rng.choice([300.0, 600.0, 1200.0])
+        voids.append({
+            "X": round(i * bay + (bay - width) / 2, 1),
+            "Z": 0.0 if is_door else min(900.0, height - void_height - 100.0),
+            "Width": width,
+            "Height": void_height
+        })
+    return voids
+
+
+def generate_slabs(count, seed=0, hollow_core=True):
+    """
+    Generates a synthetic slab inventory in the record format of `IFCManager.add_slabs_bulk`.
+
+    Args:
+        count (int): Number of slabs.
+        seed (int): Seed of the random generator, so runs are comparable between commits.
+        hollow_core (bool): Generate hollow-core slabs from standard sections, or solid slabs.
+
+    Returns:
+        list: Slab records holding `element_data`.
+    """
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        if hollow_core:
+            width, height, void_count, void_diameter = rng.choice(HOLLOW_CORE_SECTIONS)
+        else:
+            width, height, void_count, void_diameter = rng.choice([1200, 2400]), rng.choice([160, 200, 250]), 0, 0.0
+        records.append({
+            "element_data": {
+                "Product ID": f"HC-{i:06d}" if hollow_core else f"SS-{i:06d}",
+                "Reinforcement ID": f"RF-{rng.randint(0, 49):02d}",
+                "Count": 1,
+                "Height": height,
+                "Length": rng.choice([4800, 6000, 7200, 8400, 9600]),
+                "Width": width,
+                "Void Count": void_count,
+                "Void Diameter": float(void_diameter),
+                "Concrete Cover": rng.choice([25.0, 30.0, 35.0]),
+                "External Web Thickness": 35.0,
+                "Concrete Strength Class": rng.choice(STRENGTH_CLASSES),
+                "Max Aggregate Size": rng.choice([16, 20]),
+                "Drawings": f"https://example.com/slabs/{i}.pdf",
+                "Notes": "Recovered from floor deck, bearing ends saw cut."
+            }
+        })
+    return records
@@ -4,20 +4,150 @@ import os
 # Add the parent directory of 'ifc_library' to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+import copy
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, ttk
 from ifc_library.ifc_manager import IFCManager
-from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.inventory import WALL_ELEMENT_FIELDS, WALL_GEOMETRY_FIELDS
+from ifc_library.records import read_records
+from ifc_library.validation import validate_walls
+
+# Walls built between two progress updates
+CHUNK_SIZE = 50
+# Delay before edits are saved, every edit within it is written by the same save
+SAVE_DELAY_MS = 2000
+# Interval at which the window picks up the worker's events
+POLL_MS = 50
+# Fields entered as text that the inventory holds as numbers
+NUMBER_FIELDS = {name for name, _, kind, _ in WALL_ELEMENT_FIELDS + WALL_GEOMETRY_FIELDS if kind == "number"}
+
+
+class ModelWorker(threading.Thread):
+    """
+    Owns the open model and runs every build and save off the Tk main thread.
+
+    Tasks are taken from `tasks` in order, so a save always sees the walls queued before it.
+    Progress and results are posted to `events` as tuples, which the window polls; the worker
+    never touches a Tk widget or variable. A failed task is posted as an "error" event, and so
+    is whatever ends the thread.
+    """
+
+    def __init__(self, file_path):
+        super().__init__(daemon=True)
+        self.file_path = file_path
+        self.manager = None
+        self.dirty = False
+        # Element_ID -> void layout the wall was last built with
+        self.void_layouts = {}
+        self.tasks = queue.Queue()
+        self.events = queue.Queue()
+
+    def run(self):
+        try:
+            self.run_tasks()
+        except BaseException as error:
+            self.events.put(("error", f"Model worker stopped: {type(error).__name__}: {error}"))
+            raise
+
+    def run_tasks(self):
+        while True:
+            task, argument = self.tasks.get()
+            if task == "stop":
+                break
+            try:
+                if self.manager is None:
+                    self.open_model()
+                if task == "build":
+                    self.build(argument)
+                elif task == "save":
+                    self.save()
+            except Exception as error:
+                self.events.put(("error", f"{type(error).__name__}: {error}"))
+
+    def open_model(self):
+        if os.path.exists(self.file_path):
+            self.manager = IFCManager.open(self.file_path)
+        else:
+            self.manager = IFCManager(self.file_path)
+
+    def build(self, records):
+        """
+        Validates the records, then adds new walls to the open model and updates existing ones.
+
+        Args:
+            records (list of dict): Records holding `element_data` and `geometry_data`.
+        """
+        report = validate_walls(records)
+        if not report.is_valid:
+            self.events.put(("rejected", report.by_row()))
+            records = [record for record, valid in zip(records, report.valid) if valid]
+
+        added = updated = 0
+        for start in range(0, len(records), CHUNK_SIZE):
+            chunk = records[start:start + CHUNK_SIZE]
+            # Void layouts are not kept in the property sets: only walls whose voids changed
+            # are rebuilt when their dimensions did not change
+            rebuilt = [self.voids_changed(record) for record in chunk]
+            for rebuild in (False, True):
+                part = [record for record, changed in zip(chunk, rebuilt) if changed == rebuild]
+                if part:
+                    upsert = self.manager.upsert_walls(part, rebuild_geometry=rebuild)
+                    added += upsert.added
+                    updated += upsert.updated
+            for record in chunk:
+                self.void_layouts[element_id(record)] = copy.deepcopy(voids(record))
+            self.dirty = True
+            self.events.put(("progress", start + len(chunk), len(records)))
+        self.events.put(("built", added, updated))
+
+    def voids_changed(self, record):
+        """
+        Args:
+            record (dict): Record of a wall to build.
+
+        Returns:
+            bool: True if the wall is in the model with other voids than the record's.
+        """
+        key = element_id(record)
+        if key in self.void_layouts:
+            return self.void_layouts[key] != voids(record)
+        # A wall of the opened file: its layout is unknown, rebuild it if it has or gets voids
+        wall = self.manager.get_updater().get_element("IfcWall", "Element_ID", key)
+        return wall is not None and bool(voids(record) or wall.HasOpenings)
+
+    def save(self):
+        # Saves requested after the model was written are no-ops
+        if not self.dirty:
+            return
+        start = time.perf_counter()
+        self.manager.save()
+        self.dirty = False
+        self.events.put(("saved", self.file_path, time.perf_counter() - start))
+
+    def stop(self):
+        # Writes pending edits before the worker ends
+        self.tasks.put(("save", None))
+        self.tasks.put(("stop", None))
+
+
+def element_id(record):
+    return record.get("element_data", {}).get("Element_ID")
+
+
+def voids(record):
+    return record.get("geometry_data", {}).get("Voids") or []
+
 
 class WallCreationGUI:
-    def __init__(self, root):
+    def __init__(self, root, file_path="wall_demo.ifc"):
         self.root = root
         self.root.title("IFC Wall Creation Tool")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
-        # Variables for wall parameters
-        self.length = tk.DoubleVar()
-        self.height = tk.DoubleVar()
-        self.thickness = tk.DoubleVar()
+        self.file_path = tk.StringVar(value=file_path)
         self.element_data = {
             'Element_ID': tk.StringVar(),
             'Wall_ID': tk.StringVar(),
@@ -41,7 +171,6 @@ class WallCreationGUI:
             'Reinf_Type': tk.StringVar(),
             'Mirrored': tk.BooleanVar(value=False),  # Default value
             'Count': tk.IntVar(value=1),  # Default value
-            'FootprintPolyline': tk.StringVar(),
             'Height': tk.DoubleVar(),
             'Length': tk.DoubleVar(),
             'Thickness': tk.DoubleVar(),
@@ -49,83 +178,293 @@ class WallCreationGUI:
             'Agg_Size': tk.StringVar(),
             'Drawing': tk.StringVar(),
             'Geometry_Notes': tk.StringVar(),
-            'Has_Void': tk.BooleanVar(value=False),  # Default value
             'Has_ExtPanels': tk.BooleanVar(value=False),  # Default value
             'Has_Connections': tk.BooleanVar(value=False),  # Default value
             'Has_Corbel': tk.BooleanVar(value=False)  # Default value
         }
 
+        # Openings of the wall in the form, Has_Void follows from them
+        self.void_data = {
+            'X': tk.DoubleVar(),
+            'Z': tk.DoubleVar(),
+            'Width': tk.DoubleVar(),
+            'Height': tk.DoubleVar()
+        }
+        self.voids = []
+
+        # Walls waiting to be built, by Treeview item
+        self.batch = {}
+
+        self.worker = None
+        self.building = False
+        # Batch items of the running build, and the ones it rejected
+        self.submitted = []
+        self.rejected = ""
+        self.save_job = None
+
         # GUI Elements
         self.setup_gui()
+        self.root.after(POLL_MS, self.poll_worker)
 
     def setup_gui(self):
         frame = ttk.Frame(self.root, padding="10")
         frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        form = ttk.Frame(frame)
+        form.grid(row=0, column=0, sticky=(tk.N, tk.W, tk.E))
+        batch_frame = ttk.Frame(frame, padding=(10, 0, 0, 0))
+        batch_frame.grid(row=0, column=1, sticky=(tk.N, tk.S, tk.W, tk.E))
 
         # Length, Height, Thickness Inputs (Compulsory Inputs)
-        compulsory_frame = ttk.LabelFrame(frame, text="Basic Wall Dimensions (Compulsory)", padding="10")
+        compulsory_frame = ttk.LabelFrame(form, text="Basic Wall Dimensions (Compulsory)", padding="10")
         compulsory_frame.grid(row=0, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
 
         ttk.Label(compulsory_frame, text="Wall Length (mm)*:").grid(row=0, column=0, sticky=tk.W)
-        ttk.Entry(compulsory_frame, textvariable=self.length).grid(row=0, column=1, sticky=(tk.W, tk.E))
+        ttk.Entry(compulsory_frame, textvariable=self.geometry_data['Length']).grid(row=0, column=1, sticky=(tk.W, tk.E))
 
         ttk.Label(compulsory_frame, text="Wall Height (mm)*:").grid(row=1, column=0, sticky=tk.W)
-        ttk.Entry(compulsory_frame, textvariable=self.height).grid(row=1, column=1, sticky=(tk.W, tk.E))
+        ttk.Entry(compulsory_frame, textvariable=self.geometry_data['Height']).grid(row=1, column=1, sticky=(tk.W, tk.E))
 
         ttk.Label(compulsory_frame, text="Wall Thickness (mm)*:").grid(row=2, column=0, sticky=tk.W)
-        ttk.Entry(compulsory_frame, textvariable=self.thickness).grid(row=2, column=1, sticky=(tk.W, tk.E))
+        ttk.Entry(compulsory_frame, textvariable=self.geometry_data['Thickness']).grid(row=2, column=1, sticky=(tk.W, tk.E))
 
         # Element Data Inputs
-        element_frame = ttk.LabelFrame(frame, text="Element Data", padding="10")
+        element_frame = ttk.LabelFrame(form, text="Element Data", padding="10")
         element_frame.grid(row=3, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
+        self.add_fields(element_frame, self.element_data)
 
-        row = 0
-        for key, var in self.element_data.items():
-            ttk.Label(element_frame, text=f"{key.replace('_', ' ')}:").grid(row=row, column=0, sticky=tk.W)
-            ttk.Entry(element_frame, textvariable=var).grid(row=row, column=1, sticky=(tk.W, tk.E))
-            row += 1
-
-        # Geometry Data Inputs
-        geometry_frame = ttk.LabelFrame(frame, text="Geometry Data", padding="10")
+        # Geometry Data Inputs, the dimensions are entered above
+        geometry_frame = ttk.LabelFrame(form, text="Geometry Data", padding="10")
         geometry_frame.grid(row=4, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
+        self.add_fields(geometry_frame, {key: var for key, var in self.geometry_data.items()
+                                         if key not in ('Length', 'Height', 'Thickness')})
+
+        # Void Inputs
+        void_frame = ttk.LabelFrame(form, text="Voids (mm from the wall's bottom left corner)", padding="10")
+        void_frame.grid(row=5, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
+        for column, (key, var) in enumerate(self.void_data.items()):
+            ttk.Label(void_frame, text=f"{key}:").grid(row=0, column=2 * column, sticky=tk.W)
+            ttk.Entry(void_frame, textvariable=var, width=7).grid(row=0, column=2 * column + 1, sticky=tk.W)
+        self.void_list = tk.Listbox(void_frame, height=3)
+        self.void_list.grid(row=1, column=0, columnspan=6, pady=5, sticky=(tk.W, tk.E))
+        ttk.Button(void_frame, text="Add Void", command=self.add_void).grid(row=1, column=6, sticky=tk.N)
+        ttk.Button(void_frame, text="Remove Void", command=self.remove_void).grid(row=1, column=7, sticky=tk.N)
+
+        # Batch of walls built into the open model
+        file_frame = ttk.Frame(batch_frame)
+        file_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        ttk.Label(file_frame, text="IFC file:").grid(row=0, column=0, sticky=tk.W)
+        self.file_entry = ttk.Entry(file_frame, textvariable=self.file_path, width=40)
+        self.file_entry.grid(row=0, column=1, sticky=(tk.W, tk.E))
+
+        columns = ("Element_ID", "Wall_ID", "Length", "Height", "Thickness", "Voids")
+        self.batch_table = ttk.Treeview(batch_frame, columns=columns, show="headings", height=20)
+        for column in columns:
+            self.batch_table.heading(column, text=column.replace('_', ' '))
+            self.batch_table.column(column, width=80)
+        self.batch_table.grid(row=1, column=0, pady=10, sticky=(tk.N, tk.S, tk.W, tk.E))
 
-        row = 0
-        for key, var in self.geometry_data.items():
-            ttk.Label(geometry_frame, text=f"{key.replace('_', ' ')}:").grid(row=row, column=0, sticky=tk.W)
-            ttk.Entry(geometry_frame, textvariable=var).grid(row=row, column=1, sticky=(tk.W, tk.E))
-            row += 1
+        buttons = ttk.Frame(batch_frame)
+        buttons.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        ttk.Button(buttons, text="Add to Batch", command=self.add_to_batch).grid(row=0, column=0)
+        ttk.Button(buttons, text="Import Table...", command=self.import_table).grid(row=0, column=1)
+        ttk.Button(buttons, text="Remove Selected", command=self.remove_selected).grid(row=0, column=2)
+        self.create_button = ttk.Button(buttons, text="Create Walls", command=self.create_walls)
+        self.create_button.grid(row=0, column=3)
 
-        # Create Wall Button
-        ttk.Button(frame, text="Create Wall", command=self.create_wall).grid(row=5, column=0, columnspan=2, pady=10)
+        self.progress = ttk.Progressbar(batch_frame, mode="determinate")
+        self.progress.grid(row=3, column=0, pady=10, sticky=(tk.W, tk.E))
 
         # Feedback Label
-        self.feedback_label = ttk.Label(frame, text="", foreground="green")
-        self.feedback_label.grid(row=6, column=0, columnspan=2)
+        self.feedback_label = ttk.Label(batch_frame, text="", foreground="green", wraplength=500)
+        self.feedback_label.grid(row=4, column=0, sticky=tk.W)
+
+    def add_fields(self, parent, variables):
+        for row, (key, var) in enumerate(variables.items()):
+            ttk.Label(parent, text=f"{key.replace('_', ' ')}:").grid(row=row, column=0, sticky=tk.W)
+            if isinstance(var, tk.BooleanVar):
+                ttk.Checkbutton(parent, variable=var).grid(row=row, column=1, sticky=tk.W)
+            else:
+                ttk.Entry(parent, textvariable=var).grid(row=row, column=1, sticky=(tk.W, tk.E))
+
+    def add_void(self):
+        try:
+            void = {key: var.get() for key, var in self.void_data.items()}
+        except tk.TclError:
+            return self.show("Void dimensions must be numbers", error=True)
+        self.voids.append(void)
+        self.void_list.insert(tk.END, ", ".join(f"{key} {value:g}" for key, value in void.items()))
+
+    def remove_void(self):
+        for index in reversed(self.void_list.curselection()):
+            self.void_list.delete(index)
+            del self.voids[index]
+
+    def form_record(self):
+        """
+        Returns:
+            dict: The wall in the form, as a record for `upsert_walls`, or None if a number is invalid.
+        """
+        record = {"element_data": {}, "geometry_data": {}}
+        for section, variables in (("element_data", self.element_data), ("geometry_data", self.geometry_data)):
+            for key, var in variables.items():
+                try:
+                    value = var.get()
+                    if key in NUMBER_FIELDS and isinstance(value, str):
+                        value = parse_number(value)
+                except (tk.TclError, ValueError):
+                    self.show(f"{key.replace('_', ' ')} must be a number", error=True)
+                    return None
+                record[section][key] = value
+        record["geometry_data"]['Has_Void'] = bool(self.voids)
+        record["geometry_data"]['Voids'] = [dict(void) for void in self.voids]
+        return record
+
+    def add_to_batch(self):
+        record = self.form_record()
+        if record is not None:
+            self.add_records([record])
+
+    def import_table(self):
+        path = filedialog.askopenfilename(filetypes=[("Wall inventories", "*.csv *.jsonl *.ndjson")])
+        if not path:
+            return
+        try:
+            records = list(read_records(path))
+        except (OSError, ValueError) as error:
+            return self.show(f"Could not import {os.path.basename(path)}: {error}", error=True)
+        self.add_records(records)
+        self.show(f"Imported {len(records)} walls from {os.path.basename(path)}")
+
+    def add_records(self, records):
+        for record in records:
+            element_data = record.get("element_data", {})
+            geometry_data = record.get("geometry_data", {})
+            values = (element_data.get("Element_ID", ""), element_data.get("Wall_ID", ""),
+                      geometry_data.get("Length", ""), geometry_data.get("Height", ""),
+                      geometry_data.get("Thickness", ""), len(geometry_data.get("Voids") or []))
+            self.batch[self.batch_table.insert("", tk.END, values=values)] = record
+
+    def remove_selected(self):
+        for item in self.batch_table.selection():
+            self.batch_table.delete(item)
+            del self.batch[item]
+
+    def create_walls(self):
+        # Builds the batch, or the wall in the form if the batch is empty
+        if self.building:
+            return
+        if self.batch:
+            self.submitted = list(self.batch)
+            records = list(self.batch.values())
+        else:
+            self.submitted = []
+            record = self.form_record()
+            if record is None:
+                return
+            records = [record]
+
+        if self.worker is None or not self.worker.is_alive():
+            # A stopped worker is replaced: the model is opened again from its file
+            self.worker = ModelWorker(self.file_path.get())
+            self.worker.start()
+            self.file_entry.state(["disabled"])
+        self.worker.tasks.put(("build", records))
+        self.building = True
+        self.create_button.state(["disabled"])
+        self.progress.configure(maximum=len(records), value=0)
+        self.show(f"Building {len(records)} walls...")
+
+    def schedule_save(self):
+        # Restarts the save delay, so that a series of edits is written once
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+        self.save_job = self.root.after(SAVE_DELAY_MS, self.request_save)
+
+    def request_save(self):
+        self.save_job = None
+        self.worker.tasks.put(("save", None))
+
+    def poll_worker(self):
+        if self.worker is not None:
+            while True:
+                try:
+                    event, *arguments = self.worker.events.get_nowait()
+                except queue.Empty:
+                    break
+                self.handle_event(event, arguments)
+            if self.building and not self.worker.is_alive():
+                # Its last event, if any, was the error that ended it
+                self.finish_build()
+                self.show("The model worker stopped, the batch was not built", error=True)
+        self.root.after(POLL_MS, self.poll_worker)
+
+    def handle_event(self, event, arguments):
+        if event == "progress":
+            done, total = arguments
+            self.progress.configure(maximum=total, value=done)
+        elif event == "rejected":
+            # Rejected walls stay in the batch to be corrected
+            rejected = arguments[0]
+            lines = [f"Wall {row + 1}: {'; '.join(messages)}" for row, messages in list(rejected.items())[:5]]
+            self.rejected = f"\n{len(rejected)} walls rejected\n" + "\n".join(lines)
+            rejected_items = {self.submitted[row] for row in rejected if row < len(self.submitted)}
+            self.submitted = [item for item in self.submitted if item not in rejected_items]
+        elif event == "built":
+            added, updated = arguments
+            self.finish_build()
+            for item in self.submitted:
+                if item in self.batch:
+                    self.batch_table.delete(item)
+                    del self.batch[item]
+            self.show(f"{added} walls added, {updated} updated, saving shortly{self.rejected}",
+                      error=bool(self.rejected))
+            self.rejected = ""
+            if added or updated:
+                self.schedule_save()
+        elif event == "saved":
+            file_path, elapsed = arguments
+            self.show(f"Saved to '{file_path}' in {elapsed:.1f}s")
+        elif event == "error":
+            if self.building:
+                self.finish_build()
+                self.rejected = ""
+            self.show(arguments[0], error=True)
+
+    def finish_build(self):
+        self.building = False
+        self.create_button.state(["!disabled"])
+
+    def show(self, text, error=False):
+        self.feedback_label.config(text=text, foreground="red" if error else "green")
 
-    def create_wall(self):
-        # Create an IFC Manager and Wall Element
-        manager = IFCManager("wall_demo.ifc")
-        wall = IFCWall(manager, name="Demo Wall")
-        wall.add_wall_representation(
-            length=self.length.get(),
-            height=self.height.get(),
-            thickness=self.thickness.get()
-        )
+    def close(self):
+        # Writes pending edits on the worker before the window goes away
+        if self.worker is None or not self.worker.is_alive():
+            return self.root.destroy()
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+            self.save_job = None
+        self.worker.stop()
+        self.show("Saving before closing...")
+        self.wait_for_worker()
 
-        # Add element data
-        element_data = {key: var.get() for key, var in self.element_data.items()}
-        wall.add_element_data(element_data)
+    def wait_for_worker(self):
+        if self.worker.is_alive():
+            self.root.after(POLL_MS, self.wait_for_worker)
+        else:
+            self.root.destroy()
 
-        # Add geometry data
-        geometry_data = {key: var.get() for key, var in self.geometry_data.items()}
-        wall.add_geometry_data(geometry_data)
 
-        manager.save()
+def parse_number(text):
+    # Entry text to an int or float, None if left empty
+    text = text.strip()
+    if not text:
+        return None
+    number = float(text)
+    return int(number) if number.is_integer() and "." not in text else number
 
-        # Update feedback
-        self.feedback_label.config(text=f"Wall created and saved to 'wall_demo.ifc'")
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = WallCreationGUI(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
@@ -20,19 +20,100 @@ document.getElementById('Has_Void').addEventListener('change', function() {
     }
 });
 
+// Generation service, see ifc_library/service.py
+const SERVICE_URL = window.IFC_SERVICE_URL || 'http://localhost:8765';
+// Seconds the service may take before it answers with a job to poll instead of the file
+const SERVICE_WAIT = 10;
+
+// Required record fields the form does not ask for
+const WALL_ELEMENT_DEFAULTS = {
+    Local_ID: '', Building_ID: '', Product_ID: '', Reinf_ID: '', Wing: '', Floor_Num: 0,
+    Orientation: 'South', Grid_Pos: '', Status: 'Available', Storage_Loc: '', Links: '', Notes: ''
+};
+const WALL_GEOMETRY_DEFAULTS = {
+    Product_ID: '', Reinf_Type: '', Mirrored: false, Count: 1, Agg_Size: 0, Drawing: '',
+    Geometry_Notes: '', Has_ExtPanels: false, Has_Connections: false, Has_Corbel: false
+};
+
+function showStatus(message) {
+    let status = document.getElementById('status');
+    if (!status) {
+        status = document.createElement('p');
+        status.id = 'status';
+        document.getElementById('preview').appendChild(status);
+    }
+    status.textContent = message;
+}
+
+function downloadIfc(blob, name) {
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(blob);
+    link.download = name;
+    link.click();
+    URL.revokeObjectURL(link.href);
+}
+
+async function fetchIfc(url, options, attempt = 0) {
+    const response = await fetch(url, options);
+    if (response.status === 503 && attempt < 5) {
+        // The service is at capacity: back off as it asks
+        const delay = parseFloat(response.headers.get('Retry-After') || '1') * 1000 * (attempt + 1);
+        showStatus('Service busy, retrying...');
+        await new Promise(resolve => setTimeout(resolve, delay));
+        return fetchIfc(url, options, attempt + 1);
+    }
+    return response;
+}
+
+async function generateIfc(records) {
+    showStatus('Generating IFC...');
+    let response = await fetchIfc(`${SERVICE_URL}/jobs?wait=${SERVICE_WAIT}`, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(records)
+    });
+
+    // Not built within the wait: poll the job until its file is ready
+    if (response.status === 202) {
+        let job = await response.json();
+        while (job.status === 'queued' || job.status === 'running') {
+            await new Promise(resolve => setTimeout(resolve, 500));
+            job = await (await fetch(`${SERVICE_URL}${job.url}`)).json();
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error);
+        }
+        response = await fetch(`${SERVICE_URL}${job.file}`);
+    }
+
+    if (response.status === 422) {
+        const result = await response.json();
+        const messages = Object.values(result.records).flatMap(rows => Object.values(rows).flat());
+        throw new Error(messages.join('\n'));
+    }
+    if (!response.ok) {
+        const result = await response.json();
+        throw new Error(result.error);
+    }
+    downloadIfc(await response.blob(), `${response.headers.get('X-Job-Id') || 'model'}.ifc`);
+    showStatus('IFC file generated.');
+}
+
 // Handler for generating or updating the IFC file
 document.getElementById('generateIfc').addEventListener('click', function() {
     const wallData = {
         element_data: {
+            ...WALL_ELEMENT_DEFAULTS,
             Element_ID: 1,
             Wall_ID: document.getElementById('Wall_ID').value,
-            Wall_Type: document.getElementById('Wall_Type').value,
+            Wall_Type: document.getElementById('Wall_Type').value
+        },
+        geometry_data: {
+            ...WALL_GEOMETRY_DEFAULTS,
             Height: parseFloat(document.getElementById('Height').value),
             Length: parseFloat(document.getElementById('Length').value),
             Thickness: parseFloat(document.getElementById('Thickness').value),
             Strength_Class: document.getElementById('Strength_Class').value,
-        },
-        geometry_data: {
             Has_Void: document.getElementById('Has_Void').checked,
             Voids: []
         }
@@ -47,6 +128,5 @@ document.getElementById('generateIfc').addEventListener('click', function() {
         wallData.geometry_data.Voids.push(void1);
     }
 
-    console.log('Wall Data:', wallData);
-    // You can now pass this data to the backend or WebAssembly/Python processing to generate the IFC
+    generateIfc({walls: [wallData]}).catch(error => showStatus(`Generation failed: ${error.message}`));
 });
@@ -0,0 +1,18 @@
+import importlib
+
+# Public classes, imported on first access so that `import ifc_library` does not load ifcopenshell
+_EXPORTS = {
+    "IFCManager": "ifc_library.ifc_manager",
+    "IFCElement": "ifc_library.ifc_manager",
+    "IFCWall": "ifc_library.elements.ifc_wall",
+    "IFCSlab": "ifc_library.elements.ifc_slab",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'ifc_library' has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
@@ -0,0 +1,515 @@
+"""
+Content-addressed on-disk cache of built elements, so that a rebuild only builds what changed.
+
+Each wall or slab record is hashed together with the build options. The cache stores, per
+hash, the STEP lines the bulk builder generated for that record: the element, its placement,
+representation, openings and property sets. Entities referenced by several elements, such
+as shared types and their representation maps, are stored once and pulled in by every
+element using them. Cached entities keep the ids they were given when first built, which
+are unique across the whole cache, so a cached element is written out as is, without being
+renumbered or parsed. Only the records whose hash is not in the cache go through the bulk
+builder.
+
+Containment and type assignments group many elements, so they are not cached but written
+per build from the records. The cache is bounded in size and evicts the least recently used
+elements first.
+"""
+
+import gc
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import time
+from collections import Counter, OrderedDict
+
+import ifcopenshell.guid
+
+from ifc_library.bulk import element_guid
+from ifc_library.export import StepWriter
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.sharding import STEP_TOKEN, data_section
+
+CACHE_VERSION = 1
+# Cached entities are numbered from here up, above the skeleton, buildings and storeys of any build
+CACHE_ID_BASE = 10_000_000
+DEFAULT_MAX_BYTES = 2 << 30
+
+
+class CacheReport:
+    """
+    Cache use and output size of a cached build.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entities = 0
+        self.cache_bytes = 0
+        self.file_size = 0
+        self.elapsed = 0.0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self):
+        return (f"Built {self.hits + self.misses} elements into {self.file_path}: {self.hits} cached, "
+                f"{self.misses} built ({self.hit_rate:.1%} hits), {self.evictions} evicted, "
+                f"{self.entities} entities, {self.file_size / 1e6:.1f} MB, {self.elapsed:.2f}s "
+                f"(cache {self.cache_bytes / 1e6:.1f} MB)")
+
+
+class CacheEntry:
+    """
+    The cached STEP lines of one element.
+    """
+
+    __slots__ = ("offset", "length", "entities", "element_id", "type_id", "shared_ids")
+
+    def __init__(self, offset, length, entities, element_id, type_id, shared_ids):
+        self.offset = offset
+        self.length = length
+        self.entities = entities
+        self.element_id = element_id
+        # Id of the element's shared type, None without one
+        self.type_id = type_id
+        # Ids of the shared entities the element's lines refer to, directly or not
+        self.shared_ids = shared_ids
+
+    def __getstate__(self):
+        return (self.offset, self.length, self.entities, self.element_id, self.type_id, self.shared_ids)
+
+    def __setstate__(self, state):
+        self.offset, self.length, self.entities, self.element_id, self.type_id, self.shared_ids = state
+
+
+class BuildCache:
+    """
+    Element fragments stored in one append-only STEP data file, indexed by record hash.
+
+    The index keeps the entries in least recently used order. Entries evicted to stay under
+    `max_bytes` leave their lines in the data file until it is compacted, which happens once
+    more than half of it is unused.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): Directory of the cache, created if needed.
+            max_bytes (int): Size of the cached lines above which the least recently used entries are evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.pickle")
+        self.data_path = os.path.join(cache_dir, "fragments.step")
+        self.signature = skeleton_signature()
+        # Record hash -> CacheEntry, least recently used first
+        self.entries = OrderedDict()
+        # Shared entity id -> [offset, length, number of entries referring to it]
+        self.shared = {}
+        self.next_id = CACHE_ID_BASE
+        self.live_bytes = 0
+        self.evictions = 0
+        self.stream = None
+        self.data = None
+        os.makedirs(cache_dir, exist_ok=True)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            self.clear()
+            return
+        # The index holds a few small containers per entry, which the collector would scan
+        # over and over while they are loaded
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.index_path, "rb") as f:
+                index = pickle.load(f)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if index["version"] != CACHE_VERSION or index["signature"] != self.signature:
+            # Built by another version of the library: the cached ids no longer match the skeleton
+            self.clear()
+            return
+        self.entries = index["entries"]
+        self.shared = index["shared"]
+        self.next_id = index["next_id"]
+        self.live_bytes = index["live_bytes"]
+
+    def clear(self):
+        self.entries = OrderedDict()
+        self.shared = {}
+        self.next_id = CACHE_ID_BASE
+        self.live_bytes = 0
+        if os.path.exists(self.data_path):
+            os.remove(self.data_path)
+
+    def save(self):
+        self.close_data()
+        index = {"version": CACHE_VERSION, "signature": self.signature, "entries": self.entries,
+                 "shared": self.shared, "next_id": self.next_id, "live_bytes": self.live_bytes}
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.index_path)
+
+    def get(self, key):
+        """
+        Returns:
+            CacheEntry: The entry of a record hash, marked as most recently used, or None.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def allocate(self, count):
+        # Reserves `count` entity ids, returns the first one
+        first = self.next_id
+        self.next_id += count
+        return first
+
+    def append(self, text):
+        # Appends lines to the data file, returns their offset and length in bytes
+        if self.stream is None:
+            self.close_data()
+            self.stream = open(self.data_path, "ab")
+        data = text.encode("utf-8")
+        offset = self.stream.tell()
+        self.stream.write(data)
+        self.live_bytes += len(data)
+        return offset, len(data)
+
+    def add(self, key, text, entities, element_id, type_id, shared_ids, shared_lines):
+        """
+        Stores the lines of a newly built element.
+
+        Args:
+            key (str): Record hash, see `record_key`.
+            text (str): The element's own STEP lines.
+            entities (int): Number of lines in `text`.
+            element_id (int): Id of the element entity.
+            type_id (int): Id of its shared type, or None.
+            shared_ids (tuple): Ids of the shared entities it refers to, directly or not.
+            shared_lines (dict): Id -> STEP line of the shared entities not stored yet.
+
+        Returns:
+            CacheEntry: The new entry.
+        """
+        for entity_id in shared_ids:
+            shared = self.shared.get(entity_id)
+            if shared is None:
+                shared = self.shared[entity_id] = [*self.append(shared_lines[entity_id]), 0]
+            shared[2] += 1
+        offset, length = self.append(text)
+        entry = self.entries[key] = CacheEntry(offset, length, entities, element_id, type_id, shared_ids)
+        return entry
+
+    def evict(self):
+        """
+        Drops the least recently used entries until the cache fits in `max_bytes`, and the
+        shared entities no remaining entry refers to.
+
+        Returns:
+            int: Number of entries evicted.
+        """
+        evicted = 0
+        while self.live_bytes > self.max_bytes and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.live_bytes -= entry.length
+            for entity_id in entry.shared_ids:
+                shared = self.shared[entity_id]
+                shared[2] -= 1
+                if not shared[2]:
+                    self.live_bytes -= shared[1]
+                    del self.shared[entity_id]
+            evicted += 1
+        self.evictions += evicted
+        if evicted:
+            self.compact()
+        return evicted
+
+    def compact(self):
+        # Rewrites the data file without the lines of evicted entries once they are the majority
+        self.close_data()
+        if not os.path.exists(self.data_path) or os.path.getsize(self.data_path) <= 2 * self.live_bytes:
+            return
+        temp_path = self.data_path + ".tmp"
+        data = self.read_data()
+        with open(temp_path, "wb") as f:
+            for shared in self.shared.values():
+                start = shared[0]
+                shared[0] = f.tell()
+                f.write(data[start:start + shared[1]])
+            for entry in self.entries.values():
+                start = entry.offset
+                entry.offset = f.tell()
+                f.write(data[start:start + entry.length])
+        self.close_data()
+        os.replace(temp_path, self.data_path)
+
+    def read_data(self):
+        """
+        Returns:
+            mmap.mmap: The data file, mapped read-only, or an empty bytes object.
+        """
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if self.data is None:
+            if not os.path.exists(self.data_path) or not os.path.getsize(self.data_path):
+                return b""
+            with open(self.data_path, "rb") as f:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.data
+
+    def close_data(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+
+def build_cached(file_path, wall_records=(), slab_records=(), cache_dir=".ifc_build_cache",
+                 max_bytes=DEFAULT_MAX_BYTES, compression=None, batch_size=1000, share_geometry=True,
+                 place_on_grid=False, intern_property_values=False, chunk_size=1 << 20):
+    """
+    Builds an inventory to a file, taking every element whose record is unchanged since an
+    earlier build from the cache and building only the others.
+
+    Walls and slabs get deterministic GlobalIds from their Element_ID and Product ID (see
+    `bulk.element_guid`), so an element has the same GlobalId whether it was cached or built.
+    Elements are contained in the storey of their Building_ID and Floor_Num, as with
+    `IFCManager.add_walls_bulk`. Base quantities are not supported, as their shared sets span
+    many elements. The model is not kept: open the file to work on it. Only one build may
+    use a cache directory at a time.
+
+    Args:
+        file_path (str): Output path.
+        wall_records (iterable of dict): Wall records, as accepted by `IFCManager.add_walls_bulk`.
+        slab_records (iterable of dict): Slab records, as accepted by `IFCManager.add_slabs_bulk`.
+        cache_dir (str): Directory of the cache.
+        max_bytes (int): Size of the cache above which the least recently used elements are evicted.
+        compression (str): "gzip", "zip" or None. Inferred from the extension when omitted.
+        batch_size (int): Bulk builder batch size for the elements not in the cache.
+        share_geometry (bool): Map shared type representations.
+        place_on_grid (bool): Place walls on the grid from their `Grid_Pos` and `Orientation`.
+        intern_property_values (bool): Share low-cardinality property values.
+        chunk_size (int): Number of characters buffered before each write.
+
+    Returns:
+        CacheReport: Hits, misses and evictions, entities written, file size and elapsed time.
+    """
+    start = time.perf_counter()
+    report = CacheReport(file_path)
+    cache = BuildCache(cache_dir, max_bytes)
+    options = {"share_geometry": share_geometry, "place_on_grid": place_on_grid,
+               "intern_property_values": intern_property_values}
+
+    # Buildings and storeys are created in a model of their own, written ahead of the elements
+    manager = IFCManager(None)
+    hierarchy = manager.get_hierarchy()
+
+    # One (entry, storey) per record in record order, with the entry of a miss filled in once built
+    elements = []
+    misses = []
+    key_counts = Counter()
+    for ifc_class, records, key_field in (("IfcWall", wall_records, "Element_ID"),
+                                          ("IfcSlab", slab_records, "Product ID")):
+        for record in records:
+            business_key = record.get("element_data", {}).get(key_field)
+            occurrence = key_counts[(ifc_class, business_key)]
+            key_counts[(ifc_class, business_key)] += 1
+            key = record_key(ifc_class, record, occurrence, options)
+            entry = cache.get(key)
+            elements.append([entry, hierarchy.container(record)])
+            if entry is None:
+                misses.append((len(elements) - 1, ifc_class, record, key, business_key, occurrence))
+    report.hits = len(elements) - len(misses)
+    report.misses = len(misses)
+
+    if misses:
+        for index, entry in build_misses(cache, misses, batch_size, share_geometry, place_on_grid,
+                                         intern_property_values):
+            elements[index][0] = entry
+
+    writer = StepWriter(file_path, compression, chunk_size)
+    with writer:
+        step = manager.model.to_string()
+        writer.write_header(step)
+        writer.write(data_section(step))
+        writer.report.entities += sum(1 for _ in manager.model)
+
+        data = cache.read_data()
+        shared_ids = set()
+        for entry, _ in elements:
+            shared_ids.update(entry.shared_ids)
+        for entity_id in sorted(shared_ids):
+            offset, length, _ = cache.shared[entity_id]
+            writer.write(data[offset:offset + length].decode("utf-8"))
+        writer.report.entities += len(shared_ids)
+        for entry, _ in elements:
+            writer.write(data[entry.offset:entry.offset + entry.length].decode("utf-8"))
+            writer.report.entities += entry.entities
+
+        # Relationships spanning many elements, numbered after every cached id
+        contained = {}
+        typed = {}
+        for entry, storey in elements:
+            contained.setdefault(storey.id(), []).append(entry.element_id)
+            if entry.type_id is not None:
+                typed.setdefault(entry.type_id, []).append(entry.element_id)
+        next_id = cache.next_id
+        for storey_id, element_ids in contained.items():
+            writer.write_entity(f"#{next_id}=IFCRELCONTAINEDINSPATIALSTRUCTURE('{ifcopenshell.guid.new()}',$,$,$,"
+                                f"({','.join(f'#{element_id}' for element_id in element_ids)}),#{storey_id})")
+            next_id += 1
+        for type_id, element_ids in typed.items():
+            writer.write_entity(f"#{next_id}=IFCRELDEFINESBYTYPE('{ifcopenshell.guid.new()}',$,$,$,"
+                                f"({','.join(f'#{element_id}' for element_id in element_ids)}),#{type_id})")
+            next_id += 1
+    cache.close_data()
+
+    report.evictions = cache.evict()
+    cache.save()
+    report.entities = writer.report.entities
+    report.file_size = writer.report.file_size
+    report.cache_bytes = cache.live_bytes
+    report.elapsed = time.perf_counter() - start
+    print(report)
+    return report
+
+
+def build_misses(cache, misses, batch_size, share_geometry, place_on_grid, intern_property_values):
+    """
+    Builds the records missing from the cache in a fresh model and stores their lines.
+
+    Args:
+        cache (BuildCache): The cache receiving the new entries.
+        misses (list of tuple): Record index, IFC class, record, record hash, business key and occurrence.
+        batch_size (int): Bulk builder batch size.
+        share_geometry (bool): Map shared type representations.
+        place_on_grid (bool): Place walls on the grid.
+        intern_property_values (bool): Share low-cardinality property values.
+
+    Returns:
+        list of tuple: Record index and CacheEntry of every miss.
+    """
+    manager = IFCManager(None, intern_property_values=intern_property_values)
+    # Entities up to here are the skeleton, which is the same in every build
+    skeleton_size = max(entity.id() for entity in manager.model)
+    builder = manager.get_bulk_builder(batch_size, share_geometry, place_on_grid)
+    built = []
+    for count, (_, ifc_class, record, _, business_key, occurrence) in enumerate(misses, 1):
+        # Containment is written per build, the storey passed here is never flushed
+        element = builder.build(record, builder.build_wall if ifc_class == "IfcWall" else builder.build_slab,
+                                manager.storey)
+        if business_key is not None:
+            element.GlobalId = element_guid(ifc_class, business_key, occurrence)
+        built.append(element)
+        if count % batch_size == 0:
+            builder.flush_batch()
+    builder.flush_batch()
+
+    model = manager.model
+    closures = []
+    type_closures = []
+    counts = Counter()
+    for element in built:
+        closure = element_closure(model, element, skeleton_size)
+        counts.update(closure)
+        closures.append(closure)
+        element_type = next((rel.RelatingType for rel in getattr(element, "IsTypedBy", ())), None)
+        if element_type is None:
+            type_closures.append((None, set()))
+        else:
+            type_closures.append((element_type.id(),
+                                  {entity.id() for entity in model.traverse(element_type) if entity.id() > skeleton_size}))
+
+    # Entities of more than one element, and types, are stored once and shared
+    shared = {entity_id for entity_id, count in counts.items() if count > 1}
+    for _, type_closure in type_closures:
+        shared.update(type_closure)
+
+    all_ids = sorted(set(counts) | shared)
+    first = cache.allocate(len(all_ids))
+    new_ids = {entity_id: first + position for position, entity_id in enumerate(all_ids)}
+
+    def renumber(match):
+        reference = match.group(1)
+        if reference is None or int(reference) <= skeleton_size:
+            return match.group(0)
+        return f"#{new_ids[int(reference)]}"
+
+    def line(entity_id):
+        return STEP_TOKEN.sub(renumber, model.by_id(entity_id).to_string(True)) + ";\n"
+
+    shared_lines = {new_ids[entity_id]: line(entity_id) for entity_id in shared}
+    entries = []
+    for (index, _, _, key, _, _), element, closure, (type_id, type_closure) in zip(misses, built, closures,
+                                                                                  type_closures):
+        own_ids = sorted(entity_id for entity_id in closure if entity_id not in shared)
+        shared_ids = tuple(sorted(new_ids[entity_id] for entity_id in (closure | type_closure) if entity_id in shared))
+        entry = cache.add(key, "".join(line(entity_id) for entity_id in own_ids), len(own_ids),
+                          new_ids[element.id()], new_ids[type_id] if type_id is not None else None,
+                          shared_ids, shared_lines)
+        entries.append((index, entry))
+    return entries
+
+
+def element_closure(model, element, skeleton_size):
+    """
+    Collects the entities making up one element: the element and everything it refers to,
+    its own property sets and its openings, without the skeleton.
+
+    Args:
+        model (ifcopenshell.file): The model the element was built in.
+        element (IfcElement): The element.
+        skeleton_size (int): Highest entity id of the skeleton.
+
+    Returns:
+        set: Entity ids.
+    """
+    roots = [element]
+    for rel in element.IsDefinedBy:
+        if rel.is_a("IfcRelDefinesByProperties") and len(rel.RelatedObjects) == 1:
+            roots.append(rel)
+    roots.extend(getattr(element, "HasOpenings", ()))
+    closure = set()
+    for root in roots:
+        closure.update(entity.id() for entity in model.traverse(root) if entity.id() > skeleton_size)
+    return closure
+
+
+def record_key(ifc_class, record, occurrence, options):
+    """
+    Hashes a record with everything else its generated lines depend on.
+
+    Args:
+        ifc_class (str): IFC class the record is built as.
+        record (dict): The record.
+        occurrence (int): Number of earlier records of the class with the same business key.
+        options (dict): Build options.
+
+    Returns:
+        str: Hex digest of the normalized record.
+    """
+    text = json.dumps([CACHE_VERSION, ifc_class, occurrence, options, record], sort_keys=True,
+                      separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def skeleton_signature():
+    # Ids and classes of the skeleton entities, which cached lines refer to by id
+    model = IFCManager(None).model
+    text = ";".join(f"{entity.id()}={entity.is_a()}" for entity in sorted(model, key=lambda entity: entity.id()))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,387 @@
+import numbers
+import time
+import uuid
+
+import ifcopenshell.guid
+
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.elements.ifc_slab import IFCSlab
+from ifc_library.inventory import SlabRecord, WallRecord
+
+# Namespace of the GlobalIds derived from business keys, see element_guid
+GUID_NAMESPACE = uuid.UUID("5d0e5a7c-3f4b-4c1e-9a57-2b8f1c0d6e93")
+
+
+def element_guid(ifc_class, key, occurrence=0):
+    """
+    Derives the GlobalId of an element from its business key, so every build of the same
+    inventory gives the element the same GlobalId.
+
+    Args:
+        ifc_class (str): IFC class of the element.
+        key: The element's Element_ID (walls) or Product ID (slabs). Integral numbers give the
+             same GlobalId whatever their type, e.g. 17 and 17.0.
+        occurrence (int): Number of earlier elements with the same class and key in the build.
+
+    Returns:
+        str: The compressed 22 character GlobalId.
+    """
+    if isinstance(key, numbers.Real) and not isinstance(key, bool) and float(key).is_integer():
+        key = int(key)
+    name = f"{ifc_class}/{key}" if not occurrence else f"{ifc_class}/{key}/{occurrence}"
+    return ifcopenshell.guid.compress(uuid.uuid5(GUID_NAMESPACE, name).hex)
+
+
+class BulkReport:
+    """
+    Throughput summary of a bulk build.
+    """
+
+    def __init__(self, element_type):
+        self.element_type = element_type
+        self.count = 0
+        self.batches = 0
+        self.elapsed = 0.0
+
+    @property
+    def elements_per_second(self):
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"Built {self.count} {self.element_type} in {self.batches} batches, "
+                f"{self.elapsed:.2f}s ({self.elements_per_second:.0f} elements/s)")
+
+
+class BulkBuilder:
+    """
+    Streams element records straight into an IFCManager model.
+
+    The per-element path (IFCWall / IFCSlab) dispatches roughly ten ifcopenshell.api.run
+    calls per element, each resolving the usecase, recomputing the unit scale and firing
+    listeners. The bulk path creates the same entities directly, shares the geometric
+    resources every element uses (origin, axes, extrusion direction) and writes the spatial
+    type assignments and property sets once per batch. Elements are contained in the storey of
+    their Building_ID and Floor_Num (see SpatialHierarchy), with one relationship update per
+    storey at the end of the build.
+
+    With `share_geometry` enabled, elements with identical dimensions map a single
+    representation through their shared type (see GeometryCache) instead of each getting
+    their own solid and opening elements. With `place_on_grid` enabled, walls are placed
+    on the manager's grid from their `Grid_Pos` and `Orientation` instead of at the origin.
+    With `quantities` enabled, each batch gets its base quantities computed over the whole
+    batch at once and attached as shared IfcElementQuantity sets (see QuantityWriter).
+    With `deterministic_ids` enabled, walls and slabs get their GlobalIds from their
+    Element_ID and Product ID (see element_guid) instead of random ones.
+    """
+
+    def __init__(self, ifc_manager, batch_size=1000, share_geometry=True, place_on_grid=False, quantities=False,
+                 deterministic_ids=False):
+        self.ifc_manager = ifc_manager
+        self.model = ifc_manager.model
+        self.batch_size = batch_size
+        self.share_geometry = share_geometry
+        self.place_on_grid = place_on_grid
+        self.quantities = quantities
+        self.deterministic_ids = deterministic_ids
+        # (IFC class, key) -> number of elements given a GlobalId from that key so far
+        self.key_counts = {}
+        self.geometry = ifc_manager.get_geometry_cache()
+        self.unit_scale = self.geometry.unit_scale
+        self.hierarchy = ifc_manager.get_hierarchy()
+        # Storey of the element being built
+        self.container = None
+        self.typed_products = {}
+        self.pending_psets = {}
+        self.pending_footprints = []
+        # IFC class -> (elements, records) whose quantities are not written yet
+        self.pending_quantities = {}
+
+    def add_walls(self, records, container=None):
+        """
+        Builds one IfcWall per record.
+
+        Args:
+            records (iterable of dict or WallInventory): Records holding `element_data` and
+                                                         `geometry_data`, as accepted by
+                                                         `create_wall_from_data`, or a columnar inventory.
+            container (IfcSpatialStructureElement): Spatial container, defaults to the storey of
+                                                    each wall's Building_ID and Floor_Num.
+
+        Returns:
+            BulkReport: Number of walls built and the throughput achieved.
+        """
+        return self._build(records, self.build_wall, "walls", container)
+
+    def add_slabs(self, records, container=None):
+        """
+        Builds one IfcSlab per record, solid or hollow-core depending on its `Void Count`.
+
+        Args:
+            records (iterable of dict or SlabInventory): Records holding the slab `element_data`,
+                                                         or a columnar inventory.
+            container (IfcSpatialStructureElement): Spatial container, defaults to the storey of
+                                                    each slab's Building_ID and Floor_Num if it has them.
+
+        Returns:
+            BulkReport: Number of slabs built and the throughput achieved.
+        """
+        return self._build(records, self.build_slab, "slabs", container)
+
+    def _build(self, records, build_element, element_type, container):
+        report = BulkReport(element_type)
+        start = time.perf_counter()
+
+        batch = []
+        for record in records:
+            batch.append(self.build(record, build_element, container))
+            if len(batch) >= self.batch_size:
+                self.flush_batch()
+                report.count += len(batch)
+                report.batches += 1
+                batch = []
+        if batch:
+            self.flush_batch()
+            report.count += len(batch)
+            report.batches += 1
+        self.hierarchy.flush()
+
+        report.elapsed = time.perf_counter() - start
+        print(report)
+        return report
+
+    def build(self, record, build_element, container=None):
+        """
+        Builds one element and queues it to be contained in its storey.
+
+        Args:
+            record: Wall or slab record.
+            build_element (callable): `build_wall` or `build_slab`.
+            container (IfcSpatialStructureElement): Spatial container, defaults to the storey of
+                                                    the record's Building_ID and Floor_Num.
+
+        Returns:
+            IfcElement: The created element entity.
+        """
+        self.container = container or self.hierarchy.container(record)
+        element = build_element(record)
+        self.hierarchy.contain(self.container, [element])
+        if self.quantities:
+            elements, records = self.pending_quantities.setdefault(element.is_a(), ([], []))
+            elements.append(element)
+            records.append(record)
+        return element
+
+    def flush_batch(self):
+        """
+        Writes the type assignments, property sets and quantities of the elements built since the last flush.
+        """
+        self.flush_footprints()
+        self.flush_types()
+        pset_writer = self.ifc_manager.get_pset_writer()
+        for pset_name, (elements, properties_list) in self.pending_psets.items():
+            pset_writer.write_batch(elements, pset_name, properties_list)
+        self.pending_psets = {}
+        self.flush_quantities()
+
+    def flush_quantities(self):
+        if self.pending_quantities:
+            quantity_writer = self.ifc_manager.get_quantity_writer()
+            for ifc_class, (elements, records) in self.pending_quantities.items():
+                if ifc_class == "IfcWall":
+                    quantity_writer.write_walls(elements, records)
+                else:
+                    quantity_writer.write_slabs(elements, records)
+        self.pending_quantities = {}
+
+    def flush_footprints(self):
+        spatial_index = self.ifc_manager.spatial_index
+        if spatial_index is not None:
+            for container, element, points, matrix in self.pending_footprints:
+                spatial_index.add_footprint(container or self.ifc_manager.storey, element, points, matrix)
+        self.pending_footprints = []
+
+    def flush_types(self):
+        for element_type, products in self.typed_products.items():
+            self.geometry.assign_type(element_type, products)
+        self.typed_products = {}
+
+    def build_wall(self, record):
+        """
+        Creates a wall with its placement, body representation, openings and property sets.
+
+        Args:
+            record (dict or WallRecord): Record holding `element_data` and `geometry_data`, or a
+                                         row of a WallInventory.
+
+        Returns:
+            IfcWall: The created wall entity.
+        """
+        if isinstance(record, WallRecord):
+            # Read straight from the inventory columns, without intermediate dicts
+            matrix = self.grid_matrix(record.grid_pos, record.orientation)
+            wall = self.create_product("IfcWall", record.name, matrix, record.element_id)
+            self.build_wall_body(wall, record.length, record.height, record.thickness, record.voids, record.mirrored)
+            self.add_footprint(wall, record.length, record.thickness, matrix)
+            self.add_property_set(wall, "ReC_Pset_WallElementData", record.element_data_properties())
+            self.add_property_set(wall, "ReC_Pset_WallGeometryData", record.geometry_data_properties())
+            return wall
+
+        element_data = record.get("element_data", {})
+        geometry_data = record.get("geometry_data", {})
+
+        matrix = self.grid_matrix(element_data.get("Grid_Pos"), element_data.get("Orientation"))
+        wall = self.create_product("IfcWall", element_data.get("Wall_ID", "Default Wall"), matrix,
+                                   element_data.get("Element_ID"))
+        self.build_wall_geometry(wall, geometry_data)
+        self.add_footprint(wall, geometry_data.get("Length", 5000.0), geometry_data.get("Thickness", 300.0), matrix)
+
+        self.add_property_set(wall, "ReC_Pset_WallElementData", IFCWall.element_data_properties(element_data))
+        self.add_property_set(wall, "ReC_Pset_WallGeometryData", IFCWall.geometry_data_properties(geometry_data))
+        return wall
+
+    def build_slab(self, record):
+        """
+        Creates a solid or hollow-core slab with its placement, body representation and property set.
+
+        Args:
+            record (dict or SlabRecord): Record holding the slab `element_data`, or a row of a SlabInventory.
+
+        Returns:
+            IfcSlab: The created slab entity.
+        """
+        if isinstance(record, SlabRecord):
+            slab = self.create_product("IfcSlab", record.name, key=record.name)
+            self.build_slab_body(slab, record.length, record.width, record.height, record.void_count, record.void_diameter)
+            self.add_footprint(slab, record.length, record.width)
+            self.add_property_set(slab, "ReC_Pset_SlabElementData", record.element_data_properties())
+            return slab
+
+        element_data = record.get("element_data", {})
+        slab = self.create_product("IfcSlab", element_data.get("Product ID", "Slab"),
+                                   key=element_data.get("Product ID"))
+        self.build_slab_geometry(slab, element_data)
+        self.add_footprint(slab, element_data['Length'], element_data['Width'])
+
+        self.add_property_set(slab, "ReC_Pset_SlabElementData", IFCSlab.element_data_properties(element_data))
+        return slab
+
+    def build_wall_geometry(self, wall, geometry_data, share_geometry=None):
+        """
+        Gives a wall its body representation and openings, shared through its type if enabled.
+
+        Args:
+            wall (IfcWall): The wall entity.
+            geometry_data (dict): Geometry data holding Length, Height, Thickness, Mirrored and Voids.
+            share_geometry (bool): Overrides the builder's `share_geometry` setting for this wall.
+        """
+        self.build_wall_body(
+            wall,
+            geometry_data.get("Length", 5000.0),
+            geometry_data.get("Height", 3000.0),
+            geometry_data.get("Thickness", 300.0),
+            geometry_data.get("Voids") or [],
+            bool(geometry_data.get("Mirrored")),
+            share_geometry
+        )
+
+    def build_wall_body(self, wall, length, height, thickness, voids, mirrored=False, share_geometry=None):
+        """
+        Gives a wall of the given dimensions its body representation and openings.
+
+        Args:
+            wall (IfcWall): The wall entity.
+            length (float): Length of the wall.
+            height (float): Height of the wall.
+            thickness (float): Thickness of the wall.
+            voids (list of dicts or numpy.ndarray): Voids (openings) in the wall, see `void_rows`.
+            mirrored (bool): Whether the wall is a mirrored panel. Only used for shared geometry.
+            share_geometry (bool): Overrides the builder's `share_geometry` setting for this wall.
+        """
+        if share_geometry is None:
+            share_geometry = self.share_geometry
+
+        if share_geometry:
+            wall_type = self.geometry.get_wall_type(length, height, thickness, voids)
+            self.geometry.map_representation(wall, wall_type, mirrored=mirrored)
+            self.typed_products.setdefault(wall_type, []).append(wall)
+        else:
+            wall.Representation = self.geometry.create_product_shape(
+                self.geometry.create_wall_solid(length, height, thickness))
+            self.geometry.add_openings(wall, voids, thickness)
+
+    def build_slab_geometry(self, slab, element_data, share_geometry=None):
+        """
+        Gives a slab its solid or hollow-core body representation, shared through its type if enabled.
+
+        Args:
+            slab (IfcSlab): The slab entity.
+            element_data (dict): Slab element data holding Length, Width, Height, Void Count and Void Diameter.
+            share_geometry (bool): Overrides the builder's `share_geometry` setting for this slab.
+        """
+        self.build_slab_body(
+            slab,
+            element_data['Length'],
+            element_data['Width'],
+            element_data['Height'],
+            element_data.get('Void Count', 0),
+            element_data.get('Void Diameter', 0.0),
+            share_geometry
+        )
+
+    def build_slab_body(self, slab, length, width, height, void_count=0, void_diameter=0.0, share_geometry=None):
+        """
+        Gives a slab of the given dimensions its solid or hollow-core body representation.
+
+        Args:
+            slab (IfcSlab): The slab entity.
+            length (int): Length of the slab in mm.
+            width (int): Width of the slab in mm.
+            height (int): Height of the slab in mm.
+            void_count (int): Number of voids (cores) in the slab. If 0, the slab is considered solid.
+            void_diameter (float): Diameter of the voids in mm. Ignored if void_count is 0.
+            share_geometry (bool): Overrides the builder's `share_geometry` setting for this slab.
+        """
+        if share_geometry is None:
+            share_geometry = self.share_geometry
+
+        if share_geometry:
+            slab_type = self.geometry.get_slab_type(length, width, height, void_count, void_diameter)
+            self.geometry.map_representation(slab, slab_type)
+            self.typed_products.setdefault(slab_type, []).append(slab)
+        elif void_count > 0:
+            slab.Representation = self.geometry.create_product_shape(
+                self.geometry.create_hollow_core_solid(length, width, height, void_count, void_diameter))
+        else:
+            slab.Representation = self.geometry.create_product_shape(
+                self.geometry.create_wall_solid(length, height, width))
+
+    def create_product(self, ifc_class, name, matrix=None, key=None):
+        placement = self.geometry.create_placement(matrix)
+        return self.model.create_entity(ifc_class, GlobalId=self.global_id(ifc_class, key), Name=name,
+                                        ObjectPlacement=placement)
+
+    def global_id(self, ifc_class, key):
+        # Derived from the business key when enabled, repeated keys are told apart by their occurrence
+        if not self.deterministic_ids or key is None:
+            return ifcopenshell.guid.new()
+        occurrence = self.key_counts.get((ifc_class, key), 0)
+        self.key_counts[(ifc_class, key)] = occurrence + 1
+        return element_guid(ifc_class, key, occurrence)
+
+    def grid_matrix(self, grid_pos, orientation):
+        # Placement on the grid when enabled and the record has a position, None for the origin
+        if not self.place_on_grid or grid_pos is None or orientation is None:
+            return None
+        return self.ifc_manager.get_grid().placement_matrix(grid_pos, orientation)
+
+    def add_footprint(self, element, length, width, matrix=None):
+        # Indexed in flush_batch, only when a spatial index is attached
+        if self.ifc_manager.spatial_index is not None:
+            self.pending_footprints.append(
+                (self.container, element, [(0.0, 0.0), (length, 0.0), (length, width), (0.0, width)], matrix))
+
+    def add_property_set(self, element, pset_name, properties):
+        # Written per pset name for the whole batch in flush_batch
+        elements, properties_list = self.pending_psets.setdefault(pset_name, ([], []))
+        elements.append(element)
+        properties_list.append(properties)
@@ -0,0 +1,526 @@
+"""
+Diffing of two inventory snapshots, keyed on Element_ID (walls) and Product_ID (slabs).
+
+A snapshot holds the ReC_Pset_* values of every wall and slab as columns, read from a model
+in one pass over its property relationships or memory-mapped from a sidecar written by
+`IFCManager.export_sidecar`, which skips the STEP parse altogether. Every element gets one
+64-bit hash of its property values, dimensions included, computed column by column over the
+whole snapshot. Void layouts are not in the property sets: a snapshot read from a model
+also holds the openings of every wall, read back from its geometry, with a hash of their
+own. Two snapshots are aligned on their keys in a single pass, and only the elements whose
+hashes differ are compared property by property and opening by opening.
+
+    changes = diff_files("monday.ifc", "tuesday.ifc")
+    changes.save("changes.json")
+    manager.apply_changes(changes)
+"""
+
+import argparse
+import hashlib
+import json
+import time
+
+import ifcopenshell
+import numpy as np
+
+from ifc_library.geometry_cache import wall_voids
+from ifc_library.sidecar import SIDECAR_PSETS, Sidecar, properties_record, read_columns
+from ifc_library.units import record_unit_scale
+
+VOID_FIELDS = ("X", "Y", "Z", "Width", "Height", "Depth")
+
+# Property holding the business key of each class, elements without one are keyed on their GlobalId
+KEY_PROPERTIES = {
+    "IfcWall": ("ReC_Pset_WallElementData", "Element_ID"),
+    "IfcSlab": ("ReC_Pset_SlabElementData", "Product_ID"),
+}
+
+
+class Snapshot:
+    """
+    The ReC_Pset_* values of the walls and slabs of one inventory, by IFC class, and the
+    void layouts of the walls when read from a model.
+    """
+
+    def __init__(self, tables, void_layouts=None):
+        """
+        Args:
+            tables (dict): IFC class -> (GlobalIds, pset name -> property name -> (kind, arrays)),
+                           as returned by `sidecar.read_columns`.
+            void_layouts (dict): IFC class -> the void layout of each element, see `void_layout`.
+                                 Classes left out, e.g. every class of a sidecar, have no
+                                 openings to compare.
+        """
+        self.tables = tables
+        self.void_layouts = void_layouts or {}
+        self.key_lists = {}
+        self.hash_arrays = {}
+        self.void_hash_arrays = {}
+
+    @classmethod
+    def from_model(cls, model):
+        tables = read_columns(model)
+        void_layouts = {}
+        if "IfcWall" in tables:
+            unit_scale = record_unit_scale(model)
+            void_layouts["IfcWall"] = [void_layout(wall_voids(model.by_guid(global_id), unit_scale))
+                                       for global_id in tables["IfcWall"][0]]
+        return cls(tables, void_layouts)
+
+    @classmethod
+    def from_sidecar(cls, file_path):
+        sidecar = Sidecar(file_path)
+        tables = {}
+        for ifc_class in sidecar.classes:
+            columns = {pset_name: {name: sidecar.encoded(ifc_class, pset_name, name) for name in names}
+                       for pset_name, names in sidecar.columns(ifc_class).items()}
+            tables[ifc_class] = (sidecar.global_ids(ifc_class).astype(str).tolist(), columns)
+        return cls(tables)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Reads a snapshot from a sidecar (`.npz`) or an IFC file.
+        """
+        if file_path.lower().endswith(".npz"):
+            return cls.from_sidecar(file_path)
+        return cls.from_model(ifcopenshell.open(file_path))
+
+    @property
+    def classes(self):
+        return list(self.tables)
+
+    def count(self, ifc_class):
+        return len(self.tables[ifc_class][0]) if ifc_class in self.tables else 0
+
+    def global_ids(self, ifc_class):
+        return self.tables[ifc_class][0] if ifc_class in self.tables else []
+
+    def keys(self, ifc_class):
+        """
+        Returns:
+            list: The key of each element of a class: its business key, or ("GlobalId", GlobalId)
+                  when it has none or shares it with an earlier element.
+        """
+        keys = self.key_lists.get(ifc_class)
+        if keys is None:
+            keys = self.key_lists[ifc_class] = []
+            seen = set()
+            for global_id, key in zip(self.global_ids(ifc_class), self.business_keys(ifc_class)):
+                if key is None or key in seen:
+                    key = ("GlobalId", global_id)
+                seen.add(key)
+                keys.append(key)
+        return keys
+
+    def business_keys(self, ifc_class):
+        pset_name, name = KEY_PROPERTIES[ifc_class]
+        column = self.tables[ifc_class][1].get(pset_name, {}).get(name) if ifc_class in self.tables else None
+        if column is None:
+            return [None] * self.count(ifc_class)
+        return column_values(*column)
+
+    def hashes(self, ifc_class):
+        """
+        Returns:
+            numpy.ndarray: One uint64 hash per element of a class over all its property values.
+                           Missing properties do not contribute, and integers hash like the
+                           equal floats.
+        """
+        hashes = self.hash_arrays.get(ifc_class)
+        if hashes is None:
+            hashes = np.zeros(self.count(ifc_class), dtype=np.uint64)
+            for pset_name, columns in self.tables.get(ifc_class, (None, {}))[1].items():
+                for name, (kind, parts) in columns.items():
+                    values, missing = column_hashes(kind, parts)
+                    terms = mix(values ^ np.uint64(text_hash(f"{pset_name}/{name}")))
+                    terms[missing] = 0
+                    hashes += terms
+            self.hash_arrays[ifc_class] = hashes
+        return hashes
+
+    def void_hashes(self, ifc_class):
+        """
+        Returns:
+            numpy.ndarray: One uint64 hash per element of a class over its void layout, or None
+                           if the snapshot has no void layouts for the class.
+        """
+        if ifc_class not in self.void_layouts:
+            return None
+        hashes = self.void_hash_arrays.get(ifc_class)
+        if hashes is None:
+            hashes = self.void_hash_arrays[ifc_class] = np.array(
+                [text_hash(repr(layout)) for layout in self.void_layouts[ifc_class]], dtype=np.uint64)
+        return hashes
+
+    def voids(self, ifc_class, row):
+        """
+        Returns:
+            list: Void dicts of one element in record units, or None if its openings are unknown.
+        """
+        layouts = self.void_layouts.get(ifc_class)
+        layout = layouts[row] if layouts is not None else None
+        return None if layout is None else [dict(zip(VOID_FIELDS, values)) for values in layout]
+
+    def properties(self, ifc_class, row):
+        """
+        Returns:
+            dict: Pset name -> property name -> value of one element, without missing properties.
+        """
+        properties = {}
+        for pset_name, columns in self.tables[ifc_class][1].items():
+            values = {}
+            for name, column in columns.items():
+                value = column_value(*column, row)
+                if value is not None:
+                    values[name] = value
+            properties[pset_name] = values
+        return properties
+
+
+class ChangeSet:
+    """
+    Elements added, removed and modified between two snapshots.
+
+    Each change is a dict with the element's `ifc_class`, business `key` (None without one)
+    and `global_id`. Added elements carry all their `properties`, modified ones only the
+    changed properties with their new values, None for a removed property. Walls also carry
+    their `voids`, the void dicts of their openings, when added or when their openings changed.
+    """
+
+    def __init__(self, added=None, removed=None, modified=None):
+        self.added = added or []
+        self.removed = removed or []
+        self.modified = modified or []
+        self.elapsed = 0.0
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def __str__(self):
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.modified)} modified "
+                f"in {self.elapsed:.2f}s")
+
+    def to_dict(self):
+        return {"added": self.added, "removed": self.removed, "modified": self.modified}
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("added"), data.get("removed"), data.get("modified"))
+
+
+class ApplyReport:
+    """
+    Summary of a change set applied to a model.
+
+    `skipped` lists the changes left unapplied because they would rebuild a wall whose
+    openings cannot be read back, see `ElementUpdater.wall_voids`.
+    """
+
+    def __init__(self):
+        self.added = 0
+        self.removed = 0
+        self.modified = 0
+        self.missing = 0
+        self.skipped = []
+        self.elapsed = 0.0
+
+    def __str__(self):
+        text = (f"Applied changes: {self.added} added, {self.removed} removed, {self.modified} modified, "
+                f"{self.missing} not found in {self.elapsed * 1000:.1f}ms")
+        if self.skipped:
+            keys = ", ".join(str(item.get("key") or item.get("global_id")) for item in self.skipped[:5])
+            text += f"\n{len(self.skipped)} walls with openings left unchanged: {keys}"
+        return text
+
+
+def diff_snapshots(old, new):
+    """
+    Finds the elements added, removed and modified from one snapshot to the next.
+
+    Args:
+        old (Snapshot): The earlier snapshot.
+        new (Snapshot): The later snapshot.
+
+    Returns:
+        ChangeSet: The changes.
+    """
+    start = time.perf_counter()
+    changes = ChangeSet()
+    for ifc_class in dict.fromkeys(old.classes + new.classes):
+        old_rows = {key: row for row, key in enumerate(old.keys(ifc_class))}
+        new_keys = new.keys(ifc_class)
+        # Row of each new element in the old snapshot, -1 for added ones
+        matches = np.array([old_rows.get(key, -1) for key in new_keys], dtype=np.int64)
+        found = matches >= 0
+        new_ids = new.global_ids(ifc_class)
+
+        for row in np.flatnonzero(~found).tolist():
+            changes.added.append(change(ifc_class, new_keys[row], new_ids[row], new.properties(ifc_class, row),
+                                        new.voids(ifc_class, row)))
+
+        kept = np.zeros(old.count(ifc_class), dtype=bool)
+        kept[matches[found]] = True
+        old_keys = old.keys(ifc_class)
+        old_ids = old.global_ids(ifc_class)
+        for row in np.flatnonzero(~kept).tolist():
+            changes.removed.append(change(ifc_class, old_keys[row], old_ids[row]))
+
+        rows = np.flatnonzero(found)
+        differs = old.hashes(ifc_class)[matches[rows]] != new.hashes(ifc_class)[rows]
+        voids_differ = np.zeros(len(rows), dtype=bool)
+        old_void_hashes = old.void_hashes(ifc_class)
+        new_void_hashes = new.void_hashes(ifc_class)
+        if old_void_hashes is not None and new_void_hashes is not None:
+            voids_differ = old_void_hashes[matches[rows]] != new_void_hashes[rows]
+        candidates = differs | voids_differ
+        for row, new_voids in zip(rows[candidates].tolist(), voids_differ[candidates].tolist()):
+            delta = property_changes(old.properties(ifc_class, matches[row]), new.properties(ifc_class, row))
+            voids = new.voids(ifc_class, row) if new_voids else None
+            if delta or voids is not None:
+                changes.modified.append(change(ifc_class, new_keys[row], new_ids[row], delta, voids))
+    changes.elapsed = time.perf_counter() - start
+    return changes
+
+
+def diff_files(old_path, new_path):
+    """
+    Diffs two inventories saved as IFC files or sidecars, see `Snapshot.load`.
+
+    Returns:
+        ChangeSet: The changes, with `elapsed` including reading both files.
+    """
+    start = time.perf_counter()
+    changes = diff_snapshots(Snapshot.load(old_path), Snapshot.load(new_path))
+    changes.elapsed = time.perf_counter() - start
+    return changes
+
+
+def apply_changes(ifc_manager, changes):
+    """
+    Applies a change set to an open model.
+
+    Elements are found by business key through the model index, falling back to their
+    GlobalId. Removed elements are deleted, modified ones get their changed properties
+    written, their geometry rebuilt if a dimension changed and are moved to the storey of a
+    changed Building_ID or Floor_Num. Added elements are built with their GlobalId.
+
+    Walls whose openings changed are rebuilt with the `voids` of the change. Void layouts
+    are not part of the property sets otherwise: a wall rebuilt for a new dimension keeps the
+    openings read back from the model, and a modified wall whose openings cannot be read back
+    is left unchanged and reported in `ApplyReport.skipped`. Walls added from a change set
+    have their `voids`, or no openings when it has none, e.g. when diffed from sidecars.
+
+    Args:
+        ifc_manager (IFCManager): The manager of the model.
+        changes (ChangeSet): The changes, e.g. from `diff_snapshots` or `ChangeSet.load`.
+
+    Returns:
+        ApplyReport: Number of elements added, removed, modified and not found, and the skipped changes.
+    """
+    start = time.perf_counter()
+    report = ApplyReport()
+    updater = ifc_manager.get_updater()
+
+    for item in changes.removed:
+        element = find_element(ifc_manager, item)
+        if element is None:
+            report.missing += 1
+            continue
+        updater.remove_element(element)
+        report.removed += 1
+
+    for item in changes.modified:
+        element = find_element(ifc_manager, item)
+        if element is None:
+            report.missing += 1
+            continue
+        ifc_class = item["ifc_class"]
+        properties = element_properties(element, [pset_name for pset_name, _, _ in SIDECAR_PSETS[ifc_class]])
+        for pset_name, values in item["properties"].items():
+            properties.setdefault(pset_name, {}).update(values)
+        record = properties_record(ifc_class, properties)
+        if ifc_class == "IfcWall":
+            geometry_data = record.setdefault("geometry_data", {})
+            if "voids" in item:
+                geometry_data["Voids"] = item["voids"]
+            elif "Voids" not in geometry_data and updater.geometry_changed(element, geometry_data):
+                voids = updater.wall_voids(element)
+                if voids is None:
+                    report.skipped.append(item)
+                    continue
+                geometry_data["Voids"] = voids
+            updater.update_wall(element, record, rebuild_geometry="voids" in item)
+        else:
+            updater.update_slab(element, record)
+        report.modified += 1
+
+    builder = ifc_manager.get_bulk_builder()
+    for item in changes.added:
+        ifc_class = item["ifc_class"]
+        record = properties_record(ifc_class, item["properties"])
+        if "voids" in item:
+            record.setdefault("geometry_data", {})["Voids"] = item["voids"]
+        element = builder.build(record, builder.build_wall if ifc_class == "IfcWall" else builder.build_slab)
+        if item.get("global_id") and find_by_guid(ifc_manager.model, item["global_id"]) is None:
+            element.GlobalId = item["global_id"]
+        report.added += 1
+    builder.flush_batch()
+    ifc_manager.flush_containment()
+
+    report.elapsed = time.perf_counter() - start
+    print(report)
+    return report
+
+
+def find_element(ifc_manager, item):
+    key = item.get("key")
+    if key is not None:
+        _, id_property = KEY_PROPERTIES[item["ifc_class"]]
+        element = ifc_manager.get_updater().get_element(item["ifc_class"], id_property, key)
+        if element is not None:
+            return element
+    return find_by_guid(ifc_manager.model, item.get("global_id"))
+
+
+def find_by_guid(model, global_id):
+    if not global_id:
+        return None
+    try:
+        return model.by_guid(global_id)
+    except RuntimeError:
+        return None
+
+
+def element_properties(element, pset_names):
+    """
+    Returns:
+        dict: Pset name -> property name -> value of the named property sets of an element.
+    """
+    properties = {}
+    for rel in element.IsDefinedBy:
+        pset = rel.RelatingPropertyDefinition
+        if pset.Name in pset_names and pset.is_a("IfcPropertySet"):
+            # Positional access (Name, NominalValue, wrappedValue) avoids the attribute name lookups
+            properties[pset.Name] = {prop[0]: value[0] if (value := prop[2]) is not None else None
+                                     for prop in pset.HasProperties}
+    return properties
+
+
+def change(ifc_class, key, global_id, properties=None, voids=None):
+    item = {"ifc_class": ifc_class, "key": None if isinstance(key, tuple) else key, "global_id": global_id}
+    if properties is not None:
+        item["properties"] = properties
+    if voids is not None:
+        item["voids"] = voids
+    return item
+
+
+def void_layout(voids, decimals=3):
+    """
+    Normalizes the void dicts of a wall for comparison: one rounded row per void, sorted, so
+    that the order the openings were built or read back in does not matter.
+
+    Returns:
+        tuple: Tuples of X, Y, Z, Width, Height and Depth, or None for unreadable openings.
+    """
+    if voids is None:
+        return None
+    return tuple(sorted(tuple(round(float(void[name]) + 0.0, decimals) for name in VOID_FIELDS) for void in voids))
+
+
+def property_changes(old, new):
+    """
+    Returns:
+        dict: Pset name -> property name -> new value of the properties that differ, None for
+              properties the new values no longer have.
+    """
+    delta = {}
+    for pset_name in dict.fromkeys(list(old) + list(new)):
+        old_values = old.get(pset_name, {})
+        new_values = new.get(pset_name, {})
+        changed = {name: new_values.get(name) for name in dict.fromkeys(list(old_values) + list(new_values))
+                   if old_values.get(name) != new_values.get(name)}
+        if changed:
+            delta[pset_name] = changed
+    return delta
+
+
+def column_value(kind, parts, row):
+    # One value of an encoded column as a Python value, None when missing
+    if kind == "text":
+        code = int(parts["codes"][row])
+        return None if code < 0 else str(parts["categories"][code])
+    if "mask" in parts and parts["mask"][row]:
+        return None
+    value = parts["values"][row]
+    if kind == "float":
+        return None if np.isnan(value) else float(value)
+    return bool(value) if kind == "bool" else int(value)
+
+
+def column_values(kind, parts):
+    # A whole encoded column as Python values, None where missing
+    if kind == "text":
+        categories = parts["categories"].tolist()
+        return np.array(categories + [None], dtype=object)[np.asarray(parts["codes"])].tolist()
+    values = np.asarray(parts["values"])
+    missing = np.isnan(values) if kind == "float" else np.zeros(len(values), dtype=bool)
+    if "mask" in parts:
+        missing = missing | np.asarray(parts["mask"])
+    return np.ma.masked_array(values, missing).tolist(None)
+
+
+def column_hashes(kind, parts):
+    """
+    Hashes every value of an encoded column.
+
+    Returns:
+        tuple: uint64 value hashes and a boolean array of the missing values.
+    """
+    if kind == "text":
+        codes = np.asarray(parts["codes"])
+        table = np.array([text_hash(category) for category in parts["categories"].tolist()] + [0], dtype=np.uint64)
+        return table[codes], codes < 0
+    # Numbers and booleans hash as their float64 bits, with -0.0 folded into 0.0
+    values = np.asarray(parts["values"], dtype=np.float64) + 0.0
+    missing = np.isnan(values)
+    if "mask" in parts:
+        missing |= np.asarray(parts["mask"])
+    return values.view(np.uint64), missing
+
+
+def text_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def mix(values):
+    # splitmix64 finalizer, spreading every input bit over the whole hash
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two inventory models or sidecars.")
+    parser.add_argument("old", help="Earlier IFC file or .npz sidecar")
+    parser.add_argument("new", help="Later IFC file or .npz sidecar")
+    parser.add_argument("-o", "--output", help="Path the change set is saved to as JSON")
+    args = parser.parse_args(argv)
+
+    changes = diff_files(args.old, args.new)
+    print(changes)
+    if args.output:
+        changes.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
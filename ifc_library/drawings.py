@@ -0,0 +1,518 @@
+"""
+Batch generation of dimensioned SVG drawings for wall and slab records.
+
+Walls get an elevation with their openings from `Voids` and a section through their
+thickness, slabs a plan and a cross-section with their hollow cores. The drawings are built
+from the same inputs as the 3D geometry (`void_rows` for the openings, `hollow_core_points`
+for the cores), so they always match the model.
+
+Each drawing is named after the key its element is found by, the Element_ID of a wall or the
+Product ID of a slab, and written to one output directory, together with a `drawings.json`
+manifest of the hash of the inputs of every drawing. Drawings whose hash is unchanged since
+the last run are skipped, the others are rendered in a process pool. The records are left as
+they are: the file names are returned in the report and, when a manager is given, written to
+the `Drawing` (walls) or `Drawings` (slabs) property of the matching element:
+
+    report = generate_drawings("drawings", wall_records, slab_records, ifc_manager=manager)
+    for record, name in zip(wall_records, report.wall_names):
+        record["geometry_data"]["Drawing"] = name
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+
+import numpy as np
+
+from ifc_library.geometry_cache import void_rows
+from ifc_library.profiles import hollow_core_points
+
+MANIFEST_NAME = "drawings.json"
+
+# Bumped whenever the drawing layout changes, so every drawing is redrawn once
+DRAWING_VERSION = 1
+
+# Characters allowed in a drawing file name, anything else in a business key becomes "_"
+UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+# Paper sizes in mm, multiplied by the scale to get model units
+TEXT_SIZE = 2.5
+LINE_WIDTH = 0.35
+THIN_LINE_WIDTH = 0.18
+DIMENSION_GAP = 8.0
+MARGIN = 15.0
+
+STYLE = (".outline{{fill:none;stroke:#000;stroke-width:{line}}}"
+         ".section{{fill:url(#hatch);stroke:#000;stroke-width:{line}}}"
+         ".opening{{fill:#fff;stroke:#000;stroke-width:{thin}}}"
+         ".hidden{{fill:none;stroke:#000;stroke-width:{thin};stroke-dasharray:{dash}}}"
+         ".dimension{{fill:none;stroke:#000;stroke-width:{thin}}}"
+         "text{{font-family:sans-serif;font-size:{text}px;text-anchor:middle}}"
+         ".title{{font-size:{title}px;text-anchor:start}}")
+
+
+class DrawingReport:
+    """
+    Summary of a drawing run, with the file name of the drawing of each record.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.wall_names = []
+        self.slab_names = []
+        self.drawn = 0
+        self.unchanged = 0
+        self.updated = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (f"Drew {self.drawn} drawings to {self.output_dir}, {self.unchanged} unchanged, "
+                f"{self.updated} elements updated in {self.elapsed:.2f}s")
+
+
+def generate_drawings(output_dir, wall_records=(), slab_records=(), processes=None, chunk_size=200, scale=20,
+                      ifc_manager=None):
+    """
+    Draws every wall and slab record whose geometry changed since the last run.
+
+    When using the default spawn/forkserver start methods and more than one process, call
+    this from under an `if __name__ == "__main__":` guard.
+
+    Args:
+        output_dir (str): Directory the SVG files and the manifest are written to.
+        wall_records (iterable of dict): Wall records, as accepted by `IFCManager.add_walls_bulk`.
+        slab_records (iterable of dict): Slab records, as accepted by `IFCManager.add_slabs_bulk`.
+        processes (int): Number of worker processes, defaults to the number of CPUs. With 1 process,
+                         or no more than `chunk_size` drawings to make, everything is drawn in this process.
+        chunk_size (int): Number of drawings per pool task.
+        scale (float): Drawing scale, e.g. 20 for 1:20.
+        ifc_manager (IFCManager): If given, the file names are written to the Drawing / Drawings
+                                  property of the elements with the same Element_ID / Product ID.
+
+    Returns:
+        DrawingReport: Number of drawings made and skipped, elements updated, and the file names
+                       in record order in `wall_names` and `slab_names`. The records are not changed.
+    """
+    report = DrawingReport(output_dir)
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    names = {}
+    jobs = []
+    pending = []
+    for record in wall_records:
+        jobs.append(("wall", record, drawing_name(record["element_data"].get("Element_ID"), names),
+                     wall_parameters(record, scale)))
+    for record in slab_records:
+        jobs.append(("slab", record, drawing_name(record["element_data"].get("Product ID"), names),
+                     slab_parameters(record, scale)))
+
+    hashes = {}
+    for kind, record, name, parameters in jobs:
+        hashes[name] = drawing_hash(kind, parameters)
+        if manifest.get(name) == hashes[name] and os.path.exists(os.path.join(output_dir, name)):
+            report.unchanged += 1
+        else:
+            pending.append((kind, os.path.join(output_dir, name), parameters))
+
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    if processes == 1 or len(chunks) <= 1:
+        report.drawn = sum(map(draw_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            report.drawn = sum(executor.map(draw_chunk, chunks))
+
+    # Drawings of records that are gone are left on disk, but no longer tracked
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=0, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    for kind, record, name, parameters in jobs:
+        (report.wall_names if kind == "wall" else report.slab_names).append(name)
+    if ifc_manager is not None:
+        report.updated = update_drawing_properties(ifc_manager, jobs)
+
+    report.elapsed = time.perf_counter() - start
+    print(report)
+    return report
+
+
+def update_drawing_properties(ifc_manager, jobs):
+    """
+    Writes the drawing file names to the property sets of the elements of the records.
+
+    Args:
+        ifc_manager (IFCManager): The manager holding the elements.
+        jobs (list of tuple): Kind, record, drawing name and parameters of each drawing.
+
+    Returns:
+        int: Number of elements whose property changed.
+    """
+    updater = ifc_manager.get_updater()
+    pset_writer = ifc_manager.get_pset_writer()
+    updated = 0
+    for kind, record, name, parameters in jobs:
+        if kind == "wall":
+            element = updater.get_element("IfcWall", "Element_ID", record["element_data"].get("Element_ID"))
+            pset_name, property_name = "ReC_Pset_WallGeometryData", "Drawing"
+        else:
+            element = updater.get_element("IfcSlab", "Product_ID", record["element_data"].get("Product ID"))
+            pset_name, property_name = "ReC_Pset_SlabElementData", "Drawings"
+        if element is not None and pset_writer.update(element, pset_name, {property_name: name}):
+            updated += 1
+    return updated
+
+
+def drawing_name(key, names):
+    """
+    Derives a unique SVG file name from a business key.
+
+    Args:
+        key: Element_ID of a wall or Product ID of a slab record.
+        names (dict): File stems used so far and how often, updated in place.
+
+    Returns:
+        str: The file name, with a `-2`, `-3`, ... suffix for keys repeated in one run.
+    """
+    stem = UNSAFE_NAME.sub("_", str(key)) if key not in (None, "") else "unnamed"
+    count = names.get(stem, 0) + 1
+    names[stem] = count
+    return f"{stem}.svg" if count == 1 else f"{stem}-{count}.svg"
+
+
+def drawing_hash(kind, parameters):
+    text = json.dumps([DRAWING_VERSION, kind, parameters], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def wall_parameters(record, scale):
+    """
+    Reads the inputs of a wall drawing from a record, with the defaults of `build_wall_geometry`.
+
+    Args:
+        record (dict): Record holding `element_data` and `geometry_data`.
+        scale (float): Drawing scale.
+
+    Returns:
+        dict: JSON-serializable drawing inputs.
+    """
+    element_data = record.get("element_data", {})
+    geometry_data = record.get("geometry_data", {})
+    thickness = geometry_data.get("Thickness", 300.0)
+    return {
+        "title": f"Wall {element_data.get('Wall_ID', '')}",
+        "subtitle": f"Product {element_data.get('Product_ID', '')}",
+        "length": geometry_data.get("Length", 5000.0),
+        "height": geometry_data.get("Height", 3000.0),
+        "thickness": thickness,
+        "voids": void_rows(geometry_data.get("Voids") or [], thickness).tolist(),
+        "mirrored": bool(geometry_data.get("Mirrored")),
+        "scale": scale,
+    }
+
+
+def slab_parameters(record, scale):
+    """
+    Reads the inputs of a slab drawing from a record, with the defaults of `build_slab_geometry`.
+
+    Args:
+        record (dict): Record holding the slab `element_data`.
+        scale (float): Drawing scale.
+
+    Returns:
+        dict: JSON-serializable drawing inputs.
+    """
+    element_data = record.get("element_data", {})
+    return {
+        "title": f"Slab {element_data.get('Product ID', '')}",
+        "subtitle": f"Reinforcement {element_data.get('Reinforcement ID', '')}",
+        "length": element_data["Length"],
+        "width": element_data["Width"],
+        "height": element_data["Height"],
+        "void_count": element_data.get("Void Count", 0),
+        "void_diameter": element_data.get("Void Diameter", 0.0),
+        "scale": scale,
+    }
+
+
+def draw_chunk(jobs):
+    """
+    Process pool worker rendering and writing a chunk of drawings.
+
+    Args:
+        jobs (list of tuple): Kind ("wall" or "slab"), output path and drawing inputs of each drawing.
+
+    Returns:
+        int: Number of drawings written.
+    """
+    for kind, path, parameters in jobs:
+        svg = wall_svg(**parameters) if kind == "wall" else slab_svg(**parameters)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(svg)
+    return len(jobs)
+
+
+def wall_svg(length, height, thickness, voids=None, mirrored=False, title="", subtitle="", scale=20):
+    """
+    Draws the elevation and section of a wall.
+
+    The elevation is seen from the side the wall is built from, with the openings drawn as
+    crossed rectangles and mirrored along the length for mirrored panels, like their mapped
+    representation. It is dimensioned with the overall length and height, a chain of the
+    opening edges along the length and the sill height of each opening.
+
+    Args:
+        length (float): Length of the wall in mm.
+        height (float): Height of the wall in mm.
+        thickness (float): Thickness of the wall in mm.
+        voids (list or numpy.ndarray): Voids (openings) in the wall as dicts, see `void_rows`, or as
+                                       X, Y, Z, Width, Height, Depth rows.
+        mirrored (bool): Whether the wall is a mirrored panel.
+        title (str): First title line.
+        subtitle (str): Second title line.
+        scale (float): Drawing scale, e.g. 20 for 1:20.
+
+    Returns:
+        str: The SVG document.
+    """
+    drawing = SvgDrawing(scale)
+    gap = DIMENSION_GAP * scale
+    if isinstance(voids, (list, tuple)) and voids and not isinstance(voids[0], dict):
+        # Rows as stored in the drawing inputs, which have to be JSON-serializable
+        voids = np.array(voids, dtype=float)
+    openings = []
+    for x, _, z, width, void_height, _ in void_rows(voids, thickness).tolist():
+        if mirrored:
+            x = length - x - width
+        openings.append((x, z, width, void_height))
+
+    drawing.rect(0, 0, length, height, "outline")
+    for x, z, width, void_height in openings:
+        top = height - z - void_height
+        drawing.rect(x, top, width, void_height, "opening")
+        drawing.line(x, top, x + width, top + void_height, "opening")
+        drawing.line(x + width, top, x, top + void_height, "opening")
+        drawing.text(x + width / 2, top - drawing.text_size / 2, f"{format_length(width)} x {format_length(void_height)}")
+        if z > 0:
+            drawing.vertical_dimension(height - z, height, x + width / 2, x + width / 2)
+
+    edges = sorted({0.0, float(length)} | {edge for x, _, width, _ in openings for edge in (x, x + width)
+                                           if 0 < edge < length})
+    if len(edges) > 2:
+        drawing.chain_dimension(edges, height + gap, height)
+    drawing.chain_dimension((0.0, length), height + 2 * gap, height)
+    drawing.vertical_dimension(0, height, -gap, 0)
+
+    # Section through the thickness, to the right of the elevation
+    section_x = length + 2 * gap
+    drawing.rect(section_x, 0, thickness, height, "section")
+    drawing.chain_dimension((section_x, section_x + thickness), height + gap, height)
+    drawing.text(section_x + thickness / 2, -drawing.text_size, "Section")
+
+    notes = f"{format_length(length)} x {format_length(height)} x {format_length(thickness)}"
+    if mirrored:
+        notes += ", mirrored"
+    drawing.title(0, height + 3 * gap, (title, subtitle, notes))
+    return drawing.to_string()
+
+
+def slab_svg(length, width, height, void_count=0, void_diameter=0.0, title="", subtitle="", scale=20):
+    """
+    Draws the plan and cross-section of a solid or hollow-core slab.
+
+    The cores are laid out like `hollow_core_points` does for the profile of the 3D slab,
+    drawn as circles in the cross-section and as hidden lines along the length in the plan.
+    The cross-section is dimensioned with the width, the height, the positions of the core
+    centres and the core diameter.
+
+    Args:
+        length (float): Length of the slab in mm.
+        width (float): Width of the slab in mm.
+        height (float): Height of the slab in mm.
+        void_count (int): Number of voids (cores) in the slab. If 0, the slab is considered solid.
+        void_diameter (float): Diameter of the voids in mm. Ignored if void_count is 0.
+        title (str): First title line.
+        subtitle (str): Second title line.
+        scale (float): Drawing scale, e.g. 20 for 1:20.
+
+    Returns:
+        str: The SVG document.
+    """
+    drawing = SvgDrawing(scale)
+    gap = DIMENSION_GAP * scale
+    cores = []
+    if void_count > 0:
+        points = hollow_core_points(width, height, void_count, void_diameter)
+        # Each core contributes its right, top, left and bottom points, the centre is halfway
+        cores = [((right[0] + left[0]) / 2, (right[1] + left[1]) / 2)
+                 for right, left in zip(points[4::4].tolist(), points[6::4].tolist())]
+
+    # Plan, with the length along x and the cores as hidden lines
+    drawing.rect(0, 0, length, width, "outline")
+    for centre_x, _ in cores:
+        for offset in (-void_diameter / 2, void_diameter / 2):
+            drawing.line(0, centre_x + offset, length, centre_x + offset, "hidden")
+    drawing.chain_dimension((0.0, length), width + gap, width)
+    drawing.vertical_dimension(0, width, -gap, 0)
+    drawing.text(length / 2, -drawing.text_size, "Plan")
+
+    # Cross-section below the plan, y pointing down from its top face
+    top = width + 4 * gap
+    drawing.rect(0, top, width, height, "section")
+    for centre_x, centre_y in cores:
+        drawing.circle(centre_x, top + height - centre_y, void_diameter / 2, "opening")
+    if cores:
+        # Core centres rather than edges, the webs are too thin to label at drawing scales
+        drawing.chain_dimension([0.0] + [centre_x for centre_x, _ in cores] + [float(width)], top - gap, top)
+        drawing.text(width / 2, top + height + gap + drawing.text_size,
+                     f"{void_count} cores {format_length(void_diameter)} dia.")
+    drawing.chain_dimension((0.0, width), top + height + gap, top + height)
+    drawing.vertical_dimension(top, top + height, -gap, 0)
+    drawing.text(width / 2, top - 2 * gap, "Section")
+
+    notes = f"{format_length(length)} x {format_length(width)} x {format_length(height)}"
+    drawing.title(0, top + height + 3 * gap, (title, subtitle, notes))
+    return drawing.to_string()
+
+
+class SvgDrawing:
+    """
+    Collects the elements of one drawing in model units (mm) and sizes the page to fit them.
+
+    Coordinates run right and down like SVG's, the page is the bounding box of everything
+    drawn plus a margin, at the given scale.
+    """
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.text_size = TEXT_SIZE * scale
+        self.tick = 1.0 * scale
+        self.elements = []
+        self.bounds = [float("inf"), float("inf"), float("-inf"), float("-inf")]
+
+    def extend(self, x, y):
+        bounds = self.bounds
+        bounds[0], bounds[1] = min(bounds[0], x), min(bounds[1], y)
+        bounds[2], bounds[3] = max(bounds[2], x), max(bounds[3], y)
+
+    def rect(self, x, y, width, height, css_class):
+        self.extend(x, y)
+        self.extend(x + width, y + height)
+        self.elements.append(f'<rect class="{css_class}" x="{x:g}" y="{y:g}" width="{width:g}" height="{height:g}"/>')
+
+    def line(self, x1, y1, x2, y2, css_class):
+        self.extend(x1, y1)
+        self.extend(x2, y2)
+        self.elements.append(f'<line class="{css_class}" x1="{x1:g}" y1="{y1:g}" x2="{x2:g}" y2="{y2:g}"/>')
+
+    def circle(self, x, y, radius, css_class):
+        self.extend(x - radius, y - radius)
+        self.extend(x + radius, y + radius)
+        self.elements.append(f'<circle class="{css_class}" cx="{x:g}" cy="{y:g}" r="{radius:g}"/>')
+
+    def text(self, x, y, text, css_class=None, rotate=False):
+        # Text is only roughly accounted for in the bounds, the margin covers the rest
+        self.extend(x, y - self.text_size)
+        attributes = f' class="{css_class}"' if css_class else ""
+        if rotate:
+            attributes += f' transform="rotate(-90 {x:g} {y:g})"'
+        self.elements.append(f'<text{attributes} x="{x:g}" y="{y:g}">{escape(text)}</text>')
+
+    def chain_dimension(self, positions, y, origin_y):
+        """
+        Draws a horizontal chain of dimensions between consecutive x positions.
+
+        Args:
+            positions (sequence of float): Sorted x positions.
+            y (float): Height of the dimension line.
+            origin_y (float): Where the extension lines start, on the measured object.
+        """
+        direction = 1 if y > origin_y else -1
+        tick = self.tick
+        self.line(positions[0], y, positions[-1], y, "dimension")
+        for x in positions:
+            self.line(x, origin_y + direction * tick, x, y + direction * tick, "dimension")
+            self.line(x - tick, y + tick, x + tick, y - tick, "dimension")
+        for start, end in zip(positions, positions[1:]):
+            self.text((start + end) / 2, y - tick, format_length(end - start))
+
+    def vertical_dimension(self, y1, y2, x, origin_x):
+        """
+        Draws a vertical dimension between two y positions.
+
+        Args:
+            y1 (float): Top of the measured span.
+            y2 (float): Bottom of the measured span.
+            x (float): Position of the dimension line.
+            origin_x (float): Where the extension lines start, on the measured object.
+        """
+        tick = self.tick
+        direction = 1 if x > origin_x else -1
+        self.line(x, y1, x, y2, "dimension")
+        for y in (y1, y2):
+            if origin_x != x:
+                self.line(origin_x + direction * tick, y, x + direction * tick, y, "dimension")
+            self.line(x - tick, y + tick, x + tick, y - tick, "dimension")
+        self.text(x - tick, (y1 + y2) / 2, format_length(y2 - y1), rotate=True)
+
+    def title(self, x, y, lines):
+        for i, line in enumerate(lines):
+            if line:
+                self.text(x, y + i * 1.6 * self.text_size, line, "title")
+        self.text(x, y + len(lines) * 1.6 * self.text_size, f"Scale 1:{self.scale:g}", "title")
+
+    def to_string(self):
+        scale = self.scale
+        margin = MARGIN * scale
+        left, top, right, bottom = self.bounds
+        left, top = left - margin, top - margin
+        width, height = right - left + margin, bottom - top + margin
+        style = STYLE.format(line=f"{LINE_WIDTH * scale:g}", thin=f"{THIN_LINE_WIDTH * scale:g}",
+                             dash=f"{3 * scale:g},{1.5 * scale:g}", text=f"{self.text_size:g}",
+                             title=f"{1.4 * self.text_size:g}")
+        hatch = 2 * scale
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width / scale:.1f}mm" height="{height / scale:.1f}mm" '
+            f'viewBox="{left:g} {top:g} {width:g} {height:g}">\n'
+            f'<defs><style>{style}</style>'
+            f'<pattern id="hatch" patternUnits="userSpaceOnUse" width="{hatch:g}" height="{hatch:g}" '
+            f'patternTransform="rotate(45)"><line x1="0" y1="0" x2="0" y2="{hatch:g}" stroke="#000" '
+            f'stroke-width="{THIN_LINE_WIDTH * scale:g}"/></pattern></defs>\n'
+            + "\n".join(self.elements)
+            + "\n</svg>\n"
+        )
+
+
+def format_length(value):
+    return f"{round(value, 1):g}"
+
+
+def main(argv=None):
+    # Imported here as the record readers are only needed from the command line
+    from ifc_library.records import read_records
+
+    parser = argparse.ArgumentParser(description="Draw dimensioned SVG elevations and sections of walls and slabs.")
+    parser.add_argument("output_dir", help="Directory the drawings are written to")
+    parser.add_argument("--walls", help="Wall records as .csv or .jsonl")
+    parser.add_argument("--slabs", help="Slab records as .csv or .jsonl")
+    parser.add_argument("--processes", type=int, help="Number of worker processes")
+    parser.add_argument("--scale", type=float, default=20, help="Drawing scale, e.g. 20 for 1:20")
+    args = parser.parse_args(argv)
+
+    generate_drawings(args.output_dir, read_records(args.walls) if args.walls else (),
+                      read_records(args.slabs) if args.slabs else (), processes=args.processes, scale=args.scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@ from ifc_library.ifc_manager import IFCElement
 from ifcopenshell.api import run
 import numpy as np
 
+from ifc_library.quantities import density, slab_quantity_table
+from ifc_library.units import RECORD_LENGTH_UNIT
+
 class IFCSlab(IFCElement):
     """
     Represents an IFC Slab element, capable of managing both solid and hollow-core slabs.
@@ -10,7 +13,7 @@ class IFCSlab(IFCElement):
     def __init__(self, ifc_manager, name="Slab"):
         super().__init__(ifc_manager, ifc_class="IfcSlab", name=name)
 
-    def add_slab_representation(self, length, width, height, void_count=0, void_diameter=0):
+    def add_slab_representation(self, length, width, height, void_count=0, void_diameter=0, shared=False):
         """
         Adds a geometric representation of the slab, choosing between a solid or hollow-core representation.
 
@@ -20,8 +23,16 @@ class IFCSlab(IFCElement):
             height (int): Height of the slab in mm.
             void_count (int): Number of voids (cores) in the slab. If 0, the slab is considered solid.
             void_diameter (float): Diameter of the voids in mm. Ignored if void_count is 0.
+            shared (bool): If True, map the representation of an IfcSlabType shared by every slab
+                           with the same dimensions instead of creating a new solid.
         """
-        if void_count > 0:
+        self.footprint = [(0.0, 0.0), (length, 0.0), (length, width), (0.0, width)]
+        if shared:
+            geometry_cache = self.ifc_manager.get_geometry_cache()
+            slab_type = geometry_cache.get_slab_type(length, width, height, void_count, void_diameter)
+            geometry_cache.map_representation(self.element, slab_type)
+            geometry_cache.assign_type(slab_type, [self.element])
+        elif void_count > 0:
             self.add_hollow_core_representation(length, width, height, void_count, void_diameter)
         else:
             self.add_solid_representation(length, width, height)
@@ -35,10 +46,11 @@ class IFCSlab(IFCElement):
             width (int): Width of the slab in mm.
             height (int): Height of the slab in mm.
         """
+        # The geometry API takes SI units
         representation_data = {
-            'length': length,
-            'height': height,
-            'thickness': width  # Using "thickness" to represent width as per IFC standards
+            'length': length * RECORD_LENGTH_UNIT,
+            'height': height * RECORD_LENGTH_UNIT,
+            'thickness': width * RECORD_LENGTH_UNIT  # Using "thickness" to represent width as per IFC standards
         }
 
         # Create and assign the geometric representation to the slab
@@ -56,15 +68,19 @@ class IFCSlab(IFCElement):
             void_count (int): Number of voids (cores) in the slab.
             void_diameter (float): Diameter of the voids in mm.
         """
-        profile_polyline = self.create_hollow_core_profile(width, height, void_count, void_diameter)
+        geometry_cache = self.ifc_manager.get_geometry_cache()
+        solid = geometry_cache.create_hollow_core_solid(length, width, height, void_count, void_diameter)
 
-        # Create and assign the profile-based representation to the slab
-        profile_representation = run("geometry.add_profile_representation", self.ifc_manager.model, context=self.ifc_manager.body, profile=profile_polyline, length=length)
-        run("geometry.assign_representation", self.ifc_manager.model, product=self.element, representation=profile_representation)
+        # Assign the extruded cross-section, which runs along the slab length like the solid slab
+        representation = geometry_cache.create_shape_representation(solid)
+        run("geometry.assign_representation", self.ifc_manager.model, product=self.element, representation=representation)
 
     def create_hollow_core_profile(self, width, height, void_count, void_diameter):
         """
-        Creates a 2D profile for a hollow-core slab based on the void count and diameter.
+        Returns the 2D profile of a hollow-core slab, with the cores modelled as circular voids.
+
+        Profiles are cached per (width, height, void_count, void_diameter), so slabs with the
+        same cross-section share a single profile.
 
         Args:
             width (int): Width of the slab in mm.
@@ -73,40 +89,42 @@ class IFCSlab(IFCElement):
             void_diameter (float): Diameter of the voids in mm.
 
         Returns:
-            IfcPolyline: A polyline representing the profile points.
+            IfcArbitraryProfileDefWithVoids: The shared profile.
         """
-        external_web_thickness = (width - void_count * void_diameter) / (void_count + 1)
-        points = []
-
-        x_pos = 0.0
-        y_pos = 0.0
+        profiles = self.ifc_manager.get_geometry_cache().profiles
+        return profiles.get_hollow_core_profile(width, height, void_count, void_diameter)
 
-        # Start from the bottom left corner
-        points.append((x_pos, y_pos))
-        y_pos = height
-
-        # Move up to the top left corner
-        points.append((x_pos, y_pos))
-        x_pos += external_web_thickness
-
-        # Add the arcs representing the voids
-        for _ in range(void_count):
-            points.append((x_pos, y_pos))
-            x_pos += void_diameter + external_web_thickness
+    def add_quantities(self, length, width, height, void_count=0, void_diameter=0, strength_class=None):
+        """
+        Adds Qto_SlabBaseQuantities computed from the dimensions, net of the hollow cores.
 
-        # Complete the profile
-        points.append((width, height))
-        points.append((width, 0.0))
-        points.append((0.0, 0.0))  # Closing the profile
+        Args:
+            length (int): Length of the slab in mm.
+            width (int): Width of the slab in mm.
+            height (int): Height of the slab in mm.
+            void_count (int): Number of voids (cores) in the slab.
+            void_diameter (float): Diameter of the voids in mm.
+            strength_class (str): Concrete strength class the density is taken from.
 
-        # Convert points to IfcCartesianPoints
-        cartesian_points = [run("geometry.add_cartesian_point", self.ifc_manager.model, coordinates=point) for point in points]
-        
-        # Create the polyline representation
-        profile_polyline = run("geometry.add_polyline", self.ifc_manager.model, points=cartesian_points)
+        Returns:
+            IfcElementQuantity: The quantity set, shared with slabs of equal quantities.
+        """
+        quantity_writer = self.ifc_manager.get_quantity_writer()
+        table = slab_quantity_table([length], [width], [height], [void_count], [void_diameter],
+                                    density(strength_class, quantity_writer.densities))
+        return quantity_writer.write([self.element], "Qto_SlabBaseQuantities", table)[0]
 
-        return profile_polyline
+    def add_record(self, record, shared=False):
+        """
+        Adds the representation and property set of a SlabInventory row, read straight from its columns.
 
+        Args:
+            record (SlabRecord): Row of a SlabInventory, e.g. `inventory[i]`.
+            shared (bool): If True, map the representation of a shared IfcSlabType.
+        """
+        self.add_slab_representation(record.length, record.width, record.height, record.void_count,
+                                     record.void_diameter, shared=shared)
+        self.add_property_set({"ReC_Pset_SlabElementData": record.element_data_properties()})
 
     def add_element_data(self, element_data):
         """
@@ -115,7 +133,20 @@ class IFCSlab(IFCElement):
         Args:
             element_data (dict): Dictionary containing element-specific properties.
         """
-        properties = {
+        self.add_property_set({"ReC_Pset_SlabElementData": self.element_data_properties(element_data)})
+
+    @staticmethod
+    def element_data_properties(element_data):
+        """
+        Maps raw element data onto the ReC_Pset_SlabElementData properties.
+
+        Args:
+            element_data (dict): Dictionary containing element-specific properties.
+
+        Returns:
+            dict: Property names and values for the property set.
+        """
+        return {
             "Product_ID": element_data['Product ID'],
             "Reinforcement_ID": element_data['Reinforcement ID'],
             "Count": element_data['Count'],
@@ -131,5 +162,3 @@ class IFCSlab(IFCElement):
             "Drawings": element_data.get('Drawings'),  # Optional, may not be present
             "Notes": element_data.get('Notes')  # Optional, may not be present
         }
-        self.add_property_set({"ReC_Pset_SlabElementData": properties})
-
@@ -4,6 +4,10 @@ from ifc_library.ifc_manager import IFCElement
 from ifcopenshell.api import run  # Import run directly here
 import numpy as np
 
+from ifc_library.geometry_cache import void_rows
+from ifc_library.quantities import density, wall_quantity_table
+from ifc_library.units import RECORD_LENGTH_UNIT, si_matrix
+
 class IFCWall(IFCElement):
     """
     Represents an IFC Wall element. Inherits from IFCElement.
@@ -12,49 +16,69 @@ class IFCWall(IFCElement):
         super().__init__(ifc_manager, ifc_class="IfcWall", name=name)
 
 
-    def add_wall_representation(self, length, height, thickness, voids=None):
+    def place_on_grid(self, grid_pos, orientation, elevation=0.0):
+        """
+        Places the wall on a grid intersection of the manager's grid, facing its orientation.
+
+        Args:
+            grid_pos (str): Grid position such as "C12", the `Grid_Pos` of the element data.
+            orientation (str): "North", "East", "South" or "West", the `Orientation` of the element data.
+            elevation (float): Height of the wall's base.
+        """
+        self.set_placement(self.ifc_manager.get_grid().placement_matrix(grid_pos, orientation, elevation))
+
+    def add_wall_representation(self, length, height, thickness, voids=None, mirrored=False, shared=False):
         """
         Adds a wall-specific geometric representation.
-        The FootprintPolyline is automatically calculated from the length and thickness.
-        Voids (openings) can also be added.
+        The footprint, kept for the spatial index, is automatically calculated from the length
+        and thickness. Voids (openings) can also be added.
 
         Args:
-            length (float): Length of the wall.
-            height (float): Height of the wall.
-            thickness (float): Thickness of the wall.
-            voids (list of dicts): List of voids (openings) in the wall.
+            length (float): Length of the wall in mm.
+            height (float): Height of the wall in mm.
+            thickness (float): Thickness of the wall in mm.
+            voids (list of dicts or numpy.ndarray): Voids (openings) in the wall, see `void_rows`.
+            mirrored (bool): Whether the wall is a mirrored panel. Only used for shared geometry.
+            shared (bool): If True, map the representation of an IfcWallType shared by every wall
+                           with the same dimensions and voids instead of creating a new solid.
         """
-        # FootprintPolyline from element dimensions
-        footprint_polyline = [
+        # Footprint from element dimensions
+        self.footprint = [
             (0.0, 0.0),
             (length, 0.0),
             (length, thickness),
             (0.0, thickness)
         ]
 
+        if shared:
+            geometry_cache = self.ifc_manager.get_geometry_cache()
+            wall_type = geometry_cache.get_wall_type(length, height, thickness, voids)
+            geometry_cache.map_representation(self.element, wall_type, mirrored)
+            geometry_cache.assign_type(wall_type, [self.element])
+            return
+
+        # The geometry API takes SI units
         representation_data = {
-            'length': length,
-            'height': height,
-            'thickness': thickness,
-            'FootprintPolyline': footprint_polyline
+            'length': length * RECORD_LENGTH_UNIT,
+            'height': height * RECORD_LENGTH_UNIT,
+            'thickness': thickness * RECORD_LENGTH_UNIT
         }
 
         # Handle the representation creation and assignment for the wall
         representation = run("geometry.add_wall_representation", self.ifc_manager.model, context=self.ifc_manager.body, **representation_data)
         run("geometry.assign_representation", self.ifc_manager.model, product=self.element, representation=representation)
 
-        # If voids are specified, create them
-        if voids:
-            for void in voids:
-                self.add_void(void, thickness)
+        # If voids are specified, create them in one batch
+        if voids is not None and len(voids):
+            self.add_voids(voids, thickness)
 
     def add_void(self, void_data, wall_thickness):
         """
-        Adds a void (opening) to the wall using the ifcopenshell void.add_opening API.
+        Adds a void (opening) to the wall using the ifcopenshell feature.add_feature API.
 
         Args:
-            void_data (dict): A dictionary containing X, Z, Width, Height, and optional Y, Depth of the void.
-            wall_thickness (float): The thickness of the wall.
+            void_data (dict): A dictionary containing X, Z, Width, Height, and optional Y, Depth of the void, in mm.
+            wall_thickness (float): The thickness of the wall in mm.
         """
         x = void_data.get("X", 0.0)  # Horizontal position
         z = void_data.get("Z", 0.0)  # Vertical position (height)
@@ -68,19 +92,94 @@ class IFCWall(IFCElement):
 
         # Create the representation for the opening
         representation = run("geometry.add_wall_representation", self.ifc_manager.model,
-                             context=self.ifc_manager.body, length=width, height=height, thickness=depth)
+                             context=self.ifc_manager.body, length=width * RECORD_LENGTH_UNIT,
+                             height=height * RECORD_LENGTH_UNIT, thickness=depth * RECORD_LENGTH_UNIT)
         run("geometry.assign_representation", self.ifc_manager.model, product=opening, representation=representation)
 
         # Place the opening in the correct position relative to the wall
         matrix = np.identity(4)
         matrix[:, 3] = [x, y, z, 1]  # Use Z for height positioning
-        run("geometry.edit_object_placement", self.ifc_manager.model, product=opening, matrix=matrix)
+        run("geometry.edit_object_placement", self.ifc_manager.model, product=opening, matrix=si_matrix(matrix))
 
         # Add the opening to the wall
-        run("void.add_opening", self.ifc_manager.model, opening=opening, element=self.element)
+        run("feature.add_feature", self.ifc_manager.model, feature=opening, element=self.element)
+
+    def add_voids(self, voids, wall_thickness):
+        """
+        Adds many voids (openings) to the wall in one batch.
+
+        Produces the same openings as calling `add_void` for each of them, but without the
+        per-opening API dispatch: positions are computed as one array, openings of the same
+        Width, Height and Depth share one box representation, and the IfcRelVoidsElement
+        relationships are created directly.
+
+        Args:
+            voids (list of dicts or numpy.ndarray): Voids with X, Z, Width, Height, and optional Y, Depth,
+                                                    see `void_rows`.
+            wall_thickness (float): The thickness of the wall.
+
+        Returns:
+            list: The created IfcOpeningElements.
+        """
+        return self.ifc_manager.get_geometry_cache().add_openings(self.element, voids, wall_thickness)
+
+    def add_quantities(self, length, height, thickness, voids=None, strength_class=None):
+        """
+        Adds Qto_WallBaseQuantities computed from the dimensions, without evaluating the geometry.
+
+        Args:
+            length (float): Length of the wall in mm.
+            height (float): Height of the wall in mm.
+            thickness (float): Thickness of the wall in mm.
+            voids (list of dicts or numpy.ndarray): Voids (openings) in the wall, see `void_rows`.
+            strength_class (str): Concrete strength class the density is taken from.
+
+        Returns:
+            IfcElementQuantity: The quantity set, shared with walls of equal quantities.
+        """
+        quantity_writer = self.ifc_manager.get_quantity_writer()
+        rows = void_rows(voids, thickness)
+        table = wall_quantity_table([length], [height], [thickness], [0, len(rows)], rows,
+                                    density(strength_class, quantity_writer.densities))
+        return quantity_writer.write([self.element], "Qto_WallBaseQuantities", table)[0]
+
+    def add_record(self, record, shared=False):
+        """
+        Adds the representation, voids and property sets of a WallInventory row.
+
+        The values are read straight from the inventory columns instead of element_data and
+        geometry_data record dicts. Only the property dict of each set is built, as the pset
+        writer takes one.
+
+        Args:
+            record (WallRecord): Row of a WallInventory, e.g. `inventory[i]`.
+            shared (bool): If True, map the representation of a shared IfcWallType.
+        """
+        self.add_wall_representation(record.length, record.height, record.thickness, voids=record.voids,
+                                     mirrored=record.mirrored, shared=shared)
+        self.add_property_set({
+            "ReC_Pset_WallElementData": record.element_data_properties(),
+            "ReC_Pset_WallGeometryData": record.geometry_data_properties()
+        })
 
     def add_element_data(self, element_data):
-        properties = {
+        self.add_property_set({"ReC_Pset_WallElementData": self.element_data_properties(element_data)})
+
+    def add_geometry_data(self, geometry_data):
+        self.add_property_set({"ReC_Pset_WallGeometryData": self.geometry_data_properties(geometry_data)})
+
+    @staticmethod
+    def element_data_properties(element_data):
+        """
+        Maps raw element data onto the ReC_Pset_WallElementData properties.
+
+        Args:
+            element_data (dict): Dictionary containing element-specific properties.
+
+        Returns:
+            dict: Property names and values for the property set.
+        """
+        return {
             "Element_ID": element_data['Element_ID'],
             "Wall_ID": element_data['Wall_ID'],
             "Local_ID": element_data['Local_ID'],
@@ -97,10 +196,19 @@ class IFCWall(IFCElement):
             "Links": element_data['Links'],
             "Notes": element_data['Notes']
         }
-        self.add_property_set({"ReC_Pset_WallElementData": properties})
 
-    def add_geometry_data(self, geometry_data):
-        properties = {
+    @staticmethod
+    def geometry_data_properties(geometry_data):
+        """
+        Maps raw geometry data onto the ReC_Pset_WallGeometryData properties.
+
+        Args:
+            geometry_data (dict): Dictionary containing geometry-specific properties.
+
+        Returns:
+            dict: Property names and values for the property set.
+        """
+        return {
             "Product_ID": geometry_data['Product_ID'],
             "Reinf_Type": geometry_data['Reinf_Type'],
             "Mirrored": geometry_data['Mirrored'],
@@ -118,4 +226,3 @@ class IFCWall(IFCElement):
             "Has_Connections": geometry_data['Has_Connections'],
             "Has_Corbel": geometry_data['Has_Corbel']
         }
-        self.add_property_set({"ReC_Pset_WallGeometryData": properties})
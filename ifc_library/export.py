@@ -0,0 +1,243 @@
+import gzip
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import ifcopenshell
+
+from ifc_library.sharding import (SHARD_KEYS, build_shard, data_section, hierarchy_skeleton, partition_records,
+                                  renumber_shard)
+
+STEP_FOOTER = "ENDSEC;\nEND-ISO-10303-21;\n"
+
+
+class ExportReport:
+    """
+    Size and duration of an export.
+    """
+
+    def __init__(self, file_path, compression):
+        self.file_path = file_path
+        self.compression = compression
+        self.entities = 0
+        self.bytes_written = 0
+        self.file_size = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (f"Exported {self.entities} entities to {self.file_path}: {self.bytes_written / 1e6:.1f} MB of STEP, "
+                f"{self.file_size / 1e6:.1f} MB on disk ({self.compression or 'uncompressed'}), {self.elapsed:.2f}s")
+
+
+def compression_for(file_path):
+    """
+    Infers the compression of an output file from its extension.
+
+    Args:
+        file_path (str): Output path, `.ifc`, `.ifc.gz` or `.ifcZIP`.
+
+    Returns:
+        str: "gzip", "zip" or None for plain STEP.
+    """
+    lower = file_path.lower()
+    if lower.endswith(".ifczip") or lower.endswith(".zip"):
+        return "zip"
+    if lower.endswith(".gz"):
+        return "gzip"
+    return None
+
+
+class StepWriter:
+    """
+    Writes STEP text to a plain, gzip or ifcZIP file in fixed-size chunks.
+
+    Text is buffered up to `chunk_size` characters and then encoded and written, so neither
+    the whole file content nor its compressed form is ever held in memory.
+    """
+
+    def __init__(self, file_path, compression=None, chunk_size=1 << 20):
+        """
+        Args:
+            file_path (str): Output path.
+            compression (str): "gzip", "zip" or None. Inferred from the extension when omitted.
+            chunk_size (int): Number of characters buffered before each write.
+        """
+        self.file_path = file_path
+        self.compression = compression if compression is not None else compression_for(file_path)
+        if self.compression not in (None, "gzip", "zip"):
+            raise ValueError(f"Unsupported compression: {self.compression}")
+        self.chunk_size = chunk_size
+        self.report = ExportReport(file_path, self.compression)
+        self.buffer = []
+        self.buffered = 0
+        self.archive = None
+        self.stream = None
+        self.start = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(write_footer=exc_type is None)
+
+    def open(self):
+        self.start = time.perf_counter()
+        if self.compression == "gzip":
+            self.stream = gzip.open(self.file_path, "wb", compresslevel=6)
+        elif self.compression == "zip":
+            # An ifcZIP archive holds a single .ifc file named after the archive
+            member = os.path.splitext(os.path.basename(self.file_path))[0] + ".ifc"
+            self.archive = zipfile.ZipFile(self.file_path, "w", zipfile.ZIP_DEFLATED)
+            self.stream = self.archive.open(member, "w", force_zip64=True)
+        else:
+            self.stream = open(self.file_path, "wb")
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.chunk_size:
+            self.flush()
+
+    def write_header(self, step):
+        """
+        Writes the HEADER section of a STEP string and opens the DATA section.
+
+        Args:
+            step (str): A STEP string, typically of a small or empty model of the same schema.
+        """
+        self.write(step[:step.index("DATA;\n")] + "DATA;\n")
+
+    def write_entity(self, line):
+        self.write(line + ";\n")
+        self.report.entities += 1
+
+    def flush(self):
+        if not self.buffer:
+            return
+        data = "".join(self.buffer).encode("utf-8")
+        self.stream.write(data)
+        self.report.bytes_written += len(data)
+        self.buffer = []
+        self.buffered = 0
+
+    def close(self, write_footer=True):
+        """
+        Finishes the file and fills in the report.
+
+        Args:
+            write_footer (bool): End the DATA section and the file. Disabled when aborting.
+
+        Returns:
+            ExportReport: Entities and bytes written, size on disk and elapsed time.
+        """
+        if write_footer:
+            self.write(STEP_FOOTER)
+        self.flush()
+        self.stream.close()
+        if self.archive is not None:
+            self.archive.close()
+        self.report.file_size = os.path.getsize(self.file_path)
+        self.report.elapsed = time.perf_counter() - self.start
+        return self.report
+
+
+def write_model(model, file_path, compression=None, chunk_size=1 << 20):
+    """
+    Streams an in-memory model to a plain, gzip or ifcZIP file, one entity at a time.
+
+    Unlike `model.write`, the STEP text of the whole model is never materialized.
+
+    Args:
+        model (ifcopenshell.file): The model to write.
+        file_path (str): Output path.
+        compression (str): "gzip", "zip" or None. Inferred from the extension when omitted.
+        chunk_size (int): Number of characters buffered before each write.
+
+    Returns:
+        ExportReport: Entities and bytes written, size on disk and elapsed time.
+    """
+    writer = StepWriter(file_path, compression, chunk_size)
+    with writer:
+        writer.write_header(ifcopenshell.file(schema=model.schema).to_string())
+        highest_id = max((entity.id() for entity in model), default=0)
+        for entity_id in range(1, highest_id + 1):
+            try:
+                entity = model.by_id(entity_id)
+            except RuntimeError:
+                # Ids of removed entities are left as gaps
+                continue
+            writer.write_entity(entity.to_string(True))
+    print(writer.report)
+    return writer.report
+
+
+def write_shard(writer, shard, skeleton_size, offset):
+    # Appends a shard's own entities after the ones written so far, returns the next offset
+    data, highest_id = shard
+    writer.write(renumber_shard((data, skeleton_size, offset)))
+    writer.report.entities += highest_id - skeleton_size
+    return offset + highest_id - skeleton_size
+
+
+def build_streamed(file_path, wall_records=(), slab_records=(), keys=SHARD_KEYS, compression=None, processes=1,
+                   batch_size=1000, share_geometry=True, intern_property_values=False, chunk_size=1 << 20):
+    """
+    Builds an inventory one partition at a time, writing each finished partition straight to disk.
+
+    Partitions (by default one per building, wing and floor) are built on the same skeleton
+    as `build_sharded` and renumbered the same way, but serially and without ever holding
+    more than one partition in memory, so peak memory is bounded by the largest storey
+    rather than the whole inventory. The model is not kept: open the file to work on it.
+    Shared types are cached per partition.
+
+    When using the default spawn/forkserver start methods, call this from under an
+    `if __name__ == "__main__":` guard.
+
+    Args:
+        file_path (str): Output path.
+        wall_records (iterable of dict): Wall records, as accepted by `IFCManager.add_walls_bulk`.
+        slab_records (iterable of dict): Slab records, as accepted by `IFCManager.add_slabs_bulk`.
+        keys (tuple): `element_data` fields the inventory is partitioned on.
+        compression (str): "gzip", "zip" or None. Inferred from the extension when omitted.
+        processes (int): Number of partitions built at the same time. Peak memory grows with it.
+        batch_size (int): Bulk builder batch size.
+        share_geometry (bool): Map shared type representations within each partition.
+        intern_property_values (bool): Share low-cardinality property values within each partition.
+        chunk_size (int): Number of characters buffered before each write.
+
+    Returns:
+        ExportReport: Entities and bytes written, size on disk and elapsed time.
+    """
+    shards = {}
+    for key, records in partition_records(wall_records, keys).items():
+        shards.setdefault(key, ([], []))[0].extend(records)
+    for key, records in partition_records(slab_records, keys).items():
+        shards.setdefault(key, ([], []))[1].extend(records)
+    skeleton, skeleton_size = hierarchy_skeleton(shards.values())
+
+    writer = StepWriter(file_path, compression, chunk_size)
+    with writer:
+        writer.write_header(skeleton)
+        writer.write(data_section(skeleton))
+        writer.report.entities += skeleton_size
+
+        offset = 0
+        # Each partition is built in a fresh worker process: ifcopenshell does not hand the
+        # memory of a discarded model back to the system, so building them in this process
+        # would grow it by the size of every partition. At most `processes` partitions are
+        # in flight, finished ones are written and dropped in order.
+        with ProcessPoolExecutor(max_workers=processes, max_tasks_per_child=1) as executor:
+            pending = deque()
+            for walls, slabs in shards.values():
+                job = (skeleton, walls, slabs, batch_size, share_geometry, intern_property_values)
+                pending.append(executor.submit(build_shard, job))
+                if len(pending) < processes:
+                    continue
+                offset = write_shard(writer, pending.popleft().result(), skeleton_size, offset)
+            while pending:
+                offset = write_shard(writer, pending.popleft().result(), skeleton_size, offset)
+    print(writer.report)
+    return writer.report
@@ -0,0 +1,476 @@
+import ifcopenshell.guid
+import numpy as np
+
+from ifc_library.profiles import ProfileCache
+from ifc_library.units import record_unit_scale
+
+
+class GeometryCache:
+    """
+    Shares one element type and representation map per unique element geometry.
+
+    Precast panels from the same production line repeat the same dimensions hundreds of
+    times. Instead of extruding a new solid for every element, each unique geometry (keyed
+    on its normalized dimensions and void layout) gets one IfcWallType / IfcSlabType holding
+    an IfcRepresentationMap, and every instance only carries an IfcMappedItem pointing to it.
+
+    Also owns the geometric resources (origin, axes, extrusion direction) shared by every
+    shape built directly, and the helpers that build those shapes the way the
+    geometry.add_wall_representation API does. Dimensions are taken in record units (mm,
+    see `ifc_library.units`) and written in the project units.
+    """
+
+    def __init__(self, ifc_manager, precision=1):
+        """
+        Args:
+            ifc_manager (IFCManager): The manager whose model the geometry is added to.
+            precision (int): Number of decimals dimensions are rounded to when building the cache key.
+        """
+        self.ifc_manager = ifc_manager
+        self.model = ifc_manager.model
+        self.precision = precision
+        # Project length unit in record units
+        self.unit_scale = record_unit_scale(self.model)
+        self.types = {}
+        self.type_keys = {}
+        self.type_relations = {}
+        self.mirror_operators = {}
+        self.profiles = ProfileCache(self.model, self.unit_scale)
+        self.opening_shapes = {}
+        self.opening_shape_ids = set()
+        self.directions = {}
+
+        self.origin = self.model.createIfcCartesianPoint((0.0, 0.0, 0.0))
+        self.z_axis = self.model.createIfcDirection((0.0, 0.0, 1.0))
+        self.x_axis = self.model.createIfcDirection((1.0, 0.0, 0.0))
+        self.axis_placement = self.model.createIfcAxis2Placement3D(self.origin, self.z_axis, self.x_axis)
+        # Extrudes along x a profile drawn in the yz plane, i.e. a slab cross-section along its length
+        self.section_placement = self.model.createIfcAxis2Placement3D(
+            self.origin, self.x_axis, self.model.createIfcDirection((0.0, 1.0, 0.0)))
+        self.identity_operator = self.model.createIfcCartesianTransformationOperator3D(None, None, self.origin, None, None)
+
+    def wall_key(self, length, height, thickness, voids=None):
+        """
+        Normalizes wall dimensions and void layout into a hashable cache key.
+
+        Args:
+            length (float): Length of the wall.
+            height (float): Height of the wall.
+            thickness (float): Thickness of the wall.
+            voids (list of dicts or numpy.ndarray): Voids (openings) in the wall, see `void_rows`.
+
+        Returns:
+            tuple: The cache key.
+        """
+        return ("IfcWallType", self.round(length), self.round(height), self.round(thickness),
+                tuple(sorted(tuple(self.round(value) for value in row) for row in void_rows(voids, thickness).tolist())))
+
+    def slab_key(self, length, width, height, void_count=0, void_diameter=0.0):
+        """
+        Normalizes slab dimensions into a hashable cache key.
+
+        Args:
+            length (int): Length of the slab in mm.
+            width (int): Width of the slab in mm.
+            height (int): Height of the slab in mm.
+            void_count (int): Number of voids (cores) in the slab.
+            void_diameter (float): Diameter of the voids in mm.
+
+        Returns:
+            tuple: The cache key.
+        """
+        if void_count <= 0:
+            void_diameter = 0.0
+        return ("IfcSlabType", self.round(length), self.round(width), self.round(height),
+                int(void_count), self.round(void_diameter))
+
+    def round(self, value):
+        return round(float(value), self.precision)
+
+    def get_wall_type(self, length, height, thickness, voids=None):
+        """
+        Returns the IfcWallType shared by every wall with these dimensions, creating it on first use.
+
+        The voids are cut from the mapped solid, so instances need no opening elements of their own.
+
+        Args:
+            length (float): Length of the wall.
+            height (float): Height of the wall.
+            thickness (float): Thickness of the wall.
+            voids (list of dicts or numpy.ndarray): Voids (openings) in the wall, see `void_rows`.
+
+        Returns:
+            IfcWallType: The shared wall type.
+        """
+        key = self.wall_key(length, height, thickness, voids)
+        wall_type = self.types.get(key)
+        if wall_type is None:
+            _, length, height, thickness, void_dimensions = key
+            solid = self.create_wall_solid(length, height, thickness)
+            for x, y, z, width, void_height, depth in void_dimensions:
+                void_solid = self.create_wall_solid(width, void_height, depth, location=(x, y, z))
+                solid = self.model.createIfcBooleanResult("DIFFERENCE", solid, void_solid)
+            name = f"{length:g}x{height:g}x{thickness:g}"
+            if void_dimensions:
+                name += f" ({len(void_dimensions)} voids)"
+            wall_type = self.create_type("IfcWallType", name, solid)
+            self.types[key] = wall_type
+            self.type_keys[wall_type] = key
+        return wall_type
+
+    def get_slab_type(self, length, width, height, void_count=0, void_diameter=0.0):
+        """
+        Returns the IfcSlabType shared by every slab with these dimensions, creating it on first use.
+
+        Args:
+            length (int): Length of the slab in mm.
+            width (int): Width of the slab in mm.
+            height (int): Height of the slab in mm.
+            void_count (int): Number of voids (cores) in the slab. If 0, the slab is considered solid.
+            void_diameter (float): Diameter of the voids in mm. Ignored if void_count is 0.
+
+        Returns:
+            IfcSlabType: The shared slab type.
+        """
+        key = self.slab_key(length, width, height, void_count, void_diameter)
+        slab_type = self.types.get(key)
+        if slab_type is None:
+            _, length, width, height, void_count, void_diameter = key
+            if void_count > 0:
+                solid = self.create_hollow_core_solid(length, width, height, void_count, void_diameter)
+                name = f"{length:g}x{width:g}x{height:g} ({void_count}x{void_diameter:g} cores)"
+            else:
+                solid = self.create_wall_solid(length, height, width)
+                name = f"{length:g}x{width:g}x{height:g}"
+            slab_type = self.create_type("IfcSlabType", name, solid)
+            self.types[key] = slab_type
+            self.type_keys[slab_type] = key
+        return slab_type
+
+    def create_type(self, ifc_class, name, solid):
+        body = self.ifc_manager.body
+        representation_type = "CSG" if solid.is_a("IfcBooleanResult") else "SweptSolid"
+        representation = self.model.createIfcShapeRepresentation(body, body.ContextIdentifier, representation_type, [solid])
+        representation_map = self.model.createIfcRepresentationMap(self.axis_placement, representation)
+        return self.model.create_entity(ifc_class, GlobalId=ifcopenshell.guid.new(), Name=name,
+                                        RepresentationMaps=[representation_map], PredefinedType="NOTDEFINED")
+
+    def map_representation(self, product, element_type, mirrored=False):
+        """
+        Gives a product an IfcMappedItem of its type's representation map.
+
+        IFC transformation operators must keep a positive scale, so a mirrored panel is
+        mapped through the equivalent half turn about the vertical axis through the wall
+        centre, which maps x to length - x for the through-thickness openings.
+
+        Args:
+            product (IfcProduct): The element instance.
+            element_type (IfcTypeProduct): Type returned by get_wall_type or get_slab_type.
+            mirrored (bool): Whether the instance is the mirrored version of the type.
+        """
+        representation_map = element_type.RepresentationMaps[0]
+        operator = self.get_mirror_operator(element_type) if mirrored else self.identity_operator
+        mapped_item = self.model.createIfcMappedItem(representation_map, operator)
+        body = self.ifc_manager.body
+        representation = self.model.createIfcShapeRepresentation(
+            body, body.ContextIdentifier, "MappedRepresentation", [mapped_item])
+        product.Representation = self.model.createIfcProductDefinitionShape(None, None, [representation])
+
+    def get_mirror_operator(self, element_type):
+        operator = self.mirror_operators.get(element_type)
+        if operator is None:
+            _, length, _, thickness, _ = self.type_keys[element_type]
+            length, thickness = length / self.unit_scale, thickness / self.unit_scale
+            operator = self.model.createIfcCartesianTransformationOperator3D(
+                self.model.createIfcDirection((-1.0, 0.0, 0.0)),
+                self.model.createIfcDirection((0.0, -1.0, 0.0)),
+                self.model.createIfcCartesianPoint((length, thickness, 0.0)),
+                None,
+                self.z_axis
+            )
+            self.mirror_operators[element_type] = operator
+        return operator
+
+    def assign_type(self, element_type, products):
+        """
+        Relates instances to their type through a single IfcRelDefinesByType per type.
+
+        Args:
+            element_type (IfcTypeProduct): The shared type.
+            products (list): Instances of the type.
+        """
+        rel = self.type_relations.get(element_type)
+        if rel is None:
+            self.type_relations[element_type] = self.model.createIfcRelDefinesByType(
+                ifcopenshell.guid.new(), None, None, None, products, element_type)
+        else:
+            rel.RelatedObjects = rel.RelatedObjects + tuple(products)
+
+    def unassign_type(self, product):
+        """
+        Takes a product out of its type relationship, removing the relationship once it is empty.
+
+        Args:
+            product (IfcProduct): The typed instance.
+        """
+        for rel in list(getattr(product, "IsTypedBy", ())):
+            related = [obj for obj in rel.RelatedObjects if obj != product]
+            if related:
+                rel.RelatedObjects = related
+                continue
+            if self.type_relations.get(rel.RelatingType) == rel:
+                del self.type_relations[rel.RelatingType]
+            self.model.remove(rel)
+
+    def resource_ids(self):
+        """
+        Returns:
+            set: Ids of the cached entities handed to later elements, which have to be kept
+                 even when no element uses them anymore.
+        """
+        resources = [self.origin, self.z_axis, self.x_axis, self.axis_placement, self.section_placement,
+                     self.identity_operator]
+        resources.extend(self.directions.values())
+        resources.extend(self.mirror_operators.values())
+        resources.extend(self.profiles.profiles.values())
+        return {resource.id() for resource in resources} | self.opening_shape_ids
+
+    def create_placement(self, matrix=None):
+        """
+        Creates the object placement of a product.
+
+        Args:
+            matrix (numpy.ndarray): 4x4 placement matrix in the units of the element dimensions,
+                                    as `IFCElement.set_placement` takes it. The product is
+                                    placed at the origin without one.
+
+        Returns:
+            IfcLocalPlacement: The placement.
+        """
+        if matrix is None:
+            return self.model.createIfcLocalPlacement(None, self.axis_placement)
+        location = self.model.createIfcCartesianPoint((matrix[:3, 3] / self.unit_scale).tolist())
+        return self.model.createIfcLocalPlacement(None, self.model.createIfcAxis2Placement3D(
+            location, self.get_direction(matrix[:3, 2]), self.get_direction(matrix[:3, 0])))
+
+    def get_direction(self, vector):
+        # Directions are shared: elements on a grid only use a handful of them
+        key = tuple(round(float(value), 12) + 0.0 for value in vector)
+        direction = self.directions.get(key)
+        if direction is None:
+            direction = self.directions[key] = self.model.createIfcDirection(key)
+        return direction
+
+    def add_openings(self, element, voids, wall_thickness):
+        """
+        Cuts a batch of openings into an element.
+
+        The opening positions are converted to project units as one NumPy array, identical
+        (Width, Height, Depth) openings share one cached box representation, and each opening
+        is placed relative to the element like `IFCWall.add_void` places it.
+
+        Args:
+            element (IfcElement): The element receiving the openings.
+            voids (list of dicts or numpy.ndarray): Voids with X, Z, Width, Height, and optional
+                                                    Y, Depth, or an array of void rows, see `void_rows`.
+            wall_thickness (float): The thickness of the wall.
+
+        Returns:
+            list: The created IfcOpeningElements, in void order.
+        """
+        values = void_rows(voids, wall_thickness)
+        if not len(values):
+            return []
+        locations = (values[:, :3] / self.unit_scale).tolist()
+        sizes = values[:, 3:].tolist()
+
+        model = self.model
+        openings = []
+        for location, (width, height, depth) in zip(locations, sizes):
+            placement = model.createIfcLocalPlacement(element.ObjectPlacement, model.createIfcAxis2Placement3D(
+                model.createIfcCartesianPoint(location), self.z_axis, self.x_axis))
+            openings.append(model.create_entity(
+                "IfcOpeningElement", GlobalId=ifcopenshell.guid.new(), ObjectPlacement=placement,
+                Representation=self.get_opening_shape(width, height, depth)))
+        for opening in openings:
+            model.createIfcRelVoidsElement(ifcopenshell.guid.new(), None, None, None, element, opening)
+        return openings
+
+    def get_opening_shape(self, width, height, depth):
+        """
+        Returns the box representation shared by every opening of these dimensions.
+
+        Args:
+            width (float): Width of the opening.
+            height (float): Height of the opening.
+            depth (float): Depth of the opening.
+
+        Returns:
+            IfcProductDefinitionShape: The shared shape.
+        """
+        key = (self.round(width), self.round(height), self.round(depth))
+        shape = self.opening_shapes.get(key)
+        if shape is None:
+            shape = self.create_product_shape(self.create_wall_solid(*key))
+            self.opening_shapes[key] = shape
+            self.opening_shape_ids.add(shape.id())
+        return shape
+
+    def is_shared_opening_shape(self, shape):
+        return shape is not None and shape.id() in self.opening_shape_ids
+
+    def create_wall_solid(self, length, height, thickness, location=None):
+        # Same rectangle as geometry.add_wall_representation, values given in record units
+        length = length / self.unit_scale
+        thickness = thickness / self.unit_scale
+        points = ((0.0, 0.0), (0.0, thickness), (length, thickness), (length, 0.0), (0.0, 0.0))
+        position = self.axis_placement
+        if location:
+            point = self.model.createIfcCartesianPoint(tuple(co / self.unit_scale for co in location))
+            position = self.model.createIfcAxis2Placement3D(point, self.z_axis, self.x_axis)
+        return self.create_extruded_solid(points, height / self.unit_scale, position)
+
+    def create_hollow_core_solid(self, length, width, height, void_count, void_diameter):
+        """
+        Extrudes the cached hollow-core cross-section along the slab length.
+
+        The slab spans the same box as a solid slab: length along x, width along y and height along z.
+
+        Args:
+            length (int): Length of the slab in mm.
+            width (int): Width of the slab in mm.
+            height (int): Height of the slab in mm.
+            void_count (int): Number of voids (cores) in the slab.
+            void_diameter (float): Diameter of the voids in mm.
+
+        Returns:
+            IfcExtrudedAreaSolid: The slab solid.
+        """
+        profile = self.profiles.get_hollow_core_profile(width, height, void_count, void_diameter)
+        return self.model.createIfcExtrudedAreaSolid(profile, self.section_placement, self.z_axis, length / self.unit_scale)
+
+    def create_extruded_solid(self, points, depth, position=None):
+        curve = self.model.createIfcIndexedPolyCurve(self.model.createIfcCartesianPointList2D(points), None, False)
+        profile = self.model.createIfcArbitraryClosedProfileDef("AREA", None, curve)
+        return self.model.createIfcExtrudedAreaSolid(profile, position or self.axis_placement, self.z_axis, depth)
+
+    def create_shape_representation(self, item):
+        body = self.ifc_manager.body
+        return self.model.createIfcShapeRepresentation(body, body.ContextIdentifier, "SweptSolid", [item])
+
+    def create_product_shape(self, item):
+        return self.model.createIfcProductDefinitionShape(None, None, [self.create_shape_representation(item)])
+
+
+def box_values(solid, location=(0.0, 0.0, 0.0)):
+    """
+    Reads back the position and size of an axis-aligned box extruded upwards, as built by
+    `GeometryCache.create_wall_solid` or `geometry.add_wall_representation`.
+
+    Args:
+        solid (IfcRepresentationItem): The solid.
+        location (tuple): Position of the solid's coordinate system, e.g. of its opening's placement.
+
+    Returns:
+        tuple: X, Y, Z, length along x, height and extent along y, in the solid's units. None
+               for any other solid.
+    """
+    if not solid.is_a("IfcExtrudedAreaSolid") or not solid.SweptArea.is_a("IfcArbitraryClosedProfileDef"):
+        return None
+    position = solid.Position
+    if position is not None and (not is_default_direction(position.Axis, (0.0, 0.0, 1.0)) or
+                                 not is_default_direction(position.RefDirection, (1.0, 0.0, 0.0))):
+        return None
+    if not is_default_direction(solid.ExtrudedDirection, (0.0, 0.0, 1.0)):
+        return None
+    curve = solid.SweptArea.OuterCurve
+    if curve.is_a("IfcIndexedPolyCurve"):
+        points = np.array(curve.Points.CoordList, dtype=np.float64)
+    elif curve.is_a("IfcPolyline"):
+        points = np.array([point.Coordinates for point in curve.Points], dtype=np.float64)
+    else:
+        return None
+    if len(np.unique(points.round(6), axis=0)) != 4:
+        return None
+    origin = np.array(location, dtype=np.float64)
+    if position is not None:
+        origin = origin + position.Location.Coordinates
+    start, end = points.min(axis=0), points.max(axis=0)
+    x, y = origin[:2] + start
+    return float(x), float(y), float(origin[2]), float(end[0] - start[0]), float(solid.Depth), float(end[1] - start[1])
+
+
+def wall_voids(wall, unit_scale):
+    """
+    Reads back the void layout of a wall, from its openings or from the solid of its shared type.
+
+    Args:
+        wall (IfcWall): The wall.
+        unit_scale (float): Project length unit in record units, see `units.record_unit_scale`.
+
+    Returns:
+        list: Void dicts with X, Y, Z, Width, Height and Depth in record units, or None if a
+              void is not a box as the builders make them.
+    """
+    rows = []
+    for rel in getattr(wall, "HasOpenings", ()):
+        opening = rel.RelatedOpeningElement
+        placement = opening.ObjectPlacement
+        if (opening.Representation is None or placement is None or not placement.is_a("IfcLocalPlacement")
+                or placement.PlacementRelTo != wall.ObjectPlacement):
+            return None
+        items = [item for representation in opening.Representation.Representations
+                 for item in representation.Items]
+        values = box_values(items[0], placement.RelativePlacement.Location.Coordinates) if len(items) == 1 else None
+        if values is None:
+            return None
+        rows.append(values)
+    for rel in getattr(wall, "IsTypedBy", ()):
+        for representation_map in rel.RelatingType.RepresentationMaps or ():
+            for item in representation_map.MappedRepresentation.Items:
+                # Voids cut from a shared solid, see GeometryCache.get_wall_type
+                while item.is_a("IfcBooleanResult"):
+                    values = box_values(item.SecondOperand)
+                    if item.Operator != "DIFFERENCE" or values is None:
+                        return None
+                    rows.append(values)
+                    item = item.FirstOperand
+    rows = np.array(rows, dtype=np.float64).reshape(-1, 6) * unit_scale
+    return [dict(zip(("X", "Y", "Z", "Width", "Height", "Depth"), row)) for row in rows.tolist()]
+
+
+def is_default_direction(direction, default):
+    return direction is None or np.allclose(direction.DirectionRatios, default)
+
+
+def void_rows(voids, wall_thickness):
+    """
+    Normalizes a void layout into an array with one X, Y, Z, Width, Height, Depth row per void.
+
+    Args:
+        voids (list of dicts or numpy.ndarray): Void dicts, with the defaults of `void_values`,
+                                                or rows that are already complete.
+        wall_thickness (float): The thickness of the wall.
+
+    Returns:
+        numpy.ndarray: Array of shape (number of voids, 6).
+    """
+    if isinstance(voids, np.ndarray):
+        return voids.reshape(-1, 6)
+    return np.array([void_values(void_data, wall_thickness) for void_data in voids or ()], dtype=float).reshape(-1, 6)
+
+
+def void_values(void_data, wall_thickness):
+    """
+    Reads the position and size of a void, with the same defaults as `IFCWall.add_void`.
+
+    Args:
+        void_data (dict): A dictionary containing X, Z, Width, Height, and optional Y, Depth of the void.
+        wall_thickness (float): The thickness of the wall.
+
+    Returns:
+        tuple: X, Y, Z, Width, Height and Depth.
+    """
+    return (void_data.get("X", 0.0), void_data.get("Y", 0.0), void_data.get("Z", 0.0),
+            void_data.get("Width", 1000.0), void_data.get("Height", 2100.0),
+            void_data.get("Depth", wall_thickness + 100.0))
@@ -0,0 +1,170 @@
+import ifcopenshell.guid
+
+from ifc_library.inventory import SlabRecord, WallRecord
+
+DEFAULT_STOREY_NAME = "Ground Floor"
+
+
+class SpatialHierarchy:
+    """
+    Site / building / storey tree of a model, built on demand from the elements' Building_ID
+    and Floor_Num.
+
+    Each building and storey is created the first time an element refers to it, aggregated
+    under its parent, and cached by its key afterwards. Elements without a Building_ID go to
+    the manager's default building, elements without a Floor_Num to the ground floor of their
+    building.
+
+    Containment is collected per storey and written by `flush` as one
+    IfcRelContainedInSpatialStructure per storey. Extending the relationship per element or
+    per batch copies its whole RelatedElements list every time, so the cost grows with the
+    number of elements already on the storey; a flush copies it once.
+    """
+
+    def __init__(self, ifc_manager):
+        self.ifc_manager = ifc_manager
+        self.model = ifc_manager.model
+        # Building_ID -> IfcBuilding, (Building_ID, Floor_Num) -> IfcBuildingStorey
+        self.buildings = {None: ifc_manager.building}
+        self.storeys = {(None, None): ifc_manager.storey}
+        # Storey id -> (storey, products not contained yet)
+        self.pending = {}
+
+    @classmethod
+    def build(cls, ifc_manager):
+        """
+        Binds the buildings and storeys already in a model.
+
+        Buildings are keyed by their Name, storeys by their building and the floor number
+        of their Name (see `storey_name`).
+
+        Args:
+            ifc_manager (IFCManager): The manager whose model is bound.
+
+        Returns:
+            SpatialHierarchy: The hierarchy.
+        """
+        hierarchy = cls(ifc_manager)
+        for building in ifc_manager.model.by_type("IfcBuilding"):
+            if building != ifc_manager.building:
+                hierarchy.buildings.setdefault(building.Name, building)
+        building_ids = {building.id(): building_id for building_id, building in hierarchy.buildings.items()}
+        for storey in ifc_manager.model.by_type("IfcBuildingStorey"):
+            if storey == ifc_manager.storey:
+                continue
+            parent = next((rel.RelatingObject for rel in storey.Decomposes), None)
+            building_id = building_ids.get(parent.id()) if parent is not None else None
+            hierarchy.storeys.setdefault((building_id, floor_number(storey.Name)), storey)
+        return hierarchy
+
+    def building(self, building_id):
+        """
+        Returns:
+            IfcBuilding: The building with the given Building_ID, created on first use.
+        """
+        building_id = category_key(building_id)
+        building = self.buildings.get(building_id)
+        if building is None:
+            building = self.create("IfcBuilding", building_id, self.ifc_manager.site)
+            self.buildings[building_id] = building
+        return building
+
+    def storey(self, building_id=None, floor_num=None):
+        """
+        Args:
+            building_id: Building_ID of the element, None for the default building.
+            floor_num: Floor_Num of the element, None for the ground floor.
+
+        Returns:
+            IfcBuildingStorey: The storey, created with its building on first use.
+        """
+        building_id = category_key(building_id)
+        floor_num = floor_key(floor_num)
+        key = (building_id, floor_num)
+        storey = self.storeys.get(key)
+        if storey is None:
+            if floor_num in (None, 0):
+                storey = self.storeys.get((building_id, None if floor_num == 0 else 0))
+            if storey is None:
+                storey = self.create("IfcBuildingStorey", storey_name(floor_num), self.building(building_id))
+            self.storeys[key] = storey
+        return storey
+
+    def container(self, record):
+        """
+        Returns:
+            IfcBuildingStorey: The storey of a wall or slab record, from its Building_ID and Floor_Num.
+        """
+        if isinstance(record, WallRecord):
+            return self.storey(record.building_id, record.floor_num)
+        if isinstance(record, SlabRecord):
+            return self.storey()
+        element_data = record.get("element_data", {})
+        return self.storey(element_data.get("Building_ID"), element_data.get("Floor_Num"))
+
+    def create(self, ifc_class, name, parent):
+        element = self.model.create_entity(ifc_class, GlobalId=ifcopenshell.guid.new(), Name=name)
+        if parent is not None:
+            for rel in parent.IsDecomposedBy:
+                rel.RelatedObjects = rel.RelatedObjects + (element,)
+                break
+            else:
+                self.model.createIfcRelAggregates(ifcopenshell.guid.new(), None, None, None, parent, [element])
+        return element
+
+    def contain(self, container, products):
+        """
+        Queues products to be contained in a storey, see `flush`.
+
+        Args:
+            container (IfcSpatialStructureElement): The storey.
+            products (list): Products not contained anywhere yet.
+        """
+        pending = self.pending.get(container.id())
+        if pending is None:
+            pending = self.pending[container.id()] = (container, [])
+        pending[1].extend(products)
+
+    def flush(self):
+        """
+        Writes the queued containment, one relationship update per storey.
+        """
+        for container, products in self.pending.values():
+            for rel in container.ContainsElements:
+                rel.RelatedElements = rel.RelatedElements + tuple(products)
+                break
+            else:
+                self.model.createIfcRelContainedInSpatialStructure(
+                    ifcopenshell.guid.new(), None, None, None, products, container)
+        self.pending = {}
+
+
+def storey_name(floor_num):
+    if floor_num in (None, 0):
+        return DEFAULT_STOREY_NAME
+    return f"Floor {floor_num}"
+
+
+def floor_number(name):
+    # Inverse of storey_name, other names are kept as the key
+    if name == DEFAULT_STOREY_NAME:
+        return 0
+    if name and name.startswith("Floor "):
+        return floor_key(name[len("Floor "):])
+    return name
+
+
+def category_key(value):
+    # Keyed as text like the building Name, so 7 and "7" are the same building in a reopened model
+    return None if value is None or value == "" else str(value)
+
+
+def floor_key(value):
+    # 2, 2.0 and "2" are the same floor
+    if value is None or value == "" or value != value:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else number
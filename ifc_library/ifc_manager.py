@@ -1,17 +1,69 @@
 import ifcopenshell
+import ifcopenshell.guid
 from ifcopenshell.api import run
 
+from ifc_library.units import si_matrix
+
 class IFCManager:
-    def __init__(self, file_path):
+    # STEP text of the model set up by setup_ifc_model, built by the first manager of the
+    # process and cloned by every later one instead of re-running the setup API calls
+    skeleton = None
+
+    def __init__(self, file_path, intern_property_values=False, model=None, grid=None):
         self.file_path = file_path
-        self.model = ifcopenshell.file()
+        self.intern_property_values = intern_property_values
+        self.model = model
         self.project = None
         self.context = None
         self.body = None
         self.site = None
         self.building = None
         self.storey = None
-        self.setup_ifc_model()
+        self.bulk_builder = None
+        self.geometry_cache = None
+        self.pset_writer = None
+        self.updater = None
+        self.index = None
+        self.grid = grid
+        self.spatial_index = None
+        self.hierarchy = None
+        self.quantity_writer = None
+        if self.model is None:
+            self.create_model()
+        else:
+            self.bind_model()
+
+    @classmethod
+    def open(cls, file_path, intern_property_values=False):
+        """
+        Loads an existing model instead of building a new one, so it can be updated in place.
+
+        Args:
+            file_path (str): Path of the IFC file to open. `save` writes back to it.
+            intern_property_values (bool): Share low-cardinality values of newly written properties.
+
+        Returns:
+            IFCManager: A manager bound to the model's project, contexts and spatial elements.
+        """
+        return cls(file_path, intern_property_values=intern_property_values, model=ifcopenshell.open(file_path))
+
+    def create_model(self):
+        """
+        Starts a new model from the cached skeleton, setting the skeleton up on first use.
+
+        A clone gets new GlobalIds for its project and spatial elements, so models created from
+        the same skeleton stay distinguishable.
+        """
+        if IFCManager.skeleton is None:
+            self.model = ifcopenshell.file()
+            self.setup_ifc_model()
+            IFCManager.skeleton = self.model.to_string()
+            return
+
+        self.model = ifcopenshell.file.from_string(IFCManager.skeleton)
+        self.bind_model()
+        for element in (self.project, self.site, self.building, self.storey, *self.model.by_type("IfcRelAggregates")):
+            element.GlobalId = ifcopenshell.guid.new()
 
     def setup_ifc_model(self):
         # Create the IFC project
@@ -25,29 +77,356 @@ class IFCManager:
         self.body = run("context.add_context", self.model, context_type="Model",
                         context_identifier="Body", target_view="MODEL_VIEW", parent=self.context)
 
-        # Create a site, building, and storey
+        # Create a site, and the default building and storey. Further buildings and storeys
+        # are created from the elements' Building_ID and Floor_Num, see get_hierarchy
         self.site = run("root.create_entity", self.model, ifc_class="IfcSite", name="My Site")
         self.building = run("root.create_entity", self.model, ifc_class="IfcBuilding", name="Building A")
         self.storey = run("root.create_entity", self.model, ifc_class="IfcBuildingStorey", name="Ground Floor")
 
         # Assign hierarchy
-        # run("aggregate.assign_object", self.model, relating_object=self.project, products=[self.site])
-        # run("aggregate.assign_object", self.model, relating_object=self.site, products=[self.building])
-        # run("aggregate.assign_object", self.model, relating_object=self.building, products=[self.storey])
+        run("aggregate.assign_object", self.model, relating_object=self.project, products=[self.site])
+        run("aggregate.assign_object", self.model, relating_object=self.site, products=[self.building])
+        run("aggregate.assign_object", self.model, relating_object=self.building, products=[self.storey])
+
+    def bind_model(self):
+        """
+        Binds the project, contexts and spatial elements of an existing model to the manager,
+        i.e. the entities `setup_ifc_model` would otherwise create.
+        """
+        self.project = self.model.by_type("IfcProject")[0]
+        for context in self.model.by_type("IfcGeometricRepresentationContext"):
+            if context.ContextType != "Model":
+                continue
+            if context.is_a("IfcGeometricRepresentationSubContext"):
+                if context.ContextIdentifier == "Body" and self.body is None:
+                    self.body = context
+            elif self.context is None:
+                self.context = context
+        self.site = next(iter(self.model.by_type("IfcSite")), None)
+        self.building = next(iter(self.model.by_type("IfcBuilding")), None)
+        self.storey = next(iter(self.model.by_type("IfcBuildingStorey")), None)
+
+    def add_walls_bulk(self, records, batch_size=1000, container=None, share_geometry=True, place_on_grid=False,
+                       quantities=False, deterministic_ids=False):
+        """
+        Builds many walls in one pass, bypassing the per-element API calls.
+
+        Args:
+            records (iterable of dict or WallInventory): Records holding `element_data` and `geometry_data`,
+                                                         e.g. from `ifc_library.records.read_records`,
+                                                         or a columnar `ifc_library.inventory.WallInventory`.
+            batch_size (int): Number of walls whose types and property sets are written at a time.
+            container (IfcSpatialStructureElement): Spatial container, defaults to the storey of each
+                                                    wall's Building_ID and Floor_Num, see `get_hierarchy`.
+            share_geometry (bool): Map one shared representation per unique geometry through an IfcWallType.
+            place_on_grid (bool): Place each wall on the grid from its `Grid_Pos` and `Orientation`, see `get_grid`.
+            quantities (bool): Attach Qto_WallBaseQuantities computed from the records, see `get_quantity_writer`.
+            deterministic_ids (bool): Derive each wall's GlobalId from its Element_ID, see `bulk.element_guid`.
+
+        Returns:
+            BulkReport: Number of walls built and the throughput achieved.
+        """
+        builder = self.get_bulk_builder(batch_size, share_geometry, place_on_grid, quantities, deterministic_ids)
+        return builder.add_walls(records, container)
+
+    def add_slabs_bulk(self, records, batch_size=1000, container=None, share_geometry=True, quantities=False,
+                       deterministic_ids=False):
+        """
+        Builds many slabs in one pass, bypassing the per-element API calls.
+
+        Args:
+            records (iterable of dict or SlabInventory): Records holding the slab `element_data`,
+                                                         or a columnar `ifc_library.inventory.SlabInventory`.
+            batch_size (int): Number of slabs whose types and property sets are written at a time.
+            container (IfcSpatialStructureElement): Spatial container, defaults to the storey of each
+                                                    slab's Building_ID and Floor_Num if it has them.
+            share_geometry (bool): Map one shared representation per unique geometry through an IfcSlabType.
+            quantities (bool): Attach Qto_SlabBaseQuantities computed from the records, see `get_quantity_writer`.
+            deterministic_ids (bool): Derive each slab's GlobalId from its Product ID, see `bulk.element_guid`.
+
+        Returns:
+            BulkReport: Number of slabs built and the throughput achieved.
+        """
+        builder = self.get_bulk_builder(batch_size, share_geometry, quantities=quantities,
+                                        deterministic_ids=deterministic_ids)
+        return builder.add_slabs(records, container)
+
+    def upsert_walls(self, records, rebuild_geometry=False, container=None):
+        """
+        Adds walls whose Element_ID is not in the model yet and updates the others in place.
+
+        Args:
+            records (iterable of dict): Records holding `element_data` and `geometry_data`.
+            rebuild_geometry (bool): Rebuild the representation of existing walls even if their
+                                     dimensions are unchanged, e.g. after a change of `Voids`.
+            container (IfcSpatialStructureElement): Container of new walls, defaults to the storey.
+
+        Returns:
+            UpsertReport: Number of walls added, updated and unchanged.
+        """
+        return self.get_updater().upsert_walls(records, rebuild_geometry, container)
+
+    def upsert_slabs(self, records, rebuild_geometry=False, container=None):
+        """
+        Adds slabs whose Product ID is not in the model yet and updates the others in place.
+
+        Args:
+            records (iterable of dict): Records holding the slab `element_data`.
+            rebuild_geometry (bool): Rebuild the representation of existing slabs even if their
+                                     dimensions are unchanged.
+            container (IfcSpatialStructureElement): Container of new slabs, defaults to the storey.
+
+        Returns:
+            UpsertReport: Number of slabs added, updated and unchanged.
+        """
+        return self.get_updater().upsert_slabs(records, rebuild_geometry, container)
+
+    def apply_changes(self, changes):
+        """
+        Applies the elements added, removed and modified between two inventory snapshots.
+
+        Args:
+            changes (ChangeSet): The changes, see `ifc_library.diff.diff_snapshots`.
+
+        Returns:
+            ApplyReport: Number of elements added, removed, modified and not found.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.diff import apply_changes
+
+        return apply_changes(self, changes)
+
+    def get_updater(self):
+        # Imported here as the updater depends on the element classes, which import this module
+        from ifc_library.updater import ElementUpdater
+
+        if self.updater is None:
+            self.updater = ElementUpdater(self)
+        return self.updater
+
+    def get_index(self):
+        """
+        Returns the business key index of the model, building it on first use.
+
+        Returns:
+            ElementIndex: Index over the ReC_Pset_* keys, kept current as property sets are written.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.index import ElementIndex
+
+        if self.index is None:
+            self.index = ElementIndex.build(self)
+        return self.index
+
+    def get_spatial_index(self):
+        """
+        Returns the per-storey footprint index of the model, building it on first use.
+
+        Returns:
+            SpatialIndex: STR tree index of the wall and slab footprints, kept current as
+                          elements are assigned to containers.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.spatial import SpatialIndex
+
+        if self.spatial_index is None:
+            self.flush_containment()
+            self.spatial_index = SpatialIndex.build(self)
+        return self.spatial_index
+
+    def get_hierarchy(self):
+        """
+        Returns the building and storey tree of the model, binding the existing one on first use.
+
+        Returns:
+            SpatialHierarchy: Buildings and storeys by Building_ID and Floor_Num, created on
+                              demand, and the containment not written to the model yet.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.hierarchy import SpatialHierarchy
+
+        if self.hierarchy is None:
+            self.hierarchy = SpatialHierarchy.build(self)
+        return self.hierarchy
+
+    def get_storey(self, building_id=None, floor_num=None):
+        """
+        Returns the storey of a Building_ID and Floor_Num, creating it and its building on first use.
+        """
+        return self.get_hierarchy().storey(building_id, floor_num)
+
+    def flush_containment(self):
+        # Writes the containment queued by assign_to_container and the builders. Called by save,
+        # export and the updaters; call it before writing self.model by other means
+        if self.hierarchy is not None:
+            self.hierarchy.flush()
+
+    def get_grid(self):
+        """
+        Returns the structural grid `Grid_Pos` values are placed on, a default 7.2 m grid unless one was given.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.spatial import Grid
+
+        if self.grid is None:
+            self.grid = Grid()
+        return self.grid
+
+    def get_bulk_builder(self, batch_size=None, share_geometry=None, place_on_grid=None, quantities=None,
+                         deterministic_ids=None):
+        """
+        Returns the bulk builder of the model, creating it on first use.
+
+        Settings left as None keep their current value, i.e. the `BulkBuilder` default for a new
+        builder, so callers that only build (the updater, `apply_changes`) keep the settings of
+        the last bulk build.
+
+        Returns:
+            BulkBuilder: The builder, with the given settings applied.
+        """
+        # Imported here as the builder depends on the element classes, which import this module
+        from ifc_library.bulk import BulkBuilder
+
+        if self.bulk_builder is None:
+            self.bulk_builder = BulkBuilder(self)
+        settings = {"batch_size": batch_size, "share_geometry": share_geometry, "place_on_grid": place_on_grid,
+                    "quantities": quantities, "deterministic_ids": deterministic_ids}
+        for name, value in settings.items():
+            if value is not None:
+                setattr(self.bulk_builder, name, value)
+        return self.bulk_builder
+
+    def get_quantity_writer(self, densities=None):
+        """
+        Returns the writer of the analytic base quantities of walls and slabs.
+
+        Args:
+            densities (dict): Strength class -> density in kg/m³, replacing the ones in use.
+                              Defaults to reinforced normal-weight concrete, see `quantities.density`.
+
+        Returns:
+            QuantityWriter: Writer sharing one IfcElementQuantity per unique set of values.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.quantities import QuantityWriter
+
+        if self.quantity_writer is None:
+            self.quantity_writer = QuantityWriter(self)
+        if densities is not None:
+            self.quantity_writer.densities = densities
+        return self.quantity_writer
+
+    def get_geometry_cache(self):
+        # Imported here as the cache depends on the element classes, which import this module
+        from ifc_library.geometry_cache import GeometryCache
+
+        if self.geometry_cache is None:
+            self.geometry_cache = GeometryCache(self)
+        return self.geometry_cache
+
+    def get_pset_writer(self):
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.pset_templates import PsetWriter
+
+        if self.pset_writer is None:
+            self.pset_writer = PsetWriter(self, intern_values=self.intern_property_values)
+        return self.pset_writer
 
     def save(self):
-        # Write out to a file
+        # Write out to a file. Containment is queued until flush_containment, which writing
+        # self.model directly skips, see IFCElement.assign_to_container
+        self.flush_containment()
         self.model.write(self.file_path)
         print(f"IFC file saved to: {self.file_path}")
 
+    def export(self, file_path=None, compression=None):
+        """
+        Streams the model to a plain, gzip or ifcZIP file without materializing its STEP text.
+
+        Args:
+            file_path (str): Output path, defaults to the manager's file path. A `.ifc.gz` or
+                             `.ifcZIP` extension selects the compression.
+            compression (str): "gzip", "zip" or None to infer it from the extension.
+
+        Returns:
+            ExportReport: Entities and bytes written, size on disk and elapsed time.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.export import write_model
+
+        self.flush_containment()
+        return write_model(self.model, file_path or self.file_path, compression)
+
+    def export_sidecar(self, file_path):
+        """
+        Writes the ReC_Pset_* values and GlobalIds of the walls and slabs to a columnar `.npz`
+        file, which analytics can read column by column without parsing the STEP file.
+
+        Args:
+            file_path (str): Output path, normally ending in `.npz`.
+
+        Returns:
+            SidecarReport: Elements and columns written, file size and elapsed time.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.sidecar import write_sidecar
+
+        return write_sidecar(self.model, file_path)
+
+    def import_sidecar(self, file_path, shared=False, place_on_grid=False):
+        """
+        Rebuilds the walls and slabs of a sidecar written by `export_sidecar` in this model.
+
+        Returns:
+            list: The created IFCWall and IFCSlab objects.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.sidecar import import_sidecar
+
+        return import_sidecar(self, file_path, shared, place_on_grid)
+
+    def generate_drawings(self, output_dir, wall_records=(), slab_records=(), processes=None, scale=20):
+        """
+        Draws dimensioned SVG elevations and sections of wall and slab records, and writes the
+        file names to the Drawing / Drawings property of the matching elements of this model.
+
+        Args:
+            output_dir (str): Directory the drawings are written to.
+            wall_records (iterable of dict): Wall records, as accepted by `add_walls_bulk`.
+            slab_records (iterable of dict): Slab records, as accepted by `add_slabs_bulk`.
+            processes (int): Number of worker processes, defaults to the number of CPUs.
+            scale (float): Drawing scale, e.g. 20 for 1:20.
+
+        Returns:
+            DrawingReport: Number of drawings made and skipped, elements updated, and the file name
+                           of each record. The records are not changed.
+        """
+        # Imported here to keep the manager importable without the optional builders
+        from ifc_library.drawings import generate_drawings
+
+        return generate_drawings(output_dir, wall_records, slab_records, processes=processes, scale=scale,
+                                 ifc_manager=self)
+
 class IFCElement:
     def __init__(self, ifc_manager, ifc_class, name):
         self.ifc_manager = ifc_manager
         self.element = run("root.create_entity", self.ifc_manager.model, ifc_class=ifc_class, name=name)
+        # Placement matrix and footprint points in the element's own coordinates, for the spatial index
+        self.matrix = None
+        self.footprint = None
 
-    def set_placement(self):
-        # Set placement using the provided method
-        run("geometry.edit_object_placement", self.ifc_manager.model, product=self.element)
+    def set_placement(self, matrix=None):
+        """
+        Places the element, at the origin unless a matrix is given.
+
+        Args:
+            matrix (numpy.ndarray): 4x4 placement matrix, in the units of the element dimensions.
+        """
+        self.matrix = matrix
+        if matrix is None:
+            run("geometry.edit_object_placement", self.ifc_manager.model, product=self.element)
+        else:
+            run("geometry.edit_object_placement", self.ifc_manager.model, product=self.element, matrix=si_matrix(matrix))
 
     # NOTE: this method is overrided by the subclass i.e. ifc_Wall
     # def add_representation(self, length, height, thickness):
@@ -57,18 +436,43 @@ class IFCElement:
     #     run("geometry.assign_representation", self.ifc_manager.model, product=self.element, representation=representation)
 
     def assign_to_container(self, container):
-        # Assign element to a container
-        run("spatial.assign_container", self.ifc_manager.model, relating_structure=container, product=self.element)
+        """
+        Assigns the element to a container, moving it if it is contained already.
+
+        New elements are queued and contained with the other elements of the storey by
+        `IFCManager.flush_containment`, which `save` and `export` call. Call it before writing
+        `ifc_manager.model` directly, e.g. with `model.write`, or the queued elements are
+        written without their containment.
+
+        Args:
+            container (IfcSpatialStructureElement): The storey or other spatial element.
+        """
+        if self.element.ContainedInStructure:
+            run("spatial.assign_container", self.ifc_manager.model, relating_structure=container,
+                products=[self.element])
+        else:
+            self.ifc_manager.get_hierarchy().contain(container, [self.element])
+        spatial_index = self.ifc_manager.spatial_index
+        if spatial_index is not None and self.footprint is not None:
+            spatial_index.add_footprint(container, self.element, self.footprint, self.matrix)
 
     def add_property_set(self, property_sets):
         """
         Adds one or more property sets to the element.
 
+        ReC_Pset_* sets are written from their precompiled templates, any other
+        set goes through the pset API.
+
         Args:
             property_sets (dict): A dictionary where keys are property set names,
                                   and values are dictionaries of property names and values.
         """
+        pset_writer = self.ifc_manager.get_pset_writer()
         for pset_name, properties in property_sets.items():
+            if pset_writer.has_template(pset_name):
+                pset_writer.write(self.element, pset_name, properties)
+                continue
+
             # Create the property set
             pset = run("pset.add_pset", self.ifc_manager.model, product=self.element, name=pset_name)
             
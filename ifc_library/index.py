@@ -0,0 +1,229 @@
+import json
+
+from ifc_library.pset_templates import PSET_TEMPLATES
+
+# Business keys identifying an element, indexed for every templated property set
+KEY_PROPERTIES = ("Element_ID", "Product_ID", "Wall_ID")
+
+# Low-cardinality properties with a secondary index: the shared properties of the templates
+INDEXED_PROPERTIES = frozenset(KEY_PROPERTIES).union(*(template.shared_properties for template in PSET_TEMPLATES.values()))
+
+SIDECAR_VERSION = 1
+
+
+class ElementIndex:
+    """
+    Index of the walls and slabs of a model on their ReC_Pset_* business keys.
+
+    Every element is recorded under its GlobalId with its IFC class, business keys
+    (Element_ID, Product_ID, Wall_ID) and low-cardinality property values. Each of those
+    fields has a value -> GlobalIds index, so filter queries intersect a few sets instead of
+    walking `by_type` and reading every property set. Attached to an IFCManager, the index
+    follows every ReC_Pset_* set written or updated through the pset writer, and it can be
+    saved as a JSON sidecar next to the IFC file and queried without opening the model.
+    """
+
+    def __init__(self, ifc_manager=None):
+        """
+        Args:
+            ifc_manager (IFCManager): The manager whose model is indexed. Optional when the index
+                                      is loaded from a sidecar file for querying only.
+        """
+        self.ifc_manager = ifc_manager
+        self.records = {}
+        self.values = {}
+
+    @classmethod
+    def build(cls, ifc_manager):
+        """
+        Indexes an existing model in one pass over its property relationships, and keeps the
+        index current from then on.
+
+        Args:
+            ifc_manager (IFCManager): The manager whose model is indexed.
+
+        Returns:
+            ElementIndex: The index.
+        """
+        index = cls(ifc_manager)
+        for rel in ifc_manager.model.by_type("IfcRelDefinesByProperties"):
+            pset = rel.RelatingPropertyDefinition
+            if pset.Name not in PSET_TEMPLATES:
+                continue
+            properties = {}
+            for prop in pset.HasProperties:
+                # Positional access (Name, NominalValue) avoids the attribute name lookups
+                name = prop[0]
+                if name in INDEXED_PROPERTIES and prop.is_a("IfcPropertySingleValue") and prop[2] is not None:
+                    properties[name] = prop[2].wrappedValue
+            for element in rel.RelatedObjects:
+                index.add(element, pset.Name, properties)
+        ifc_manager.get_pset_writer().listeners.append(index.add)
+        return index
+
+    def add(self, element, pset_name, properties):
+        """
+        Records the indexed properties of an element's property set. None values are unindexed.
+
+        Args:
+            element (IfcObject): The element.
+            pset_name (str): Name of the property set.
+            properties (dict): Property names and values, all of them or only the changed ones.
+        """
+        if pset_name not in PSET_TEMPLATES:
+            return
+        global_id = element.GlobalId
+        record = self.records.get(global_id)
+        if record is None:
+            record = self.records[global_id] = {}
+            self.set_value(global_id, record, "ifc_class", element.is_a())
+        for name, value in properties.items():
+            if name in INDEXED_PROPERTIES:
+                self.set_value(global_id, record, name, value)
+
+    def set_value(self, global_id, record, name, value):
+        old_value = record.get(name)
+        if old_value is not None:
+            if old_value == value:
+                return
+            global_ids = self.values[name][old_value]
+            global_ids.discard(global_id)
+            if not global_ids:
+                del self.values[name][old_value]
+        if value is None:
+            record.pop(name, None)
+            return
+        record[name] = value
+        self.values.setdefault(name, {}).setdefault(value, set()).add(global_id)
+
+    def remove(self, global_id):
+        """
+        Drops an element from the index.
+
+        Args:
+            global_id (str): GlobalId of the element.
+        """
+        record = self.records.pop(global_id, None)
+        for name, value in (record or {}).items():
+            global_ids = self.values[name][value]
+            global_ids.discard(global_id)
+            if not global_ids:
+                del self.values[name][value]
+
+    def get(self, global_id):
+        """
+        Returns the indexed fields of an element.
+
+        Args:
+            global_id (str): GlobalId of the element.
+
+        Returns:
+            dict: Field names and values, or None if the element is not indexed.
+        """
+        return self.records.get(global_id)
+
+    def query(self, **criteria):
+        """
+        Finds the elements matching every criterion.
+
+        Each criterion is a field name (an indexed property or `ifc_class`) with either a
+        value, a list/tuple/set of accepted values, or a predicate called with the value.
+        Value criteria are answered from the secondary indexes, smallest candidate set first.
+
+        Example:
+            index.query(ifc_class="IfcWall", Status="Available", Strength_Class="C30/37")
+
+        Returns:
+            list: GlobalIds of the matching elements.
+        """
+        candidate_sets = []
+        predicates = []
+        for name, accepted in criteria.items():
+            if name != "ifc_class" and name not in INDEXED_PROPERTIES:
+                raise ValueError(f"{name} is not an indexed field")
+            values = self.values.get(name, {})
+            if callable(accepted):
+                predicates.append((name, accepted))
+            elif isinstance(accepted, (list, tuple, set, frozenset)):
+                candidate_sets.append(set().union(*(values.get(value, ()) for value in accepted)))
+            else:
+                candidate_sets.append(values.get(accepted, set()))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            result = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+        else:
+            result = set(self.records)
+        for name, predicate in predicates:
+            result = {global_id for global_id in result
+                      if name in self.records[global_id] and predicate(self.records[global_id][name])}
+        return sorted(result)
+
+    def find_one(self, **criteria):
+        """
+        Returns the GlobalId of the first element matching the criteria, see `query`.
+
+        Returns:
+            str: The GlobalId, or None if nothing matches.
+        """
+        result = self.query(**criteria)
+        return result[0] if result else None
+
+    def get_element(self, global_id):
+        """
+        Resolves a GlobalId to its entity in the attached model.
+
+        Args:
+            global_id (str): GlobalId of the element.
+
+        Returns:
+            IfcObject: The element, or None.
+        """
+        if global_id is None or self.ifc_manager is None:
+            return None
+        return self.ifc_manager.model.by_guid(global_id)
+
+    def save(self, path=None):
+        """
+        Writes the index as a JSON sidecar file.
+
+        Args:
+            path (str): Sidecar path, defaults to the manager's file path with `.index.json` appended.
+
+        Returns:
+            str: The path written.
+        """
+        path = path or sidecar_path(self.ifc_manager.file_path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": SIDECAR_VERSION, "records": self.records}, f, separators=(",", ":"))
+        return path
+
+    @classmethod
+    def load(cls, path, ifc_manager=None):
+        """
+        Reads an index from a JSON sidecar file.
+
+        Args:
+            path (str): Sidecar path.
+            ifc_manager (IFCManager): Manager of the same model, to resolve and follow elements.
+
+        Returns:
+            ElementIndex: The index.
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SIDECAR_VERSION:
+            raise ValueError(f"Unsupported index sidecar version in {path}")
+
+        index = cls(ifc_manager)
+        index.records = data["records"]
+        for global_id, record in index.records.items():
+            for name, value in record.items():
+                index.values.setdefault(name, {}).setdefault(value, set()).add(global_id)
+        if ifc_manager is not None:
+            ifc_manager.get_pset_writer().listeners.append(index.add)
+        return index
+
+
+def sidecar_path(file_path):
+    return f"{file_path}.index.json"
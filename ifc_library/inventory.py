@@ -0,0 +1,583 @@
+import sys
+
+import numpy as np
+
+from ifc_library.geometry_cache import void_values
+
+# Raised as a KeyError when a required field is missing, like the dict-based element data mapping
+REQUIRED = object()
+
+# (property name, record key, column kind, default) in ReC_Pset_* template order. Kinds are
+# "number", "bool", "category" for low-cardinality strings and "text" or "object" for the rest.
+# Keys such as Element_ID are "text": kept as given, so both 7 and "W-7" are valid ids
+WALL_ELEMENT_FIELDS = (
+    ("Element_ID", "Element_ID", "text", REQUIRED),
+    ("Wall_ID", "Wall_ID", "text", REQUIRED),
+    ("Local_ID", "Local_ID", "text", REQUIRED),
+    ("Building_ID", "Building_ID", "category", REQUIRED),
+    ("Product_ID", "Product_ID", "text", REQUIRED),
+    ("Reinf_ID", "Reinf_ID", "category", REQUIRED),
+    ("Wall_Type", "Wall_Type", "category", REQUIRED),
+    ("Wing", "Wing", "category", REQUIRED),
+    ("Floor_Num", "Floor_Num", "number", REQUIRED),
+    ("Orientation", "Orientation", "category", REQUIRED),
+    ("Grid_Pos", "Grid_Pos", "text", REQUIRED),
+    ("Status", "Status", "category", REQUIRED),
+    ("Storage_Loc", "Storage_Loc", "category", REQUIRED),
+    ("Links", "Links", "text", REQUIRED),
+    ("Notes", "Notes", "text", REQUIRED),
+)
+
+WALL_GEOMETRY_FIELDS = (
+    ("Product_ID", "Product_ID", "text", REQUIRED),
+    ("Reinf_Type", "Reinf_Type", "category", REQUIRED),
+    ("Mirrored", "Mirrored", "bool", REQUIRED),
+    ("Count", "Count", "number", REQUIRED),
+    ("FootprintPolyline", "FootprintPolyline", "object", None),
+    ("Height", "Height", "number", None),
+    ("Length", "Length", "number", None),
+    ("Thickness", "Thickness", "number", None),
+    ("Strength_Class", "Strength_Class", "category", REQUIRED),
+    ("Agg_Size", "Agg_Size", "number", REQUIRED),
+    ("Drawing", "Drawing", "text", REQUIRED),
+    ("Geometry_Notes", "Geometry_Notes", "text", REQUIRED),
+    ("Has_Void", "Has_Void", "bool", REQUIRED),
+    ("Has_ExtPanels", "Has_ExtPanels", "bool", REQUIRED),
+    ("Has_Connections", "Has_Connections", "bool", REQUIRED),
+    ("Has_Corbel", "Has_Corbel", "bool", REQUIRED),
+)
+
+SLAB_ELEMENT_FIELDS = (
+    ("Product_ID", "Product ID", "text", REQUIRED),
+    ("Reinforcement_ID", "Reinforcement ID", "category", REQUIRED),
+    ("Count", "Count", "number", REQUIRED),
+    ("Height", "Height", "number", REQUIRED),
+    ("Length", "Length", "number", REQUIRED),
+    ("Width", "Width", "number", REQUIRED),
+    ("Void_Count", "Void Count", "number", 0),
+    ("Void_Diameter", "Void Diameter", "number", 0.0),
+    ("Concrete_Cover", "Concrete Cover", "number", 0.0),
+    ("External_Web_Thickness", "External Web Thickness", "number", 0.0),
+    ("Concrete_Strength_Class", "Concrete Strength Class", "category", REQUIRED),
+    ("Max_Aggregate_Size", "Max Aggregate Size", "number", None),
+    ("Drawings", "Drawings", "text", None),
+    ("Notes", "Notes", "text", None),
+)
+
+
+class CategoricalColumn:
+    """
+    Low-cardinality strings stored as int32 codes into a list of interned categories.
+    """
+
+    __slots__ = ("codes", "categories")
+
+    def __init__(self, values):
+        lookup = {}
+        self.categories = []
+        self.codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None:
+                self.codes[i] = -1
+                continue
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(self.categories)
+                self.categories.append(sys.intern(value) if isinstance(value, str) else value)
+            self.codes[i] = code
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        return None if code < 0 else self.categories[code]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def take(self, rows):
+        column = CategoricalColumn.__new__(CategoricalColumn)
+        column.codes = self.codes[rows]
+        column.categories = self.categories
+        return column
+
+    def equals(self, value):
+        """
+        Returns a boolean mask of the rows holding a value, without decoding the column.
+        """
+        try:
+            return self.codes == self.categories.index(value)
+        except ValueError:
+            return np.zeros(len(self.codes), dtype=bool)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + sum(sys.getsizeof(category) for category in self.categories)
+
+
+class NumberColumn:
+    """
+    Numeric or boolean values in a NumPy array.
+
+    A column of ints stays int64, so property values keep the IfcInteger type they would get
+    from the dicts. Columns with floats or missing values are float64 with NaN for missing.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values, kind="number"):
+        if kind == "bool":
+            self.values = np.array(values, dtype=bool)
+        elif all(type(value) is int for value in values):
+            self.values = np.array(values, dtype=np.int64)
+        else:
+            self.values = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+    def __getitem__(self, index):
+        value = self.values[index].item()
+        return None if value != value else value
+
+    def __len__(self):
+        return len(self.values)
+
+    def take(self, rows):
+        column = NumberColumn.__new__(NumberColumn)
+        column.values = self.values[rows]
+        return column
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+
+class TextColumn:
+    """
+    Free text such as ids, notes and links, one string per row.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+    def take(self, rows):
+        values = self.values
+        return TextColumn([values[row] for row in rows.tolist()])
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.values) + sum(sys.getsizeof(value) for value in self.values if value is not None)
+
+
+def build_column(kind, values):
+    if kind == "category":
+        return CategoricalColumn(values)
+    if kind in ("number", "bool"):
+        return NumberColumn(values, kind)
+    return TextColumn(values)
+
+
+def invalid_numbers(values, kind="number"):
+    """
+    Finds the values of a numeric or boolean field that cannot be stored as one.
+
+    Numbers and booleans are valid, like numeric strings for "number" fields, which NumPy
+    converts when the column is built.
+
+    Args:
+        values (list): Field values, None for missing ones.
+        kind (str): "number" or "bool".
+
+    Returns:
+        list: Indices of the invalid values.
+    """
+    rows = []
+    for row, value in enumerate(values):
+        if value is None or isinstance(value, (bool, int, float, np.number, np.bool_)):
+            continue
+        if kind == "number" and isinstance(value, str):
+            try:
+                float(value)
+                continue
+            except ValueError:
+                pass
+        rows.append(row)
+    return rows
+
+
+def row_indices(rows):
+    # Row indices from a boolean mask or an index array
+    rows = np.asarray(rows)
+    return np.flatnonzero(rows) if rows.dtype == bool else rows.astype(np.int64)
+
+
+class Inventory:
+    """
+    Columnar element inventory: one typed column per field instead of one dict per element.
+
+    Numeric and boolean fields are NumPy arrays, low-cardinality strings are categorical
+    codes and free text is kept as one list per field. Rows are read through lightweight
+    record views, which map straight onto the ReC_Pset_* property sets.
+    """
+
+    # (section name, field specs) pairs, set by the subclasses
+    sections = ()
+    record_class = None
+
+    def __init__(self, columns, size, missing=None, invalid=None):
+        """
+        Args:
+            columns (dict): Section name -> property name -> column.
+            size (int): Number of rows.
+            missing (dict): (section name, property name) -> rows missing that required field.
+            invalid (dict): (section name, property name) -> rows whose value is not a number
+                            although the field is numeric.
+        """
+        self.columns = columns
+        self.size = size
+        self.missing = missing or {}
+        self.invalid = invalid or {}
+
+    @classmethod
+    def from_records(cls, records, strict=True):
+        """
+        Packs element records into columns in a single pass.
+
+        Args:
+            records (iterable of dict): Records as accepted by the bulk builder, e.g. from
+                                        `ifc_library.records.read_records`. They are not kept.
+            strict (bool): Raise a KeyError on a missing required field, and a ValueError on a
+                           numeric field holding something else than a number. Otherwise the
+                           value is left empty and the row recorded in `missing` or `invalid`,
+                           for validation.
+
+        Returns:
+            Inventory: The packed inventory.
+        """
+        values = {section: {name: [] for name, _, _, _ in fields} for section, fields in cls.sections}
+        missing = {}
+        size = 0
+        for record in records:
+            for section, fields in cls.sections:
+                data = record.get(section, {})
+                section_values = values[section]
+                for name, key, _, default in fields:
+                    if default is not REQUIRED:
+                        section_values[name].append(data.get(key, default))
+                    elif strict:
+                        section_values[name].append(data[key])
+                    else:
+                        value = data.get(key, REQUIRED)
+                        if value is REQUIRED:
+                            missing.setdefault((section, name), []).append(size)
+                            value = None
+                        section_values[name].append(value)
+            size += 1
+
+        columns = {}
+        invalid = {}
+        for section, fields in cls.sections:
+            columns[section] = {}
+            for name, _, kind, _ in fields:
+                column_values = values[section].pop(name)
+                if kind in ("number", "bool"):
+                    rows = invalid_numbers(column_values, kind)
+                    if rows and strict:
+                        raise ValueError(f"{name} of record {rows[0]} is not a number: {column_values[rows[0]]!r}")
+                    if rows:
+                        invalid[section, name] = np.array(rows, dtype=np.int64)
+                        for row in rows:
+                            column_values[row] = None
+                columns[section][name] = build_column(kind, column_values)
+        missing = {field: np.array(rows, dtype=np.int64) for field, rows in missing.items()}
+        return cls(columns, size, missing, invalid)
+
+    def select(self, rows):
+        """
+        Returns a new inventory holding only some rows, e.g. the ones that passed validation.
+
+        Args:
+            rows (numpy.ndarray): Boolean mask over the rows, or row indices.
+
+        Returns:
+            Inventory: The selected rows, in order. Categories are shared with this inventory.
+        """
+        rows = row_indices(rows)
+        columns = {
+            section: {name: column.take(rows) for name, column in section_columns.items()}
+            for section, section_columns in self.columns.items()
+        }
+        return type(self)(columns, len(rows))
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("inventory index out of range")
+        return self.record_class(self, index)
+
+    def __iter__(self):
+        record_class = self.record_class
+        for index in range(self.size):
+            yield record_class(self, index)
+
+    def column(self, name, section=None):
+        """
+        Returns a column, e.g. `inventory.column("Length")` for the NumPy array of lengths.
+
+        Args:
+            name (str): Property name.
+            section (str): Section holding the field, the first one holding it by default.
+
+        Returns:
+            numpy.ndarray, CategoricalColumn or list: The array of a numeric or boolean field,
+            the categorical column of a category field, or the list of a text field.
+        """
+        for section_name, _ in self.sections:
+            if section is not None and section_name != section:
+                continue
+            column = self.columns[section_name].get(name)
+            if column is not None:
+                return column.values if not isinstance(column, CategoricalColumn) else column
+        raise KeyError(name)
+
+    def numeric_table(self, section=None):
+        """
+        Gathers the numeric and boolean fields into a NumPy structured array.
+
+        Args:
+            section (str): Only the fields of this section, all of them by default. Fields that
+                           appear in several sections are taken from the first.
+
+        Returns:
+            numpy.ndarray: Structured array with one row per element.
+        """
+        arrays = {}
+        for section_name, _ in self.sections:
+            if section is not None and section_name != section:
+                continue
+            for name, column in self.columns[section_name].items():
+                if isinstance(column, NumberColumn) and name not in arrays:
+                    arrays[name] = column.values
+        table = np.empty(self.size, dtype=[(name, values.dtype) for name, values in arrays.items()])
+        for name, values in arrays.items():
+            table[name] = values
+        return table
+
+    def properties(self, section, index):
+        """
+        Reads one row of a section as the property dict of its ReC_Pset_* set.
+
+        Args:
+            section (str): "element_data" or "geometry_data".
+            index (int): Row index.
+
+        Returns:
+            dict: Property names and values.
+        """
+        return {name: column[index] for name, column in self.columns[section].items()}
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for section in self.columns.values() for column in section.values())
+
+
+class WallRecord:
+    """
+    View of one wall of a WallInventory.
+    """
+
+    __slots__ = ("inventory", "index")
+
+    def __init__(self, inventory, index):
+        self.inventory = inventory
+        self.index = index
+
+    @property
+    def name(self):
+        return self.inventory.columns["element_data"]["Wall_ID"][self.index]
+
+    @property
+    def element_id(self):
+        return self.inventory.columns["element_data"]["Element_ID"][self.index]
+
+    @property
+    def grid_pos(self):
+        return self.inventory.columns["element_data"]["Grid_Pos"][self.index]
+
+    @property
+    def orientation(self):
+        return self.inventory.columns["element_data"]["Orientation"][self.index]
+
+    @property
+    def building_id(self):
+        return self.inventory.columns["element_data"]["Building_ID"][self.index]
+
+    @property
+    def floor_num(self):
+        return self.inventory.columns["element_data"]["Floor_Num"][self.index]
+
+    @property
+    def length(self):
+        return self.dimension("Length", 5000.0)
+
+    @property
+    def height(self):
+        return self.dimension("Height", 3000.0)
+
+    @property
+    def thickness(self):
+        return self.dimension("Thickness", 300.0)
+
+    @property
+    def mirrored(self):
+        return self.inventory.columns["geometry_data"]["Mirrored"][self.index]
+
+    @property
+    def voids(self):
+        # X, Y, Z, Width, Height, Depth rows with the add_void defaults applied
+        offsets = self.inventory.void_offsets
+        return self.inventory.void_values[offsets[self.index]:offsets[self.index + 1]]
+
+    def dimension(self, name, default):
+        # Same defaults as create_wall_from_data when a dimension is missing
+        value = self.inventory.columns["geometry_data"][name][self.index]
+        return default if value is None else value
+
+    def element_data_properties(self):
+        return self.inventory.properties("element_data", self.index)
+
+    def geometry_data_properties(self):
+        return self.inventory.properties("geometry_data", self.index)
+
+
+class SlabRecord:
+    """
+    View of one slab of a SlabInventory.
+    """
+
+    __slots__ = ("inventory", "index")
+
+    def __init__(self, inventory, index):
+        self.inventory = inventory
+        self.index = index
+
+    def value(self, name):
+        return self.inventory.columns["element_data"][name][self.index]
+
+    @property
+    def name(self):
+        return self.value("Product_ID")
+
+    @property
+    def length(self):
+        return self.value("Length")
+
+    @property
+    def width(self):
+        return self.value("Width")
+
+    @property
+    def height(self):
+        return self.value("Height")
+
+    @property
+    def void_count(self):
+        return self.value("Void_Count")
+
+    @property
+    def void_diameter(self):
+        return self.value("Void_Diameter")
+
+    def element_data_properties(self):
+        return self.inventory.properties("element_data", self.index)
+
+
+class WallInventory(Inventory):
+    """
+    Columnar wall inventory.
+
+    The variable-length void layouts are stored as one float64 array of X, Y, Z, Width,
+    Height, Depth rows for all walls, with `void_offsets[i]:void_offsets[i + 1]` the rows
+    of wall i.
+
+    Example:
+        inventory = WallInventory.from_records(read_records("walls.jsonl"))
+        manager.add_walls_bulk(inventory)
+        long_walls = inventory.column("Length") > 6000
+    """
+
+    sections = (("element_data", WALL_ELEMENT_FIELDS), ("geometry_data", WALL_GEOMETRY_FIELDS))
+    record_class = WallRecord
+
+    def __init__(self, columns, size, missing=None, invalid=None, void_offsets=None, void_values=None):
+        super().__init__(columns, size, missing, invalid)
+        self.void_offsets = void_offsets if void_offsets is not None else np.zeros(size + 1, dtype=np.int64)
+        self.void_values = void_values if void_values is not None else np.empty((0, 6))
+
+    @classmethod
+    def from_records(cls, records, strict=True):
+        void_counts = []
+        void_rows = []
+        invalid_voids = []
+
+        def collect_voids(records):
+            # Packs the void layouts while the base class packs the fields, in the same single pass
+            for row, record in enumerate(records):
+                geometry_data = record.get("geometry_data", {})
+                thickness = geometry_data.get("Thickness", 300.0)
+                # An invalid thickness is reported on its own field, the voids get the default depth
+                thickness = 300.0 if thickness is None or invalid_numbers([thickness]) else float(thickness)
+                voids = geometry_data.get("Voids") or []
+                void_counts.append(len(voids))
+                for void_data in voids:
+                    values = void_values(void_data, thickness)
+                    invalid = invalid_numbers(values)
+                    if invalid and strict:
+                        raise ValueError(f"Voids of record {row} are not numbers: {void_data!r}")
+                    if invalid:
+                        invalid_voids.append(row)
+                        values = [np.nan if index in invalid else value for index, value in enumerate(values)]
+                    void_rows.append(values)
+                yield record
+
+        inventory = super().from_records(collect_voids(records), strict)
+        inventory.void_offsets = np.concatenate(([0], np.cumsum(void_counts, dtype=np.int64)))
+        inventory.void_values = np.array(void_rows, dtype=np.float64).reshape(-1, 6)
+        if invalid_voids:
+            inventory.invalid["geometry_data", "Voids"] = np.unique(invalid_voids)
+        return inventory
+
+    def select(self, rows):
+        rows = row_indices(rows)
+        inventory = super().select(rows)
+        counts = np.diff(self.void_offsets)[rows]
+        inventory.void_offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        # Index of every kept void row: its wall's old start plus its position within the wall
+        starts = np.repeat(self.void_offsets[rows] - inventory.void_offsets[:-1], counts)
+        inventory.void_values = self.void_values[starts + np.arange(inventory.void_offsets[-1])]
+        return inventory
+
+    @property
+    def nbytes(self):
+        return super().nbytes + self.void_offsets.nbytes + self.void_values.nbytes
+
+
+class SlabInventory(Inventory):
+    """
+    Columnar slab inventory.
+
+    Example:
+        inventory = SlabInventory.from_records(read_records("slabs.csv"))
+        manager.add_slabs_bulk(inventory)
+    """
+
+    sections = (("element_data", SLAB_ELEMENT_FIELDS),)
+    record_class = SlabRecord
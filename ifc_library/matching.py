@@ -0,0 +1,469 @@
+import re
+import time
+
+import numpy as np
+
+from ifc_library.elements.ifc_slab import IFCSlab
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.inventory import SlabInventory, WallInventory
+
+STRENGTH_CLASS = re.compile(r"C\s*(\d+)", re.IGNORECASE)
+
+# Stock statuses that can be matched to a design
+AVAILABLE_STATUSES = ("Available", "Stored")
+
+
+class StockIndex:
+    """
+    Sorted multi-key index over reclaimed stock.
+
+    Items are grouped on an exact section key (e.g. thickness and void layout of a wall) and
+    sorted on their first cut dimension inside each group. A demand looks up the groups it
+    may use, binary searches the window of items long enough but within tolerance, and
+    filters that window on the remaining dimensions and the strength class with array
+    operations, so a query touches only the items that nearly fit.
+    """
+
+    def __init__(self, rows, sections, dimensions, strength):
+        """
+        Args:
+            rows (numpy.ndarray): Inventory row of each stock item.
+            sections (list): Hashable exact-match key of each item.
+            dimensions (numpy.ndarray): Array of shape (items, d) of the dimensions a demand
+                                        may be cut down to, the first one being searched.
+            strength (numpy.ndarray): Characteristic strength of each item, NaN if unknown.
+        """
+        self.rows = rows
+        self.dimensions = dimensions
+        self.strength = strength
+        self.groups = {}
+        members = {}
+        for item, section in enumerate(sections):
+            members.setdefault(section, []).append(item)
+        for section, items in members.items():
+            items = np.array(items, dtype=np.int64)
+            items = items[np.argsort(dimensions[items, 0], kind="stable")]
+            self.groups[section] = (items, dimensions[items, 0])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def query(self, sections, minimum, maximum, min_strength=np.nan):
+        """
+        Finds the items of some sections whose dimensions all lie within a window.
+
+        Args:
+            sections (iterable): Section keys the demand may use.
+            minimum (numpy.ndarray): Smallest acceptable dimensions, i.e. the demand.
+            maximum (numpy.ndarray): Largest acceptable dimensions, the demand plus tolerance.
+            min_strength (float): Lowest acceptable strength, NaN for any.
+
+        Returns:
+            tuple: Candidate item indices and their waste, the relative excess of the product
+                   of the dimensions over the demanded one.
+        """
+        found = []
+        for section in sections:
+            group = self.groups.get(section)
+            if group is None:
+                continue
+            items, first = group
+            start = np.searchsorted(first, minimum[0], side="left")
+            end = np.searchsorted(first, maximum[0], side="right")
+            items = items[start:end]
+            if not len(items):
+                continue
+            dimensions = self.dimensions[items]
+            fits = np.all((dimensions >= minimum) & (dimensions <= maximum), axis=1)
+            if not np.isnan(min_strength):
+                fits &= self.strength[items] >= min_strength
+            found.append(items[fits])
+        items = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+        waste = np.prod(self.dimensions[items], axis=1) / np.prod(minimum) - 1.0
+        return items, waste
+
+
+class MatchResult:
+    """
+    Candidates and assignment of a batch of demands.
+
+    `candidates[i]` holds the inventory rows fitting demand i, best fit first, with their
+    waste in `waste[i]`. `assignment[i]` is the inventory row given to demand i, -1 if none.
+    """
+
+    def __init__(self, demand_count, element_type):
+        self.element_type = element_type
+        self.candidates = [np.zeros(0, dtype=np.int64)] * demand_count
+        self.waste = [np.zeros(0)] * demand_count
+        self.assignment = np.full(demand_count, -1, dtype=np.int64)
+        self.assigned_waste = np.full(demand_count, np.nan)
+        self.assigned = False
+        self.stock_size = 0
+        self.elapsed = 0.0
+
+    @property
+    def matched(self):
+        return int(np.count_nonzero(self.assignment >= 0))
+
+    def pairs(self):
+        """
+        Returns:
+            list: (demand index, inventory row) of every matched demand.
+        """
+        demands = np.flatnonzero(self.assignment >= 0)
+        return list(zip(demands.tolist(), self.assignment[demands].tolist()))
+
+    def __str__(self):
+        if not self.assigned:
+            found = sum(1 for candidates in self.candidates if len(candidates))
+            return (f"Found candidates for {found} of {len(self.assignment)} demands against {self.stock_size} "
+                    f"available {self.element_type} in {self.elapsed:.2f}s")
+        mean_waste = np.nanmean(self.assigned_waste) * 100 if self.matched else 0.0
+        return (f"Matched {self.matched} of {len(self.assignment)} demands against {self.stock_size} available "
+                f"{self.element_type} in {self.elapsed:.2f}s (mean waste {mean_waste:.1f}%)")
+
+
+def strength_value(strength_class):
+    """
+    Characteristic cylinder strength of a class such as "C30/37", NaN if it cannot be read.
+    """
+    match = STRENGTH_CLASS.search(str(strength_class)) if strength_class is not None else None
+    return float(match.group(1)) if match else np.nan
+
+
+def category_values(column, function):
+    # Applies a function once per category of a categorical column, then gathers per row
+    values = np.array([function(category) for category in column.categories] + [function(None)])
+    return values[column.codes]
+
+
+def wall_void_key(voids):
+    # Exact void layout key: rounded X, Y, Z, Width, Height, Depth rows, sorted like GeometryCache.wall_key
+    return tuple(sorted(tuple(round(value, 1) for value in row) for row in np.asarray(voids).reshape(-1, 6).tolist()))
+
+
+def build_wall_index(inventory, statuses=AVAILABLE_STATUSES):
+    """
+    Indexes the walls of an inventory that can still be reused.
+
+    Walls are grouped on thickness and exact void layout, and searched on length then height.
+
+    Args:
+        inventory (WallInventory): The reclaimed walls.
+        statuses (iterable of str): Statuses of the walls that can be matched.
+
+    Returns:
+        StockIndex: The index.
+    """
+    status = inventory.column("Status")
+    usable = np.zeros(len(inventory), dtype=bool)
+    for value in statuses:
+        usable |= status.equals(value)
+    rows = np.flatnonzero(usable)
+
+    dimensions = np.column_stack([
+        np.nan_to_num(inventory.column(name, "geometry_data").astype(np.float64)[rows], nan=default)
+        for name, default in (("Length", 5000.0), ("Height", 3000.0))
+    ])
+    thickness = np.nan_to_num(inventory.column("Thickness", "geometry_data").astype(np.float64)[rows], nan=300.0)
+    offsets = inventory.void_offsets
+    sections = [
+        (round(float(thickness[i]), 1),
+         wall_void_key(inventory.void_values[offsets[row]:offsets[row + 1]]) if offsets[row + 1] > offsets[row] else ())
+        for i, row in enumerate(rows.tolist())
+    ]
+    strength = category_values(inventory.column("Strength_Class"), strength_value)[rows]
+    return StockIndex(rows, sections, dimensions, strength)
+
+
+def build_slab_index(inventory):
+    """
+    Indexes the slabs of an inventory. Hollow-core slabs are only cut to length, so slabs are
+    grouped on their cross-section (width, height, void count and diameter) and searched on length.
+
+    Args:
+        inventory (SlabInventory): The reclaimed slabs.
+
+    Returns:
+        StockIndex: The index.
+    """
+    rows = np.arange(len(inventory))
+    columns = [np.nan_to_num(inventory.column(name).astype(np.float64)) for name in
+               ("Width", "Height", "Void_Count", "Void_Diameter")]
+    sections = list(zip(*(np.round(column, 1).tolist() for column in columns)))
+    dimensions = inventory.column("Length").astype(np.float64)[:, None]
+    strength = category_values(inventory.column("Concrete_Strength_Class"), strength_value)
+    return StockIndex(rows, sections, dimensions, strength)
+
+
+def match_walls(demands, inventory, length_tolerance=600.0, height_tolerance=300.0, thickness_tolerance=0.0,
+                candidates=10, assign=True, statuses=AVAILABLE_STATUSES):
+    """
+    Finds reclaimed walls for the wall slots of a new design.
+
+    A wall fits a slot if it is at least as long and high as the slot and no more than the
+    tolerances larger, so it can be cut down, its thickness is within tolerance, its strength
+    class is at least the required one and it has exactly the slot's void layout (no voids
+    if the slot has none). Fits are ranked on waste, the relative excess of wall area.
+
+    Args:
+        demands (list of dict): Slots with Length, Height, Thickness and optional
+                                Strength_Class, Voids (as in the wall geometry data),
+                                Demand_ID, Grid_Pos and Orientation.
+        inventory (WallInventory or iterable of dict): The reclaimed walls.
+        length_tolerance (float): Largest excess length accepted.
+        height_tolerance (float): Largest excess height accepted.
+        thickness_tolerance (float): Largest thickness difference accepted.
+        candidates (int): Number of best-fit candidates kept per demand.
+        assign (bool): Also assign every wall to at most one demand, see `assign_stock`.
+        statuses (iterable of str): Statuses of the walls that can be matched.
+
+    Returns:
+        MatchResult: Candidates and assignment per demand, as inventory rows.
+    """
+    start = time.perf_counter()
+    if not isinstance(inventory, WallInventory):
+        inventory = WallInventory.from_records(inventory)
+    index = build_wall_index(inventory, statuses)
+    thicknesses = {}
+    for thickness, void_key in index.groups:
+        thicknesses.setdefault(void_key, []).append(thickness)
+
+    result = MatchResult(len(demands), "walls")
+    result.stock_size = len(index)
+    tolerance = np.array((length_tolerance, height_tolerance))
+    # Repeated slots (same panel at many grid positions) are queried once
+    queries = {}
+    keys = []
+    for demand in demands:
+        thickness = float(demand.get("Thickness", 300.0))
+        void_key = wall_void_key(void_array(demand.get("Voids"), thickness)) if demand.get("Voids") else ()
+        minimum = np.array((demand.get("Length", 5000.0), demand.get("Height", 3000.0)), dtype=np.float64)
+        min_strength = strength_value(demand.get("Strength_Class"))
+        key = (tuple(minimum.tolist()), thickness, void_key, min_strength)
+        if key not in queries:
+            sections = [(value, void_key) for value in thicknesses.get(void_key, ())
+                        if abs(value - thickness) <= thickness_tolerance + 1e-9]
+            queries[key] = (sections, minimum, minimum + tolerance, min_strength)
+        keys.append(key)
+
+    run_queries(result, index, queries, keys, candidates, assign)
+    result.elapsed = time.perf_counter() - start
+    print(result)
+    return result
+
+
+def match_slabs(demands, inventory, length_tolerance=600.0, candidates=10, assign=True):
+    """
+    Finds reclaimed slabs for the slab slots of a new design.
+
+    A slab fits a slot if it has the slot's cross-section, is at least as long and no more
+    than the tolerance longer, and its strength class is at least the required one.
+
+    Args:
+        demands (list of dict): Slots with Length, Width, Height, optional Void Count and
+                                Void Diameter (as in the slab element data), Concrete
+                                Strength Class and Demand_ID, and the Matrix, Building_ID
+                                and Floor_Num used by `apply_slab_matches`.
+        inventory (SlabInventory or iterable of dict): The reclaimed slabs.
+        length_tolerance (float): Largest excess length accepted.
+        candidates (int): Number of best-fit candidates kept per demand.
+        assign (bool): Also assign every slab to at most one demand, see `assign_stock`.
+
+    Returns:
+        MatchResult: Candidates and assignment per demand, as inventory rows.
+    """
+    start = time.perf_counter()
+    if not isinstance(inventory, SlabInventory):
+        inventory = SlabInventory.from_records(inventory)
+    index = build_slab_index(inventory)
+
+    result = MatchResult(len(demands), "slabs")
+    result.stock_size = len(index)
+    queries = {}
+    keys = []
+    for demand in demands:
+        section = tuple(round(float(demand.get(name, 0.0) or 0.0), 1) for name in
+                        ("Width", "Height", "Void Count", "Void Diameter"))
+        minimum = np.array((demand["Length"],), dtype=np.float64)
+        min_strength = strength_value(demand.get("Concrete Strength Class"))
+        key = (section, float(minimum[0]), min_strength)
+        if key not in queries:
+            queries[key] = ([section], minimum, minimum + length_tolerance, min_strength)
+        keys.append(key)
+
+    run_queries(result, index, queries, keys, candidates, assign)
+    result.elapsed = time.perf_counter() - start
+    print(result)
+    return result
+
+
+def void_array(voids, thickness):
+    # Imported here as the geometry cache depends on ifcopenshell.util, only needed for demands with voids
+    from ifc_library.geometry_cache import void_rows
+
+    return void_rows(voids, thickness)
+
+
+def run_queries(result, index, queries, keys, count, assign):
+    """
+    Runs each distinct query once and fills in the candidates of every demand.
+
+    Args:
+        result (MatchResult): Result to fill in.
+        index (StockIndex): The stock.
+        queries (dict): Query key -> (sections, minimum, maximum, min_strength).
+        keys (list): Query key of each demand.
+        count (int): Number of best-fit candidates kept per demand.
+        assign (bool): Also assign the stock, see `assign_stock`.
+    """
+    best = {}
+    for key, query in queries.items():
+        items, waste = index.query(*query)
+        if len(items) > count:
+            kept = np.argpartition(waste, count - 1)[:count]
+            items, waste = items[kept], waste[kept]
+        order = np.argsort(waste, kind="stable")
+        best[key] = (index.rows[items[order]], waste[order])
+    for i, key in enumerate(keys):
+        result.candidates[i], result.waste[i] = best[key]
+    if not assign:
+        return
+
+    def query_all(key):
+        items, waste = index.query(*queries[key])
+        order = np.argsort(waste, kind="stable")
+        return index.rows[items[order]], waste[order]
+
+    assign_stock(result, keys, query_all)
+
+
+def assign_stock(result, keys, query_all):
+    """
+    Gives each demand its own stock item, least waste first.
+
+    All (demand, candidate) pairs are sorted on waste and taken greedily, skipping demands
+    already served and items already used. Demands left over because all their kept
+    candidates went to others then walk their full window, best fit first, for an unused
+    item. This is the greedy approximation of the minimum-waste assignment, which would be
+    cubic in the number of demands.
+
+    Args:
+        result (MatchResult): Result whose candidates are assigned, updated in place.
+        keys (list): Query key of each demand; demands with the same key share their window.
+        query_all (callable): Query key -> all fitting inventory rows and their waste, best first.
+    """
+    result.assigned = True
+    counts = np.array([len(candidates) for candidates in result.candidates], dtype=np.int64)
+    if not counts.sum():
+        return
+    demands = np.repeat(np.arange(len(counts)), counts)
+    candidates = np.concatenate(result.candidates)
+    waste = np.concatenate(result.waste)
+    order = np.argsort(waste, kind="stable")
+
+    used = set()
+    assignment = result.assignment
+    for demand, row, value in zip(demands[order].tolist(), candidates[order].tolist(), waste[order].tolist()):
+        if assignment[demand] >= 0 or row in used:
+            continue
+        assignment[demand] = row
+        result.assigned_waste[demand] = value
+        used.add(row)
+
+    # Items only get used, so each window is walked once from where the last demand stopped
+    windows = {}
+    for demand in np.flatnonzero((assignment < 0) & (counts > 0)).tolist():
+        key = keys[demand]
+        if key not in windows:
+            rows, waste = query_all(key)
+            windows[key] = [rows.tolist(), waste.tolist(), 0]
+        window = windows[key]
+        rows, waste, position = window
+        while position < len(rows) and rows[position] in used:
+            position += 1
+        window[2] = position
+        if position < len(rows):
+            assignment[demand] = rows[position]
+            result.assigned_waste[demand] = waste[position]
+            used.add(rows[position])
+
+
+def apply_wall_matches(ifc_manager, demands, inventory, result, container=None, shared=False):
+    """
+    Adds the matched reclaimed walls to a model, in the design's slots.
+
+    Each wall gets the representation, voids and property sets of its stock record through
+    `IFCWall.add_record`, is placed on the grid from the demand's Grid_Pos and Orientation
+    when it has them, and records the match in ReC_Pset_ReuseMatch.
+
+    Args:
+        ifc_manager (IFCManager): The design model.
+        demands (list of dict): The demands passed to `match_walls`.
+        inventory (WallInventory): The inventory passed to `match_walls`.
+        result (MatchResult): The match result.
+        container (IfcSpatialStructureElement): Spatial container, defaults to the storey of each
+                                                demand's Building_ID and Floor_Num.
+        shared (bool): Map shared type representations.
+
+    Returns:
+        list: The created IFCWall objects.
+    """
+    walls = []
+    for demand_index, row in result.pairs():
+        demand = demands[demand_index]
+        record = inventory[row]
+        wall = IFCWall(ifc_manager, name=demand.get("Demand_ID") or record.name)
+        if demand.get("Grid_Pos") and demand.get("Orientation"):
+            wall.place_on_grid(demand["Grid_Pos"], demand["Orientation"])
+        else:
+            wall.set_placement()
+        wall.add_record(record, shared)
+        add_match_data(wall, demand, record.element_data_properties()["Element_ID"], result.assigned_waste[demand_index])
+        wall.assign_to_container(container or ifc_manager.get_storey(demand.get("Building_ID"), demand.get("Floor_Num")))
+        walls.append(wall)
+    ifc_manager.flush_containment()
+    return walls
+
+
+def apply_slab_matches(ifc_manager, demands, inventory, result, container=None, shared=False):
+    """
+    Adds the matched reclaimed slabs to a model through `IFCSlab.add_record`, recording the
+    match in ReC_Pset_ReuseMatch.
+
+    Each slab is placed by the demand's optional `Matrix`, a 4x4 placement matrix in mm as
+    taken by `IFCElement.set_placement` (e.g. a NumPy array or nested lists), and stays at the
+    origin without one.
+
+    Args:
+        ifc_manager (IFCManager): The design model.
+        demands (list of dict): The demands passed to `match_slabs`, with an optional Matrix.
+        inventory (SlabInventory): The inventory passed to `match_slabs`.
+        result (MatchResult): The match result.
+        container (IfcSpatialStructureElement): Spatial container, defaults to the storey of each
+                                                demand's Building_ID and Floor_Num.
+        shared (bool): Map shared type representations.
+
+    Returns:
+        list: The created IFCSlab objects.
+    """
+    slabs = []
+    for demand_index, row in result.pairs():
+        demand = demands[demand_index]
+        record = inventory[row]
+        slab = IFCSlab(ifc_manager, name=demand.get("Demand_ID") or record.name)
+        slab.set_placement(demand.get("Matrix"))
+        slab.add_record(record, shared)
+        add_match_data(slab, demand, record.name, result.assigned_waste[demand_index])
+        slab.assign_to_container(container or ifc_manager.get_storey(demand.get("Building_ID"), demand.get("Floor_Num")))
+        slabs.append(slab)
+    ifc_manager.flush_containment()
+    return slabs
+
+
+def add_match_data(element, demand, stock_id, waste):
+    element.add_property_set({"ReC_Pset_ReuseMatch": {
+        "Demand_ID": demand.get("Demand_ID"),
+        "Stock_ID": stock_id,
+        "Waste_Ratio": round(float(waste), 4)
+    }})
@@ -0,0 +1,112 @@
+import numpy as np
+
+
+def hollow_core_web_thickness(width, void_count, void_diameter):
+    """
+    Computes the thickness of the webs between and beside the cores of a hollow-core slab.
+
+    Args:
+        width (float): Width of the slab in mm.
+        void_count (int): Number of voids (cores) in the slab.
+        void_diameter (float): Diameter of the voids in mm.
+
+    Returns:
+        float: The web thickness, equal for the outer and the inner webs.
+    """
+    return (width - void_count * void_diameter) / (void_count + 1)
+
+
+def hollow_core_points(width, height, void_count, void_diameter):
+    """
+    Computes the outline and core points of a hollow-core cross-section in one array.
+
+    The first four points are the outer rectangle. Each core then contributes four points on
+    its circle (right, top, left, bottom), so the circle is exactly described by two arcs
+    through three of them each.
+
+    Args:
+        width (float): Width of the slab in mm.
+        height (float): Height of the slab in mm.
+        void_count (int): Number of voids (cores) in the slab.
+        void_diameter (float): Diameter of the voids in mm.
+
+    Returns:
+        numpy.ndarray: Array of shape (4 + 4 * void_count, 2).
+    """
+    web = hollow_core_web_thickness(width, void_count, void_diameter)
+    if web <= 0:
+        raise ValueError(f"{void_count} cores of {void_diameter} mm do not fit in a {width} mm wide slab")
+    radius = void_diameter / 2
+
+    outline = np.array([(0.0, 0.0), (width, 0.0), (width, height), (0.0, height)])
+
+    centres_x = web + radius + np.arange(void_count) * (void_diameter + web)
+    offsets = np.array([(radius, 0.0), (0.0, radius), (-radius, 0.0), (0.0, -radius)])
+    centres = np.column_stack((centres_x, np.full(void_count, height / 2)))
+    cores = (centres[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+
+    return np.vstack((outline, cores))
+
+
+class ProfileCache:
+    """
+    Builds hollow-core cross-sections as IfcArbitraryProfileDefWithVoids, one per unique
+    (width, height, void_count, void_diameter).
+
+    A hollow-core catalogue only has a few dozen cross-sections spread over thousands of
+    slabs, so each profile is computed with NumPy once and then reused by every slab that
+    shares it. The outline and all cores share a single IfcCartesianPointList2D: the outer
+    boundary is an IfcLineIndex loop, each core a pair of IfcArcIndex segments, so the cores
+    are true circles rather than faceted polygons.
+    """
+
+    def __init__(self, model, unit_scale=1.0):
+        """
+        Args:
+            model (ifcopenshell.file): The model the profiles are added to.
+            unit_scale (float): Project length unit in record units, see
+                                `ifc_library.units.record_unit_scale`. Dimensions are given in
+                                record units (mm) and converted to project units.
+        """
+        self.model = model
+        self.unit_scale = unit_scale
+        self.profiles = {}
+
+    def get_hollow_core_profile(self, width, height, void_count, void_diameter):
+        """
+        Returns the cached profile for a hollow-core cross-section, creating it on first use.
+
+        Args:
+            width (float): Width of the slab in mm.
+            height (float): Height of the slab in mm.
+            void_count (int): Number of voids (cores) in the slab.
+            void_diameter (float): Diameter of the voids in mm.
+
+        Returns:
+            IfcArbitraryProfileDefWithVoids: The shared profile.
+        """
+        key = (float(width), float(height), int(void_count), float(void_diameter))
+        profile = self.profiles.get(key)
+        if profile is None:
+            profile = self.create_hollow_core_profile(*key)
+            self.profiles[key] = profile
+        return profile
+
+    def create_hollow_core_profile(self, width, height, void_count, void_diameter):
+        points = hollow_core_points(width, height, void_count, void_diameter) / self.unit_scale
+        point_list = self.model.createIfcCartesianPointList2D(points.tolist())
+
+        outer_curve = self.model.createIfcIndexedPolyCurve(
+            point_list, [self.model.createIfcLineIndex((1, 2, 3, 4, 1))], False)
+
+        inner_curves = []
+        for first in range(5, 5 + 4 * void_count, 4):
+            right, top, left, bottom = first, first + 1, first + 2, first + 3
+            segments = [
+                self.model.createIfcArcIndex((right, top, left)),
+                self.model.createIfcArcIndex((left, bottom, right))
+            ]
+            inner_curves.append(self.model.createIfcIndexedPolyCurve(point_list, segments, False))
+
+        name = f"HC {width:g}x{height:g} {void_count}x{void_diameter:g}"
+        return self.model.createIfcArbitraryProfileDefWithVoids("AREA", name, outer_curve, inner_curves)
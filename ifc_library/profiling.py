@@ -0,0 +1,240 @@
+import json
+import sys
+import time
+from array import array
+
+import ifcopenshell.api
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+class ApiCallStats:
+    """
+    Call count, latencies and entities created for one API name and element class.
+    """
+
+    __slots__ = ("count", "seconds", "entities", "latencies")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.entities = 0
+        self.latencies = array("d")
+
+    def add(self, elapsed, entities):
+        self.count += 1
+        self.seconds += elapsed
+        self.entities += entities
+        self.latencies.append(elapsed)
+
+    def merge(self, other):
+        self.count += other.count
+        self.seconds += other.seconds
+        self.entities += other.entities
+        self.latencies.extend(other.latencies)
+
+    def percentiles(self):
+        if not self.latencies:
+            return {percentile: 0.0 for percentile in PERCENTILES}
+        values = np.percentile(np.frombuffer(self.latencies, dtype=np.float64), PERCENTILES)
+        return dict(zip(PERCENTILES, values.tolist()))
+
+
+class ApiProfiler:
+    """
+    Records every `ifcopenshell.api.run` call made by the ifc_library modules.
+
+    The ifc_library modules call `run` through their module-level import. While the profiler
+    is enabled those names point to a recording wrapper, and disabling it puts the original
+    function back, so profiling costs nothing at all when it is off. Calls are broken down
+    by API name (e.g. `pset.edit_pset`) and by the IFC class of the element they act on.
+
+    Example:
+        with ApiProfiler() as profiler:
+            manager.add_walls_bulk(records)
+        print(profiler)
+        profiler.save_json("profile.json")
+        profiler.save_prometheus("profile.prom")
+    """
+
+    def __init__(self):
+        # (api, element class) -> ApiCallStats
+        self.stats = {}
+        self.patched = []
+        self.elapsed = 0.0
+        self.start = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    @property
+    def enabled(self):
+        return bool(self.patched)
+
+    def enable(self):
+        """
+        Starts recording the `run` calls of every loaded ifc_library module.
+        """
+        if self.enabled:
+            return
+        for name, module in list(sys.modules.items()):
+            if not name.startswith("ifc_library") or module is None:
+                continue
+            original = getattr(module, "run", None)
+            if original is not None and is_api_run(original):
+                module.run = self.wrap(original)
+                self.patched.append((module, original))
+        self.start = time.perf_counter()
+
+    def disable(self):
+        """
+        Stops recording and restores the original `run` functions.
+        """
+        if not self.enabled:
+            return
+        for module, original in reversed(self.patched):
+            module.run = original
+        self.patched = []
+        self.elapsed += time.perf_counter() - self.start
+
+    def wrap(self, run):
+        stats = self.stats
+
+        def profiled_run(usecase_path, ifc_file=None, should_run_listeners=True, **settings):
+            element_class = element_class_of(settings, sys._getframe(1))
+            first_id = highest_id(ifc_file) if ifc_file is not None else 0
+            start = time.perf_counter()
+            result = run(usecase_path, ifc_file, should_run_listeners, **settings)
+            elapsed = time.perf_counter() - start
+            entities = highest_id(ifc_file) - first_id if ifc_file is not None else 0
+
+            key = (usecase_path, element_class)
+            call_stats = stats.get(key)
+            if call_stats is None:
+                call_stats = stats[key] = ApiCallStats()
+            call_stats.add(elapsed, entities)
+            return result
+
+        # Marks the wrapper so that a nested profiler also wraps it
+        profiled_run.api_run = run
+        return profiled_run
+
+    def reset(self):
+        self.stats = {}
+        self.elapsed = 0.0
+
+    def by_api(self):
+        """
+        Sums the statistics over element classes.
+
+        Returns:
+            dict: API name -> ApiCallStats.
+        """
+        totals = {}
+        for (api, _), call_stats in self.stats.items():
+            totals.setdefault(api, ApiCallStats()).merge(call_stats)
+        return totals
+
+    def report(self):
+        """
+        Summarizes the recorded calls, slowest API first.
+
+        Returns:
+            dict: Profiled time, and per API its totals, latency percentiles and per-class breakdown.
+        """
+        apis = []
+        for api, totals in sorted(self.by_api().items(), key=lambda item: -item[1].seconds):
+            apis.append({
+                "api": api,
+                **stats_summary(totals),
+                "by_element_class": {
+                    element_class: stats_summary(call_stats)
+                    for (name, element_class), call_stats in sorted(self.stats.items()) if name == api
+                }
+            })
+        return {"elapsed": self.elapsed, "apis": apis}
+
+    def save_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def save_prometheus(self, path, prefix="ifc_library_api"):
+        """
+        Writes the statistics in the Prometheus text exposition format, e.g. for a node exporter textfile collector.
+
+        Args:
+            path (str): Output path, conventionally ending in `.prom`.
+            prefix (str): Metric name prefix.
+
+        Returns:
+            str: The path written.
+        """
+        lines = []
+        counters = (("calls_total", "Number of ifcopenshell.api.run calls.", "count"),
+                    ("seconds_total", "Time spent in ifcopenshell.api.run calls.", "seconds"),
+                    ("entities_created_total", "Entities created by ifcopenshell.api.run calls.", "entities"))
+        for suffix, help_text, attribute in counters:
+            lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+            lines.append(f"# TYPE {prefix}_{suffix} counter")
+            for (api, element_class), call_stats in sorted(self.stats.items()):
+                lines.append(f'{prefix}_{suffix}{{api="{api}",element_class="{element_class}"}} '
+                             f'{getattr(call_stats, attribute)}')
+
+        lines.append(f"# HELP {prefix}_latency_seconds Latency of ifcopenshell.api.run calls.")
+        lines.append(f"# TYPE {prefix}_latency_seconds summary")
+        for api, totals in sorted(self.by_api().items()):
+            for percentile, value in totals.percentiles().items():
+                lines.append(f'{prefix}_latency_seconds{{api="{api}",quantile="{percentile / 100}"}} {value}')
+            lines.append(f'{prefix}_latency_seconds_sum{{api="{api}"}} {totals.seconds}')
+            lines.append(f'{prefix}_latency_seconds_count{{api="{api}"}} {totals.count}')
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def __str__(self):
+        lines = [f"{'API':<36} {'calls':>8} {'total s':>9} {'p50 ms':>8} {'p99 ms':>8} {'entities':>9}"]
+        for api in self.report()["apis"]:
+            lines.append(f"{api['api']:<36} {api['calls']:>8} {api['seconds']:>9.3f} "
+                         f"{api['p50'] * 1000:>8.3f} {api['p99'] * 1000:>8.3f} {api['entities']:>9}")
+        return "\n".join(lines)
+
+
+def stats_summary(call_stats):
+    summary = {"calls": call_stats.count, "seconds": call_stats.seconds, "entities": call_stats.entities}
+    summary.update({f"p{percentile}": value for percentile, value in call_stats.percentiles().items()})
+    return summary
+
+
+def is_api_run(function):
+    return function is ifcopenshell.api.run or getattr(function, "api_run", None) is not None
+
+
+def element_class_of(settings, caller):
+    # The element an API call acts on, or the class it creates for root.create_entity
+    for name in ("product", "element", "related_object", "relating_structure"):
+        element = settings.get(name)
+        if element is not None and hasattr(element, "is_a"):
+            return element.is_a()
+    products = settings.get("products")
+    if products:
+        return products[0].is_a()
+    if "ifc_class" in settings:
+        return settings["ifc_class"]
+    # Calls such as geometry.add_wall_representation only get a context: use the IFCElement making them
+    element = getattr(caller.f_locals.get("self"), "element", None)
+    return element.is_a() if hasattr(element, "is_a") else "-"
+
+
+def highest_id(ifc_file):
+    # ifcopenshell 0.8+ exposes the id counter on the file, earlier versions on its wrapped data
+    get_max_id = getattr(ifc_file, "get_max_id", None)
+    if get_max_id is not None:
+        return get_max_id()
+    return ifc_file.wrapped_data.getMaxId()
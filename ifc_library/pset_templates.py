@@ -0,0 +1,277 @@
+import ifcopenshell.guid
+
+
+class PsetTemplate:
+    """
+    Precompiled layout of one ReC_Pset_* property set.
+
+    The property names, their order and which of them hold low-cardinality values are fixed
+    once per set name, so writing a set is a single pass over the values with no name
+    lookups, no type inference through the API and no pset.add_pset / pset.edit_pset dispatch.
+    """
+
+    def __init__(self, name, property_names, shared_properties=()):
+        """
+        Args:
+            name (str): Name of the property set.
+            property_names (list): Property names, in the order they are written.
+            shared_properties (iterable): Properties whose values repeat across elements
+                                          and may be shared when interning is enabled.
+        """
+        self.name = name
+        self.property_names = tuple(property_names)
+        self.known_properties = frozenset(property_names)
+        self.shared_properties = frozenset(shared_properties)
+
+    def create_properties(self, model, properties, interner=None):
+        """
+        Creates the IfcPropertySingleValue entities of one element's set.
+
+        Args:
+            model (ifcopenshell.file): The model to create the properties in.
+            properties (dict): Property names and values. None values are skipped, names outside
+                               the template are appended after the templated ones.
+            interner (PropertyInterner): If given, values of shared properties are reused.
+
+        Returns:
+            list: The property entities, in template order.
+        """
+        names = self.property_names
+        if not self.known_properties.issuperset(properties):
+            names += tuple(name for name in properties if name not in self.known_properties)
+
+        props = []
+        for name in names:
+            value = properties.get(name)
+            if value is None:
+                continue
+            if interner is not None and name in self.shared_properties:
+                props.append(interner.get(name, value))
+            else:
+                props.append(model.createIfcPropertySingleValue(name, None, create_value(model, value), None))
+        return props
+
+
+class PropertyInterner:
+    """
+    Hands out one shared IfcPropertySingleValue per (name, value) pair.
+
+    IfcProperty may be part of several property sets, so identical low-cardinality values
+    such as Status or Strength_Class only need to exist once in the model. Shared properties
+    must therefore never be edited in place, only swapped for another property.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.properties = {}
+        self.property_ids = set()
+
+    def get(self, name, value):
+        # The type is part of the key so that 1, 1.0 and True stay distinct properties
+        key = (name, type(value), value)
+        prop = self.properties.get(key)
+        if prop is None:
+            prop = self.model.createIfcPropertySingleValue(name, None, create_value(self.model, value), None)
+            self.properties[key] = prop
+            self.property_ids.add(prop.id())
+        return prop
+
+    def is_interned(self, prop):
+        return prop.id() in self.property_ids
+
+
+class PsetWriter:
+    """
+    Writes property sets of an IFCManager model from the precompiled templates.
+    """
+
+    def __init__(self, ifc_manager, intern_values=False):
+        """
+        Args:
+            ifc_manager (IFCManager): The manager whose model the property sets are added to.
+            intern_values (bool): Share identical values of low-cardinality properties between elements.
+        """
+        self.ifc_manager = ifc_manager
+        self.model = ifc_manager.model
+        self.interner = PropertyInterner(self.model) if intern_values else None
+        # Callables notified with (element, pset_name, properties) after each set is written or updated
+        self.listeners = []
+
+    def has_template(self, pset_name):
+        return pset_name in PSET_TEMPLATES
+
+    def write(self, element, pset_name, properties):
+        """
+        Adds one property set to an element.
+
+        Args:
+            element (IfcObject): The element receiving the property set.
+            pset_name (str): Name of a templated property set.
+            properties (dict): Property names and values.
+
+        Returns:
+            IfcPropertySet: The created property set.
+        """
+        return self.write_batch([element], pset_name, [properties])[0]
+
+    def write_batch(self, elements, pset_name, properties_list):
+        """
+        Adds the same property set to many elements, each with its own values.
+
+        Args:
+            elements (list): The elements receiving the property set.
+            pset_name (str): Name of a templated property set.
+            properties_list (list of dict): Property names and values, one dict per element.
+
+        Returns:
+            list: The created property sets, in element order.
+        """
+        template = PSET_TEMPLATES[pset_name]
+        model = self.model
+        psets = []
+        for element, properties in zip(elements, properties_list):
+            props = template.create_properties(model, properties, self.interner)
+            pset = model.createIfcPropertySet(ifcopenshell.guid.new(), None, pset_name, None, props)
+            model.createIfcRelDefinesByProperties(ifcopenshell.guid.new(), None, None, None, [element], pset)
+            psets.append(pset)
+        for listener in self.listeners:
+            for element, properties in zip(elements, properties_list):
+                listener(element, pset_name, properties)
+        return psets
+
+    def update(self, element, pset_name, properties):
+        """
+        Updates an element's existing property set in place, touching only the changed properties.
+
+        Changed properties are replaced by new (or interned) ones rather than edited, so values
+        shared with other elements are never modified. A None value removes the property, and
+        the set is created if the element does not have it yet.
+
+        Args:
+            element (IfcObject): The element owning the property set.
+            pset_name (str): Name of the property set.
+            properties (dict): Property names and new values.
+
+        Returns:
+            bool: True if anything changed.
+        """
+        pset = get_pset(element, pset_name)
+        if pset is None:
+            if all(value is None for value in properties.values()):
+                return False
+            self.write(element, pset_name, properties)
+            return True
+
+        template = PSET_TEMPLATES.get(pset_name)
+        current = {prop.Name: prop for prop in pset.HasProperties}
+        changed = False
+        released = []
+        for name, value in properties.items():
+            prop = current.get(name)
+            if value is None:
+                if prop is not None:
+                    del current[name]
+                    changed = True
+                    released.append(prop)
+                continue
+            if prop is not None and prop.NominalValue is not None:
+                old_value = prop.NominalValue.wrappedValue
+                if type(old_value) is type(value) and old_value == value:
+                    continue
+            if self.interner is not None and template is not None and name in template.shared_properties:
+                new_prop = self.interner.get(name, value)
+            else:
+                new_prop = self.model.createIfcPropertySingleValue(name, None, create_value(self.model, value), None)
+            current[name] = new_prop
+            changed = True
+            if prop is not None:
+                released.append(prop)
+
+        if not changed:
+            return False
+        pset.HasProperties = list(current.values())
+        for prop in released:
+            self.release(prop)
+        for listener in self.listeners:
+            listener(element, pset_name, properties)
+        return True
+
+    def release(self, prop):
+        # Removes a replaced property unless another property set or the interner still uses it
+        if self.interner is not None and self.interner.is_interned(prop):
+            return
+        if not self.model.get_inverse(prop):
+            self.model.remove(prop)
+
+
+def get_pset(element, pset_name):
+    """
+    Finds an element's property set by name.
+
+    Args:
+        element (IfcObject): The element.
+        pset_name (str): Name of the property set.
+
+    Returns:
+        IfcPropertySet: The property set, or None if the element does not have it.
+    """
+    for rel in getattr(element, "IsDefinedBy", ()):
+        if rel.is_a("IfcRelDefinesByProperties") and rel.RelatingPropertyDefinition.Name == pset_name:
+            return rel.RelatingPropertyDefinition
+    return None
+
+
+def create_value(model, value):
+    """
+    Wraps a plain Python value in the IFC measure type `pset.edit_pset` would infer for it.
+
+    Args:
+        model (ifcopenshell.file): The model to create the value in.
+        value: Property value.
+
+    Returns:
+        entity_instance: An IfcBoolean, IfcInteger, IfcReal or IfcLabel.
+    """
+    # bool must be tested before int, as bool is a subclass of int
+    if isinstance(value, bool):
+        return model.create_entity("IfcBoolean", value)
+    if isinstance(value, int):
+        return model.create_entity("IfcInteger", value)
+    if isinstance(value, float):
+        return model.create_entity("IfcReal", value)
+    return model.create_entity("IfcLabel", str(value))
+
+
+PSET_TEMPLATES = {
+    template.name: template for template in (
+        PsetTemplate(
+            "ReC_Pset_WallElementData",
+            ["Element_ID", "Wall_ID", "Local_ID", "Building_ID", "Product_ID", "Reinf_ID", "Wall_Type",
+             "Wing", "Floor_Num", "Orientation", "Grid_Pos", "Status", "Storage_Loc", "Links", "Notes"],
+            shared_properties=["Building_ID", "Wall_Type", "Wing", "Floor_Num", "Orientation", "Status",
+                               "Storage_Loc"]
+        ),
+        PsetTemplate(
+            "ReC_Pset_WallGeometryData",
+            ["Product_ID", "Reinf_Type", "Mirrored", "Count", "FootprintPolyline", "Height", "Length",
+             "Thickness", "Strength_Class", "Agg_Size", "Drawing", "Geometry_Notes", "Has_Void",
+             "Has_ExtPanels", "Has_Connections", "Has_Corbel"],
+            shared_properties=["Reinf_Type", "Mirrored", "Count", "Height", "Length", "Thickness",
+                               "Strength_Class", "Agg_Size", "Has_Void", "Has_ExtPanels", "Has_Connections",
+                               "Has_Corbel"]
+        ),
+        PsetTemplate(
+            "ReC_Pset_SlabElementData",
+            ["Product_ID", "Reinforcement_ID", "Count", "Height", "Length", "Width", "Void_Count",
+             "Void_Diameter", "Concrete_Cover", "External_Web_Thickness", "Concrete_Strength_Class",
+             "Max_Aggregate_Size", "Drawings", "Notes"],
+            shared_properties=["Count", "Height", "Length", "Width", "Void_Count", "Void_Diameter",
+                               "Concrete_Cover", "External_Web_Thickness", "Concrete_Strength_Class",
+                               "Max_Aggregate_Size"]
+        ),
+        PsetTemplate(
+            "ReC_Pset_ReuseMatch",
+            ["Demand_ID", "Stock_ID", "Waste_Ratio"]
+        ),
+    )
+}
@@ -0,0 +1,321 @@
+import ifcopenshell.guid
+import ifcopenshell.util.unit
+import numpy as np
+
+from ifc_library.inventory import Inventory, SlabInventory, SlabRecord, WallInventory, WallRecord
+from ifc_library.validation import WALL_DIMENSIONS
+
+# Density in kg/m³ of reinforced normal-weight concrete (EN 1991-1-1, Table A.1), used for
+# every strength class not given explicitly
+DEFAULT_DENSITY = 2500.0
+# Density in kg/m³ of the lightweight "LC" strength classes
+LIGHTWEIGHT_DENSITY = 1800.0
+
+# Quantity set name -> (quantity name, IFC quantity class) in write order. Values are computed
+# in m, m², m³ and kg from the record lengths in mm (see ifc_library.units), and written in
+# the project units.
+QUANTITY_SETS = {
+    "Qto_WallBaseQuantities": (
+        ("Length", "IfcQuantityLength"),
+        ("Width", "IfcQuantityLength"),
+        ("Height", "IfcQuantityLength"),
+        ("GrossFootprintArea", "IfcQuantityArea"),
+        ("NetFootprintArea", "IfcQuantityArea"),
+        ("GrossSideArea", "IfcQuantityArea"),
+        ("NetSideArea", "IfcQuantityArea"),
+        ("GrossVolume", "IfcQuantityVolume"),
+        ("NetVolume", "IfcQuantityVolume"),
+        ("GrossWeight", "IfcQuantityWeight"),
+        ("NetWeight", "IfcQuantityWeight"),
+    ),
+    "Qto_SlabBaseQuantities": (
+        ("Length", "IfcQuantityLength"),
+        ("Width", "IfcQuantityLength"),
+        ("Depth", "IfcQuantityLength"),
+        ("Perimeter", "IfcQuantityLength"),
+        ("GrossArea", "IfcQuantityArea"),
+        ("NetArea", "IfcQuantityArea"),
+        ("GrossVolume", "IfcQuantityVolume"),
+        ("NetVolume", "IfcQuantityVolume"),
+        ("GrossWeight", "IfcQuantityWeight"),
+        ("NetWeight", "IfcQuantityWeight"),
+    ),
+}
+
+# Quantity class -> (value attribute, unit type)
+QUANTITY_CLASSES = {
+    "IfcQuantityLength": ("LengthValue", "LENGTHUNIT"),
+    "IfcQuantityArea": ("AreaValue", "AREAUNIT"),
+    "IfcQuantityVolume": ("VolumeValue", "VOLUMEUNIT"),
+    "IfcQuantityWeight": ("WeightValue", "MASSUNIT"),
+}
+
+
+def density(strength_class, densities=None):
+    """
+    Density of a concrete strength class.
+
+    Args:
+        strength_class (str): Class such as "C30/37" or "LC25/28".
+        densities (dict): Strength class -> density in kg/m³, overriding the defaults.
+
+    Returns:
+        float: Density in kg/m³.
+    """
+    if densities and strength_class in densities:
+        return float(densities[strength_class])
+    if isinstance(strength_class, str) and strength_class.strip().upper().startswith("LC"):
+        return LIGHTWEIGHT_DENSITY
+    return DEFAULT_DENSITY
+
+
+def density_values(column, densities=None):
+    """
+    Density of every row of a categorical strength class column, looked up once per class.
+
+    Returns:
+        numpy.ndarray: Density in kg/m³ per row.
+    """
+    values = np.array([density(category, densities) for category in column.categories] + [density(None, densities)])
+    return values[column.codes]
+
+
+def wall_quantity_table(length, height, thickness, void_offsets, void_values, densities):
+    """
+    Computes the base quantities of many walls at once.
+
+    The openings are clipped to their wall, so an opening reaching past an edge only removes
+    the part inside it. Overlapping openings are counted twice; `validate_walls` rejects them.
+
+    Args:
+        length (numpy.ndarray): Wall lengths in mm.
+        height (numpy.ndarray): Wall heights in mm.
+        thickness (numpy.ndarray): Wall thicknesses in mm.
+        void_offsets (numpy.ndarray): Start of each wall's voids in `void_values`, plus the end.
+        void_values (numpy.ndarray): X, Y, Z, Width, Height, Depth rows of the voids in mm.
+        densities (numpy.ndarray): Density of each wall in kg/m³.
+
+    Returns:
+        dict: Quantity name -> NumPy array, in m, m², m³ and kg.
+    """
+    length, height, thickness = (np.asarray(values, dtype=np.float64) for values in (length, height, thickness))
+    count = len(length)
+    walls = np.repeat(np.arange(count), np.diff(void_offsets))
+    x, y, z, width, void_height, depth = np.asarray(void_values, dtype=np.float64).reshape(-1, 6).T
+
+    # Extent of each opening inside its wall, along the wall, across it and up
+    along = overlap(x, x + width, length[walls])
+    across = overlap(y, y + depth, thickness[walls])
+    up = overlap(z, z + void_height, height[walls])
+    # Openings starting at the face through which the side area is measured, and at the base
+    through_face = (y <= 0) & (across > 0)
+    at_base = (z <= 0) & (up > 0)
+
+    opening_volume = np.bincount(walls, along * across * up, count)
+    opening_side = np.bincount(walls, along * up * through_face, count)
+    opening_footprint = np.bincount(walls, along * across * at_base, count)
+
+    gross_volume = length * height * thickness * 1e-9
+    net_volume = gross_volume - opening_volume * 1e-9
+    return {
+        "Length": length * 1e-3,
+        "Width": thickness * 1e-3,
+        "Height": height * 1e-3,
+        "GrossFootprintArea": length * thickness * 1e-6,
+        "NetFootprintArea": (length * thickness - opening_footprint) * 1e-6,
+        "GrossSideArea": length * height * 1e-6,
+        "NetSideArea": (length * height - opening_side) * 1e-6,
+        "GrossVolume": gross_volume,
+        "NetVolume": net_volume,
+        "GrossWeight": gross_volume * densities,
+        "NetWeight": net_volume * densities,
+    }
+
+
+def slab_quantity_table(length, width, height, void_count, void_diameter, densities):
+    """
+    Computes the base quantities of many slabs at once, net of their hollow cores.
+
+    Args:
+        length (numpy.ndarray): Slab lengths in mm, along the cores.
+        width (numpy.ndarray): Slab widths in mm.
+        height (numpy.ndarray): Slab heights in mm.
+        void_count (numpy.ndarray): Number of cores per slab.
+        void_diameter (numpy.ndarray): Core diameters in mm.
+        densities (numpy.ndarray): Density of each slab in kg/m³.
+
+    Returns:
+        dict: Quantity name -> NumPy array, in m, m², m³ and kg.
+    """
+    length, width, height = (np.asarray(values, dtype=np.float64) for values in (length, width, height))
+    void_count = np.nan_to_num(np.asarray(void_count, dtype=np.float64))
+    void_diameter = np.nan_to_num(np.asarray(void_diameter, dtype=np.float64))
+
+    section = width * height
+    net_section = section - void_count * np.pi * void_diameter ** 2 / 4
+    gross_volume = section * length * 1e-9
+    net_volume = net_section * length * 1e-9
+    return {
+        "Length": length * 1e-3,
+        "Width": width * 1e-3,
+        "Depth": height * 1e-3,
+        "Perimeter": 2 * (length + width) * 1e-3,
+        "GrossArea": length * width * 1e-6,
+        # The cores run inside the slab and do not reduce its top face
+        "NetArea": length * width * 1e-6,
+        "GrossVolume": gross_volume,
+        "NetVolume": net_volume,
+        "GrossWeight": gross_volume * densities,
+        "NetWeight": net_volume * densities,
+    }
+
+
+def overlap(start, end, size):
+    # Length of [start, end] inside [0, size]
+    return np.clip(np.minimum(end, size) - np.maximum(start, 0.0), 0.0, None)
+
+
+def wall_quantities(records, densities=None):
+    """
+    Computes the base quantities of a whole wall inventory.
+
+    Args:
+        records (WallInventory or iterable of dict): Inventory, or records as accepted by
+                                                     `IFCManager.add_walls_bulk`.
+        densities (dict): Strength class -> density in kg/m³, see `density`.
+
+    Returns:
+        dict: Qto_WallBaseQuantities name -> NumPy array, in m, m², m³ and kg.
+    """
+    inventory = records if isinstance(records, Inventory) else WallInventory.from_records(records, strict=False)
+    length, height, thickness = (
+        np.nan_to_num(inventory.column(name, "geometry_data").astype(np.float64), nan=default)
+        for name, default in WALL_DIMENSIONS
+    )
+    return wall_quantity_table(length, height, thickness, inventory.void_offsets, inventory.void_values,
+                               density_values(inventory.column("Strength_Class"), densities))
+
+
+def slab_quantities(records, densities=None):
+    """
+    Computes the base quantities of a whole slab inventory.
+
+    Args:
+        records (SlabInventory or iterable of dict): Inventory, or records as accepted by
+                                                     `IFCManager.add_slabs_bulk`.
+        densities (dict): Strength class -> density in kg/m³, see `density`.
+
+    Returns:
+        dict: Qto_SlabBaseQuantities name -> NumPy array, in m, m², m³ and kg.
+    """
+    inventory = records if isinstance(records, Inventory) else SlabInventory.from_records(records, strict=False)
+    return slab_quantity_table(inventory.column("Length"), inventory.column("Width"), inventory.column("Height"),
+                               inventory.column("Void_Count"), inventory.column("Void_Diameter"),
+                               density_values(inventory.column("Concrete_Strength_Class"), densities))
+
+
+def record_inventory(records, inventory_class, record_class):
+    # Inventory of a batch of records: the rows of their inventory, or the records packed
+    if records and all(isinstance(record, record_class) for record in records):
+        inventory = records[0].inventory
+        if all(record.inventory is inventory for record in records):
+            return inventory.select(np.array([record.index for record in records], dtype=np.int64))
+    return inventory_class.from_records(records, strict=False)
+
+
+class QuantityWriter:
+    """
+    Attaches computed base quantities to elements as IfcElementQuantity sets.
+
+    Elements with the same dimensions, openings and density have the same quantities, so one
+    set is created per unique row of values and shared by all of them through a single
+    IfcRelDefinesByProperties, and reused by later batches. Shared sets must be replaced,
+    never edited in place.
+    """
+
+    def __init__(self, ifc_manager, densities=None):
+        """
+        Args:
+            ifc_manager (IFCManager): The manager whose model the quantities are added to.
+            densities (dict): Strength class -> density in kg/m³, see `density`.
+        """
+        self.ifc_manager = ifc_manager
+        self.model = ifc_manager.model
+        self.densities = densities
+        self.unit_scales = {
+            unit_type: ifcopenshell.util.unit.calculate_unit_scale(self.model, unit_type)
+            for _, unit_type in QUANTITY_CLASSES.values()
+        }
+        # (set name, values) -> IfcElementQuantity
+        self.quantity_sets = {}
+
+    def write_walls(self, elements, records):
+        """
+        Adds Qto_WallBaseQuantities to walls.
+
+        Args:
+            elements (list): The IfcWall entities.
+            records (list or WallInventory): Their records, in the same order.
+        """
+        if not isinstance(records, Inventory):
+            records = record_inventory(list(records), WallInventory, WallRecord)
+        self.write(elements, "Qto_WallBaseQuantities", wall_quantities(records, self.densities))
+
+    def write_slabs(self, elements, records):
+        """
+        Adds Qto_SlabBaseQuantities to slabs.
+
+        Args:
+            elements (list): The IfcSlab entities.
+            records (list or SlabInventory): Their records, in the same order.
+        """
+        if not isinstance(records, Inventory):
+            records = record_inventory(list(records), SlabInventory, SlabRecord)
+        self.write(elements, "Qto_SlabBaseQuantities", slab_quantities(records, self.densities))
+
+    def write(self, elements, qto_name, table):
+        """
+        Adds a quantity set to each element, shared between elements with equal values.
+
+        Args:
+            elements (list): The elements.
+            qto_name (str): Name of a set of QUANTITY_SETS.
+            table (dict): Quantity name -> NumPy array of SI values, one per element.
+
+        Returns:
+            list: The quantity set of each element.
+        """
+        layout = QUANTITY_SETS[qto_name]
+        values = np.column_stack([
+            np.asarray(table[name], dtype=np.float64) / self.unit_scales[QUANTITY_CLASSES[quantity_class][1]]
+            for name, quantity_class in layout
+        ])
+        # Rounded so that float noise does not split equal geometries
+        values = np.round(values, 6)
+        unique, inverse = np.unique(values, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(unique)))[:-1]
+
+        quantity_sets = []
+        for row, group in zip(unique, np.split(order, bounds)):
+            quantity_set = self.get_quantity_set(qto_name, layout, row)
+            self.model.createIfcRelDefinesByProperties(
+                ifcopenshell.guid.new(), None, None, None, [elements[i] for i in group.tolist()], quantity_set)
+            quantity_sets.append(quantity_set)
+        return [quantity_sets[i] for i in inverse.tolist()]
+
+    def get_quantity_set(self, qto_name, layout, row):
+        key = (qto_name, row.tobytes())
+        quantity_set = self.quantity_sets.get(key)
+        if quantity_set is None:
+            quantities = []
+            for (name, quantity_class), value in zip(layout, row.tolist()):
+                if value != value:
+                    continue
+                attribute = QUANTITY_CLASSES[quantity_class][0]
+                quantities.append(self.model.create_entity(quantity_class, Name=name, **{attribute: value}))
+            quantity_set = self.model.createIfcElementQuantity(
+                ifcopenshell.guid.new(), None, qto_name, None, "BaseQuantities", quantities)
+            self.quantity_sets[key] = quantity_set
+        return quantity_set
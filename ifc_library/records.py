@@ -0,0 +1,80 @@
+import csv
+import json
+import os
+
+
+def read_records(path):
+    """
+    Streams element records from a CSV or JSON-lines inventory file.
+
+    Args:
+        path (str): Path to a `.csv`, `.jsonl` or `.ndjson` file.
+
+    Returns:
+        iterator of dict: Records holding `element_data` and `geometry_data`.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return read_csv(path)
+    if extension in (".jsonl", ".ndjson"):
+        return read_jsonl(path)
+    raise ValueError(f"Unsupported inventory format: {path}")
+
+
+def read_jsonl(path):
+    """
+    Streams records from a JSON-lines file, one record object per line.
+
+    Args:
+        path (str): Path to the JSON-lines file.
+
+    Yields:
+        dict: One record per non-empty line.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_csv(path):
+    """
+    Streams records from a CSV file.
+
+    Columns are named `element_data.<Field>` or `geometry_data.<Field>`; columns without a
+    prefix go to `element_data`. Cells are parsed as JSON where possible so numbers, booleans
+    and the `Voids` list keep their types, empty cells are dropped.
+
+    Args:
+        path (str): Path to the CSV file.
+
+    Yields:
+        dict: One record per row.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            record = {"element_data": {}, "geometry_data": {}}
+            for column, cell in row.items():
+                if cell is None or cell == "":
+                    continue
+                section, _, field = column.rpartition(".")
+                record[section or "element_data"][field] = parse_cell(cell)
+            yield record
+
+
+def parse_cell(cell):
+    """
+    Converts a CSV cell to the Python value it represents.
+
+    Args:
+        cell (str): Raw cell text.
+
+    Returns:
+        The parsed number, boolean or list, or the original string.
+    """
+    if cell in ("True", "False"):
+        return cell == "True"
+    try:
+        return json.loads(cell)
+    except ValueError:
+        return cell
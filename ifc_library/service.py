@@ -0,0 +1,437 @@
+"""
+Local IFC generation service.
+
+Accepts wall and slab records over HTTP, as `create_wall_from_data` and the bulk builder take
+them, and builds each submission into one IFC model in a pool of warm worker processes:
+
+    python -m ifc_library.service --port 8765 --workers 4 --static gui/web_assembly
+
+    POST /jobs              one record, a list of records, or {"walls": [...], "slabs": [...]}
+    POST /jobs?wait=10      the same, answered with the IFC file if it is built within 10 s
+    GET  /jobs/<id>         job status
+    GET  /jobs/<id>/file    the IFC file of a finished job
+    GET  /health            queue length, workers and latency percentiles
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from ifc_library.validation import validate_slabs, validate_walls
+
+STATIC_TYPES = {".html": "text/html", ".js": "text/javascript", ".css": "text/css"}
+
+# Manager built by the worker ahead of its next job, see warm_worker
+_spare_manager = None
+
+
+class ServiceBusy(Exception):
+    """
+    Raised when a submission would exceed the pending job limit.
+    """
+
+
+class Job:
+    """
+    One submission: its records are built into one model in a worker process.
+    """
+
+    def __init__(self, job_id, file_path, wall_count, slab_count):
+        self.id = job_id
+        self.file_path = file_path
+        self.wall_count = wall_count
+        self.slab_count = slab_count
+        self.submitted = time.perf_counter()
+        self.finished = None
+        self.future = None
+        self.result = None
+        self.error = None
+
+    @property
+    def status(self):
+        if self.error is not None:
+            return "failed"
+        if self.result is not None:
+            return "done"
+        return "running" if self.future is not None and self.future.running() else "queued"
+
+    def to_dict(self):
+        data = {"job": self.id, "status": self.status, "walls": self.wall_count, "slabs": self.slab_count,
+                "url": f"/jobs/{self.id}"}
+        if self.result is not None:
+            data.update(self.result)
+            data["file"] = f"/jobs/{self.id}/file"
+            data["latency"] = self.finished - self.submitted
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class GenerationService:
+    """
+    Queues generation jobs into a pool of warm worker processes.
+
+    Every worker imports the library and builds the IFCManager skeleton once when it starts,
+    then keeps a manager built ahead of its next job, so a request never pays for a cold
+    start. At most `max_pending` jobs are queued or running; further submissions are refused
+    with ServiceBusy so that clients back off instead of queueing unbounded work, which keeps
+    the latency of accepted jobs predictable. Workers are replaced after `recycle_after`
+    jobs, as ifcopenshell does not hand the memory of discarded models back to the system.
+    """
+
+    def __init__(self, output_dir=None, workers=None, max_pending=64, max_jobs=1000, recycle_after=200,
+                 share_geometry=True):
+        """
+        Args:
+            output_dir (str): Directory the IFC files are written to, defaults to a temporary directory.
+            workers (int): Number of worker processes, defaults to the number of CPUs.
+            max_pending (int): Largest number of jobs queued or running at a time.
+            max_jobs (int): Number of finished jobs kept; the oldest ones and their files are dropped.
+            recycle_after (int): Jobs a worker process runs before it is replaced.
+            share_geometry (bool): Map shared type representations, see `IFCManager.add_walls_bulk`.
+        """
+        self.temp_dir = None
+        if output_dir is None:
+            self.temp_dir = tempfile.TemporaryDirectory(prefix="ifc_service_")
+            output_dir = self.temp_dir.name
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.share_geometry = share_geometry
+        self.executor = ProcessPoolExecutor(self.workers, initializer=warm_worker, max_tasks_per_child=recycle_after)
+        self.jobs = OrderedDict()
+        self.pending = 0
+        self.completed = 0
+        self.latencies = deque(maxlen=1000)
+        self.lock = threading.Lock()
+
+    def submit(self, walls=(), slabs=()):
+        """
+        Queues the records of one submission, to be built into one model.
+
+        Args:
+            walls (list of dict): Wall records holding `element_data` and `geometry_data`.
+            slabs (list of dict): Slab records holding `element_data`.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            ServiceBusy: If `max_pending` jobs are already queued or running.
+        """
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise ServiceBusy(f"{self.pending} jobs pending")
+            self.pending += 1
+        job_id = uuid.uuid4().hex
+        job = Job(job_id, os.path.join(self.output_dir, f"{job_id}.ifc"), len(walls), len(slabs))
+        try:
+            job.future = self.executor.submit(generate, job.file_path, list(walls), list(slabs), self.share_geometry)
+        except Exception:
+            with self.lock:
+                self.pending -= 1
+            raise
+        # Only visible to GET /jobs/<id> once it has its future
+        with self.lock:
+            self.jobs[job_id] = job
+            self.evict()
+        job.future.add_done_callback(lambda future: self.finish(job, future))
+        return job
+
+    def finish(self, job, future):
+        error = future.exception()
+        with self.lock:
+            job.finished = time.perf_counter()
+            if error is None:
+                job.result = future.result()
+                self.latencies.append(job.finished - job.submitted)
+            else:
+                job.error = f"{type(error).__name__}: {error}"
+            self.pending -= 1
+            self.completed += 1
+
+    def evict(self):
+        # Drops the oldest finished jobs beyond max_jobs, with their files
+        while len(self.jobs) > self.max_jobs:
+            job_id, job = next(iter(self.jobs.items()))
+            if job.finished is None:
+                break
+            del self.jobs[job_id]
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def wait(self, job, timeout):
+        """
+        Waits for a job to finish.
+
+        Returns:
+            bool: True if the job finished within the timeout.
+        """
+        try:
+            job.future.result(timeout)
+        except TimeoutError:
+            return False
+        except Exception:
+            pass
+        # The done callback may still be running in the executor's thread
+        deadline = time.perf_counter() + 1.0
+        while job.finished is None and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        return job.finished is not None
+
+    def stats(self):
+        with self.lock:
+            latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "latency_p50": float(np.percentile(latencies, 50)),
+                "latency_p99": float(np.percentile(latencies, 99))
+            }
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+        if self.temp_dir is not None:
+            self.temp_dir.cleanup()
+
+
+def warm_worker():
+    """
+    Process pool initializer: imports the builders and builds the first manager, which also
+    caches the model skeleton for every later one.
+    """
+    global _spare_manager
+    from ifc_library.ifc_manager import IFCManager
+    import ifc_library.bulk  # noqa: F401
+
+    _spare_manager = IFCManager(None)
+
+
+def take_manager(file_path):
+    # Hands out the manager built ahead of time, and builds the next one
+    global _spare_manager
+    from ifc_library.ifc_manager import IFCManager
+
+    manager = _spare_manager or IFCManager(None)
+    manager.file_path = file_path
+    _spare_manager = IFCManager(None)
+    return manager
+
+
+def generate(file_path, walls, slabs, share_geometry=True):
+    """
+    Worker function: builds the records of one job into one model and saves it.
+
+    Returns:
+        dict: Number of products, file size and build time.
+    """
+    start = time.perf_counter()
+    manager = take_manager(file_path)
+    if walls:
+        manager.add_walls_bulk(walls, share_geometry=share_geometry)
+    if slabs:
+        manager.add_slabs_bulk(slabs, share_geometry=share_geometry)
+    manager.save()
+    return {
+        "products": len(manager.model.by_type("IfcProduct")),
+        "file_size": os.path.getsize(file_path),
+        "build_time": time.perf_counter() - start
+    }
+
+
+def parse_submission(data):
+    """
+    Splits a request body into wall and slab records.
+
+    Args:
+        data: One wall record, a list of wall records, or {"walls": [...], "slabs": [...]}.
+
+    Returns:
+        tuple: The wall records and the slab records.
+    """
+    if isinstance(data, list):
+        return data, []
+    if isinstance(data, dict) and ("walls" in data or "slabs" in data):
+        return list(data.get("walls") or []), list(data.get("slabs") or [])
+    if isinstance(data, dict):
+        return [data], []
+    raise ValueError("Expected a record, a list of records or an object with walls and slabs")
+
+
+def validation_errors(walls, slabs):
+    # Per-record errors of the submission, None if it can be built
+    errors = {}
+    for name, records, validate in (("walls", walls, validate_walls), ("slabs", slabs, validate_slabs)):
+        if records:
+            report = validate(records)
+            if not report.is_valid:
+                errors[name] = report.by_row()
+    return errors or None
+
+
+class GenerationHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front of a GenerationService, set as the `service` class attribute by `serve`.
+    """
+
+    service = None
+    static_dir = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_OPTIONS(self):
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.send_cors_headers()
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+        wait = parse_qs(url.query).get("wait", ["0"])[0] or "0"
+        try:
+            wait = float(wait)
+        except ValueError:
+            return self.send_json(HTTPStatus.BAD_REQUEST, {"error": f"wait is not a number: {wait!r}"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            walls, slabs = parse_submission(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as error:
+            return self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+
+        try:
+            errors = validation_errors(walls, slabs)
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            # E.g. records, or their element_data and geometry_data, that are not JSON objects
+            return self.send_json(HTTPStatus.BAD_REQUEST, {"error": f"Malformed records: {error}"})
+        if errors is not None:
+            return self.send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": "Invalid records", "records": errors})
+        try:
+            job = self.service.submit(walls, slabs)
+        except ServiceBusy as error:
+            return self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(error)}, {"Retry-After": "1"})
+
+        if wait > 0 and self.service.wait(job, wait):
+            if job.error is not None:
+                return self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, job.to_dict())
+            return self.send_file(job)
+        self.send_json(HTTPStatus.ACCEPTED, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip("/")
+        if path == "/health":
+            return self.send_json(HTTPStatus.OK, self.service.stats())
+        parts = path.split("/")
+        if len(parts) in (3, 4) and parts[1] == "jobs":
+            job = self.service.get(parts[2])
+            if job is None:
+                return self.send_json(HTTPStatus.NOT_FOUND, {"error": "Unknown job"})
+            if len(parts) == 3:
+                return self.send_json(HTTPStatus.OK, job.to_dict())
+            if parts[3] == "file":
+                if job.status != "done":
+                    return self.send_json(HTTPStatus.CONFLICT, job.to_dict())
+                return self.send_file(job)
+        if self.static_dir is not None:
+            return self.send_static(path)
+        self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def send_cors_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Access-Control-Expose-Headers", "Location, Content-Disposition, X-Job-Id")
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_cors_headers()
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_file(self, job):
+        with open(job.file_path, "rb") as f:
+            body = f.read()
+        self.send_response(HTTPStatus.OK)
+        self.send_cors_headers()
+        self.send_header("Content-Type", "application/x-step")
+        self.send_header("Content-Disposition", f'attachment; filename="{job.id}.ifc"')
+        self.send_header("X-Job-Id", job.id)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_static(self, path):
+        # Serves the frontend, e.g. gui/web_assembly, without leaving its directory
+        root = os.path.realpath(self.static_dir)
+        file_path = os.path.realpath(os.path.join(root, path.lstrip("/") or "index.html"))
+        if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+            return self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+        with open(file_path, "rb") as f:
+            body = f.read()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", STATIC_TYPES.get(os.path.splitext(file_path)[1], "application/octet-stream"))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host="127.0.0.1", port=8765, static_dir=None, **service_options):
+    """
+    Runs the generation service until interrupted.
+
+    Args:
+        host (str): Interface to listen on. Defaults to local connections only.
+        port (int): Port to listen on.
+        static_dir (str): Directory of the frontend to serve at `/`, e.g. "gui/web_assembly".
+        **service_options: Options of GenerationService.
+    """
+    service = GenerationService(**service_options)
+    handler = type("Handler", (GenerationHandler,), {"service": service, "static_dir": static_dir})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"IFC generation service listening on http://{host}:{port} with {service.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve IFC generation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the CPU count")
+    parser.add_argument("--max-pending", type=int, default=64, help="Jobs queued or running before clients are refused")
+    parser.add_argument("--output", help="Directory the IFC files are kept in, defaults to a temporary directory")
+    parser.add_argument("--static", help="Frontend directory served at /, e.g. gui/web_assembly")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.static, output_dir=args.output, workers=args.workers, max_pending=args.max_pending)
@@ -0,0 +1,183 @@
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ifcopenshell
+
+from ifc_library.bulk import BulkReport
+from ifc_library.ifc_manager import IFCManager
+
+SHARD_KEYS = ("Building_ID", "Wing", "Floor_Num")
+
+# Either a STEP string literal, which is copied as is, or an entity reference
+STEP_TOKEN = re.compile(r"'(?:[^']|'')*'|#(\d+)")
+
+
+def partition_records(records, keys=SHARD_KEYS):
+    """
+    Groups element records by the values of their partition keys.
+
+    Args:
+        records (iterable of dict): Records holding `element_data`.
+        keys (tuple): `element_data` fields the shards are keyed on. Missing fields group as None.
+
+    Returns:
+        dict: Shard key tuple to the list of records in that shard.
+    """
+    shards = {}
+    for record in records:
+        element_data = record.get("element_data", {})
+        shards.setdefault(tuple(element_data.get(key) for key in keys), []).append(record)
+    return shards
+
+
+def build_sharded(file_path, wall_records=(), slab_records=(), processes=None, keys=SHARD_KEYS,
+                  batch_size=1000, share_geometry=True, intern_property_values=False):
+    """
+    Builds an inventory in parallel, one shard per partition key, and merges the shards into one model.
+
+    Every worker starts from the same serialized skeleton (project, units, contexts and site
+    created by `setup_ifc_model`, with every building and storey of the inventory, see
+    `hierarchy_skeleton`), so the skeleton entities carry the same STEP ids in every shard.
+    The merge keeps the skeleton once and appends each shard's own entities with their ids
+    offset, leaving references to the skeleton untouched. The renumbering runs in the pool
+    too, only the final parse of the merged model is serial.
+    Shared types are cached per worker, so identical geometry built in different shards
+    gets one type per shard.
+
+    When using the default spawn/forkserver start methods, call this from under an
+    `if __name__ == "__main__":` guard.
+
+    Args:
+        file_path (str): Path the merged model is saved to.
+        wall_records (iterable of dict): Wall records, as accepted by `IFCManager.add_walls_bulk`.
+        slab_records (iterable of dict): Slab records, as accepted by `IFCManager.add_slabs_bulk`.
+        processes (int): Number of worker processes, defaults to the number of CPUs.
+        keys (tuple): `element_data` fields the inventory is partitioned on.
+        batch_size (int): Bulk builder batch size in each worker.
+        share_geometry (bool): Map shared type representations in each worker.
+        intern_property_values (bool): Share low-cardinality property values in each worker.
+
+    Returns:
+        tuple: The IFCManager holding the merged model, and a BulkReport of the whole build.
+    """
+    start = time.perf_counter()
+    shards = {}
+    for key, records in partition_records(wall_records, keys).items():
+        shards.setdefault(key, ([], []))[0].extend(records)
+    for key, records in partition_records(slab_records, keys).items():
+        shards.setdefault(key, ([], []))[1].extend(records)
+    skeleton, skeleton_size = hierarchy_skeleton(shards.values())
+
+    jobs = [(skeleton, walls, slabs, batch_size, share_geometry, intern_property_values)
+            for walls, slabs in shards.values()]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        shard_data = list(executor.map(build_shard, jobs))
+
+        renumber_jobs = []
+        offset = 0
+        for data, highest_id in shard_data:
+            renumber_jobs.append((data, skeleton_size, offset))
+            offset += highest_id - skeleton_size
+        shard_data = list(executor.map(renumber_shard, renumber_jobs))
+
+    model = merge_shards(skeleton, shard_data)
+    manager = IFCManager(file_path, intern_property_values=intern_property_values, model=model)
+
+    report = BulkReport("walls and slabs")
+    report.count = sum(len(walls) + len(slabs) for walls, slabs in shards.values())
+    report.batches = len(shards)
+    report.elapsed = time.perf_counter() - start
+    print(report)
+    return manager, report
+
+
+def hierarchy_skeleton(shards):
+    """
+    Serializes a new model holding the buildings and storeys of every record of every shard.
+
+    The merge keeps the skeleton lines of a single shard only, so buildings and storeys have to
+    be created here, once, rather than by the shard that first needs them: each shard would
+    otherwise create its own copy, aggregated by an edit to the skeleton's site relationship
+    that the merge drops. Workers bind them by name, see `SpatialHierarchy.build`.
+
+    Args:
+        shards (iterable of tuple): Wall records and slab records of each shard.
+
+    Returns:
+        tuple: The skeleton STEP string and its highest entity id.
+    """
+    manager = IFCManager(None)
+    hierarchy = manager.get_hierarchy()
+    for walls, slabs in shards:
+        for record in walls:
+            hierarchy.container(record)
+        for record in slabs:
+            hierarchy.container(record)
+    return manager.model.to_string(), max(entity.id() for entity in manager.model)
+
+
+def build_shard(job):
+    """
+    Process pool worker building one shard on top of the shared skeleton.
+
+    Args:
+        job (tuple): Skeleton STEP string, wall records, slab records, batch size,
+                     share_geometry and intern_property_values flags.
+
+    Returns:
+        tuple: The DATA section lines of the shard model and its highest entity id.
+    """
+    skeleton, walls, slabs, batch_size, share_geometry, intern_property_values = job
+    manager = IFCManager(None, intern_property_values=intern_property_values,
+                         model=ifcopenshell.file.from_string(skeleton))
+    if walls:
+        manager.add_walls_bulk(walls, batch_size=batch_size, share_geometry=share_geometry)
+    if slabs:
+        manager.add_slabs_bulk(slabs, batch_size=batch_size, share_geometry=share_geometry)
+    return data_section(manager.model.to_string()), max(entity.id() for entity in manager.model)
+
+
+def renumber_shard(job):
+    """
+    Process pool worker dropping the skeleton lines of a shard and offsetting its own entity ids.
+
+    Args:
+        job (tuple): Shard DATA section lines, highest skeleton entity id and the id offset.
+
+    Returns:
+        str: The renumbered shard entity lines.
+    """
+    data, skeleton_size, offset = job
+
+    def renumber(match):
+        reference = match.group(1)
+        if reference is None or int(reference) <= skeleton_size:
+            return match.group(0)
+        return f"#{int(reference) + offset}"
+
+    lines = [line for line in data.splitlines(True) if int(line[1:line.index("=")]) > skeleton_size]
+    return STEP_TOKEN.sub(renumber, "".join(lines))
+
+
+def merge_shards(skeleton, shard_data):
+    """
+    Concatenates renumbered shard entity lines onto the skeleton.
+
+    Args:
+        skeleton (str): STEP string of the shared skeleton model.
+        shard_data (list of str): Entity lines of each shard, as returned by `renumber_shard`.
+
+    Returns:
+        ifcopenshell.file: The merged model.
+    """
+    header = skeleton[:skeleton.index("DATA;\n")]
+    parts = [header, "DATA;\n", data_section(skeleton)]
+    parts.extend(shard_data)
+    parts.append("ENDSEC;\nEND-ISO-10303-21;\n")
+    return ifcopenshell.file.from_string("".join(parts))
+
+
+def data_section(step):
+    # Entity lines between DATA; and ENDSEC;, one entity per line as written by ifcopenshell
+    return step[step.index("DATA;\n") + len("DATA;\n"):step.rindex("ENDSEC;")]
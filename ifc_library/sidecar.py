@@ -0,0 +1,392 @@
+"""
+Columnar sidecar of the ReC_Pset_* data of a model.
+
+The sidecar is an uncompressed NumPy `.npz` archive with one member per column, so a column
+is read by memory-mapping its bytes inside the archive, without parsing the STEP file or
+loading the other columns:
+
+    manager.export_sidecar("model.npz")
+    sidecar = Sidecar("model.npz")
+    lengths = sidecar.column("IfcWall", "ReC_Pset_WallGeometryData", "Length")
+
+Members are named `<IFC class>/<pset>/<property>.<part>`: numbers and booleans are stored as
+`values` (with a `mask` of the missing rows if any), text as categorical `codes` into
+`categories`. `<IFC class>/GlobalId` holds the GlobalIds, `__schema__` the layout as JSON.
+"""
+
+import json
+import os
+import struct
+import time
+import zipfile
+
+import numpy as np
+
+from ifc_library.inventory import REQUIRED, SLAB_ELEMENT_FIELDS, WALL_ELEMENT_FIELDS, WALL_GEOMETRY_FIELDS
+from ifc_library.pset_templates import PSET_TEMPLATES
+
+# IFC class -> (pset name, record section, field specs) of the exported property sets
+SIDECAR_PSETS = {
+    "IfcWall": (
+        ("ReC_Pset_WallElementData", "element_data", WALL_ELEMENT_FIELDS),
+        ("ReC_Pset_WallGeometryData", "geometry_data", WALL_GEOMETRY_FIELDS),
+    ),
+    "IfcSlab": (
+        ("ReC_Pset_SlabElementData", "element_data", SLAB_ELEMENT_FIELDS),
+    ),
+}
+
+SIDECAR_VERSION = 1
+COLUMN_PARTS = ("values", "mask", "codes", "categories")
+
+
+class SidecarReport:
+    """
+    Size and duration of a sidecar export.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.counts = {}
+        self.columns = 0
+        self.file_size = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        counts = ", ".join(f"{count} {ifc_class}" for ifc_class, count in self.counts.items())
+        return (f"Exported {self.columns} columns of {counts or 'no elements'} to {self.file_path}: "
+                f"{self.file_size / 1e6:.1f} MB, {self.elapsed:.2f}s")
+
+
+def write_sidecar(model, file_path):
+    """
+    Writes the ReC_Pset_* values and GlobalIds of every wall and slab to a columnar `.npz` file.
+
+    Args:
+        model (ifcopenshell.file): The model.
+        file_path (str): Output path, normally ending in `.npz`.
+
+    Returns:
+        SidecarReport: Elements and columns written, file size and elapsed time.
+    """
+    start = time.perf_counter()
+    report = SidecarReport(file_path)
+
+    arrays = {}
+    schema = {"version": SIDECAR_VERSION, "classes": {}}
+    for ifc_class, (global_ids, psets) in read_columns(model).items():
+        report.counts[ifc_class] = len(global_ids)
+        arrays[f"{ifc_class}/GlobalId"] = np.array(global_ids, dtype="S22")
+        columns = schema["classes"][ifc_class] = {"count": len(global_ids), "psets": {}}
+        for pset_name, pset_columns in psets.items():
+            kinds = columns["psets"][pset_name] = {}
+            for name, (kind, parts) in pset_columns.items():
+                kinds[name] = kind
+                for part, array in parts.items():
+                    arrays[f"{ifc_class}/{pset_name}/{name}.{part}"] = array
+                report.columns += 1
+
+    arrays["__schema__"] = np.array(json.dumps(schema))
+    # Stored uncompressed, so that the members can be memory-mapped
+    with open(file_path, "wb") as f:
+        np.savez(f, **arrays)
+    report.file_size = os.path.getsize(file_path)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def read_columns(model):
+    """
+    Reads the ReC_Pset_* values of every wall and slab of a model as encoded columns.
+
+    The property sets are collected in one pass over the IfcRelDefinesByProperties of the
+    model, rather than per element.
+
+    Args:
+        model (ifcopenshell.file): The model.
+
+    Returns:
+        dict: IFC class -> (GlobalIds, pset name -> property name -> (kind, arrays)), see
+              `encode_column`, for the classes the model has elements of.
+    """
+    pset_classes = {pset_name: ifc_class for ifc_class, psets in SIDECAR_PSETS.items() for pset_name, _, _ in psets}
+
+    # IFC class -> element id -> row, and (IFC class, pset) -> rows and property dicts
+    rows = {ifc_class: {} for ifc_class in SIDECAR_PSETS}
+    elements = {ifc_class: [] for ifc_class in SIDECAR_PSETS}
+    pset_rows = {}
+    for rel in model.by_type("IfcRelDefinesByProperties"):
+        pset = rel.RelatingPropertyDefinition
+        ifc_class = pset_classes.get(pset.Name)
+        if ifc_class is None:
+            continue
+        # Positional access (Name, NominalValue, wrappedValue) avoids the attribute name lookups
+        values = {prop[0]: value[0] if (value := prop[2]) is not None else None for prop in pset.HasProperties}
+        row_lists = pset_rows.setdefault((ifc_class, pset.Name), ([], []))
+        class_rows = rows[ifc_class]
+        for element in rel.RelatedObjects:
+            row = class_rows.get(element.id())
+            if row is None:
+                row = class_rows[element.id()] = len(elements[ifc_class])
+                elements[ifc_class].append(element)
+            row_lists[0].append(row)
+            row_lists[1].append(values)
+
+    tables = {}
+    for ifc_class, psets in SIDECAR_PSETS.items():
+        count = len(elements[ifc_class])
+        if not count:
+            continue
+        columns = {}
+        for pset_name, _, _ in psets:
+            element_rows, property_dicts = pset_rows.get((ifc_class, pset_name), ([], []))
+            names = list(PSET_TEMPLATES[pset_name].property_names)
+            known = set(names)
+            for properties in property_dicts:
+                names.extend(name for name in properties if name not in known and not known.add(name))
+            columns[pset_name] = {}
+            for name in names:
+                values = [None] * count
+                for row, properties in zip(element_rows, property_dicts):
+                    values[row] = properties.get(name)
+                columns[pset_name][name] = encode_column(values)
+        tables[ifc_class] = ([element.GlobalId for element in elements[ifc_class]], columns)
+    return tables
+
+
+def encode_column(values):
+    """
+    Encodes one property column.
+
+    Args:
+        values (list): One value per row, None where an element lacks the property.
+
+    Returns:
+        tuple: The kind ("bool", "int", "float" or "text") and the arrays to store by part name.
+    """
+    types = {type(value) for value in values if value is not None}
+    missing = np.array([value is None for value in values], dtype=bool)
+    if types and types <= {bool}:
+        parts = {"values": np.array([bool(value) for value in values], dtype=bool)}
+        kind = "bool"
+    elif types and types <= {int}:
+        parts = {"values": np.array([value or 0 for value in values], dtype=np.int64)}
+        kind = "int"
+    elif types and types <= {int, float}:
+        return "float", {"values": np.array([np.nan if value is None else value for value in values], dtype=np.float64)}
+    else:
+        lookup = {}
+        codes = np.array([-1 if value is None else lookup.setdefault(str(value), len(lookup)) for value in values],
+                         dtype=np.int32)
+        return "text", {"codes": codes, "categories": np.array(list(lookup), dtype=str)}
+    if missing.any():
+        parts["mask"] = missing
+    return kind, parts
+
+
+class Sidecar:
+    """
+    Reader of a sidecar written by `write_sidecar`, memory-mapping each column on first use.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        # Member name -> offset of its .npy data in the archive
+        self.offsets = {}
+        self.arrays = {}
+        with zipfile.ZipFile(file_path) as archive, open(file_path, "rb") as f:
+            for info in archive.infolist():
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise ValueError(f"{file_path}: member {info.filename} is compressed and cannot be mapped")
+                # The data follows the local header, whose name and extra field lengths may
+                # differ from the central directory's
+                f.seek(info.header_offset + 26)
+                name_length, extra_length = struct.unpack("<HH", f.read(4))
+                self.offsets[info.filename[:-len(".npy")]] = info.header_offset + 30 + name_length + extra_length
+        self.schema = json.loads(str(self.load("__schema__")))
+
+    @property
+    def classes(self):
+        return list(self.schema["classes"])
+
+    def count(self, ifc_class):
+        return self.schema["classes"][ifc_class]["count"] if ifc_class in self.schema["classes"] else 0
+
+    def columns(self, ifc_class):
+        """
+        Returns:
+            dict: Pset name -> property name -> kind ("bool", "int", "float" or "text").
+        """
+        return self.schema["classes"][ifc_class]["psets"]
+
+    def load(self, name):
+        """
+        Memory-maps one member of the archive.
+
+        Args:
+            name (str): Member name without the `.npy` extension.
+
+        Returns:
+            numpy.ndarray: A read-only memory-mapped array, or a loaded one for a 0-d member.
+        """
+        array = self.arrays.get(name)
+        if array is not None:
+            return array
+        with open(self.file_path, "rb") as f:
+            f.seek(self.offsets[name])
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+            if not shape:
+                return np.fromfile(f, dtype=dtype, count=1).reshape(())
+        array = np.memmap(self.file_path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                          order="F" if fortran_order else "C")
+        self.arrays[name] = array
+        return array
+
+    def global_ids(self, ifc_class):
+        """
+        Returns:
+            numpy.ndarray: The GlobalIds of the elements of a class, as fixed-width bytes.
+        """
+        return self.load(f"{ifc_class}/GlobalId")
+
+    def column(self, ifc_class, pset_name, name):
+        """
+        Reads one property of every element of a class.
+
+        Args:
+            ifc_class (str): "IfcWall" or "IfcSlab".
+            pset_name (str): Property set name.
+            name (str): Property name.
+
+        Returns:
+            numpy.ndarray: Numbers and booleans as the memory-mapped array, masked where the
+            property is missing, floats with NaN for missing values, text as an object array
+            with None for missing values.
+        """
+        kind = self.columns(ifc_class)[pset_name][name]
+        prefix = f"{ifc_class}/{pset_name}/{name}"
+        if kind == "text":
+            categories = self.load(f"{prefix}.categories").tolist()
+            return np.array(categories + [None], dtype=object)[self.load(f"{prefix}.codes")]
+        values = self.load(f"{prefix}.values")
+        if f"{prefix}.mask" in self.offsets:
+            return np.ma.masked_array(values, self.load(f"{prefix}.mask"))
+        return values
+
+    def encoded(self, ifc_class, pset_name, name):
+        """
+        Returns:
+            tuple: The kind of a column and its memory-mapped arrays by part name, as
+                   `encode_column` returns them.
+        """
+        prefix = f"{ifc_class}/{pset_name}/{name}"
+        parts = {part: self.load(f"{prefix}.{part}") for part in COLUMN_PARTS if f"{prefix}.{part}" in self.offsets}
+        return self.columns(ifc_class)[pset_name][name], parts
+
+    def records(self, ifc_class):
+        """
+        Rebuilds the element records of a class, as accepted by `create_wall_from_data`,
+        `IFCManager.add_walls_bulk` or `IFCManager.add_slabs_bulk`.
+
+        Void layouts are not part of the property sets, so walls come back without voids.
+
+        Returns:
+            list of dict: One record per element, in GlobalId order.
+        """
+        count = self.count(ifc_class)
+        records = [{} for _ in range(count)]
+        for pset_name, section, fields in SIDECAR_PSETS.get(ifc_class, ()):
+            keys = {name: key for name, key, _, _ in fields}
+            for record in records:
+                record[section] = {}
+            for name in self.columns(ifc_class).get(pset_name, {}) if count else ():
+                column = self.column(ifc_class, pset_name, name)
+                values = column.tolist() if not np.ma.isMaskedArray(column) else column.tolist(None)
+                key = keys.get(name, name)
+                for record, value in zip(records, values):
+                    record[section][key] = value
+        return records
+
+
+def properties_record(ifc_class, properties):
+    """
+    Maps the ReC_Pset_* values of an element back onto a record.
+
+    Args:
+        ifc_class (str): "IfcWall" or "IfcSlab".
+        properties (dict): Pset name -> property name -> value.
+
+    Returns:
+        dict: Record holding the record sections of the class, keyed like the inventory
+              fields, with the field defaults for missing optional values.
+    """
+    record = {}
+    for pset_name, section, fields in SIDECAR_PSETS[ifc_class]:
+        values = properties.get(pset_name, {})
+        data = record[section] = {}
+        for name, key, _, default in fields:
+            value = values.get(name)
+            data[key] = default if value is None and default is not REQUIRED else value
+        known = {name for name, _, _, _ in fields}
+        data.update((name, value) for name, value in values.items() if name not in known)
+    return record
+
+
+def import_sidecar(ifc_manager, file_path, shared=False, place_on_grid=False):
+    """
+    Rebuilds the walls and slabs of a sidecar in a model through IFCWall and IFCSlab.
+
+    Each element keeps its GlobalId and gets its representation from its dimension
+    properties, its ReC_Pset_* sets and the storey of its Building_ID and Floor_Num. Void
+    layouts are not part of a sidecar, so the walls have no openings.
+
+    Args:
+        ifc_manager (IFCManager): The manager whose model receives the elements.
+        file_path (str): The sidecar.
+        shared (bool): Map shared type representations.
+        place_on_grid (bool): Place walls on the grid from their `Grid_Pos` and `Orientation`.
+
+    Returns:
+        list: The created IFCWall and IFCSlab objects.
+    """
+    # Imported here as the element classes import the manager
+    from ifc_library.elements.ifc_slab import IFCSlab
+    from ifc_library.elements.ifc_wall import IFCWall
+
+    sidecar = Sidecar(file_path)
+    created = []
+    for ifc_class in sidecar.classes:
+        global_ids = sidecar.global_ids(ifc_class).astype(str).tolist()
+        for global_id, record in zip(global_ids, sidecar.records(ifc_class)):
+            element_data = record.get("element_data", {})
+            if ifc_class == "IfcWall":
+                geometry_data = record["geometry_data"]
+                element = IFCWall(ifc_manager, name=element_data.get("Wall_ID"))
+                if place_on_grid and element_data.get("Grid_Pos") and element_data.get("Orientation"):
+                    element.place_on_grid(element_data["Grid_Pos"], element_data["Orientation"])
+                else:
+                    element.set_placement()
+                element.add_wall_representation(geometry_data.get("Length") or 5000.0,
+                                                 geometry_data.get("Height") or 3000.0,
+                                                 geometry_data.get("Thickness") or 300.0,
+                                                 mirrored=geometry_data.get("Mirrored"), shared=shared)
+                element.add_element_data(element_data)
+                element.add_geometry_data(geometry_data)
+            elif ifc_class == "IfcSlab":
+                element = IFCSlab(ifc_manager, name=element_data.get("Product ID"))
+                element.set_placement()
+                element.add_slab_representation(element_data["Length"], element_data["Width"], element_data["Height"],
+                                                element_data.get("Void Count") or 0,
+                                                element_data.get("Void Diameter") or 0.0, shared=shared)
+                element.add_element_data(element_data)
+            else:
+                continue
+            element.element.GlobalId = global_id
+            element.assign_to_container(ifc_manager.get_hierarchy().container(record))
+            created.append(element)
+    return created
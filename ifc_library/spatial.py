@@ -0,0 +1,447 @@
+import math
+import re
+
+import ifcopenshell.util.element
+import ifcopenshell.util.placement
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from ifc_library.units import record_unit_scale
+
+# Compass direction the outer face of a wall (the y = 0 side of its footprint) looks towards
+# -> rotation about the vertical axis in degrees, with North along +y
+ORIENTATION_ANGLES = {"South": 0.0, "East": 90.0, "North": 180.0, "West": 270.0}
+
+# Property set and length / width properties giving the footprint of an indexed element
+FOOTPRINT_PROPERTIES = {
+    "IfcWall": ("ReC_Pset_WallGeometryData", "Length", "Thickness"),
+    "IfcSlab": ("ReC_Pset_SlabElementData", "Length", "Width"),
+}
+
+GRID_POSITION = re.compile(r"^\s*([A-Za-z]+)\s*-?\s*(\d+)\s*$")
+
+
+class Grid:
+    """
+    Structural grid mapping `Grid_Pos` values such as "C12" to plan positions.
+
+    Letters number the grid lines along x (A, B, ..., Z, AA, AB, ...), numbers the lines
+    along y, both starting at the grid origin. Positions are in the same units as the
+    element dimensions.
+    """
+
+    def __init__(self, spacing_x=7200.0, spacing_y=7200.0, origin=(0.0, 0.0)):
+        """
+        Args:
+            spacing_x (float): Distance between the lettered grid lines.
+            spacing_y (float): Distance between the numbered grid lines.
+            origin (tuple): Position of grid line A1.
+        """
+        self.spacing_x = spacing_x
+        self.spacing_y = spacing_y
+        self.origin = origin
+
+    def position(self, grid_pos):
+        """
+        Args:
+            grid_pos (str): Grid position such as "C12".
+
+        Returns:
+            tuple: The x, y position of the grid intersection.
+        """
+        column, row = parse_grid_pos(grid_pos)
+        return self.origin[0] + column * self.spacing_x, self.origin[1] + row * self.spacing_y
+
+    def placement_matrix(self, grid_pos, orientation, elevation=0.0):
+        """
+        Computes the placement of an element standing on a grid intersection.
+
+        Args:
+            grid_pos (str): Grid position such as "C12".
+            orientation (str): "North", "East", "South" or "West", see ORIENTATION_ANGLES.
+            elevation (float): Height of the element's base.
+
+        Returns:
+            numpy.ndarray: 4x4 placement matrix, as taken by `IFCElement.set_placement`.
+        """
+        if orientation not in ORIENTATION_ANGLES:
+            raise ValueError(f"Unknown orientation: {orientation!r}")
+        x, y = self.position(grid_pos)
+        return placement_matrix(x, y, ORIENTATION_ANGLES[orientation], elevation)
+
+
+def parse_grid_pos(grid_pos):
+    """
+    Splits a grid position into zero-based column and row numbers, e.g. "AB3" -> (27, 2).
+
+    Raises:
+        ValueError: If the position is not letters followed by a number.
+    """
+    match = GRID_POSITION.match(str(grid_pos))
+    if match is None:
+        raise ValueError(f"Invalid grid position: {grid_pos!r}")
+    letters, number = match.groups()
+    column = 0
+    for letter in letters.upper():
+        column = column * 26 + ord(letter) - ord("A") + 1
+    return column - 1, int(number) - 1
+
+
+def placement_matrix(x, y, angle, elevation=0.0):
+    # Rotation by `angle` degrees about the vertical axis, then translation to (x, y, elevation)
+    radians = math.radians(angle)
+    cos, sin = round(math.cos(radians), 12), round(math.sin(radians), 12)
+    matrix = np.identity(4)
+    matrix[:2, :2] = ((cos, -sin), (sin, cos))
+    matrix[:3, 3] = (x, y, elevation)
+    return matrix
+
+
+def rectangle(length, width):
+    """
+    Footprint of a wall or slab in its own coordinates, as the FootprintPolyline of a wall.
+    """
+    return [(0.0, 0.0), (length, 0.0), (length, width), (0.0, width)]
+
+
+def footprint_polygon(points, matrix=None):
+    """
+    Places a footprint in plan.
+
+    Args:
+        points (list): (x, y) footprint points in the element's own coordinates.
+        matrix (numpy.ndarray): 4x4 placement matrix of the element, identity if omitted.
+
+    Returns:
+        shapely.Polygon: The footprint in plan.
+    """
+    points = np.asarray(points, dtype=float)
+    if matrix is not None:
+        points = points @ matrix[:2, :2].T + matrix[:2, 3]
+    return shapely.Polygon(points)
+
+
+class FootprintIndex:
+    """
+    Footprints of the elements of one storey, in a set of STR trees.
+
+    A shapely STRtree is packed once and cannot grow, so footprints are indexed the way a
+    log-structured merge tree is: new footprints collect in a small buffer, a full buffer is
+    packed into a tree, and trees of similar size are merged by packing their footprints
+    again. There are at most log2(n / BUFFER_SIZE) trees, each query visits them all, and
+    every footprint is repacked O(log n) times over the life of the index.
+    """
+
+    BUFFER_SIZE = 64
+
+    def __init__(self):
+        self.footprints = []
+        self.elements = []
+        # Element id -> slot of its current footprint
+        self.slots = {}
+        self.live = np.zeros(0, dtype=bool)
+        # (tree, slots) pairs, largest first
+        self.trees = []
+        self.buffer = []
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, element, footprint):
+        """
+        Indexes the footprint of an element, replacing the one it had.
+
+        Args:
+            element (IfcProduct): The element.
+            footprint (shapely.Geometry): Its footprint in plan.
+        """
+        self.remove(element)
+        slot = len(self.footprints)
+        self.footprints.append(footprint)
+        self.elements.append(element)
+        self.slots[element.id()] = slot
+        if slot >= len(self.live):
+            self.live = np.concatenate((self.live, np.zeros(max(slot + 1, len(self.live)), dtype=bool)))
+        self.live[slot] = True
+        self.buffer.append(slot)
+        if len(self.buffer) >= self.BUFFER_SIZE:
+            self.pack()
+
+    def remove(self, element):
+        slot = self.slots.pop(element.id(), None)
+        if slot is not None:
+            # Left in its tree and skipped by the queries until the tree is repacked
+            self.live[slot] = False
+
+    def pack(self):
+        # Packs the buffer into a tree, merging the trees that are not larger than it
+        slots = np.array(self.buffer, dtype=np.int64)
+        self.buffer = []
+        while self.trees and len(self.trees[-1][1]) <= len(slots):
+            slots = np.concatenate((self.trees.pop()[1], slots))
+        slots = slots[self.live[slots]]
+        if len(slots):
+            footprints = np.array([self.footprints[slot] for slot in slots.tolist()], dtype=object)
+            self.trees.append((STRtree(footprints), slots))
+
+    def candidates(self, geometry, predicate="intersects", distance=None):
+        """
+        Returns the slots of the live footprints satisfying a predicate with a geometry.
+
+        Predicates are evaluated as `predicate(geometry, footprint)`, the way STRtree.query
+        does, for the packed trees and the buffer alike.
+        """
+        found = []
+        for tree, slots in self.trees:
+            found.append(slots[tree.query(geometry, predicate=predicate, distance=distance)])
+        if self.buffer:
+            slots = np.array(self.buffer, dtype=np.int64)
+            geometries = np.array([self.footprints[slot] for slot in self.buffer], dtype=object)
+            if predicate == "dwithin":
+                found.append(slots[shapely.dwithin(geometries, geometry, distance)])
+            else:
+                found.append(slots[getattr(shapely, predicate)(geometry, geometries)])
+        slots = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+        return slots[self.live[slots]]
+
+    def query(self, geometry, predicate="intersects"):
+        """
+        Args:
+            geometry (shapely.Geometry): Query geometry in plan.
+            predicate (str): Shapely predicate the query geometry must satisfy with the footprints,
+                             e.g. "intersects", or "contains" for the footprints inside the geometry.
+
+        Returns:
+            list: The matching elements.
+        """
+        return [self.elements[slot] for slot in self.candidates(geometry, predicate).tolist()]
+
+    def clashes(self, footprint, exclude=None):
+        """
+        Finds the elements whose footprint overlaps a footprint. Touching edges are not clashes.
+
+        Args:
+            footprint (shapely.Geometry): The footprint to check.
+            exclude (IfcProduct): Element left out of the result, e.g. the one being checked.
+
+        Returns:
+            list: The clashing elements.
+        """
+        slots = self.candidates(footprint)
+        geometries = np.array([self.footprints[slot] for slot in slots.tolist()], dtype=object)
+        slots = slots[~shapely.touches(geometries, footprint)] if len(slots) else slots
+        return [self.elements[slot] for slot in slots.tolist() if self.elements[slot] != exclude]
+
+    def near(self, x, y, distance):
+        """
+        Finds the elements whose footprint lies within a distance of a position.
+
+        Returns:
+            list: The elements, in no particular order.
+        """
+        return [self.elements[slot] for slot in
+                self.candidates(shapely.Point(x, y), "dwithin", distance).tolist()]
+
+    def nearest(self, x, y):
+        """
+        Returns:
+            IfcProduct: The element whose footprint is closest to a position, None if the index is empty.
+        """
+        point = shapely.Point(x, y)
+        best, best_distance = None, math.inf
+        for tree, slots in self.trees:
+            live = slots[self.live[slots]]
+            if len(live) == len(slots):
+                nearest = tree.query_nearest(point)
+                candidates = slots[nearest]
+            else:
+                # A tree with removed footprints may hold a removed one nearest, check them all
+                candidates = live
+            for slot in candidates.tolist():
+                distance = self.footprints[slot].distance(point)
+                if distance < best_distance:
+                    best, best_distance = slot, distance
+        for slot in self.buffer:
+            if self.live[slot]:
+                distance = self.footprints[slot].distance(point)
+                if distance < best_distance:
+                    best, best_distance = slot, distance
+        return None if best is None else self.elements[best]
+
+    def clash_pairs(self):
+        """
+        Finds every pair of overlapping footprints in the storey, with one tree over all of them.
+
+        Returns:
+            list: (element, element) pairs.
+        """
+        slots = np.array(sorted(self.slots.values()), dtype=np.int64)
+        geometries = np.array([self.footprints[slot] for slot in slots.tolist()], dtype=object)
+        first, second = STRtree(geometries).query(geometries, predicate="intersects")
+        pairs = first < second
+        first, second = first[pairs], second[pairs]
+        overlapping = ~shapely.touches(geometries[first], geometries[second])
+        return [(self.elements[slots[a]], self.elements[slots[b]])
+                for a, b in zip(first[overlapping].tolist(), second[overlapping].tolist())]
+
+
+class SpatialIndex:
+    """
+    Footprint index of the walls and slabs of a model, one FootprintIndex per storey.
+
+    Attached to an IFCManager, it follows every element assigned to a container by
+    IFCElement.assign_to_container or the bulk builder, so clash and proximity queries stay
+    O(log n) per storey while a layout is being built.
+
+    Example:
+        index = manager.get_spatial_index()
+        wall.place_on_grid("C12", "North")
+        wall.add_wall_representation(6000.0, 3000.0, 200.0)
+        wall.assign_to_container(manager.storey)
+        index.clashes(manager.storey, wall.element)
+        index.near(manager.storey, 14400.0, 79200.0, 500.0)
+    """
+
+    def __init__(self, ifc_manager=None):
+        self.ifc_manager = ifc_manager
+        self.unit_scale = record_unit_scale(ifc_manager.model) if ifc_manager else 1.0
+        self.storeys = {}
+        # Element id -> id of the storey it is indexed in
+        self.containers = {}
+
+    @classmethod
+    def build(cls, ifc_manager):
+        """
+        Indexes the walls and slabs already contained in a model, and keeps the index current from then on.
+
+        Footprints are rebuilt from each element's placement and the Length / Thickness or
+        Length / Width of its ReC_Pset_* set, without evaluating its geometry.
+
+        Args:
+            ifc_manager (IFCManager): The manager whose model is indexed.
+
+        Returns:
+            SpatialIndex: The index.
+        """
+        index = cls(ifc_manager)
+        for rel in ifc_manager.model.by_type("IfcRelContainedInSpatialStructure"):
+            for element in rel.RelatedElements:
+                footprint = element_footprint(element, index.unit_scale)
+                if footprint is not None:
+                    index.add(rel.RelatingStructure, element, footprint)
+        return index
+
+    def storey(self, container):
+        """
+        Returns:
+            FootprintIndex: The index of a container, created empty on first use.
+        """
+        storey = self.storeys.get(container.id())
+        if storey is None:
+            storey = self.storeys[container.id()] = FootprintIndex()
+        return storey
+
+    def add(self, container, element, footprint):
+        """
+        Indexes an element in its container, moving it there if it was indexed elsewhere.
+
+        Args:
+            container (IfcSpatialStructureElement): The storey holding the element.
+            element (IfcProduct): The element.
+            footprint (shapely.Geometry): Its footprint in plan.
+        """
+        previous = self.containers.get(element.id())
+        if previous is not None and previous != container.id():
+            self.storeys[previous].remove(element)
+        self.containers[element.id()] = container.id()
+        self.storey(container).add(element, footprint)
+
+    def add_footprint(self, container, element, points, matrix=None):
+        """
+        Indexes an element from its footprint points and placement matrix.
+
+        Args:
+            container (IfcSpatialStructureElement): The storey holding the element.
+            element (IfcProduct): The element.
+            points (list): (x, y) footprint points in the element's own coordinates.
+            matrix (numpy.ndarray): 4x4 placement matrix of the element.
+        """
+        self.add(container, element, footprint_polygon(points, matrix))
+
+    def update(self, element):
+        """
+        Re-reads the footprint of an indexed element after its placement or dimensions changed.
+
+        Args:
+            element (IfcProduct): The element, with its ReC_Pset_* dimensions up to date.
+        """
+        container = self.containers.get(element.id())
+        if container is None:
+            return
+        footprint = element_footprint(element, self.unit_scale)
+        if footprint is None:
+            self.remove(element)
+        else:
+            self.storeys[container].add(element, footprint)
+
+    def remove(self, element):
+        container = self.containers.pop(element.id(), None)
+        if container is not None:
+            self.storeys[container].remove(element)
+
+    def footprint(self, element):
+        storey = self.storeys[self.containers[element.id()]]
+        return storey.footprints[storey.slots[element.id()]]
+
+    def clashes(self, container, element_or_footprint):
+        """
+        Finds the elements of a storey overlapping an element or a footprint.
+
+        Args:
+            container (IfcSpatialStructureElement): The storey.
+            element_or_footprint (IfcProduct or shapely.Geometry): An indexed element, or a
+                                                                   footprint to check before placing.
+
+        Returns:
+            list: The clashing elements.
+        """
+        if isinstance(element_or_footprint, shapely.Geometry):
+            return self.storey(container).clashes(element_or_footprint)
+        return self.storey(container).clashes(self.footprint(element_or_footprint), exclude=element_or_footprint)
+
+    def near(self, container, x, y, distance):
+        return self.storey(container).near(x, y, distance)
+
+    def nearest(self, container, x, y):
+        return self.storey(container).nearest(x, y)
+
+    def clash_pairs(self, container):
+        return self.storey(container).clash_pairs()
+
+
+def element_footprint(element, unit_scale):
+    """
+    Rebuilds the footprint of a wall or slab from its placement and ReC_Pset_* dimensions.
+
+    Args:
+        element (IfcProduct): The element.
+        unit_scale (float): Project length unit in record units, see `ifc_library.units.record_unit_scale`.
+
+    Returns:
+        shapely.Polygon: The footprint, or None for other elements and missing dimensions.
+    """
+    properties = FOOTPRINT_PROPERTIES.get(element.is_a())
+    if properties is None:
+        return None
+    pset_name, length_name, width_name = properties
+    pset = ifcopenshell.util.element.get_pset(element, pset_name) or {}
+    length, width = pset.get(length_name), pset.get(width_name)
+    if not length or not width:
+        return None
+    matrix = np.identity(4)
+    if element.ObjectPlacement is not None:
+        matrix = ifcopenshell.util.placement.get_local_placement(element.ObjectPlacement)
+        # Placements are stored in project units, footprints use the dimensions' units
+        matrix[:3, 3] *= unit_scale
+    return footprint_polygon(rectangle(length, width), matrix)
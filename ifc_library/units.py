@@ -0,0 +1,41 @@
+"""
+Units of the records.
+
+Every length of a wall or slab record (dimensions, void positions and sizes, grid spacing
+and positions) is in millimetres, whatever the project length unit. The geometry is
+written in the project units and the base quantities in SI units, both converted from
+the record values.
+"""
+
+import ifcopenshell.util.unit
+import numpy as np
+
+# Length of one record unit in metres
+RECORD_LENGTH_UNIT = 0.001
+
+
+def record_unit_scale(model):
+    """
+    Args:
+        model (ifcopenshell.file): The model.
+
+    Returns:
+        float: Project length unit in record units, i.e. what record lengths are divided by
+               to get project lengths. 1.0 for a project in millimetres.
+    """
+    return ifcopenshell.util.unit.calculate_unit_scale(model) / RECORD_LENGTH_UNIT
+
+
+def si_matrix(matrix):
+    """
+    Converts a placement matrix in record units to the SI units the ifcopenshell API takes.
+
+    Args:
+        matrix (numpy.ndarray): 4x4 placement matrix in record units.
+
+    Returns:
+        numpy.ndarray: A copy with the translation in metres.
+    """
+    matrix = np.array(matrix, dtype=np.float64)
+    matrix[:3, 3] *= RECORD_LENGTH_UNIT
+    return matrix
@@ -0,0 +1,399 @@
+import time
+
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.elements.ifc_slab import IFCSlab
+from ifc_library.geometry_cache import wall_voids
+from ifc_library.pset_templates import get_pset
+
+# Properties whose change means the body representation has to be rebuilt
+WALL_GEOMETRY_PROPERTIES = ("Length", "Height", "Thickness", "Mirrored")
+SLAB_GEOMETRY_PROPERTIES = ("Length", "Width", "Height", "Void_Count", "Void_Diameter")
+# Properties whose change means a wall placed on the grid has to be placed again
+WALL_PLACEMENT_PROPERTIES = ("Grid_Pos", "Orientation")
+
+
+class UpsertReport:
+    """
+    Summary of an upsert run.
+    """
+
+    def __init__(self, element_type):
+        self.element_type = element_type
+        self.added = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (f"Upserted {self.element_type}: {self.added} added, {self.updated} updated, "
+                f"{self.unchanged} unchanged in {self.elapsed * 1000:.1f}ms")
+
+
+class ElementUpdater:
+    """
+    Updates the walls and slabs of an open model in place, keyed on their business ids.
+
+    Walls are identified by their `Element_ID`, slabs by their `Product ID`. Only the changed
+    properties of an existing element are replaced, and its body representation is only
+    rebuilt when one of its dimensions changed. Void layouts are not stored in the property
+    sets, so pass `rebuild_geometry=True` when only the `Voids` of a record changed. Elements
+    are moved to the storey of a changed Building_ID or Floor_Num, and walls placed on the
+    grid are placed again when their Grid_Pos or Orientation changed.
+    """
+
+    def __init__(self, ifc_manager):
+        self.ifc_manager = ifc_manager
+        self.model = ifc_manager.model
+
+    def get_element(self, ifc_class, id_property, element_id):
+        """
+        Looks up an element by its business id through the model index.
+
+        Args:
+            ifc_class (str): IfcWall or IfcSlab.
+            id_property (str): Element_ID for walls, Product_ID for slabs.
+            element_id: The id value.
+
+        Returns:
+            IfcElement: The element, or None if the model has no such element.
+        """
+        if element_id is None:
+            return None
+        index = self.ifc_manager.get_index()
+        return index.get_element(index.find_one(ifc_class=ifc_class, **{id_property: element_id}))
+
+    def upsert_walls(self, records, rebuild_geometry=False, container=None):
+        """
+        Adds new walls and updates existing ones in place.
+
+        Args:
+            records (iterable of dict): Records holding `element_data` and `geometry_data`.
+            rebuild_geometry (bool): Rebuild the representation of existing walls even if their
+                                     dimensions are unchanged, e.g. after a change of `Voids`.
+            container (IfcSpatialStructureElement): Container of the walls, defaults to the storey of
+                                                    their Building_ID and Floor_Num.
+
+        Returns:
+            UpsertReport: Number of walls added, updated and unchanged.
+        """
+        return self._upsert(records, "IfcWall", "Element_ID", "Element_ID", "walls",
+                            self.update_wall, "build_wall", rebuild_geometry, container)
+
+    def upsert_slabs(self, records, rebuild_geometry=False, container=None):
+        """
+        Adds new slabs and updates existing ones in place.
+
+        Args:
+            records (iterable of dict): Records holding the slab `element_data`.
+            rebuild_geometry (bool): Rebuild the representation of existing slabs even if their
+                                     dimensions are unchanged.
+            container (IfcSpatialStructureElement): Container of the slabs, defaults to the storey of
+                                                    their Building_ID and Floor_Num if they have them.
+
+        Returns:
+            UpsertReport: Number of slabs added, updated and unchanged.
+        """
+        return self._upsert(records, "IfcSlab", "Product_ID", "Product ID", "slabs",
+                            self.update_slab, "build_slab", rebuild_geometry, container)
+
+    def _upsert(self, records, ifc_class, id_property, id_field, element_type, update_element, build_method,
+                rebuild_geometry, container):
+        report = UpsertReport(element_type)
+        start = time.perf_counter()
+        # Built with the settings of the last bulk build, e.g. on the grid if it placed walls on it
+        builder = self.ifc_manager.get_bulk_builder()
+
+        build_element = getattr(builder, build_method)
+        for record in records:
+            element = self.get_element(ifc_class, id_property, record.get("element_data", {}).get(id_field))
+            if element is None:
+                builder.build(record, build_element, container)
+                report.added += 1
+            elif update_element(element, record, rebuild_geometry, container):
+                report.updated += 1
+            else:
+                report.unchanged += 1
+
+        builder.flush_batch()
+        builder.hierarchy.flush()
+
+        report.elapsed = time.perf_counter() - start
+        print(report)
+        return report
+
+    def update_wall(self, wall, record, rebuild_geometry=False, container=None):
+        """
+        Brings an existing wall in line with its record.
+
+        Args:
+            wall (IfcWall): The existing wall.
+            record (dict): Record holding `element_data` and `geometry_data`.
+            rebuild_geometry (bool): Rebuild the representation even if the dimensions are unchanged.
+            container (IfcSpatialStructureElement): Container of the wall, defaults to the storey of
+                                                    its Building_ID and Floor_Num.
+
+        Returns:
+            bool: True if anything changed.
+        """
+        element_data = record.get("element_data", {})
+        geometry_data = record.get("geometry_data", {})
+        element_properties = IFCWall.element_data_properties(element_data)
+        geometry_properties = IFCWall.geometry_data_properties(geometry_data)
+
+        rebuild_geometry = rebuild_geometry or self.properties_changed(
+            wall, "ReC_Pset_WallGeometryData", geometry_properties, WALL_GEOMETRY_PROPERTIES)
+        replace = self.properties_changed(wall, "ReC_Pset_WallElementData", element_properties, WALL_PLACEMENT_PROPERTIES)
+        changed = self.update_name(wall, element_data.get("Wall_ID", "Default Wall"))
+
+        pset_writer = self.ifc_manager.get_pset_writer()
+        changed |= pset_writer.update(wall, "ReC_Pset_WallElementData", element_properties)
+        changed |= pset_writer.update(wall, "ReC_Pset_WallGeometryData", geometry_properties)
+
+        builder = self.ifc_manager.get_bulk_builder()
+        if replace and builder.place_on_grid:
+            self.update_placement(wall, builder.grid_matrix(element_data.get("Grid_Pos"), element_data.get("Orientation")))
+            changed = True
+        changed |= self.update_container(wall, container or self.ifc_manager.get_hierarchy().container(record))
+
+        if rebuild_geometry:
+            # Rebuilt the same way it was built, shared through a type or as its own solid
+            shared = bool(getattr(wall, "IsTypedBy", ()))
+            self.remove_geometry(wall)
+            self.ifc_manager.get_bulk_builder().build_wall_geometry(wall, geometry_data, shared)
+            if self.ifc_manager.spatial_index is not None:
+                self.ifc_manager.spatial_index.update(wall)
+        return changed or rebuild_geometry
+
+    def update_slab(self, slab, record, rebuild_geometry=False, container=None):
+        """
+        Brings an existing slab in line with its record.
+
+        Args:
+            slab (IfcSlab): The existing slab.
+            record (dict): Record holding the slab `element_data`.
+            rebuild_geometry (bool): Rebuild the representation even if the dimensions are unchanged.
+            container (IfcSpatialStructureElement): Container of the slab, defaults to the storey of
+                                                    its Building_ID and Floor_Num if it has them.
+
+        Returns:
+            bool: True if anything changed.
+        """
+        element_data = record.get("element_data", {})
+        properties = IFCSlab.element_data_properties(element_data)
+
+        rebuild_geometry = rebuild_geometry or self.properties_changed(
+            slab, "ReC_Pset_SlabElementData", properties, SLAB_GEOMETRY_PROPERTIES)
+        changed = self.update_name(slab, element_data.get("Product ID", "Slab"))
+        changed |= self.ifc_manager.get_pset_writer().update(slab, "ReC_Pset_SlabElementData", properties)
+
+        # Slab records only name a storey when they have a Building_ID or Floor_Num
+        if container is None and ("Building_ID" in element_data or "Floor_Num" in element_data):
+            container = self.ifc_manager.get_hierarchy().container(record)
+        if container is not None:
+            changed |= self.update_container(slab, container)
+
+        if rebuild_geometry:
+            # Rebuilt the same way it was built, shared through a type or as its own solid
+            shared = bool(getattr(slab, "IsTypedBy", ()))
+            self.remove_geometry(slab)
+            self.ifc_manager.get_bulk_builder().build_slab_geometry(slab, element_data, shared)
+            if self.ifc_manager.spatial_index is not None:
+                self.ifc_manager.spatial_index.update(slab)
+        return changed or rebuild_geometry
+
+    def update_name(self, element, name):
+        if element.Name == name:
+            return False
+        element.Name = name
+        return True
+
+    def properties_changed(self, element, pset_name, properties, names):
+        pset = get_pset(element, pset_name)
+        if pset is None:
+            return True
+        current = {prop.Name: prop.NominalValue.wrappedValue for prop in pset.HasProperties if prop.NominalValue}
+        return any(current.get(name) != properties.get(name) for name in names)
+
+    def update_container(self, element, container):
+        """
+        Moves an element to another storey if it is not contained in it yet.
+
+        Args:
+            element (IfcElement): The element.
+            container (IfcSpatialStructureElement): The storey it belongs in.
+
+        Returns:
+            bool: True if the element was moved.
+        """
+        if container in [rel.RelatingStructure for rel in element.ContainedInStructure]:
+            return False
+        hierarchy = self.ifc_manager.get_hierarchy()
+        if any(element in products for storey, products in hierarchy.pending.values() if storey == container):
+            return False
+
+        for rel in list(element.ContainedInStructure):
+            related = [obj for obj in rel.RelatedElements if obj != element]
+            if related:
+                rel.RelatedElements = related
+            else:
+                self.model.remove(rel)
+        hierarchy.contain(container, [element])
+        spatial_index = self.ifc_manager.spatial_index
+        if spatial_index is not None and spatial_index.containers.get(element.id()) is not None:
+            footprint = spatial_index.footprint(element)
+            spatial_index.remove(element)
+            spatial_index.add(container, element, footprint)
+        return True
+
+    def update_placement(self, element, matrix):
+        """
+        Gives an element a new placement, keeping its openings placed relative to it.
+
+        Args:
+            element (IfcElement): The element.
+            matrix (numpy.ndarray): 4x4 placement matrix, None for the origin.
+        """
+        previous = element.ObjectPlacement
+        placement = self.ifc_manager.get_geometry_cache().create_placement(matrix)
+        element.ObjectPlacement = placement
+        for rel in getattr(element, "HasOpenings", ()):
+            opening_placement = rel.RelatedOpeningElement.ObjectPlacement
+            if opening_placement is not None and opening_placement.PlacementRelTo == previous:
+                opening_placement.PlacementRelTo = placement
+        if previous is not None and not self.model.get_total_inverses(previous):
+            self.remove_unused(previous)
+        if self.ifc_manager.spatial_index is not None:
+            self.ifc_manager.spatial_index.update(element)
+
+    def wall_voids(self, wall):
+        """
+        Reads back the void layout of an existing wall, from its openings or from the solid of
+        its shared type.
+
+        Void layouts are not kept in the property sets: this is how a wall rebuilt from its
+        properties, e.g. by a change set, keeps its openings.
+
+        Args:
+            wall (IfcWall): The wall.
+
+        Returns:
+            list: Void dicts with X, Y, Z, Width, Height and Depth in record units, or None if a
+                  void is not a box as the builders make them.
+        """
+        return wall_voids(wall, self.ifc_manager.get_geometry_cache().unit_scale)
+
+    def geometry_changed(self, wall, geometry_data):
+        # True if a dimension of the wall differs from its record, see update_wall
+        return self.properties_changed(wall, "ReC_Pset_WallGeometryData",
+                                       IFCWall.geometry_data_properties(geometry_data), WALL_GEOMETRY_PROPERTIES)
+
+    def remove_element(self, element):
+        """
+        Removes an element with its geometry, placement, property sets and relationships.
+
+        Shared types, representation maps, quantity sets and property values stay as long as
+        other elements use them.
+
+        Args:
+            element (IfcElement): The element to remove.
+        """
+        self.ifc_manager.flush_containment()
+        if self.ifc_manager.spatial_index is not None:
+            self.ifc_manager.spatial_index.remove(element)
+        if self.ifc_manager.index is not None:
+            self.ifc_manager.index.remove(element.GlobalId)
+
+        self.remove_geometry(element)
+        for rel in list(element.IsDefinedBy):
+            related = [obj for obj in rel.RelatedObjects if obj != element]
+            if related:
+                rel.RelatedObjects = related
+                continue
+            definition = rel.RelatingPropertyDefinition
+            self.model.remove(rel)
+            if not self.model.get_total_inverses(definition):
+                self.remove_unused(definition)
+        for rel in list(element.ContainedInStructure):
+            related = [obj for obj in rel.RelatedElements if obj != element]
+            if related:
+                rel.RelatedElements = related
+            else:
+                self.model.remove(rel)
+        self.remove_product_geometry(element)
+        self.model.remove(element)
+
+    def remove_geometry(self, element):
+        """
+        Removes an element's body representation, its type assignment and its openings.
+
+        Shared representation maps, types and geometric resources are left untouched.
+
+        Args:
+            element (IfcElement): The element whose geometry is rebuilt.
+        """
+        self.ifc_manager.get_geometry_cache().unassign_type(element)
+
+        for rel in getattr(element, "HasOpenings", ()):
+            opening = rel.RelatedOpeningElement
+            self.model.remove(rel)
+            if self.ifc_manager.get_geometry_cache().is_shared_opening_shape(opening.Representation):
+                # Kept for the other openings of the same size, and for the rebuilt ones
+                opening.Representation = None
+            self.remove_product_geometry(opening)
+            self.model.remove(opening)
+
+        self.remove_product_geometry(element, keep_placement=True)
+
+    def remove_product_geometry(self, product, keep_placement=False):
+        # The product's own shape, representations, items and placement. Representation maps,
+        # cached operators, placements and profiles stay for the elements still using them
+        representation = product.Representation
+        if representation is not None:
+            product.Representation = None
+            if not self.model.get_total_inverses(representation):
+                self.remove_unused(representation)
+        if not keep_placement and product.ObjectPlacement is not None:
+            placement = product.ObjectPlacement
+            product.ObjectPlacement = None
+            if not self.model.get_total_inverses(placement):
+                self.remove_unused(placement)
+
+    def remove_unused(self, entity):
+        """
+        Removes an entity and, recursively, the entities it refers to that nothing else uses.
+
+        Unlike `remove_deep2`, entities cached for reuse by the geometry cache, the property
+        interner and the quantity writer are kept even when unused: later elements are handed
+        the same instances, so removing them would leave the caches pointing at deleted entities.
+
+        Args:
+            entity (entity_instance): The entity, no longer referenced by anything.
+        """
+        kept = self.cached_ids()
+        if entity.id() in kept:
+            return
+        queued = {entity.id()}
+        stack = [entity]
+        while stack:
+            entity = stack.pop()
+            references = self.model.traverse(entity, max_levels=1)[1:]
+            self.model.remove(entity)
+            for reference in references:
+                reference_id = reference.id()
+                if not reference_id or reference_id in queued or reference_id in kept:
+                    continue
+                if not self.model.get_total_inverses(reference):
+                    queued.add(reference_id)
+                    stack.append(reference)
+
+    def cached_ids(self):
+        # Ids of the entities the manager's caches hand out again, see remove_unused
+        ids = set()
+        manager = self.ifc_manager
+        if manager.geometry_cache is not None:
+            ids |= manager.geometry_cache.resource_ids()
+        if manager.pset_writer is not None and manager.pset_writer.interner is not None:
+            ids |= manager.pset_writer.interner.property_ids
+        if manager.quantity_writer is not None:
+            ids.update(quantity_set.id() for quantity_set in manager.quantity_writer.quantity_sets.values())
+        return ids
@@ -0,0 +1,268 @@
+import time
+
+import numpy as np
+
+from ifc_library.inventory import Inventory, SlabInventory, WallInventory
+from ifc_library.profiles import hollow_core_web_thickness
+
+# Check name -> message
+CHECKS = {
+    "missing": "required field is missing",
+    "not_a_number": "value is not a number",
+    "not_positive": "dimension must be positive",
+    "void_size": "void width and height must be positive",
+    "void_outside": "void extends outside the wall",
+    "void_overlap": "void overlaps another void of the wall",
+    "void_count": "void count must not be negative",
+    "void_diameter": "void diameter must be positive and smaller than the slab height",
+    "web_thickness": "cores leave no positive web thickness",
+}
+
+# Dimensions the builders fall back to when a wall leaves them out
+WALL_DIMENSIONS = (("Length", 5000.0), ("Height", 3000.0), ("Thickness", 300.0))
+
+
+class ValidationReport:
+    """
+    Errors found in an inventory, as one table with a row per (record, field, check).
+
+    Example:
+        report = validate_walls(inventory)
+        print(report)
+        manager.add_walls_bulk(inventory.select(report.valid))
+    """
+
+    def __init__(self, size, element_type):
+        self.size = size
+        self.element_type = element_type
+        self.elapsed = 0.0
+        self.parts = []
+        self._errors = None
+
+    def add(self, check, field, rows):
+        """
+        Records a failed check.
+
+        Args:
+            check (str): Check name, see CHECKS.
+            field (str): Property name the check is about.
+            rows (numpy.ndarray): Boolean mask over the records, or indices of the failing records.
+        """
+        rows = np.asarray(rows)
+        rows = np.flatnonzero(rows) if rows.dtype == bool else np.unique(rows)
+        if len(rows):
+            self.parts.append((check, field, rows))
+            self._errors = None
+
+    @property
+    def errors(self):
+        """
+        numpy.ndarray: Structured array with `row`, `field` and `check` columns, sorted by row.
+        """
+        if self._errors is None:
+            count = sum(len(rows) for _, _, rows in self.parts)
+            errors = np.empty(count, dtype=[("row", np.int64), ("field", "U32"), ("check", "U16")])
+            start = 0
+            for check, field, rows in self.parts:
+                part = errors[start:start + len(rows)]
+                part["row"] = rows
+                part["field"] = field
+                part["check"] = check
+                start += len(rows)
+            self._errors = errors[np.argsort(errors["row"], kind="stable")]
+        return self._errors
+
+    @property
+    def valid(self):
+        """
+        numpy.ndarray: Boolean mask of the records without errors.
+        """
+        valid = np.ones(self.size, dtype=bool)
+        for _, _, rows in self.parts:
+            valid[rows] = False
+        return valid
+
+    @property
+    def invalid_rows(self):
+        return np.flatnonzero(~self.valid)
+
+    @property
+    def is_valid(self):
+        return not self.parts
+
+    def messages(self, row):
+        """
+        Args:
+            row (int): Record index.
+
+        Returns:
+            list: "Field: message" for each error of the record.
+        """
+        errors = self.errors
+        start, end = np.searchsorted(errors["row"], [row, row + 1])
+        return [f"{field}: {CHECKS[check]}" for _, field, check in errors[start:end].tolist()]
+
+    def by_row(self):
+        """
+        Returns:
+            dict: Record index -> error messages, for every rejected record.
+        """
+        return {row: self.messages(row) for row in self.invalid_rows.tolist()}
+
+    def counts(self):
+        """
+        Returns:
+            dict: (check, field) -> number of failing records.
+        """
+        counts = {}
+        for check, field, rows in self.parts:
+            counts[check, field] = counts.get((check, field), 0) + len(rows)
+        return counts
+
+    def __str__(self):
+        rejected = len(self.invalid_rows)
+        lines = [f"Validated {self.size} {self.element_type} in {self.elapsed * 1000:.1f}ms, "
+                 f"{rejected} rejected"]
+        for (check, field), count in sorted(self.counts().items()):
+            lines.append(f"  {field}: {CHECKS[check]} ({count} records)")
+        return "\n".join(lines)
+
+
+def validate_walls(records):
+    """
+    Checks a whole wall inventory before it is built.
+
+    Every check runs over the inventory columns at once: required fields, positive
+    dimensions, voids with a positive size lying inside their wall, and openings of the same
+    wall that overlap. Overlaps are found by sorting the voids along the wall and sweeping
+    each one only over the voids starting before it ends, rather than testing all pairs.
+
+    Args:
+        records (WallInventory or iterable of dict): Inventory, or records as accepted by
+                                                     `IFCManager.add_walls_bulk`.
+
+    Returns:
+        ValidationReport: The errors per record.
+    """
+    start = time.perf_counter()
+    inventory = as_inventory(records, WallInventory)
+    report = ValidationReport(len(inventory), "walls")
+    add_missing(report, inventory)
+    add_invalid(report, inventory)
+
+    dimensions = {}
+    for name, default in WALL_DIMENSIONS:
+        values = inventory.column(name, "geometry_data").astype(np.float64)
+        # NaN (left out) compares False: the builders use the default
+        report.add("not_positive", name, values <= 0)
+        dimensions[name] = np.where(np.isnan(values), default, values)
+
+    check_voids(report, inventory, dimensions["Length"], dimensions["Height"])
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def validate_slabs(records):
+    """
+    Checks a whole slab inventory before it is built: required fields, positive dimensions,
+    and cores that fit in the slab with a positive web thickness.
+
+    Args:
+        records (SlabInventory or iterable of dict): Inventory, or records as accepted by
+                                                     `IFCManager.add_slabs_bulk`.
+
+    Returns:
+        ValidationReport: The errors per record.
+    """
+    start = time.perf_counter()
+    inventory = as_inventory(records, SlabInventory)
+    report = ValidationReport(len(inventory), "slabs")
+    add_missing(report, inventory)
+    add_invalid(report, inventory)
+
+    for name in ("Length", "Width", "Height"):
+        report.add("not_positive", name, inventory.column(name) <= 0)
+
+    width = inventory.column("Width").astype(np.float64)
+    height = inventory.column("Height").astype(np.float64)
+    void_count = np.nan_to_num(inventory.column("Void_Count").astype(np.float64))
+    void_diameter = np.nan_to_num(inventory.column("Void_Diameter").astype(np.float64))
+    hollow = void_count > 0
+    report.add("void_count", "Void_Count", void_count < 0)
+    report.add("void_diameter", "Void_Diameter", hollow & ((void_diameter <= 0) | (void_diameter >= height)))
+    web = hollow_core_web_thickness(width, void_count, void_diameter)
+    report.add("web_thickness", "Void_Count", hollow & (web <= 0))
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def as_inventory(records, inventory_class):
+    if isinstance(records, Inventory):
+        return records
+    return inventory_class.from_records(records, strict=False)
+
+
+def add_missing(report, inventory):
+    for (_, name), rows in inventory.missing.items():
+        report.add("missing", name, rows)
+
+
+def add_invalid(report, inventory):
+    # Left empty in the columns, so the other checks skip them like missing values
+    for (_, name), rows in inventory.invalid.items():
+        report.add("not_a_number", name, rows)
+
+
+def check_voids(report, inventory, length, height):
+    """
+    Checks the void layouts of all walls at once.
+
+    Args:
+        report (ValidationReport): Report receiving the errors.
+        inventory (WallInventory): The walls.
+        length (numpy.ndarray): Length of each wall.
+        height (numpy.ndarray): Height of each wall.
+    """
+    offsets = inventory.void_offsets
+    values = inventory.void_values
+    if not len(values):
+        return
+    walls = np.repeat(np.arange(len(inventory)), np.diff(offsets))
+    x, z, width, void_height = values[:, 0], values[:, 2], values[:, 3], values[:, 4]
+
+    report.add("void_size", "Voids", walls[(width <= 0) | (void_height <= 0)])
+    outside = (x < 0) | (z < 0) | (x + width > length[walls]) | (z + void_height > height[walls])
+    report.add("void_outside", "Voids", walls[outside])
+
+    # Sort by wall, then by start along the wall. Void i can only overlap the voids after
+    # it that start before it ends; once one starts past its end (or is on another wall),
+    # so do all the following ones, and i drops out of the sweep.
+    order = along_wall_order(walls, x)
+    walls, x_start, z_start = walls[order], x[order], z[order]
+    x_end, z_end = x_start + width[order], z_start + void_height[order]
+    overlapping = np.zeros(len(order), dtype=bool)
+    candidates = np.arange(len(order) - 1)
+    step = 1
+    while len(candidates):
+        others = candidates + step
+        in_range = others < len(order)
+        candidates, others = candidates[in_range], others[in_range]
+        active = (walls[others] == walls[candidates]) & (x_start[others] < x_end[candidates])
+        candidates, others = candidates[active], others[active]
+        hit = (z_start[others] < z_end[candidates]) & (z_start[candidates] < z_end[others])
+        overlapping[candidates[hit]] = True
+        overlapping[others[hit]] = True
+        step += 1
+    report.add("void_overlap", "Voids", walls[overlapping])
+
+
+def along_wall_order(walls, x):
+    # The void rows are grouped by wall already, and usually laid out along it: only the
+    # walls with a void starting before the previous one are sorted
+    order = np.arange(len(walls))
+    descending = (x[1:] < x[:-1]) & (walls[1:] == walls[:-1])
+    if descending.any():
+        rows = np.flatnonzero(np.isin(walls, walls[1:][descending]))
+        order[rows] = rows[np.lexsort((x[rows], walls[rows]))]
+    return order
@@ -0,0 +1,66 @@
+import copy
+
+import ifcopenshell
+import ifcopenshell.util.element
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.build_cache import build_cached
+
+
+@pytest.fixture
+def records():
+    return copy.deepcopy(generate_walls(20, max_voids=2)), copy.deepcopy(generate_slabs(4))
+
+
+def element_ids(path):
+    model = ifcopenshell.open(path)
+    return {element.GlobalId: element.Name for element in model.by_type("IfcWall") + model.by_type("IfcSlab")}
+
+
+def test_unchanged_records_are_taken_from_the_cache(tmp_path, records):
+    walls, slabs = records
+    cache_dir = str(tmp_path / "cache")
+    first = build_cached(str(tmp_path / "first.ifc"), walls, slabs, cache_dir=cache_dir)
+    second = build_cached(str(tmp_path / "second.ifc"), walls, slabs, cache_dir=cache_dir)
+
+    assert (first.hits, first.misses) == (0, 24)
+    assert (second.hits, second.misses) == (24, 0) and second.hit_rate == 1.0
+    assert element_ids(str(tmp_path / "first.ifc")) == element_ids(str(tmp_path / "second.ifc"))
+
+
+def test_changed_record_is_rebuilt(tmp_path, records):
+    walls, slabs = records
+    cache_dir = str(tmp_path / "cache")
+    build_cached(str(tmp_path / "first.ifc"), walls, slabs, cache_dir=cache_dir)
+    walls[3]["geometry_data"]["Length"] += 500.0
+    walls[5]["element_data"]["Status"] = "Cache_Test"
+    path = str(tmp_path / "second.ifc")
+    report = build_cached(path, walls, slabs, cache_dir=cache_dir)
+
+    assert (report.hits, report.misses) == (22, 2)
+    model = ifcopenshell.open(path)
+    assert len(model.by_type("IfcWall")) == len(walls) and len(model.by_type("IfcSlab")) == len(slabs)
+    assert all(wall.ContainedInStructure for wall in model.by_type("IfcWall"))
+    lengths = {ifcopenshell.util.element.get_pset(wall, "ReC_Pset_WallElementData", "Element_ID"):
+               ifcopenshell.util.element.get_pset(wall, "ReC_Pset_WallGeometryData", "Length")
+               for wall in model.by_type("IfcWall")}
+    assert lengths[walls[3]["element_data"]["Element_ID"]] == walls[3]["geometry_data"]["Length"]
+
+
+def test_build_options_are_part_of_the_key(tmp_path, records):
+    walls, slabs = records
+    cache_dir = str(tmp_path / "cache")
+    build_cached(str(tmp_path / "shared.ifc"), walls, slabs, cache_dir=cache_dir)
+    report = build_cached(str(tmp_path / "unshared.ifc"), walls, slabs, cache_dir=cache_dir, share_geometry=False)
+    assert report.hits == 0
+
+
+def test_cache_is_evicted_above_its_size(tmp_path, records):
+    walls, slabs = records
+    cache_dir = str(tmp_path / "cache")
+    report = build_cached(str(tmp_path / "first.ifc"), walls, slabs, cache_dir=cache_dir, max_bytes=1)
+    assert report.evictions > 0
+    report = build_cached(str(tmp_path / "second.ifc"), walls, slabs, cache_dir=cache_dir, max_bytes=1)
+    assert report.misses > 0
+    assert len(ifcopenshell.open(str(tmp_path / "second.ifc")).by_type("IfcWall")) == len(walls)
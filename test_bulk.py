@@ -0,0 +1,59 @@
+import ifcopenshell.util.element
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.inventory import WallInventory
+
+
+def pset_value(element, pset_name, name):
+    return ifcopenshell.util.element.get_pset(element, pset_name, name)
+
+
+@pytest.mark.parametrize("share_geometry", [True, False])
+def test_bulk_walls_get_geometry_and_property_sets(share_geometry):
+    records = generate_walls(30, max_voids=3)
+    manager = IFCManager(None)
+    report = manager.add_walls_bulk(records, batch_size=7, share_geometry=share_geometry)
+
+    walls = manager.model.by_type("IfcWall")
+    assert report.count == len(records) == len(walls)
+    for wall, record in zip(walls, records):
+        assert wall.Name == record["element_data"]["Wall_ID"]
+        assert pset_value(wall, "ReC_Pset_WallElementData", "Element_ID") == record["element_data"]["Element_ID"]
+        assert pset_value(wall, "ReC_Pset_WallGeometryData", "Length") == record["geometry_data"]["Length"]
+        assert wall.Representation is not None
+        if not share_geometry:
+            assert len(wall.HasOpenings) == len(record["geometry_data"]["Voids"])
+
+
+def test_identical_walls_share_one_type():
+    records = generate_walls(40, max_voids=0)
+    manager = IFCManager(None)
+    manager.add_walls_bulk(records)
+
+    geometries = {tuple(record["geometry_data"][name] for name in ("Length", "Height", "Thickness"))
+                  for record in records}
+    assert len(manager.model.by_type("IfcWallType")) == len(geometries)
+
+
+def test_inventory_and_dict_records_build_the_same_model():
+    records = generate_walls(20)
+    from_dicts = IFCManager(None)
+    from_dicts.add_walls_bulk(records, deterministic_ids=True)
+    from_inventory = IFCManager(None)
+    from_inventory.add_walls_bulk(WallInventory.from_records(records), deterministic_ids=True)
+
+    assert len(list(from_dicts.model)) == len(list(from_inventory.model))
+    assert ([wall.GlobalId for wall in from_dicts.model.by_type("IfcWall")] ==
+            [wall.GlobalId for wall in from_inventory.model.by_type("IfcWall")])
+
+
+def test_bulk_slabs_are_solid_or_hollow_core():
+    hollow = generate_slabs(5)
+    solid = generate_slabs(5, seed=1, hollow_core=False)
+    manager = IFCManager(None)
+    manager.add_slabs_bulk(hollow + solid, share_geometry=False)
+
+    profiles = [slab.Representation.Representations[0].Items[0].SweptArea for slab in manager.model.by_type("IfcSlab")]
+    assert [profile.is_a("IfcArbitraryProfileDefWithVoids") for profile in profiles] == [True] * 5 + [False] * 5
@@ -0,0 +1,104 @@
+import copy
+
+import pytest
+
+from benchmarks.synthetic import generate_walls
+from ifc_library.diff import ChangeSet, Snapshot, apply_changes, diff_snapshots
+from ifc_library.ifc_manager import IFCManager
+
+
+def walls_with_voids(count=4):
+    walls = copy.deepcopy(generate_walls(count, max_voids=3))
+    for wall in walls:
+        wall["geometry_data"]["Voids"] = [{"X": 500.0, "Y": 0.0, "Z": 0.0, "Width": 900.0, "Height": 2100.0,
+                                           "Depth": wall["geometry_data"]["Thickness"] + 100.0}]
+        wall["geometry_data"]["Length"] = 4000.0
+    return walls
+
+
+def build(records, share_geometry=True):
+    manager = IFCManager(None)
+    manager.add_walls_bulk(records, share_geometry=share_geometry)
+    return manager
+
+
+def changes_between(old_records, new_records):
+    return diff_snapshots(Snapshot.from_model(build(old_records).model), Snapshot.from_model(build(new_records).model))
+
+
+def test_diff_finds_added_removed_and_modified_walls():
+    old = walls_with_voids()
+    new = copy.deepcopy(old[1:]) + copy.deepcopy(generate_walls(5)[4:])
+    new[0]["element_data"]["Status"] = "Installed"
+
+    changes = changes_between(old, new)
+    assert (len(changes.added), len(changes.removed), len(changes.modified)) == (1, 1, 1)
+    assert changes.modified[0]["properties"] == {"ReC_Pset_WallElementData": {"Status": "Installed"}}
+
+
+@pytest.mark.parametrize("share_geometry", [True, False])
+def test_resized_walls_keep_their_openings(share_geometry):
+    old = walls_with_voids()
+    new = copy.deepcopy(old)
+    new[0]["geometry_data"]["Length"] = 4800.0
+    changes = changes_between(old, new)
+
+    manager = build(old, share_geometry)
+    updater = manager.get_updater()
+    wall = updater.get_element("IfcWall", "Element_ID", old[0]["element_data"]["Element_ID"])
+    before = updater.wall_voids(wall)
+    assert len(before) == 1
+
+    for _ in range(2):
+        # Applying the same changes again rebuilds nothing and keeps the openings as well
+        report = apply_changes(manager, changes)
+        assert report.modified == 1 and not report.skipped
+        assert updater.wall_voids(wall) == pytest.approx(before)
+    assert updater.get_element("IfcWall", "Element_ID", old[0]["element_data"]["Element_ID"]) == wall
+
+
+def test_wall_with_unreadable_openings_is_skipped():
+    old = walls_with_voids()
+    new = copy.deepcopy(old)
+    new[0]["geometry_data"]["Length"] = 4800.0
+    changes = changes_between(old, new)
+
+    manager = build(old, share_geometry=False)
+    wall = manager.get_updater().get_element("IfcWall", "Element_ID", old[0]["element_data"]["Element_ID"])
+    opening = wall.HasOpenings[0].RelatedOpeningElement
+    # An opening that is not a box as the builders make it
+    opening.Representation.Representations[0].Items = [manager.model.createIfcSphere(
+        manager.model.createIfcAxis2Placement3D(manager.model.createIfcCartesianPoint((0.0, 0.0, 0.0))), 100.0)]
+
+    report = apply_changes(manager, changes)
+    assert report.modified == 0 and report.skipped == changes.modified
+    assert len(wall.HasOpenings) == 1
+
+
+@pytest.mark.parametrize("share_geometry", [True, False])
+def test_changed_openings_are_found_and_applied(share_geometry, tmp_path):
+    old = walls_with_voids()
+    new = copy.deepcopy(old)
+    new[0]["geometry_data"]["Voids"] = [{"X": 2500.0, "Y": 0.0, "Z": 900.0, "Width": 600.0, "Height": 600.0,
+                                         "Depth": new[0]["geometry_data"]["Thickness"] + 100.0},
+                                        {"X": 300.0, "Y": 0.0, "Z": 0.0, "Width": 900.0, "Height": 2100.0,
+                                         "Depth": new[0]["geometry_data"]["Thickness"] + 100.0}]
+    new_model = build(new, share_geometry).model
+    changes = diff_snapshots(Snapshot.from_model(build(old, share_geometry).model), Snapshot.from_model(new_model))
+    assert (len(changes.added), len(changes.removed), len(changes.modified)) == (0, 0, 1)
+    assert changes.modified[0]["properties"] == {}
+
+    # The openings survive the JSON round trip and rebuild the wall
+    changes.save(str(tmp_path / "changes.json"))
+    manager = build(old, share_geometry)
+    report = apply_changes(manager, ChangeSet.load(str(tmp_path / "changes.json")))
+    assert report.modified == 1
+    assert len(diff_snapshots(Snapshot.from_model(manager.model), Snapshot.from_model(new_model))) == 0
+
+
+def test_reordered_openings_are_unchanged():
+    old = walls_with_voids()
+    old[0]["geometry_data"]["Voids"].append({"X": 2500.0, "Z": 900.0, "Width": 600.0, "Height": 600.0})
+    new = copy.deepcopy(old)
+    new[0]["geometry_data"]["Voids"].reverse()
+    assert len(changes_between(old, new)) == 0
@@ -0,0 +1,63 @@
+import copy
+import os
+
+import ifcopenshell.util.element
+import numpy as np
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.drawings import generate_drawings, wall_svg
+from ifc_library.ifc_manager import IFCManager
+
+
+def test_drawings_are_named_by_element_key(tmp_path):
+    walls = copy.deepcopy(generate_walls(3, max_voids=2))
+    for wall in walls:
+        wall["element_data"]["Wall_ID"] = "W1"
+    slabs = generate_slabs(2)
+
+    report = generate_drawings(str(tmp_path), walls, slabs, processes=1)
+    assert report.wall_names == [f"{wall['element_data']['Element_ID']}.svg" for wall in walls]
+    assert report.slab_names == [f"{slab['element_data']['Product ID']}.svg" for slab in slabs]
+    for name in report.wall_names + report.slab_names:
+        assert (tmp_path / name).read_text().startswith("<svg")
+
+
+def test_records_are_left_unchanged(tmp_path):
+    walls = generate_walls(2)
+    before = copy.deepcopy(walls)
+    generate_drawings(str(tmp_path), walls, processes=1)
+    assert walls == before
+
+
+def test_unchanged_drawings_are_skipped(tmp_path):
+    walls = generate_walls(2)
+    generate_drawings(str(tmp_path), walls, processes=1)
+    stamps = {name: os.path.getmtime(tmp_path / name) for name in os.listdir(tmp_path) if name.endswith(".svg")}
+
+    report = generate_drawings(str(tmp_path), walls, processes=1)
+    assert (report.drawn, report.unchanged) == (0, 2)
+    assert stamps == {name: os.path.getmtime(tmp_path / name) for name in stamps}
+
+
+def test_drawing_names_are_written_to_the_matching_elements(tmp_path):
+    walls = copy.deepcopy(generate_walls(2))
+    walls[1]["element_data"]["Wall_ID"] = walls[0]["element_data"]["Wall_ID"]
+    manager = IFCManager(None)
+    manager.add_walls_bulk(walls)
+
+    report = manager.generate_drawings(str(tmp_path), walls, processes=1)
+    assert report.updated == 2
+    updater = manager.get_updater()
+    for wall, name in zip(walls, report.wall_names):
+        element = updater.get_element("IfcWall", "Element_ID", wall["element_data"]["Element_ID"])
+        assert ifcopenshell.util.element.get_pset(element, "ReC_Pset_WallGeometryData", "Drawing") == name
+
+
+def test_wall_voids_are_drawn_from_dicts_rows_or_an_array():
+    voids = [{"X": 500.0, "Y": 0.0, "Z": 0.0, "Width": 900.0, "Height": 2100.0, "Depth": 300.0},
+             {"X": 2500.0, "Y": 0.0, "Z": 900.0, "Width": 600.0, "Height": 600.0, "Depth": 300.0}]
+    rows = [list(void.values()) for void in voids]
+    from_dicts = wall_svg(4000.0, 3000.0, 200.0, voids)
+    assert wall_svg(4000.0, 3000.0, 200.0, rows) == from_dicts
+    assert wall_svg(4000.0, 3000.0, 200.0, np.array(rows)) == from_dicts
+    assert from_dicts.count('class="opening"') == 6
@@ -0,0 +1,63 @@
+import gzip
+import zipfile
+
+import ifcopenshell
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.export import build_streamed, compression_for, write_model
+from ifc_library.ifc_manager import IFCManager
+
+
+def read_model(path):
+    compression = compression_for(path)
+    if compression == "gzip":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return ifcopenshell.file.from_string(f.read())
+    if compression == "zip":
+        with zipfile.ZipFile(path) as archive:
+            return ifcopenshell.file.from_string(archive.read(archive.namelist()[0]).decode("utf-8"))
+    return ifcopenshell.open(path)
+
+
+def entity_counts(model):
+    counts = {}
+    for entity in model:
+        counts[entity.is_a()] = counts.get(entity.is_a(), 0) + 1
+    return counts
+
+
+def test_compression_is_inferred_from_the_extension():
+    assert [compression_for(path) for path in ("a.ifc", "a.ifc.gz", "a.ifcZIP")] == [None, "gzip", "zip"]
+
+
+@pytest.mark.parametrize("name", ["model.ifc", "model.ifc.gz", "model.ifcZIP"])
+def test_written_model_reopens_with_every_entity(tmp_path, name):
+    manager = IFCManager(None)
+    manager.add_walls_bulk(generate_walls(20, max_voids=2))
+    manager.add_slabs_bulk(generate_slabs(5))
+    path = str(tmp_path / name)
+
+    report = write_model(manager.model, path, chunk_size=1000)
+    reopened = read_model(path)
+    assert report.entities == len(list(manager.model))
+    assert entity_counts(reopened) == entity_counts(manager.model)
+    assert sorted(wall.GlobalId for wall in reopened.by_type("IfcWall")) == \
+        sorted(wall.GlobalId for wall in manager.model.by_type("IfcWall"))
+
+
+@pytest.mark.parametrize("name", ["streamed.ifc", "streamed.ifc.gz"])
+def test_streamed_build_holds_every_element(tmp_path, name):
+    walls = generate_walls(40, max_voids=2)
+    slabs = generate_slabs(5)
+    path = str(tmp_path / name)
+
+    report = build_streamed(path, walls, slabs, processes=2)
+    model = read_model(path)
+    assert report.entities == len(list(model))
+    assert sorted(wall.Name for wall in model.by_type("IfcWall")) == \
+        sorted(record["element_data"]["Wall_ID"] for record in walls)
+    assert len(model.by_type("IfcSlab")) == len(slabs)
+    global_ids = [element.GlobalId for element in model.by_type("IfcRoot")]
+    assert len(global_ids) == len(set(global_ids))
+    assert all(element.ContainedInStructure for element in model.by_type("IfcWall") + model.by_type("IfcSlab"))
@@ -0,0 +1,106 @@
+import copy
+
+import ifcopenshell.geom
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.ifc_manager import IFCManager
+
+SETTINGS = ifcopenshell.geom.settings()
+
+
+def identical_walls(count, mirrored=()):
+    walls = copy.deepcopy(generate_walls(count, max_voids=0))
+    for i, wall in enumerate(walls):
+        wall["geometry_data"].update(Length=4000.0, Height=3000.0, Thickness=200.0, Mirrored=i in mirrored,
+                                     Voids=[{"X": 500.0, "Z": 0.0, "Width": 900.0, "Height": 2100.0}])
+    return walls
+
+
+def mapped_item(element):
+    item, = element.Representation.Representations[0].Items
+    assert item.is_a("IfcMappedItem")
+    return item
+
+
+def bounds(element):
+    # Bounding box of the evaluated geometry in the element's own coordinates, in metres
+    verts = np.array(ifcopenshell.geom.create_shape(SETTINGS, element).geometry.verts).reshape(-1, 3)
+    return verts.min(axis=0).round(6).tolist(), verts.max(axis=0).round(6).tolist()
+
+
+def test_identical_walls_map_one_type_representation():
+    manager = IFCManager(None)
+    manager.add_walls_bulk(identical_walls(10))
+
+    wall_type, = manager.model.by_type("IfcWallType")
+    representation_map, = wall_type.RepresentationMaps
+    assert len(manager.model.by_type("IfcRepresentationMap")) == 1
+    rel, = wall_type.Types
+    walls = manager.model.by_type("IfcWall")
+    assert set(rel.RelatedObjects) == set(walls)
+    assert all(mapped_item(wall).MappingSource == representation_map for wall in walls)
+    # The openings are cut from the shared solid, not added per wall
+    assert representation_map.MappedRepresentation.Items[0].is_a("IfcBooleanResult")
+    assert not any(wall.HasOpenings for wall in walls)
+
+
+def test_dimensions_are_rounded_into_one_type():
+    walls = identical_walls(2)
+    walls[1]["geometry_data"]["Length"] = 4000.01
+    manager = IFCManager(None)
+    manager.add_walls_bulk(walls)
+    assert len(manager.model.by_type("IfcWallType")) == 1
+
+    walls[1]["geometry_data"]["Length"] = 4100.0
+    manager = IFCManager(None)
+    manager.add_walls_bulk(walls)
+    assert len(manager.model.by_type("IfcWallType")) == 2
+
+
+def test_mirrored_wall_maps_the_same_type_through_a_half_turn():
+    manager = IFCManager(None)
+    manager.add_walls_bulk(identical_walls(2, mirrored={1}))
+
+    plain, mirrored = manager.model.by_type("IfcWall")
+    assert len(manager.model.by_type("IfcWallType")) == 1
+    assert mapped_item(plain).MappingSource == mapped_item(mirrored).MappingSource
+    operator = mapped_item(mirrored).MappingTarget
+    assert operator.Axis1.DirectionRatios == (-1.0, 0.0, 0.0)
+    assert operator.Axis2.DirectionRatios == (0.0, -1.0, 0.0)
+    assert operator.LocalOrigin.Coordinates == (4000.0, 200.0, 0.0)
+    assert operator.Scale is None
+    assert mapped_item(plain).MappingTarget.Axis1 is None
+
+    # Both occupy the same box
+    assert bounds(plain) == bounds(mirrored)
+    assert bounds(plain) == ([0.0, 0.0, 0.0], [4.0, 0.2, 3.0])
+
+
+def test_mirrored_opening_is_at_the_other_end():
+    manager = IFCManager(None)
+    manager.add_walls_bulk(identical_walls(2, mirrored={1}))
+    plain, mirrored = manager.model.by_type("IfcWall")
+
+    def opening_faces(wall):
+        # x of the vertices on the opening's jambs, i.e. away from the wall ends
+        verts = np.array(ifcopenshell.geom.create_shape(SETTINGS, wall).geometry.verts).reshape(-1, 3)
+        return sorted({round(x, 6) for x in verts[:, 0]} - {0.0, 4.0})
+
+    assert opening_faces(plain) == [0.5, 1.4]
+    assert opening_faces(mirrored) == [2.6, 3.5]
+
+
+@pytest.mark.parametrize("hollow_core", [True, False])
+def test_identical_slabs_share_one_type(hollow_core):
+    slabs = copy.deepcopy(generate_slabs(4, hollow_core=hollow_core))
+    for slab in slabs[1:]:
+        for name in ("Length", "Width", "Height", "Void Count", "Void Diameter"):
+            slab["element_data"][name] = slabs[0]["element_data"][name]
+    manager = IFCManager(None)
+    manager.add_slabs_bulk(slabs)
+
+    slab_type, = manager.model.by_type("IfcSlabType")
+    assert all(mapped_item(slab).MappingSource == slab_type.RepresentationMaps[0]
+               for slab in manager.model.by_type("IfcSlab"))
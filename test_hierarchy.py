@@ -0,0 +1,63 @@
+from benchmarks.synthetic import generate_walls
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.sharding import build_sharded
+
+
+def walls_in(building_id, floors, count=8):
+    walls = generate_walls(count)
+    for i, wall in enumerate(walls):
+        wall["element_data"]["Building_ID"] = building_id
+        wall["element_data"]["Floor_Num"] = floors[i % len(floors)]
+    return walls
+
+
+def parent_name(element):
+    return [rel.RelatingObject.Name for rel in element.Decomposes]
+
+
+def test_manager_aggregates_site_building_and_storey():
+    manager = IFCManager(None)
+    assert parent_name(manager.site) == ["My Project"]
+    assert parent_name(manager.building) == ["My Site"]
+    assert parent_name(manager.storey) == ["Building A"]
+
+
+def test_bulk_walls_are_contained_in_their_storeys():
+    manager = IFCManager(None)
+    manager.add_walls_bulk(walls_in("B1", [1, 2]))
+
+    storeys = {storey.Name: storey for storey in manager.model.by_type("IfcBuildingStorey")}
+    assert parent_name(storeys["Floor 1"]) == ["B1"]
+    assert sum(len(rel.RelatedElements) for rel in storeys["Floor 2"].ContainsElements) == 4
+
+
+def test_numeric_building_id_binds_on_reopen(tmp_path):
+    path = str(tmp_path / "hierarchy.ifc")
+    manager = IFCManager(path)
+    manager.add_walls_bulk(walls_in(7, [1], count=2))
+    manager.save()
+
+    reopened = IFCManager.open(path)
+    reopened.add_walls_bulk(walls_in(7, [1], count=2))
+    assert [building.Name for building in reopened.model.by_type("IfcBuilding")] == ["Building A", "7"]
+
+
+def test_sharded_build_keeps_one_building_per_building_id(tmp_path):
+    manager, report = build_sharded(str(tmp_path / "sharded.ifc"), walls_in("B1", [1, 2]), processes=2)
+
+    buildings = [building for building in manager.model.by_type("IfcBuilding") if building.Name == "B1"]
+    assert len(buildings) == 1
+    assert parent_name(buildings[0]) == ["My Site"]
+    assert len(manager.model.by_type("IfcWall")) == 8
+
+
+def test_contained_element_moves_to_another_storey():
+    manager = IFCManager(None)
+    wall = IFCWall(manager)
+    wall.set_placement()
+    wall.assign_to_container(manager.get_storey("B1", 1))
+    manager.flush_containment()
+
+    wall.assign_to_container(manager.get_storey("B1", 2))
+    assert [rel.RelatingStructure.Name for rel in wall.element.ContainedInStructure] == ["Floor 2"]
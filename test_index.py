@@ -0,0 +1,69 @@
+import copy
+
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.index import ElementIndex
+
+
+@pytest.fixture
+def walls():
+    return copy.deepcopy(generate_walls(30, max_voids=1))
+
+
+@pytest.fixture
+def manager(walls):
+    manager = IFCManager(None)
+    manager.add_walls_bulk(walls)
+    manager.add_slabs_bulk(generate_slabs(5))
+    return manager
+
+
+def test_query_matches_a_scan_of_the_records(manager, walls):
+    index = manager.get_index()
+    status = walls[0]["element_data"]["Status"]
+    expected = sorted(record["element_data"]["Element_ID"] for record in walls
+                      if record["element_data"]["Status"] == status)
+
+    global_ids = index.query(ifc_class="IfcWall", Status=status)
+    assert sorted(index.get(global_id)["Element_ID"] for global_id in global_ids) == expected
+    assert len(index.query(ifc_class="IfcSlab")) == 5
+    assert index.query(ifc_class="IfcWall", Floor_Num=lambda floor: floor >= 0) == index.query(ifc_class="IfcWall")
+    with pytest.raises(ValueError):
+        index.query(Notes="")
+
+
+def test_find_one_resolves_to_the_element(manager, walls):
+    index = manager.get_index()
+    element_data = walls[3]["element_data"]
+    element = index.get_element(index.find_one(Element_ID=element_data["Element_ID"]))
+    assert element.is_a("IfcWall") and element.Name == element_data["Wall_ID"]
+    assert index.find_one(Element_ID=-1) is None
+
+
+def test_index_follows_upserts(manager, walls):
+    index = manager.get_index()
+    record = copy.deepcopy(walls[0])
+    old_status = record["element_data"]["Status"]
+    record["element_data"]["Status"] = "Index_Test"
+    new_record = copy.deepcopy(walls[1])
+    new_record["element_data"]["Element_ID"] = 10 ** 6
+
+    manager.upsert_walls([record, new_record])
+    global_id = index.find_one(Element_ID=record["element_data"]["Element_ID"])
+    assert index.query(Status="Index_Test") == [global_id]
+    assert global_id not in index.query(Status=old_status)
+    assert index.get_element(index.find_one(Element_ID=10 ** 6)) is not None
+
+
+def test_saved_index_is_queried_without_the_model(manager, walls, tmp_path):
+    index = manager.get_index()
+    path = index.save(str(tmp_path / "model.ifc.index.json"))
+
+    loaded = ElementIndex.load(path)
+    status = walls[0]["element_data"]["Status"]
+    assert loaded.query(ifc_class="IfcWall", Status=status) == index.query(ifc_class="IfcWall", Status=status)
+    assert loaded.find_one(Element_ID=walls[5]["element_data"]["Element_ID"]) == \
+        index.find_one(Element_ID=walls[5]["element_data"]["Element_ID"])
+    assert loaded.get_element(loaded.find_one(Element_ID=walls[5]["element_data"]["Element_ID"])) is None
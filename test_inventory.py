@@ -0,0 +1,48 @@
+import numpy as np
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.inventory import SlabInventory, WallInventory
+from ifc_library.pset_templates import get_pset
+
+
+def test_wall_inventory_packs_columns_and_voids():
+    records = generate_walls(20)
+    inventory = WallInventory.from_records(records)
+
+    assert len(inventory) == 20
+    assert inventory.column("Length").tolist() == [record["geometry_data"]["Length"] for record in records]
+    assert len(inventory.void_values) == sum(len(record["geometry_data"]["Voids"]) for record in records)
+    assert inventory[3].element_id == records[3]["element_data"]["Element_ID"]
+
+
+def test_select_keeps_the_voids_of_the_selected_walls():
+    records = generate_walls(20)
+    inventory = WallInventory.from_records(records)
+    selected = inventory.select(np.arange(20) % 2 == 1)
+
+    assert len(selected) == 10
+    assert selected[2].voids.tolist() == inventory[5].voids.tolist()
+
+
+def test_element_id_is_an_opaque_key():
+    records = generate_walls(3)
+    records[0]["element_data"]["Element_ID"] = "W-7"
+    inventory = WallInventory.from_records(records)
+    assert [record.element_id for record in inventory] == ["W-7", 1, 2]
+
+    manager = IFCManager(None)
+    manager.add_walls_bulk(inventory)
+    values = {}
+    for wall in manager.model.by_type("IfcWall"):
+        prop = next(prop for prop in get_pset(wall, "ReC_Pset_WallElementData").HasProperties if prop.Name == "Element_ID")
+        values[prop.NominalValue.wrappedValue] = prop.NominalValue.is_a()
+    assert values == {"W-7": "IfcLabel", 1: "IfcInteger", 2: "IfcInteger"}
+
+
+def test_slab_inventory_builds_like_the_records():
+    records = generate_slabs(5)
+    manager = IFCManager(None)
+    manager.add_slabs_bulk(SlabInventory.from_records(records))
+    assert sorted(slab.Name for slab in manager.model.by_type("IfcSlab")) == \
+        sorted(record["element_data"]["Product ID"] for record in records)
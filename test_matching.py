@@ -0,0 +1,78 @@
+import copy
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.inventory import SlabInventory, WallInventory
+from ifc_library.matching import apply_slab_matches, apply_wall_matches, match_slabs, match_walls
+
+
+def wall_stock(count=20):
+    records = copy.deepcopy(generate_walls(count, max_voids=2))
+    for record in records:
+        record["element_data"]["Status"] = "Available"
+    return WallInventory.from_records(records)
+
+
+def wall_demands(inventory, count=3):
+    # Slots slightly smaller than stock walls, so that each has a fit
+    demands = []
+    for row in range(count):
+        record = inventory[row]
+        voids = [dict(zip(("X", "Y", "Z", "Width", "Height", "Depth"), void)) for void in record.voids.tolist()]
+        demands.append({"Demand_ID": f"D{row}", "Length": record.length - 100.0, "Height": record.height - 50.0,
+                        "Thickness": record.thickness, "Voids": voids})
+    return demands
+
+
+def test_walls_fit_slots_with_their_void_layout():
+    inventory = wall_stock()
+    demands = wall_demands(inventory)
+    result = match_walls(demands, inventory)
+    assert result.matched == len(demands)
+    for demand_index, row in result.pairs():
+        assert inventory[row].length >= demands[demand_index]["Length"]
+
+
+def test_walls_match_voids_listed_in_another_order():
+    inventory = wall_stock()
+    demands = [demand for demand in wall_demands(inventory, count=10) if len(demand["Voids"]) > 1]
+    assert demands
+    for demand in demands:
+        demand["Voids"].reverse()
+    assert match_walls(demands, inventory).matched == len(demands)
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_matched_walls_are_built(shared):
+    inventory = wall_stock()
+    demands = wall_demands(inventory)
+    result = match_walls(demands, inventory)
+
+    manager = IFCManager(None)
+    walls = apply_wall_matches(manager, demands, inventory, result, shared=shared)
+    assert len(walls) == len(demands)
+    assert all(wall.element.Representation is not None for wall in walls)
+    if not shared:
+        assert [len(wall.element.HasOpenings) for wall in walls] == [len(demand["Voids"]) for demand in demands]
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_matched_slabs_are_placed_by_their_matrix(shared):
+    records = generate_slabs(10)
+    inventory = SlabInventory.from_records(records)
+    matrix = np.identity(4)
+    matrix[:3, 3] = (6000.0, 1200.0, 3000.0)
+    element_data = records[0]["element_data"]
+    demands = [{"Demand_ID": "S1", "Length": element_data["Length"], "Width": element_data["Width"],
+                "Height": element_data["Height"], "Void Count": element_data["Void Count"],
+                "Void Diameter": element_data["Void Diameter"], "Matrix": matrix}]
+    result = match_slabs(demands, inventory)
+
+    manager = IFCManager(None)
+    slab, = apply_slab_matches(manager, demands, inventory, result, shared=shared)
+    # The project is in mm, like the records
+    assert slab.element.ObjectPlacement.RelativePlacement.Location.Coordinates == (6000.0, 1200.0, 3000.0)
+    assert slab.element.Representation is not None
@@ -0,0 +1,64 @@
+import ifcopenshell.geom
+import ifcopenshell.util.shape
+import numpy as np
+import pytest
+
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.geometry_cache import wall_voids
+from ifc_library.ifc_manager import IFCManager
+
+SETTINGS = ifcopenshell.geom.settings()
+
+
+def many_voids(count=40):
+    # A grid of small openings in two sizes over a 20 m x 6 m wall
+    return [{"X": 100.0 + (i % 20) * 990.0, "Y": -50.0, "Z": 200.0 + (i // 20) * 3000.0,
+             "Width": 500.0 if i % 2 else 300.0, "Height": 800.0, "Depth": 300.0} for i in range(count)]
+
+
+def sorted_voids(wall):
+    return sorted(tuple(void.values()) for void in wall_voids(wall, 1.0))
+
+
+def plain_wall(manager):
+    wall = IFCWall(manager)
+    wall.set_placement()
+    wall.add_wall_representation(20000.0, 6000.0, 200.0)
+    return wall
+
+
+def test_batched_openings_are_related_to_the_wall():
+    manager = IFCManager(None)
+    wall = plain_wall(manager)
+    openings = wall.add_voids(many_voids(), 200.0)
+
+    assert len(openings) == 40
+    assert [rel.RelatedOpeningElement for rel in wall.element.HasOpenings] == openings
+    rels = manager.model.by_type("IfcRelVoidsElement")
+    assert len(rels) == 40 and all(rel.RelatingBuildingElement == wall.element for rel in rels)
+    assert all(opening.ObjectPlacement.PlacementRelTo == wall.element.ObjectPlacement for opening in openings)
+    # Openings of the same size share their box representation
+    assert len({opening.Representation.id() for opening in openings}) == 2
+
+
+def test_batched_openings_match_single_openings():
+    batched_manager = IFCManager(None)
+    batched = plain_wall(batched_manager)
+    batched.add_voids(np.array([list(void.values()) for void in many_voids()]), 200.0)
+    single_manager = IFCManager(None)
+    single = plain_wall(single_manager)
+    for void in many_voids():
+        single.add_void(void, 200.0)
+
+    assert np.allclose(sorted_voids(batched.element), sorted_voids(single.element))
+    volumes = [ifcopenshell.util.shape.get_volume(ifcopenshell.geom.create_shape(SETTINGS, wall.element).geometry)
+               for wall in (batched, single)]
+    assert volumes[0] == pytest.approx(volumes[1])
+    assert volumes[0] == pytest.approx(20.0 * 6.0 * 0.2 - 20 * (0.3 + 0.5) * 0.8 * 0.2)
+
+
+def test_empty_void_layout_adds_nothing():
+    manager = IFCManager(None)
+    wall = plain_wall(manager)
+    assert wall.add_voids([], 200.0) == []
+    assert not wall.element.HasOpenings
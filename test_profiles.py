@@ -0,0 +1,66 @@
+import ifcopenshell
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_slabs
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.profiles import ProfileCache, hollow_core_points, hollow_core_web_thickness
+
+
+def test_cores_are_evenly_spaced_between_equal_webs():
+    points = hollow_core_points(1200.0, 400.0, 4, 250.0)
+    web = hollow_core_web_thickness(1200.0, 4, 250.0)
+    assert points.shape == (4 + 4 * 4, 2)
+    assert points[:4].tolist() == [[0.0, 0.0], [1200.0, 0.0], [1200.0, 400.0], [0.0, 400.0]]
+
+    cores = points[4:].reshape(4, 4, 2)
+    centres = cores.mean(axis=1)
+    assert np.allclose(centres[:, 1], 200.0)
+    assert np.allclose(np.diff(centres[:, 0]), 250.0 + web)
+    assert centres[0, 0] - 125.0 == pytest.approx(web)
+    assert np.allclose(np.linalg.norm(cores - centres[:, None, :], axis=2), 125.0)
+
+    with pytest.raises(ValueError):
+        hollow_core_points(1200.0, 400.0, 5, 250.0)
+
+
+def test_profile_has_one_circular_void_curve_per_core():
+    cache = ProfileCache(ifcopenshell.file(schema="IFC4"))
+    profile = cache.get_hollow_core_profile(1200, 400, 4, 250.0)
+
+    assert profile.is_a("IfcArbitraryProfileDefWithVoids")
+    outer = profile.OuterCurve
+    assert [segment.is_a() for segment in outer.Segments] == ["IfcLineIndex"]
+    assert outer.Segments[0].wrappedValue == (1, 2, 3, 4, 1)
+    assert len(profile.InnerCurves) == 4
+    for curve in profile.InnerCurves:
+        assert curve.Points == outer.Points
+        assert [segment.is_a() for segment in curve.Segments] == ["IfcArcIndex", "IfcArcIndex"]
+        (right, top, left), (left_again, bottom, right_again) = [segment.wrappedValue for segment in curve.Segments]
+        assert (left_again, right_again) == (left, right)
+    assert len(outer.Points.CoordList) == 4 + 4 * 4
+
+
+def test_profiles_are_reused_per_cross_section():
+    cache = ProfileCache(ifcopenshell.file(schema="IFC4"))
+    profile = cache.get_hollow_core_profile(1200, 400, 4, 250.0)
+    assert cache.get_hollow_core_profile(1200.0, 400.0, 4.0, 250) == profile
+    assert cache.get_hollow_core_profile(1200, 320, 4, 250.0) != profile
+    assert len(cache.profiles) == 2
+
+
+def test_profiles_are_written_in_project_units():
+    cache = ProfileCache(ifcopenshell.file(schema="IFC4"), unit_scale=1000.0)
+    profile = cache.get_hollow_core_profile(1200, 400, 4, 250.0)
+    assert profile.OuterCurve.Points.CoordList[2] == (1.2, 0.4)
+
+
+def test_slabs_of_the_same_section_share_one_profile():
+    slabs = generate_slabs(20)
+    sections = {tuple(slab["element_data"][name] for name in ("Width", "Height", "Void Count", "Void Diameter"))
+                for slab in slabs}
+    assert len(sections) < len(slabs)
+    manager = IFCManager(None)
+    manager.add_slabs_bulk(slabs, share_geometry=False)
+    assert len(manager.model.by_type("IfcArbitraryProfileDefWithVoids")) == len(sections)
+    assert len(manager.get_geometry_cache().profiles.profiles) == len(sections)
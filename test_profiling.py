@@ -0,0 +1,59 @@
+import json
+
+import ifcopenshell.api
+
+import ifc_library.elements.ifc_wall
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.profiling import ApiProfiler
+
+
+def build_walls(manager, count=3):
+    for _ in range(count):
+        wall = IFCWall(manager)
+        wall.set_placement()
+        wall.add_wall_representation(4000.0, 3000.0, 200.0)
+        wall.add_void({"X": 500.0, "Z": 0.0, "Width": 900.0, "Height": 2100.0}, 200.0)
+        wall.add_property_set({"Pset_Test": {"Note": "x"}})
+
+
+def test_calls_are_counted_per_api_and_element_class():
+    manager = IFCManager(None)
+    with ApiProfiler() as profiler:
+        assert ifc_library.elements.ifc_wall.run is not ifcopenshell.api.run
+        build_walls(manager)
+    assert ifc_library.elements.ifc_wall.run is ifcopenshell.api.run
+
+    calls = {api: stats.count for api, stats in profiler.by_api().items()}
+    assert calls == {"root.create_entity": 6, "geometry.edit_object_placement": 6,
+                     "geometry.add_wall_representation": 6, "geometry.assign_representation": 6,
+                     "feature.add_feature": 3, "pset.add_pset": 3, "pset.edit_pset": 3}
+    assert profiler.stats[("root.create_entity", "IfcOpeningElement")].count == 3
+    assert profiler.stats[("root.create_entity", "IfcWall")].count == 3
+    assert profiler.stats[("root.create_entity", "IfcWall")].entities >= 3
+
+    # Nothing is recorded once disabled
+    build_walls(manager, 1)
+    assert sum(calls.values()) == sum(stats.count for stats in profiler.by_api().values())
+
+
+def test_report_is_saved_as_json_and_prometheus(tmp_path):
+    manager = IFCManager(None)
+    with ApiProfiler() as profiler:
+        build_walls(manager)
+
+    profiler.save_json(str(tmp_path / "profile.json"))
+    report = json.loads((tmp_path / "profile.json").read_text())
+    apis = {api["api"]: api for api in report["apis"]}
+    assert apis["feature.add_feature"]["calls"] == 3
+    assert apis["root.create_entity"]["by_element_class"]["IfcOpeningElement"]["calls"] == 3
+    assert [api["seconds"] for api in report["apis"]] == sorted((api["seconds"] for api in report["apis"]), reverse=True)
+    assert {"p50", "p90", "p99"} <= set(apis["pset.edit_pset"])
+
+    profiler.save_prometheus(str(tmp_path / "profile.prom"))
+    lines = (tmp_path / "profile.prom").read_text().splitlines()
+    assert "# TYPE ifc_library_api_calls_total counter" in lines
+    assert 'ifc_library_api_calls_total{api="feature.add_feature",element_class="IfcWall"} 3' in lines
+    assert 'ifc_library_api_latency_seconds_count{api="root.create_entity"} 6' in lines
+    assert any(line.startswith('ifc_library_api_latency_seconds{api="pset.add_pset",quantile="0.99"}')
+               for line in lines)
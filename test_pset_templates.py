@@ -0,0 +1,82 @@
+import copy
+
+import ifcopenshell.util.element
+
+from benchmarks.synthetic import generate_walls
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.pset_templates import PSET_TEMPLATES, PropertyInterner, get_pset
+
+
+def status_properties(model):
+    return [prop for prop in model.by_type("IfcPropertySingleValue") if prop.Name == "Status"]
+
+
+def test_properties_are_written_in_template_order():
+    manager = IFCManager(None)
+    wall = IFCWall(manager)
+    properties = {"Extra": "x", "Status": "Available", "Element_ID": "7", "Notes": None, "Wall_ID": "W-7"}
+    pset = manager.get_pset_writer().write(wall.element, "ReC_Pset_WallElementData", properties)
+
+    assert [prop.Name for prop in pset.HasProperties] == ["Element_ID", "Wall_ID", "Status", "Extra"]
+    template_names = PSET_TEMPLATES["ReC_Pset_WallElementData"].property_names
+    assert template_names.index("Element_ID") < template_names.index("Wall_ID") < template_names.index("Status")
+
+
+def test_value_types_round_trip():
+    manager = IFCManager(None)
+    wall = IFCWall(manager)
+    properties = {"Length": 4000.0, "Height": 3000, "Mirrored": True, "Strength_Class": "C30/37"}
+    pset = manager.get_pset_writer().write(wall.element, "ReC_Pset_WallGeometryData", properties)
+
+    assert {prop.Name: prop.NominalValue.is_a() for prop in pset.HasProperties} == {
+        "Length": "IfcReal", "Height": "IfcInteger", "Mirrored": "IfcBoolean", "Strength_Class": "IfcLabel"}
+    values = ifcopenshell.util.element.get_pset(wall.element, "ReC_Pset_WallGeometryData")
+    assert {name: (type(values[name]), values[name]) for name in properties} == \
+        {name: (type(value), value) for name, value in properties.items()}
+    assert get_pset(wall.element, "ReC_Pset_WallGeometryData") == pset
+
+
+def test_interned_values_are_shared_across_elements():
+    walls = generate_walls(30)
+    statuses = {wall["element_data"]["Status"] for wall in walls}
+
+    interned = IFCManager(None, intern_property_values=True)
+    interned.add_walls_bulk(walls)
+    assert len(status_properties(interned.model)) == len(statuses)
+    plain = IFCManager(None)
+    plain.add_walls_bulk(walls)
+    assert len(status_properties(plain.model)) == len(walls)
+
+    # Unique values such as Element_ID are never interned
+    element_ids = [prop for prop in interned.model.by_type("IfcPropertySingleValue") if prop.Name == "Element_ID"]
+    assert len(element_ids) == len(walls)
+
+
+def test_interner_keeps_types_apart():
+    manager = IFCManager(None)
+    interner = PropertyInterner(manager.model)
+    one = [interner.get("Floor_Num", value) for value in (1, 1.0, True)]
+    assert len({prop.id() for prop in one}) == 3
+    assert interner.get("Floor_Num", 1) == one[0]
+
+
+def test_updating_an_interned_value_leaves_the_other_elements_unchanged():
+    walls = copy.deepcopy(generate_walls(2))
+    for wall in walls:
+        wall["element_data"]["Status"] = "Available"
+    manager = IFCManager(None, intern_property_values=True)
+    manager.add_walls_bulk(walls)
+    first, second = manager.model.by_type("IfcWall")
+    shared, = status_properties(manager.model)
+
+    written = []
+    writer = manager.get_pset_writer()
+    writer.listeners.append(lambda element, pset_name, properties: written.append((element, properties)))
+    assert writer.update(first, "ReC_Pset_WallElementData", {"Status": "Installed"})
+    assert not writer.update(first, "ReC_Pset_WallElementData", {"Status": "Installed"})
+
+    assert ifcopenshell.util.element.get_pset(first, "ReC_Pset_WallElementData", "Status") == "Installed"
+    assert ifcopenshell.util.element.get_pset(second, "ReC_Pset_WallElementData", "Status") == "Available"
+    assert shared.NominalValue.wrappedValue == "Available"
+    assert written == [(first, {"Status": "Installed"})]
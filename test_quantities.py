@@ -0,0 +1,66 @@
+import ifcopenshell.geom
+import ifcopenshell.util.element
+import ifcopenshell.util.shape
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.elements.ifc_slab import IFCSlab
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.quantities import wall_quantities
+
+SETTINGS = ifcopenshell.geom.settings()
+
+
+def volume(element):
+    # Volume of the evaluated geometry, openings cut, in m³
+    return ifcopenshell.util.shape.get_volume(ifcopenshell.geom.create_shape(SETTINGS, element).geometry)
+
+
+def quantity(element, qto_name, name):
+    return ifcopenshell.util.element.get_pset(element, qto_name)[name]
+
+
+def test_wall_quantities_are_in_si_units():
+    wall = {"element_data": {"Strength_Class": "C30/37"},
+            "geometry_data": {"Length": 5000, "Height": 3000, "Thickness": 200,
+                              "Voids": [{"X": 1000, "Z": 0, "Width": 1000, "Height": 2000}]}}
+    table = wall_quantities([wall])
+    assert table["Length"][0] == pytest.approx(5.0)
+    assert table["GrossVolume"][0] == pytest.approx(3.0)
+    assert table["NetVolume"][0] == pytest.approx(2.6)
+    assert table["NetWeight"][0] == pytest.approx(6500.0)
+
+
+@pytest.mark.parametrize("share_geometry", [True, False])
+def test_wall_geometry_matches_its_quantities(share_geometry):
+    manager = IFCManager(None)
+    manager.add_walls_bulk(generate_walls(3, max_voids=2), share_geometry=share_geometry, quantities=True)
+
+    for wall in manager.model.by_type("IfcWall"):
+        assert volume(wall) == pytest.approx(quantity(wall, "Qto_WallBaseQuantities", "NetVolume"), rel=1e-3)
+
+
+@pytest.mark.parametrize("share_geometry", [True, False])
+def test_slab_geometry_matches_its_quantities(share_geometry):
+    manager = IFCManager(None)
+    manager.add_slabs_bulk(generate_slabs(3), share_geometry=share_geometry, quantities=True)
+
+    for slab in manager.model.by_type("IfcSlab"):
+        assert volume(slab) == pytest.approx(quantity(slab, "Qto_SlabBaseQuantities", "NetVolume"), rel=1e-2)
+
+
+def test_solid_slab_through_the_geometry_api_is_in_millimetres():
+    manager = IFCManager(None)
+    slab = IFCSlab(manager)
+    slab.set_placement()
+    slab.add_solid_representation(6000, 1200, 200)
+    assert volume(slab.element) == pytest.approx(6.0 * 1.2 * 0.2)
+
+
+def test_wall_through_the_geometry_api_is_in_millimetres():
+    manager = IFCManager(None)
+    wall = IFCWall(manager)
+    wall.set_placement()
+    wall.add_wall_representation(5000, 3000, 200, voids=[{"X": 1000, "Z": 0, "Width": 1000, "Height": 2000}])
+    assert volume(wall.element) == pytest.approx(5.0 * 3.0 * 0.2 - 1.0 * 2.0 * 0.2)
@@ -0,0 +1,73 @@
+import copy
+import json
+import threading
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.synthetic import generate_walls
+from ifc_library.service import GenerationHandler, GenerationService, Job
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    service = GenerationService(str(tmp_path_factory.mktemp("jobs")), workers=1)
+    handler = type("Handler", (GenerationHandler,), {"service": service})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def post(server, body, query=""):
+    connection = HTTPConnection(*server.server_address, timeout=60)
+    connection.request("POST", f"/jobs{query}", json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response.status, data
+
+
+def test_submission_is_built_into_an_ifc_file(server):
+    status, body = post(server, generate_walls(3), "?wait=60")
+    assert status == 200
+    assert body.startswith(b"ISO-10303-21")
+
+
+def test_invalid_records_are_answered_with_the_error_table(server):
+    walls = copy.deepcopy(generate_walls(2))
+    walls[1]["geometry_data"]["Length"] = "abc"
+
+    status, body = post(server, walls)
+    assert status == 422
+    assert json.loads(body)["records"] == {"walls": {"1": ["Length: value is not a number"]}}
+
+
+def test_malformed_records_are_a_bad_request(server):
+    status, body = post(server, [1, 2])
+    assert status == 400
+    assert "Malformed records" in json.loads(body)["error"]
+
+
+def test_non_numeric_wait_is_a_bad_request(server):
+    status, body = post(server, generate_walls(1), "?wait=abc")
+    assert status == 400
+    assert "wait is not a number" in json.loads(body)["error"]
+
+
+def test_job_without_future_is_queued():
+    assert Job("id", "job.ifc", 1, 0).status == "queued"
+
+
+def test_submitted_job_is_registered_with_its_future(tmp_path):
+    service = GenerationService(str(tmp_path), workers=1)
+    try:
+        job = service.submit(generate_walls(1))
+        assert service.get(job.id).future is not None
+        assert service.wait(job, 60) and job.status == "done"
+    finally:
+        service.close()
@@ -0,0 +1,56 @@
+import ifcopenshell.util.element
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.sharding import build_sharded, partition_records
+
+
+def containment(model):
+    # Element_ID / Product_ID of each element, to the building and storey names it is contained in
+    result = {}
+    for ifc_class, pset, name in (("IfcWall", "ReC_Pset_WallElementData", "Element_ID"),
+                                  ("IfcSlab", "ReC_Pset_SlabElementData", "Product_ID")):
+        for element in model.by_type(ifc_class):
+            storey = ifcopenshell.util.element.get_container(element)
+            building = ifcopenshell.util.element.get_aggregate(storey)
+            key = ifcopenshell.util.element.get_pset(element, pset, name)
+            result[(ifc_class, key)] = (building.Name, storey.Name)
+    return result
+
+
+def test_records_are_partitioned_by_building_wing_and_floor():
+    walls = generate_walls(50)
+    shards = partition_records(walls)
+    assert sum(len(records) for records in shards.values()) == len(walls)
+    for key, records in shards.items():
+        assert all(tuple(record["element_data"][name] for name in ("Building_ID", "Wing", "Floor_Num")) == key
+                   for record in records)
+
+
+def test_sharded_build_merges_every_element(tmp_path):
+    walls = generate_walls(60, max_voids=2)
+    slabs = generate_slabs(10)
+    manager, report = build_sharded(str(tmp_path / "sharded.ifc"), walls, slabs, processes=2)
+
+    model = manager.model
+    assert report.count == len(walls) + len(slabs)
+    assert report.batches == len(partition_records(walls)) + 1
+    assert len(model.by_type("IfcWall")) == len(walls)
+    assert len(model.by_type("IfcSlab")) == len(slabs)
+    global_ids = [element.GlobalId for element in model.by_type("IfcRoot")]
+    assert len(global_ids) == len(set(global_ids))
+    assert len(model.by_type("IfcProject")) == 1
+
+
+def test_sharded_build_keeps_the_storey_containment(tmp_path):
+    walls = generate_walls(40, max_voids=1)
+    slabs = generate_slabs(5)
+    sharded, _ = build_sharded(str(tmp_path / "sharded.ifc"), walls, slabs, processes=2)
+    single = IFCManager(None)
+    single.add_walls_bulk(walls)
+    single.add_slabs_bulk(slabs)
+
+    assert containment(sharded.model) == containment(single.model)
+    storeys = sorted((storey.Name, ifcopenshell.util.element.get_aggregate(storey).Name)
+                     for storey in sharded.model.by_type("IfcBuildingStorey"))
+    assert len(storeys) == len(set(storeys))
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.diff import Snapshot, diff_snapshots
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.sidecar import Sidecar
+
+
+@pytest.fixture
+def model_and_sidecar(tmp_path):
+    manager = IFCManager(None)
+    manager.add_walls_bulk(generate_walls(10))
+    manager.add_slabs_bulk(generate_slabs(5))
+    path = str(tmp_path / "inventory.npz")
+    manager.export_sidecar(path)
+    return manager, path
+
+
+def test_sidecar_holds_every_element(model_and_sidecar):
+    manager, path = model_and_sidecar
+    sidecar = Sidecar(path)
+    for ifc_class in ("IfcWall", "IfcSlab"):
+        global_ids = sorted(element.GlobalId for element in manager.model.by_type(ifc_class))
+        assert sorted(sidecar.global_ids(ifc_class).astype(str).tolist()) == global_ids
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_import_rebuilds_the_same_inventory(model_and_sidecar, shared):
+    manager, path = model_and_sidecar
+    imported = IFCManager(None)
+    created = imported.import_sidecar(path, shared=shared)
+
+    assert len(created) == 15
+    assert all(element.element.Representation is not None for element in created)
+    changes = diff_snapshots(Snapshot.from_model(manager.model), Snapshot.from_model(imported.model))
+    assert not changes.added and not changes.removed
+    # Sidecars hold no openings, so only the void layouts of the imported walls differ
+    assert all(item["properties"] == {} and item["voids"] == [] for item in changes.modified)
+    updater = manager.get_updater()
+    assert len(changes.modified) == sum(1 for wall in manager.model.by_type("IfcWall") if updater.wall_voids(wall))
+
+
+def test_sidecar_snapshot_matches_the_model(model_and_sidecar):
+    manager, path = model_and_sidecar
+    from_model = Snapshot.from_model(manager.model)
+    from_sidecar = Snapshot.load(path)
+    for ifc_class in ("IfcWall", "IfcSlab"):
+        assert np.array_equal(np.sort(from_model.hashes(ifc_class)), np.sort(from_sidecar.hashes(ifc_class)))
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.synthetic import generate_walls
+from ifc_library.ifc_manager import IFCManager
+
+SPATIAL_CLASSES = ("IfcProject", "IfcSite", "IfcBuilding", "IfcBuildingStorey", "IfcRelAggregates")
+
+
+def global_ids(model):
+    return {element.GlobalId for ifc_class in SPATIAL_CLASSES for element in model.by_type(ifc_class)}
+
+
+@pytest.fixture(params=["setup", "clone"])
+def managers(request, monkeypatch):
+    # Either the first manager of the process sets the skeleton up, or both are cloned from it
+    monkeypatch.setattr(IFCManager, "skeleton", None)
+    if request.param == "clone":
+        IFCManager(None)
+    return IFCManager(None), IFCManager(None)
+
+
+def test_managers_get_distinct_global_ids(managers):
+    first, second = managers
+    assert IFCManager.skeleton is not None
+    assert len(global_ids(first.model)) == len(global_ids(second.model)) == len(SPATIAL_CLASSES) + 2
+    assert not global_ids(first.model) & global_ids(second.model)
+
+
+def test_managers_do_not_share_entities(managers):
+    first, second = managers
+    assert first.model is not second.model
+    for name in ("project", "context", "body", "site", "building", "storey"):
+        entity = getattr(second, name)
+        assert entity is not None and second.model.by_id(entity.id()) == entity
+    second.project.Name = "Other Project"
+    assert first.project.Name == "My Project"
+
+    first.add_walls_bulk(generate_walls(3))
+    assert len(first.model.by_type("IfcWall")) == 3
+    assert not second.model.by_type("IfcWall")
+    assert not second.storey.ContainsElements
+
+
+def test_import_does_not_load_ifcopenshell():
+    code = ("import sys, ifc_library; assert 'ifcopenshell' not in sys.modules; "
+            "ifc_library.IFCManager; assert 'ifcopenshell' in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)
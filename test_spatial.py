@@ -0,0 +1,102 @@
+import copy
+
+import ifcopenshell
+import numpy as np
+import pytest
+import shapely
+
+from benchmarks.synthetic import generate_walls
+from ifc_library.elements.ifc_wall import IFCWall
+from ifc_library.ifc_manager import IFCManager
+from ifc_library.spatial import FootprintIndex, Grid, SpatialIndex, parse_grid_pos
+
+
+def test_grid_positions():
+    assert parse_grid_pos("A1") == (0, 0)
+    assert parse_grid_pos("ab3") == (27, 2)
+    assert Grid(6000.0, 7200.0, origin=(100.0, 200.0)).position("C12") == (12100.0, 79400.0)
+    with pytest.raises(ValueError):
+        parse_grid_pos("12C")
+
+
+def test_grid_placement_faces_its_orientation():
+    matrix = Grid().placement_matrix("B2", "East", elevation=3000.0)
+    assert matrix[:3, 3].tolist() == [7200.0, 7200.0, 3000.0]
+    # The wall's length runs along +y when its outer face looks East
+    assert np.allclose(matrix[:3, :3] @ (1.0, 0.0, 0.0), (0.0, 1.0, 0.0))
+    with pytest.raises(ValueError):
+        Grid().placement_matrix("B2", "Up")
+
+
+def filled_index(count):
+    # A row of 1000 x 200 footprints 1500 apart, the last ones left in the buffer
+    model = ifcopenshell.file()
+    index = FootprintIndex()
+    elements = []
+    for i in range(count):
+        element = model.createIfcWall(ifcopenshell.guid.new())
+        index.add(element, shapely.box(i * 1500.0, 0.0, i * 1500.0 + 1000.0, 200.0))
+        elements.append(element)
+    return index, elements
+
+
+@pytest.mark.parametrize("count", [10, FootprintIndex.BUFFER_SIZE * 3 + 10])
+def test_packed_and_buffered_footprints_answer_alike(count):
+    index, elements = filled_index(count)
+    assert len(index) == count
+    assert (len(index.trees) > 0) == (count >= FootprintIndex.BUFFER_SIZE) and index.buffer
+
+    for i in (0, count - 1):
+        # A point inside footprint i, on the packed path for the first one and in the buffer for the last
+        point = shapely.Point(i * 1500.0 + 500.0, 100.0)
+        assert index.query(point, "within") == [elements[i]]
+        assert index.query(point, "contains") == []
+        area = shapely.box(i * 1500.0 - 10.0, -10.0, i * 1500.0 + 1010.0, 210.0)
+        assert index.query(area, "contains") == [elements[i]]
+        assert index.query(area, "within") == []
+
+
+def test_clashes_near_and_nearest():
+    count = FootprintIndex.BUFFER_SIZE + 5
+    index, elements = filled_index(count)
+    for i in (3, count - 2):
+        assert index.clashes(shapely.box(i * 1500.0 + 900.0, 0.0, i * 1500.0 + 1200.0, 200.0)) == [elements[i]]
+        # Touching edges are not clashes
+        assert index.clashes(shapely.box(i * 1500.0 + 1000.0, 0.0, i * 1500.0 + 1200.0, 200.0)) == []
+        assert sorted(index.near(i * 1500.0 + 1250.0, 100.0, 300.0), key=lambda e: e.id()) == \
+            [elements[i], elements[i + 1]]
+        assert index.nearest(i * 1500.0 + 1100.0, 100.0) == elements[i]
+
+    index.remove(elements[3])
+    assert index.clashes(shapely.box(3 * 1500.0, 0.0, 3 * 1500.0 + 1000.0, 200.0)) == []
+    assert index.nearest(3 * 1500.0 + 500.0, 100.0) in (elements[2], elements[4])
+
+
+def test_spatial_index_follows_walls_placed_on_the_grid():
+    walls = copy.deepcopy(generate_walls(2, max_voids=0))
+    for wall, grid_pos in zip(walls, ("A1", "A1")):
+        wall["element_data"].update(Grid_Pos=grid_pos, Orientation="South", Building_ID=None, Floor_Num=None)
+        wall["geometry_data"].update(Length=4000.0, Thickness=200.0)
+    manager = IFCManager(None)
+    index = manager.get_spatial_index()
+    manager.add_walls_bulk(walls, place_on_grid=True)
+
+    storey = manager.get_storey()
+    first, second = manager.model.by_type("IfcWall")
+    assert index.clashes(storey, first) == [second]
+    assert index.clash_pairs(storey) == [(first, second)]
+    assert index.near(storey, 5000.0, 100.0, 500.0) == []
+    assert sorted(index.near(storey, 2000.0, 100.0, 10.0), key=lambda e: e.id()) == [first, second]
+
+    # A wall built through the element API is indexed when contained
+    wall = IFCWall(manager)
+    wall.place_on_grid("B1", "South")
+    wall.add_wall_representation(4000.0, 3000.0, 200.0)
+    wall.assign_to_container(storey)
+    assert index.clashes(storey, shapely.box(7300.0, 0.0, 7400.0, 100.0)) == [wall.element]
+
+    # Rebuilt from the placements and ReC_Pset_* dimensions of the model, the index answers the same
+    manager.flush_containment()
+    rebuilt = SpatialIndex.build(manager)
+    assert rebuilt.clashes(storey, first) == [second]
+    assert rebuilt.footprint(first).equals(index.footprint(first))
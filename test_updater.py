@@ -0,0 +1,79 @@
+import copy
+
+import pytest
+
+from benchmarks.synthetic import generate_walls
+from ifc_library.ifc_manager import IFCManager
+
+
+def with_changes(record, section, **changes):
+    record = copy.deepcopy(record)
+    record[section].update(changes)
+    return record
+
+
+def storey_names(element):
+    return [rel.RelatingStructure.Name for rel in element.ContainedInStructure]
+
+
+@pytest.mark.parametrize("share_geometry", [True, False])
+def test_repeated_dimension_upserts_rebuild_geometry(share_geometry):
+    manager = IFCManager(None)
+    record = generate_walls(1, max_voids=3)[0]
+    manager.add_walls_bulk([record], share_geometry=share_geometry)
+    updater = manager.get_updater()
+
+    sizes = []
+    for length in (4000.0, 4500.0, 4000.0, 4500.0, 4000.0):
+        record = with_changes(record, "geometry_data", Length=length)
+        report = updater.upsert_walls([record], rebuild_geometry=True)
+        assert report.updated == 1
+        sizes.append(len(list(manager.model)))
+
+    wall = manager.model.by_type("IfcWall")[0]
+    assert wall.Representation is not None
+    # Once both shared types exist, rebuilding the same geometry neither leaks nor loses entities
+    assert sizes[1] == sizes[3] and sizes[2] == sizes[4]
+
+
+def test_unchanged_upsert_reports_unchanged():
+    manager = IFCManager(None)
+    record = generate_walls(1)[0]
+    manager.add_walls_bulk([record])
+    assert manager.get_updater().upsert_walls([record]).unchanged == 1
+
+
+def test_floor_change_moves_wall_to_its_storey():
+    manager = IFCManager(None)
+    record = with_changes(generate_walls(1)[0], "element_data", Building_ID="B1", Floor_Num=1)
+    manager.add_walls_bulk([record])
+    manager.flush_containment()
+
+    manager.get_updater().upsert_walls([with_changes(record, "element_data", Floor_Num=2)])
+    wall = manager.model.by_type("IfcWall")[0]
+    assert storey_names(wall) == ["Floor 2"]
+
+
+def test_grid_change_places_wall_again_and_keeps_builder_settings():
+    manager = IFCManager(None)
+    record = with_changes(generate_walls(1)[0], "element_data", Grid_Pos="A1", Orientation="North")
+    manager.add_walls_bulk([record], place_on_grid=True)
+    wall = manager.model.by_type("IfcWall")[0]
+    before = wall.ObjectPlacement.RelativePlacement.Location.Coordinates
+
+    manager.get_updater().upsert_walls([with_changes(record, "element_data", Grid_Pos="C3")])
+    assert manager.get_bulk_builder().place_on_grid
+    assert wall.ObjectPlacement.RelativePlacement.Location.Coordinates != before
+    for rel in wall.HasOpenings:
+        assert rel.RelatedOpeningElement.ObjectPlacement.PlacementRelTo == wall.ObjectPlacement
+
+
+def test_removed_wall_leaves_shared_geometry_usable():
+    manager = IFCManager(None)
+    records = generate_walls(2)
+    manager.add_walls_bulk(records[:1])
+    manager.get_updater().remove_element(manager.model.by_type("IfcWall")[0])
+
+    twin = with_changes(records[0], "element_data", Element_ID=99)
+    manager.add_walls_bulk([twin, records[1]])
+    assert len(manager.model.by_type("IfcWall")) == 2
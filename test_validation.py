@@ -0,0 +1,44 @@
+import copy
+
+import pytest
+
+from benchmarks.synthetic import generate_slabs, generate_walls
+from ifc_library.inventory import WallInventory
+from ifc_library.validation import validate_slabs, validate_walls
+
+
+def test_generated_walls_and_slabs_are_valid():
+    assert validate_walls(generate_walls(20)).is_valid
+    assert validate_slabs(generate_slabs(20)).is_valid
+
+
+def test_non_numeric_values_are_reported_per_row():
+    walls = copy.deepcopy(generate_walls(3, max_voids=2))
+    walls[1]["geometry_data"]["Length"] = "abc"
+    walls[2]["element_data"]["Element_ID"] = "W-3"
+
+    report = validate_walls(walls)
+    assert report.by_row() == {1: ["Length: value is not a number"]}
+    assert report.valid.tolist() == [True, False, True]
+
+
+def test_non_numeric_void_is_reported():
+    walls = copy.deepcopy(generate_walls(2))
+    walls[0]["geometry_data"]["Voids"] = [{"X": "left", "Z": 0, "Width": 900, "Height": 2100}]
+
+    assert validate_walls(walls).by_row() == {0: ["Voids: value is not a number"]}
+
+
+def test_non_numeric_slab_dimension_is_reported():
+    slabs = copy.deepcopy(generate_slabs(2))
+    slabs[0]["element_data"]["Width"] = "wide"
+
+    assert validate_slabs(slabs).messages(0) == ["Width: value is not a number"]
+
+
+def test_strict_packing_names_the_field():
+    walls = copy.deepcopy(generate_walls(1))
+    walls[0]["geometry_data"]["Height"] = "tall"
+
+    with pytest.raises(ValueError, match="Height"):
+        WallInventory.from_records(walls)